@@ -9,12 +9,12 @@ from pathlib import Path
 from auditgraph import __version__
 from auditgraph.config import footprint_budget_settings, load_config, validate_rule_packs_in_config
 from auditgraph.utils.rule_packs import RulePackError
-from auditgraph.export import export_dot, export_graphml, export_json
+from auditgraph.export import export_dot, export_graphml, export_json, export_subgraph
 from auditgraph.logging import setup_logging
 from auditgraph.neo4j import export_neo4j, sync_neo4j
 from auditgraph.jobs.runner import list_jobs, run_job
 from auditgraph.pipeline.runner import PipelineRunner
-from auditgraph.query import diff_runs, keyword_search, neighbors, node_view, why_connected
+from auditgraph.query import diff_runs
 from auditgraph.scaffold import initialize_workspace
 from auditgraph.storage.artifacts import profile_pkg_root
 from auditgraph.utils.budget import evaluate_pkg_budget, latest_source_bytes
@@ -163,6 +163,22 @@ def _build_parser() -> argparse.ArgumentParser:
     neighbors_parser.add_argument("--depth", type=int, default=1, help="Traversal depth")
     neighbors_parser.add_argument("--edge-type", dest="edge_types", action="append", default=None, help="Edge type filter (repeatable)")
     neighbors_parser.add_argument("--min-confidence", type=float, default=None, help="Minimum edge confidence")
+    neighbors_parser.add_argument(
+        "--direction",
+        choices=["out", "in", "both"],
+        default="out",
+        help="Follow outgoing (out), incoming (in) or all (both) edges",
+    )
+    neighbors_parser.add_argument("--max-fanout", type=int, default=None, help="Edges followed from one node per hop")
+    neighbors_parser.add_argument("--max-edges", type=int, default=None, help="Edge budget for the whole traversal")
+    neighbors_parser.add_argument("--max-nodes", type=int, default=None, help="Node budget for the whole traversal")
+    neighbors_parser.add_argument(
+        "--component", default=None, help="Stay inside one connected component (number or entity id)"
+    )
+    neighbors_parser.add_argument("--community", default=None, help="Stay inside one community (number or entity id)")
+    neighbors_parser.add_argument(
+        "--ndjson", action="store_true", help="Stream one JSON object per line as edges are found"
+    )
     neighbors_parser.add_argument("--root", default=".", help="Workspace root (default: CWD; override with AUDITGRAPH_ROOT)")
     neighbors_parser.add_argument("--config", default=None, help="Config path (default: <root>/config/pkg.yaml; override with AUDITGRAPH_CONFIG)")
 
@@ -177,6 +193,20 @@ def _build_parser() -> argparse.ArgumentParser:
     export_parser.add_argument("--root", default=".", help="Workspace root (default: CWD; override with AUDITGRAPH_ROOT)")
     export_parser.add_argument("--config", default=None, help="Config path (default: <root>/config/pkg.yaml; override with AUDITGRAPH_CONFIG)")
     export_parser.add_argument("--output", default=None, help="Output file path")
+    export_parser.add_argument(
+        "--component", default=None, help="Only export this connected component (number or entity id)"
+    )
+    export_parser.add_argument("--community", default=None, help="Only export this community (number or entity id)")
+    export_parser.add_argument("--seed", default=None, help="Export only the subgraph around this entity id")
+    export_parser.add_argument("--depth", type=int, default=1, help="Hops from the seed (with --seed)")
+    export_parser.add_argument(
+        "--edge-type", action="append", default=None, help="Follow only this edge type (repeatable)"
+    )
+    export_parser.add_argument(
+        "--direction", choices=["out", "in", "both"], default="both", help="Edge direction to follow from the seed"
+    )
+    export_parser.add_argument("--max-nodes", type=int, default=None, help="Node budget for the subgraph walk")
+    export_parser.add_argument("--max-edges", type=int, default=None, help="Edge budget for the subgraph walk")
 
     jobs_parser = subparsers.add_parser("jobs", help="Run automation jobs")
     jobs_subparsers = jobs_parser.add_subparsers(dest="jobs_command", required=True)
@@ -188,9 +218,28 @@ def _build_parser() -> argparse.ArgumentParser:
     jobs_list.add_argument("--root", default=".", help="Workspace root (default: CWD; override with AUDITGRAPH_ROOT)")
     jobs_list.add_argument("--config", default=None, help="Config path (default: <root>/config/pkg.yaml; override with AUDITGRAPH_CONFIG)")
 
+    serve_parser = subparsers.add_parser("serve", help="Serve read commands from a warm query daemon")
+    serve_parser.add_argument(
+        "--root", default=".", help="Workspace root (default: CWD; override with AUDITGRAPH_ROOT)"
+    )
+    serve_parser.add_argument(
+        "--config", default=None, help="Config path (default: <root>/config/pkg.yaml; override with AUDITGRAPH_CONFIG)"
+    )
+    serve_parser.add_argument("--status", action="store_true", help="Report the running daemon instead of starting one")
+    serve_parser.add_argument("--stop", action="store_true", help="Stop the running daemon")
+
     why_parser = subparsers.add_parser("why-connected", help="Explain why two nodes are connected")
     why_parser.add_argument("--from", dest="from_id", required=True, help="Source id")
     why_parser.add_argument("--to", dest="to_id", required=True, help="Target id")
+    why_parser.add_argument("--paths", type=int, default=3, help="Number of shortest paths to return")
+    why_parser.add_argument("--max-depth", type=int, default=4, help="Maximum hops per path")
+    why_parser.add_argument(
+        "--direction",
+        choices=["out", "in", "both"],
+        default="both",
+        help="Follow edges forward (out), backward (in) or either way (both)",
+    )
+    why_parser.add_argument("--max-expansions", type=int, default=100_000, help="Node expansion budget")
     why_parser.add_argument("--root", default=".", help="Workspace root (default: CWD; override with AUDITGRAPH_ROOT)")
     why_parser.add_argument("--config", default=None, help="Config path (default: <root>/config/pkg.yaml; override with AUDITGRAPH_CONFIG)")
 
@@ -217,6 +266,10 @@ def _build_parser() -> argparse.ArgumentParser:
     list_parser.add_argument("--offset", type=int, default=0, help="Skip N results")
     list_parser.add_argument("--count-only", action="store_true", help="Return count only")
     list_parser.add_argument("--group-by", default=None, help="Group results by field")
+    list_parser.add_argument(
+        "--component", default=None, help="Only entities in this connected component (number or entity id)"
+    )
+    list_parser.add_argument("--community", default=None, help="Only entities in this community (number or entity id)")
     list_parser.add_argument("--root", default=".", help="Workspace root (default: CWD; override with AUDITGRAPH_ROOT)")
     list_parser.add_argument("--config", default=None, help="Config path (default: <root>/config/pkg.yaml; override with AUDITGRAPH_CONFIG)")
 
@@ -230,6 +283,22 @@ def _build_parser() -> argparse.ArgumentParser:
         help="Refuse non-loopback bolt:///neo4j:// URIs (Spec 027 FR-023a). Equivalent to AUDITGRAPH_REQUIRE_TLS=1.",
     )
 
+    gc_parser = subparsers.add_parser(
+        "gc", help="Remove artifacts unreachable from the latest run and compact the store"
+    )
+    gc_parser.add_argument("--root", default=".", help="Workspace root (default: CWD; override with AUDITGRAPH_ROOT)")
+    gc_parser.add_argument(
+        "--config", default=None, help="Config path (default: <root>/config/pkg.yaml; override with AUDITGRAPH_CONFIG)"
+    )
+    gc_parser.add_argument(
+        "--run-id", default=None, help="Run whose manifests define the live set (default: latest complete run)"
+    )
+    gc_parser.add_argument("--dry-run", action="store_true", help="Report reclaimable files and bytes without deleting")
+    gc_parser.add_argument("--keep-runs", type=int, default=1, help="Run directories to keep, including the live run")
+    gc_parser.add_argument(
+        "--archive", default=None, help="Move removed records and runs into this directory instead of discarding them"
+    )
+
     # Spec 027 FR-019..FR-022: auditgraph validate-store
     validate_store_parser = subparsers.add_parser(
         "validate-store",
@@ -258,6 +327,20 @@ def _emit(payload: dict[str, object]) -> None:
     print(json.dumps(payload, indent=2))
 
 
+def _run_read(args: argparse.Namespace, params: dict[str, object]) -> object:
+    """Answer a read command through the workspace's ``auditgraph serve``
+    daemon when one is running, otherwise in this process."""
+    from auditgraph.query.daemon import execute, request
+
+    root = _resolve_root(getattr(args, "root", "."))
+    config_path = _resolve_config(getattr(args, "config", None), root)
+    payload = request(root, config_path, args.command, params)
+    if payload is not None:
+        return payload
+    config = load_config(config_path)
+    return execute(profile_pkg_root(root, config), config, args.command, params)
+
+
 def _render_validate_store_text(result: dict) -> None:
     """Text renderer for `auditgraph validate-store` (Spec 027 US6)."""
     if "message" in result and not result.get("misses") and "profiles" not in result:
@@ -363,39 +446,19 @@ def main() -> None:
             return
 
         if args.command == "git-who":
-            from auditgraph.query.git_who import git_who
-
-            root = _resolve_root(getattr(args, "root", "."))
-            config = load_config(_resolve_config(getattr(args, "config", None), root))
-            pkg_root = profile_pkg_root(root, config)
-            _emit(git_who(pkg_root, args.file))
+            _emit(_run_read(args, {"file": args.file}))
             return
 
         if args.command == "git-log":
-            from auditgraph.query.git_log import git_log
-
-            root = _resolve_root(getattr(args, "root", "."))
-            config = load_config(_resolve_config(getattr(args, "config", None), root))
-            pkg_root = profile_pkg_root(root, config)
-            _emit(git_log(pkg_root, args.file))
+            _emit(_run_read(args, {"file": args.file}))
             return
 
         if args.command == "git-introduced":
-            from auditgraph.query.git_introduced import git_introduced
-
-            root = _resolve_root(getattr(args, "root", "."))
-            config = load_config(_resolve_config(getattr(args, "config", None), root))
-            pkg_root = profile_pkg_root(root, config)
-            _emit(git_introduced(pkg_root, args.file))
+            _emit(_run_read(args, {"file": args.file}))
             return
 
         if args.command == "git-history":
-            from auditgraph.query.git_history import git_history
-
-            root = _resolve_root(getattr(args, "root", "."))
-            config = load_config(_resolve_config(getattr(args, "config", None), root))
-            pkg_root = profile_pkg_root(root, config)
-            _emit(git_history(pkg_root, args.file))
+            _emit(_run_read(args, {"file": args.file}))
             return
 
         if args.command in {"normalize", "extract", "link", "index"}:
@@ -427,33 +490,20 @@ def main() -> None:
             return
 
         if args.command == "query":
-            root = _resolve_root(getattr(args, "root", "."))
-            config = load_config(_resolve_config(getattr(args, "config", None), root))
-            pkg_root = profile_pkg_root(root, config)
-            profile = config.profile()
-            search_cfg = profile.get("search", {})
-            enable_semantic = bool(search_cfg.get("semantic", {}).get("enabled", False))
-            score_rounding = float(search_cfg.get("ranking", {}).get("score_rounding", 0.000001))
-            results = keyword_search(
-                pkg_root,
-                args.q,
-                enable_semantic=enable_semantic,
-                score_rounding=score_rounding,
-                types=args.types,
-                where=args.where,
-                sort=args.sort,
-                descending=args.desc,
-                limit=args.limit,
-                offset=args.offset,
-            )
-            _emit({"query": args.q, "results": results})
+            params = {
+                "q": args.q,
+                "types": args.types,
+                "where": args.where,
+                "sort": args.sort,
+                "descending": args.desc,
+                "limit": args.limit,
+                "offset": args.offset,
+            }
+            _emit(_run_read(args, params))
             return
 
         if args.command == "node":
-            root = _resolve_root(getattr(args, "root", "."))
-            config = load_config(_resolve_config(getattr(args, "config", None), root))
-            pkg_root = profile_pkg_root(root, config)
-            payload = node_view(pkg_root, args.id)
+            payload = _run_read(args, {"id": args.id})
             _emit(payload)
             # Spec-028 US5 (BUG-4 fix): node_view returns a structured
             # error dict on miss rather than raising OSError. Preserve the
@@ -464,17 +514,41 @@ def main() -> None:
             return
 
         if args.command == "neighbors":
-            root = _resolve_root(getattr(args, "root", "."))
-            config = load_config(_resolve_config(getattr(args, "config", None), root))
-            pkg_root = profile_pkg_root(root, config)
-            payload = neighbors(
-                pkg_root,
-                args.id,
-                depth=args.depth,
-                edge_types=args.edge_types,
-                min_confidence=args.min_confidence,
-            )
-            _emit(payload)
+            params = {
+                "id": args.id,
+                "depth": args.depth,
+                "edge_types": args.edge_types,
+                "min_confidence": args.min_confidence,
+                "direction": args.direction,
+                "max_fanout": args.max_fanout,
+                "max_edges": args.max_edges,
+                "max_nodes": args.max_nodes,
+                "component": args.component,
+                "community": args.community,
+            }
+            if args.ndjson:
+                # Streamed in process: each edge is printed as the walk finds it.
+                from auditgraph.query.neighbors import iter_neighbors
+
+                root = _resolve_root(getattr(args, "root", "."))
+                config = load_config(_resolve_config(getattr(args, "config", None), root))
+                records = iter_neighbors(
+                    profile_pkg_root(root, config),
+                    args.id,
+                    args.depth,
+                    args.edge_types,
+                    args.min_confidence,
+                    args.direction,
+                    max_fanout=args.max_fanout,
+                    max_edges=args.max_edges,
+                    max_nodes=args.max_nodes,
+                    component=args.component,
+                    community=args.community,
+                )
+                for record in records:
+                    print(json.dumps(record), flush=True)
+                return
+            _emit(_run_read(args, params))
             return
 
         if args.command == "diff":
@@ -489,9 +563,6 @@ def main() -> None:
             root = _resolve_root(getattr(args, "root", "."))
             config = load_config(_resolve_config(getattr(args, "config", None), root))
             pkg_root = profile_pkg_root(root, config)
-            budget_settings = footprint_budget_settings(config)
-            source_bytes = latest_source_bytes(pkg_root)
-            budget_status = evaluate_pkg_budget(pkg_root, source_bytes, budget_settings, additional_bytes=0)
             export_base = (root / "exports" / "subgraphs").resolve()
             if args.output:
                 target = Path(args.output)
@@ -500,49 +571,108 @@ def main() -> None:
                 output_path = resolved
             else:
                 output_path = export_base / f"export.{args.format}"
-            if args.format == "dot":
-                path = export_dot(pkg_root, output_path, config=config)
-            elif args.format == "graphml":
-                path = export_graphml(pkg_root, output_path, config=config)
+            if args.seed:
+                # Budget applies to the streamed subgraph, not the whole store.
+                result = export_subgraph(
+                    root,
+                    pkg_root,
+                    output_path,
+                    args.seed,
+                    config=config,
+                    fmt=args.format,
+                    depth=args.depth,
+                    edge_types=args.edge_type,
+                    direction=args.direction,
+                    max_nodes=args.max_nodes,
+                    max_edges=args.max_edges,
+                    component=args.component,
+                    community=args.community,
+                )
+                path = result.path
+                budget_status = result.budget
+                payload = {
+                    "format": args.format,
+                    "output": str(path),
+                    "nodes": result.nodes,
+                    "edges": result.edges,
+                    "truncated": result.truncated,
+                }
             else:
-                path = export_json(root, pkg_root, output_path, config=config)
-            payload = {"format": args.format, "output": str(path)}
+                from auditgraph.index.clusters import cluster_members
+
+                budget_settings = footprint_budget_settings(config)
+                source_bytes = latest_source_bytes(pkg_root)
+                budget_status = evaluate_pkg_budget(pkg_root, source_bytes, budget_settings, additional_bytes=0)
+                entity_ids: set[str] | None = None
+                for kind in ("component", "community"):
+                    value = getattr(args, kind, None)
+                    if value is not None:
+                        members = set(cluster_members(pkg_root, kind, value))
+                        entity_ids = members if entity_ids is None else entity_ids & members
+                if args.format == "dot":
+                    path = export_dot(pkg_root, output_path, config=config, entity_ids=entity_ids)
+                elif args.format == "graphml":
+                    path = export_graphml(pkg_root, output_path, config=config, entity_ids=entity_ids)
+                else:
+                    path = export_json(root, pkg_root, output_path, config=config, entity_ids=entity_ids)
+                payload = {"format": args.format, "output": str(path)}
             if budget_status.status == "warn":
                 payload["budget"] = {
                     "status": budget_status.status,
                     "usage_ratio": budget_status.usage_ratio,
                     "limit_bytes": budget_status.limit_bytes,
                     "projected_bytes": budget_status.projected_bytes,
+                    "artifact_bytes": budget_status.artifact_bytes,
+                    "logical_bytes": budget_status.logical_bytes,
                 }
             _emit(payload)
             return
 
         if args.command == "list":
-            from auditgraph.query.list_entities import list_entities
-
-            root = _resolve_root(getattr(args, "root", "."))
-            config = load_config(_resolve_config(getattr(args, "config", None), root))
-            pkg_root = profile_pkg_root(root, config)
-            payload = list_entities(
-                pkg_root,
-                types=args.types,
-                where=args.where,
-                sort=args.sort,
-                descending=args.desc,
-                limit=args.limit,
-                offset=args.offset,
-                count_only=args.count_only,
-                group_by=args.group_by,
-            )
-            _emit(payload)
+            params = {
+                "types": args.types,
+                "where": args.where,
+                "sort": args.sort,
+                "descending": args.desc,
+                "limit": args.limit,
+                "offset": args.offset,
+                "count_only": args.count_only,
+                "group_by": args.group_by,
+                "component": args.component,
+                "community": args.community,
+            }
+            _emit(_run_read(args, params))
             return
 
         if args.command == "why-connected":
+            params = {
+                "from_id": args.from_id,
+                "to_id": args.to_id,
+                "k": args.paths,
+                "max_depth": args.max_depth,
+                "direction": args.direction,
+                "max_expansions": args.max_expansions,
+            }
+            _emit(_run_read(args, params))
+            return
+
+        if args.command == "serve":
+            from auditgraph.query.daemon import QueryDaemon, request
+
             root = _resolve_root(getattr(args, "root", "."))
-            config = load_config(_resolve_config(getattr(args, "config", None), root))
-            pkg_root = profile_pkg_root(root, config)
-            payload = why_connected(pkg_root, args.from_id, args.to_id)
-            _emit(payload)
+            config_path = _resolve_config(getattr(args, "config", None), root)
+            if args.status or args.stop:
+                payload = request(root, config_path, "shutdown" if args.stop else "status")
+                _emit(payload if payload is not None else {"status": "stopped"})
+                return
+            daemon = QueryDaemon(root, config_path)
+            daemon.bind()
+            _emit(daemon.status())
+            sys.stdout.flush()
+            try:
+                daemon.serve_forever()
+            except KeyboardInterrupt:
+                pass
             return
 
         if args.command == "run":
@@ -603,6 +733,22 @@ def main() -> None:
             _emit(payload.to_dict())
             return
 
+        if args.command == "gc":
+            root = _resolve_root(getattr(args, "root", "."))
+            config = load_config(_resolve_config(getattr(args, "config", None), root))
+            archive = Path(args.archive).resolve() if args.archive else None
+            runner = PipelineRunner()
+            result = runner.run_gc(
+                root=root,
+                config=config,
+                run_id=args.run_id,
+                dry_run=args.dry_run,
+                keep_runs=args.keep_runs,
+                archive_dir=archive,
+            )
+            _emit({"stage": result.stage, "status": result.status, "detail": result.detail})
+            return
+
         if args.command == "validate-store":
             from auditgraph.query.validate_store import validate_store
 
@@ -31,6 +31,8 @@ DEFAULT_CONFIG: dict[str, Any] = {
         }
     },
     "storage": {
+        "backend": "files",
+        "compression": "none",
         "footprint_budget": {
             "multiplier": 3.0,
             "warn_threshold": 0.8,
@@ -70,9 +72,15 @@ DEFAULT_CONFIG: dict[str, Any] = {
                 "cold_paths": ["*.lock", "*-lock.json", "*.generated.*"],
             },
             "search": {
-                "keyword": {"enabled": True},
+                "keyword": {
+                    "enabled": True,
+                    "bm25": {"k1": 1.2, "b": 0.75},
+                    "fuzzy": {"enabled": True, "max_edits": 2, "max_expansions": 50},
+                },
                 "semantic": {"enabled": False},
+                "field_indexes": ["type", "canonical_key", "author_email", "authored_at", "metadata.heading_level"],
                 "ranking": {"w_kw": 1.0, "w_sem": 0.3, "w_graph": 0.1, "score_rounding": 0.000001},
+                "centrality": {"enabled": False, "measure": "pagerank", "iterations": 50, "damping": 0.85},
             },
         }
     },
@@ -127,6 +135,90 @@ def footprint_budget_settings(config: Config) -> dict[str, Any]:
     return merged
 
 
+def storage_backend_name(config: Config) -> str:
+    default = str(DEFAULT_CONFIG.get("storage", {}).get("backend", "files"))
+    storage = config.raw.get("storage", {})
+    if not isinstance(storage, dict):
+        return default
+    return str(storage.get("backend", default))
+
+
+def storage_compression(config: Config) -> str:
+    default = str(DEFAULT_CONFIG.get("storage", {}).get("compression", "none"))
+    storage = config.raw.get("storage", {})
+    if not isinstance(storage, dict):
+        return default
+    return str(storage.get("compression", default))
+
+
+def bm25_settings(config: Config) -> dict[str, float]:
+    """Return the active profile's ``search.keyword.bm25`` ``k1``/``b``."""
+    defaults = DEFAULT_CONFIG["profiles"][DEFAULT_PROFILE_NAME]["search"]["keyword"]["bm25"]
+    search = config.profile().get("search", {})
+    keyword = search.get("keyword", {}) if isinstance(search, dict) else {}
+    bm25 = keyword.get("bm25", {}) if isinstance(keyword, dict) else {}
+    if not isinstance(bm25, dict):
+        bm25 = {}
+    return {name: float(bm25.get(name, default)) for name, default in defaults.items()}
+
+
+def fuzzy_settings(config: Config) -> dict[str, Any]:
+    """Return the active profile's ``search.keyword.fuzzy`` settings:
+    ``enabled`` (retry misses with typo tolerance), ``max_edits`` and
+    ``max_expansions`` (cap on terms a wildcard or fuzzy term expands to)."""
+    defaults = DEFAULT_CONFIG["profiles"][DEFAULT_PROFILE_NAME]["search"]["keyword"]["fuzzy"]
+    search = config.profile().get("search", {})
+    keyword = search.get("keyword", {}) if isinstance(search, dict) else {}
+    fuzzy = keyword.get("fuzzy", {}) if isinstance(keyword, dict) else {}
+    if not isinstance(fuzzy, dict):
+        fuzzy = {}
+    return {
+        "enabled": bool(fuzzy.get("enabled", defaults["enabled"])),
+        "max_edits": int(fuzzy.get("max_edits", defaults["max_edits"])),
+        "max_expansions": int(fuzzy.get("max_expansions", defaults["max_expansions"])),
+    }
+
+
+def field_index_settings(config: Config) -> list[str]:
+    """Return the entity fields the active profile indexes for ``list
+    --where`` (``search.field_indexes``); dotted names reach nested
+    values."""
+    defaults = DEFAULT_CONFIG["profiles"][DEFAULT_PROFILE_NAME]["search"]["field_indexes"]
+    search = config.profile().get("search", {})
+    fields = search.get("field_indexes", defaults) if isinstance(search, dict) else defaults
+    if not isinstance(fields, list):
+        return list(defaults)
+    return [str(field) for field in fields if str(field)]
+
+
+def centrality_settings(config: Config) -> dict[str, Any]:
+    """Return the active profile's ``search.centrality`` settings:
+    ``enabled`` (build scores in the index stage), ``measure`` blended
+    into keyword scores (``pagerank`` or ``degree``), PageRank
+    ``iterations`` and ``damping``, plus ``weight`` from
+    ``search.ranking.w_graph``."""
+    defaults = DEFAULT_CONFIG["profiles"][DEFAULT_PROFILE_NAME]["search"]
+    search = config.profile().get("search", {})
+    if not isinstance(search, dict):
+        search = {}
+    centrality = search.get("centrality", {})
+    if not isinstance(centrality, dict):
+        centrality = {}
+    ranking = search.get("ranking", {})
+    if not isinstance(ranking, dict):
+        ranking = {}
+    measure = str(centrality.get("measure", defaults["centrality"]["measure"]))
+    if measure not in ("pagerank", "degree"):
+        raise ConfigError(f"search.centrality.measure must be 'pagerank' or 'degree', got {measure!r}")
+    return {
+        "enabled": bool(centrality.get("enabled", defaults["centrality"]["enabled"])),
+        "measure": measure,
+        "iterations": int(centrality.get("iterations", defaults["centrality"]["iterations"])),
+        "damping": float(centrality.get("damping", defaults["centrality"]["damping"])),
+        "weight": float(ranking.get("w_graph", defaults["ranking"]["w_graph"])),
+    }
+
+
 def _load_yaml(path: Path) -> dict[str, Any]:
     try:
         import yaml  # type: ignore
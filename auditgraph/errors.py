@@ -28,3 +28,15 @@ class CompatibilityError(AuditgraphError):
 
 class BudgetError(AuditgraphError):
     """Disk footprint budget failure."""
+
+
+class GarbageCollectionError(AuditgraphError):
+    """Store garbage collection cannot determine a safe live set."""
+
+
+class QuerySyntaxError(AuditgraphError):
+    """Malformed keyword query expression."""
+
+
+class ServeError(AuditgraphError):
+    """Query daemon failure, or an error it reported for a request."""
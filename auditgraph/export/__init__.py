@@ -3,5 +3,6 @@
 from .dot import export_dot
 from .graphml import export_graphml
 from .json import export_json
+from .subgraph import export_subgraph
 
-__all__ = ["export_json", "export_dot", "export_graphml"]
+__all__ = ["export_json", "export_dot", "export_graphml", "export_subgraph"]
@@ -1,28 +1,57 @@
 from __future__ import annotations
 
 from pathlib import Path
+from typing import Collection, Iterable, Iterator
+from xml.sax.saxutils import escape, quoteattr
 
 from auditgraph.config import Config, load_config
 from auditgraph.utils.redaction import build_redactor_for_pkg_root
 
-from auditgraph.storage.artifacts import write_text
+from auditgraph.export.stream import LineWriter, atomic_output
+from auditgraph.link.adjacency import edges_among
 from auditgraph.storage.loaders import load_entities
 
 
-def export_graphml(pkg_root: Path, output_path: Path, config: Config | None = None) -> Path:
+def graphml_lines(nodes: Iterable[tuple[str, str]], edges: Iterable[tuple[str, str, str]]) -> Iterator[str]:
+    """GraphML lines for ``(id, label)`` nodes and ``(from, to, type)`` edges."""
+    yield "<?xml version=\"1.0\" encoding=\"UTF-8\"?>"
+    yield "<graphml xmlns=\"http://graphml.graphdrawing.org/xmlns\">"
+    yield "  <graph id=\"auditgraph\" edgedefault=\"directed\">"
+    for node_id, label in nodes:
+        yield f"    <node id={quoteattr(node_id)}><data key=\"label\">{escape(label)}</data></node>"
+    for source, target, edge_type in edges:
+        yield (
+            f"    <edge source={quoteattr(source)} target={quoteattr(target)}>"
+            f"<data key=\"type\">{escape(edge_type)}</data></edge>"
+        )
+    yield "  </graph>"
+    yield "</graphml>"
+
+
+def export_graphml(
+    pkg_root: Path,
+    output_path: Path,
+    config: Config | None = None,
+    *,
+    entity_ids: Collection[str] | None = None,
+) -> Path:
+    """Write every entity, or only ``entity_ids`` (e.g. one community),
+    with the links between the written entities."""
     resolved = config or load_config(None)
     redactor = build_redactor_for_pkg_root(pkg_root, resolved)
-    lines = [
-        "<?xml version=\"1.0\" encoding=\"UTF-8\"?>",
-        "<graphml xmlns=\"http://graphml.graphdrawing.org/xmlns\">",
-        "  <graph id=\"auditgraph\" edgedefault=\"directed\">",
-    ]
+    nodes: list[tuple[str, str]] = []
     for entity in load_entities(pkg_root, sorted_by_id=True):
         node_id = str(entity.get("id"))
+        if entity_ids is not None and node_id not in entity_ids:
+            continue
         label = str(entity.get("name", node_id))
-        label = str(redactor.redact_text(label).value)
-        lines.append(f"    <node id=\"{node_id}\"><data key=\"label\">{label}</data></node>")
-    lines.append("  </graph>")
-    lines.append("</graphml>")
-    write_text(output_path, "\n".join(lines))
+        nodes.append((node_id, str(redactor.redact_text(label).value)))
+    edges = (
+        (source, str(edge.get("to_id", "")), str(edge.get("type", "")))
+        for source, edge in edges_among(pkg_root, [node_id for node_id, _ in nodes])
+    )
+    with atomic_output(output_path) as handle:
+        writer = LineWriter(handle)
+        for line in graphml_lines(nodes, edges):
+            writer.line(line)
     return output_path
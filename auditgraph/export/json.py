@@ -1,35 +1,74 @@
 from __future__ import annotations
 
 from pathlib import Path
+from typing import Collection, Iterable, Iterator
 
 from auditgraph.config import Config, footprint_budget_settings, load_config
 from auditgraph.utils.export_metadata import build_export_metadata
-from auditgraph.utils.redaction import build_redactor_for_pkg_root
+from auditgraph.utils.redaction import Redactor, RedactionSummary, build_redactor_for_pkg_root
 from auditgraph.utils.budget import enforce_budget, evaluate_pkg_budget, latest_source_bytes
 
-from auditgraph.storage.artifacts import write_json
-from auditgraph.storage.loaders import load_chunks, load_documents, load_entities
+from auditgraph.export.stream import JsonObjectWriter, atomic_output
+from auditgraph.storage.loaders import iter_documents, iter_entities, iter_sorted_chunks, iter_sorted_entities
 
 
-def export_json(root: Path, pkg_root: Path, output_path: Path, config: Config | None = None) -> Path:
+def _redacted(
+    records: Iterable[dict[str, object]],
+    redactor: Redactor,
+    summary: RedactionSummary,
+) -> Iterator[dict[str, object]]:
+    for record in records:
+        result = redactor.redact_payload(record)
+        summary.merge(result.summary)
+        yield result.value
+
+
+def _cited_sources(pkg_root: Path, entity_ids: Collection[str]) -> set[object]:
+    return {
+        ref.get("source_hash")
+        for entity in iter_entities(pkg_root)
+        if str(entity.get("id")) in entity_ids
+        for ref in entity.get("refs", []) or []
+        if isinstance(ref, dict)
+    }
+
+
+def export_json(
+    root: Path,
+    pkg_root: Path,
+    output_path: Path,
+    config: Config | None = None,
+    *,
+    entity_ids: Collection[str] | None = None,
+) -> Path:
+    """Write entities, documents and chunks with export metadata. With
+    ``entity_ids`` (e.g. one community) only those entities are written,
+    with the documents and chunks of the sources they cite.
+
+    Records are streamed from the store and redacted one at a time; the
+    file is byte-identical to ``write_json`` of the whole payload.
+    """
     resolved = config or load_config(None)
     budget_settings = footprint_budget_settings(resolved)
     source_bytes = latest_source_bytes(pkg_root)
     budget_status = evaluate_pkg_budget(pkg_root, source_bytes, budget_settings, additional_bytes=0)
     enforce_budget(budget_status)
     redactor = build_redactor_for_pkg_root(pkg_root, resolved)
-    data = {
-        "entities": load_entities(pkg_root, sorted_by_id=True),
-        "documents": load_documents(pkg_root),
-        "chunks": load_chunks(pkg_root),
-    }
-    redaction_result = redactor.redact_payload(data)
-    payload = dict(redaction_result.value)
-    payload["export_metadata"] = build_export_metadata(
-        root,
-        resolved,
-        redactor.policy,
-        redaction_result.summary,
-    )
-    write_json(output_path, payload)
+    summary = RedactionSummary()
+    chunks: Iterable[dict[str, object]] = iter_sorted_chunks(pkg_root)
+    documents: Iterable[dict[str, object]] = iter_documents(pkg_root)
+    entities: Iterable[dict[str, object]] = iter_sorted_entities(pkg_root)
+    if entity_ids is not None:
+        cited = _cited_sources(pkg_root, entity_ids)
+        chunks = (chunk for chunk in chunks if chunk.get("source_hash") in cited)
+        documents = (document for document in documents if document.get("source_hash") in cited)
+        entities = (entity for entity in entities if str(entity.get("id")) in entity_ids)
+    with atomic_output(output_path) as handle:
+        # Fields in sorted key order, the layout ``write_json`` produces.
+        writer = JsonObjectWriter(handle)
+        writer.array("chunks", _redacted(chunks, redactor, summary))
+        writer.array("documents", _redacted(documents, redactor, summary))
+        writer.array("entities", _redacted(entities, redactor, summary))
+        writer.field("export_metadata", build_export_metadata(root, resolved, redactor.policy, summary))
+        writer.close()
     return output_path
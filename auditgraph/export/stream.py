@@ -0,0 +1,90 @@
+"""Incremental writers for export files.
+
+Exports are written record by record to a temporary sibling of the
+output and renamed into place once complete, so memory stays bounded by
+one record and a failed export (e.g. over budget) leaves no partial
+file. Both writers count the bytes written for budget checks.
+"""
+from __future__ import annotations
+
+import os
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, BinaryIO, Iterable, Iterator
+
+from auditgraph.storage.artifacts import ensure_dir
+from auditgraph.storage.codec import dumps
+
+
+@contextmanager
+def atomic_output(path: Path) -> Iterator[BinaryIO]:
+    """Yield a binary handle whose contents replace ``path`` on success."""
+    ensure_dir(path.parent)
+    tmp_path = path.with_name(path.name + ".tmp")
+    try:
+        with open(tmp_path, "wb") as handle:
+            yield handle
+        os.replace(tmp_path, path)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+
+
+def _indent(data: bytes, prefix: bytes) -> bytes:
+    # Pretty JSON never has a raw newline inside a string.
+    return data.replace(b"\n", b"\n" + prefix)
+
+
+class JsonObjectWriter:
+    """Write one pretty-printed JSON object a field at a time.
+
+    Given the same fields in sorted key order, the bytes equal
+    ``dumps(payload, pretty=True)`` for the whole object; ``array``
+    fields are consumed from an iterable one element at a time.
+    """
+
+    def __init__(self, handle: BinaryIO) -> None:
+        self._handle = handle
+        self._fields = 0
+        self.bytes_written = 0
+
+    def _write(self, data: bytes) -> None:
+        self._handle.write(data)
+        self.bytes_written += len(data)
+
+    def _key(self, key: str) -> None:
+        self._write((b"{\n  " if not self._fields else b",\n  ") + dumps(key) + b": ")
+        self._fields += 1
+
+    def field(self, key: str, value: Any) -> None:
+        self._key(key)
+        self._write(_indent(dumps(value, pretty=True), b"  "))
+
+    def array(self, key: str, items: Iterable[Any]) -> int:
+        """Write ``items`` as the array field ``key``; returns the count."""
+        self._key(key)
+        count = 0
+        for item in items:
+            self._write((b"[\n    " if not count else b",\n    ") + _indent(dumps(item, pretty=True), b"    "))
+            count += 1
+        self._write(b"\n  ]" if count else b"[]")
+        return count
+
+    def close(self) -> None:
+        self._write(b"\n}" if self._fields else b"{}")
+
+
+class LineWriter:
+    """Write text lines separated (not terminated) by newlines, the
+    layout of ``"\\n".join(lines)``."""
+
+    def __init__(self, handle: BinaryIO) -> None:
+        self._handle = handle
+        self._lines = 0
+        self.bytes_written = 0
+
+    def line(self, text: str) -> None:
+        data = (b"\n" if self._lines else b"") + text.encode("utf-8")
+        self._handle.write(data)
+        self.bytes_written += len(data)
+        self._lines += 1
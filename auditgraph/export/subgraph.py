@@ -0,0 +1,191 @@
+"""Seeded subgraph export (``auditgraph export --seed``).
+
+The subgraph is the breadth-first walk of ``query.neighbors`` from one
+seed entity: every edge it reports plus the nodes those edges reach,
+under the same depth, edge-type, direction, cluster and ``max_nodes`` /
+``max_edges`` limits. The walk runs twice, once to stream the nodes and
+once to stream the edges, so neither list is held in memory; both walks
+read the same adjacency and so report the same subgraph. As in full
+exports, only stored entities are written: a reached node without an
+entity record is left out, with its edges. A seed that is not a stored
+entity is an error.
+
+Records are redacted one at a time. The footprint budget is applied to
+the bytes actually written rather than to the whole store: the export
+is aborted with ``BudgetError`` (leaving no output file) as soon as it
+reaches the ``block`` threshold, and the final status is returned.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Iterable, Iterator
+
+from auditgraph.config import Config, footprint_budget_settings, load_config
+from auditgraph.export.dot import dot_lines
+from auditgraph.export.graphml import graphml_lines
+from auditgraph.export.stream import JsonObjectWriter, LineWriter, atomic_output
+from auditgraph.query.neighbors import iter_neighbors
+from auditgraph.storage.backends import get_backend
+from auditgraph.utils.budget import BudgetStatus, enforce_budget, evaluate_budget, latest_source_bytes
+from auditgraph.utils.export_metadata import build_export_metadata
+from auditgraph.utils.redaction import RedactionSummary, build_redactor_for_pkg_root
+
+FORMATS = ("json", "dot", "graphml")
+
+
+@dataclass(frozen=True)
+class SubgraphExport:
+    path: Path
+    nodes: int
+    edges: int
+    truncated: bool
+    budget: BudgetStatus
+
+
+def iter_subgraph(
+    pkg_root: Path,
+    seed: str,
+    *,
+    depth: int = 1,
+    edge_types: list[str] | None = None,
+    direction: str = "both",
+    max_nodes: int | None = None,
+    max_edges: int | None = None,
+    component: str | int | None = None,
+    community: str | int | None = None,
+) -> Iterator[tuple[str, Any]]:
+    """Yield ``("node", id)`` for the seed and each newly reached node,
+    ``("edge", {...})`` per edge with ``from_id`` and ``to_id`` set, and
+    finally ``("truncated", bool)``."""
+    seen = {seed}
+    yield "node", seed
+    for record in iter_neighbors(
+        pkg_root,
+        seed,
+        depth,
+        edge_types,
+        direction=direction,
+        max_edges=max_edges,
+        max_nodes=max_nodes,
+        component=component,
+        community=community,
+    ):
+        if "edge" in record:
+            edge: dict[str, object] = record["edge"]  # type: ignore[assignment]
+            for node_id in (str(edge["from_id"]), str(edge["to_id"])):
+                if node_id not in seen:
+                    seen.add(node_id)
+                    yield "node", node_id
+            yield "edge", edge
+        elif "truncated" in record:
+            yield "truncated", bool(record["truncated"])
+
+
+def export_subgraph(
+    root: Path,
+    pkg_root: Path,
+    output_path: Path,
+    seed: str,
+    config: Config | None = None,
+    *,
+    fmt: str = "json",
+    depth: int = 1,
+    edge_types: list[str] | None = None,
+    direction: str = "both",
+    max_nodes: int | None = None,
+    max_edges: int | None = None,
+    component: str | int | None = None,
+    community: str | int | None = None,
+) -> SubgraphExport:
+    """Stream the subgraph around ``seed`` to ``output_path`` as JSON,
+    DOT or GraphML."""
+    if fmt not in FORMATS:
+        raise ValueError(f"format must be one of {FORMATS}, got {fmt!r}")
+    backend = get_backend(pkg_root)
+    if not backend.exists("entities", seed):
+        raise ValueError(f"seed {seed!r} is not a stored entity")
+    resolved = config or load_config(None)
+    redactor = build_redactor_for_pkg_root(pkg_root, resolved)
+    budget_settings = footprint_budget_settings(resolved)
+    source_bytes = latest_source_bytes(pkg_root)
+    summary = RedactionSummary()
+    counts = {"node": 0, "edge": 0}
+    state = {"truncated": False}
+    stored: dict[str, bool] = {}
+
+    def is_stored(node_id: str) -> bool:
+        if node_id not in stored:
+            stored[node_id] = backend.exists("entities", node_id)
+        return stored[node_id]
+
+    def written(kind: str, value: Any) -> bool:
+        if kind == "node":
+            return is_stored(value)
+        return is_stored(str(value["from_id"])) and is_stored(str(value["to_id"]))
+
+    def walk(kind: str) -> Iterator[Any]:
+        for record_kind, value in iter_subgraph(
+            pkg_root,
+            seed,
+            depth=depth,
+            edge_types=edge_types,
+            direction=direction,
+            max_nodes=max_nodes,
+            max_edges=max_edges,
+            component=component,
+            community=community,
+        ):
+            if record_kind == "truncated":
+                state["truncated"] = value
+            elif record_kind == kind and written(kind, value):
+                counts[kind] += 1
+                yield value
+
+    def node_record(node_id: str) -> dict[str, object]:
+        result = redactor.redact_payload(backend.load("entities", node_id))
+        summary.merge(result.summary)
+        return result.value
+
+    def edge_record(edge: dict[str, object]) -> dict[str, object]:
+        result = redactor.redact_payload(edge)
+        summary.merge(result.summary)
+        return result.value
+
+    def checked(items: Iterable[Any], writer: JsonObjectWriter | LineWriter) -> Iterator[Any]:
+        for item in items:
+            enforce_budget(evaluate_budget(source_bytes, writer.bytes_written, budget_settings))
+            yield item
+
+    with atomic_output(output_path) as handle:
+        if fmt == "json":
+            json_writer = JsonObjectWriter(handle)
+            writer: JsonObjectWriter | LineWriter = json_writer
+            json_writer.field("seed", seed)
+            json_writer.array("nodes", checked(map(node_record, walk("node")), json_writer))
+            json_writer.array("edges", checked(map(edge_record, walk("edge")), json_writer))
+            json_writer.field("truncated", state["truncated"])
+            json_writer.field("export_metadata", build_export_metadata(root, resolved, redactor.policy, summary))
+            json_writer.close()
+        else:
+            nodes = (
+                (node_id, str(redactor.redact_text(str(backend.load("entities", node_id).get("name", node_id))).value))
+                for node_id in walk("node")
+            )
+            edges = (
+                (str(edge["from_id"]), str(edge["to_id"]), str(edge.get("type", "")))
+                for edge in walk("edge")
+            )
+            lines = dot_lines(nodes, edges) if fmt == "dot" else graphml_lines(nodes, edges)
+            writer = LineWriter(handle)
+            for line in checked(lines, writer):
+                writer.line(line)
+        status = evaluate_budget(source_bytes, writer.bytes_written, budget_settings)
+        enforce_budget(status)
+    return SubgraphExport(
+        path=output_path,
+        nodes=counts["node"],
+        edges=counts["edge"],
+        truncated=bool(state["truncated"]),
+        budget=status,
+    )
@@ -7,31 +7,16 @@ from auditgraph.extract.adr import extract_decisions
 from auditgraph.extract.entities import build_log_claim
 from auditgraph.extract.logs import extract_log_signatures
 from auditgraph.index.decisions import write_decision_index
-from auditgraph.storage.artifacts import write_json
-from auditgraph.storage.sharding import shard_dir
+from auditgraph.storage.backends import get_backend
 from auditgraph.utils.redaction import Redactor
 
 
 def write_entities(pkg_root: Path, entities: Iterable[dict[str, object]]) -> list[Path]:
-    paths: list[Path] = []
-    for entity in entities:
-        entity_id = entity["id"]
-        shard = shard_dir(pkg_root / "entities", entity_id)
-        path = shard / f"{entity_id}.json"
-        write_json(path, entity)
-        paths.append(path)
-    return paths
+    return get_backend(pkg_root).write("entities", entities)
 
 
 def write_claims(pkg_root: Path, claims: Iterable[dict[str, object]]) -> list[Path]:
-    paths: list[Path] = []
-    for claim in claims:
-        claim_id = claim["id"]
-        shard = shard_dir(pkg_root / "claims", claim_id)
-        path = shard / f"{claim_id}.json"
-        write_json(path, claim)
-        paths.append(path)
-    return paths
+    return get_backend(pkg_root).write("claims", claims)
 
 
 def extract_adr_claims(pkg_root: Path, paths: Iterable[Path]) -> list[dict[str, object]]:
@@ -4,12 +4,14 @@ from __future__ import annotations
 import json
 import logging
 import re
-from collections import defaultdict
+from collections import OrderedDict, defaultdict
 from pathlib import Path
 from typing import Any
 
 from auditgraph.storage.hashing import entity_id as _ner_entity_id, sha256_text
 from auditgraph.storage.audit import DEFAULT_PIPELINE_VERSION
+from auditgraph.storage.backends import get_backend
+from auditgraph.storage.content_store import BODY_CACHE_SIZE, BodyReader, body_key
 
 logger = logging.getLogger(__name__)
 
@@ -309,13 +311,10 @@ def extract_ner_entities(
         logger.warning("NER model not available; skipping NER extraction.")
         return [], []
 
-    # Load all chunk JSON files
-    chunks_dir = pkg_root / "chunks"
-    if not chunks_dir.exists():
-        return [], []
-
-    chunk_files = sorted(chunks_dir.rglob("*.json"))
-    if not chunk_files:
+    # Load all chunks through the profile's storage backend
+    backend = get_backend(pkg_root)
+    chunk_ids = backend.iter_ids("chunks")
+    if not chunk_ids:
         return [], []
 
     # Track mentions: key=(ner_type, normalized_name) -> {surface_forms, chunks, refs}
@@ -329,9 +328,15 @@ def extract_ner_entities(
     # Track which entities appear in which chunk (for co-occurrence)
     chunk_entity_keys: dict[str, set[tuple[str, str]]] = defaultdict(set)
 
-    for chunk_file in chunk_files:
+    # Chunks sharing a body (same text in several documents) are analysed
+    # once while the analysis stays in this LRU cache (bounded like
+    # BodyReader's); every chunk still gets its own mentions and refs.
+    bodies = BodyReader(backend)
+    analyses: OrderedDict[str, tuple[list[dict[str, Any]], list[tuple[str, int, int]]] | None] = OrderedDict()
+
+    for chunk_key in chunk_ids:
         try:
-            chunk = json.loads(chunk_file.read_text(encoding="utf-8"))
+            chunk = bodies.hydrate(backend.load("chunks", chunk_key))
         except (json.JSONDecodeError, OSError):
             continue
 
@@ -359,12 +364,29 @@ def extract_ner_entities(
         # large fraction of the false positives observed on technical content.
         # The stripped text preserves real content but removes formatting
         # tokens that have no semantic meaning.
-        ner_input_text = strip_markdown_noise(text)
-        if not ner_input_text:
+        key_for_body = body_key(chunk)
+        if key_for_body in analyses:
+            analyses.move_to_end(key_for_body)
+            analysis = analyses[key_for_body]
+        else:
+            ner_input_text = strip_markdown_noise(text)
+            # Run spaCy NER on the stripped text and the case number regex
+            # on the original text.
+            analysis = (
+                (
+                    extract_entities_from_text(ner_input_text, nlp, entity_types=allowed_types),
+                    [(match.group(), match.start(), match.end()) for match in CASE_NUMBER_PATTERN.finditer(text)],
+                )
+                if ner_input_text
+                else None
+            )
+            analyses[key_for_body] = analysis
+            if len(analyses) > BODY_CACHE_SIZE:
+                analyses.popitem(last=False)
+        if analysis is None:
             continue
+        spacy_entities, case_numbers = analysis
 
-        # Run spaCy NER on the stripped text
-        spacy_entities = extract_entities_from_text(ner_input_text, nlp, entity_types=allowed_types)
         for ent in spacy_entities:
             label = ent["label"]
             if label not in _LABEL_MAP:
@@ -388,9 +410,7 @@ def extract_ner_entities(
             })
             chunk_entity_keys[chunk_id].add(key)
 
-        # Run case number regex
-        for match in CASE_NUMBER_PATTERN.finditer(text):
-            case_num = match.group()
+        for case_num, span_start, span_end in case_numbers:
             normalized = case_num.strip()
             key = ("ner:case_number", normalized.lower())
             mentions[key]["surface_forms"].add(case_num)
@@ -400,8 +420,8 @@ def extract_ner_entities(
                 "source_path": source_path,
                 "source_hash": source_hash,
                 "chunk_id": chunk_id,
-                "span_start": match.start(),
-                "span_end": match.end(),
+                "span_start": span_start,
+                "span_end": span_end,
                 "surface_form": case_num,
                 "score": 1.0,
             })
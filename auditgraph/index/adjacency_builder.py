@@ -1,34 +1,35 @@
 """Forward adjacency index builder from all link files."""
 from __future__ import annotations
 
-import json
 from collections import defaultdict
 from pathlib import Path
 
+from auditgraph.index.csr_adjacency import write_csr_adjacency
+from auditgraph.storage.artifacts import write_json
+from auditgraph.storage.loaders import load_links
+
 
 def build_adjacency_index(pkg_root: Path) -> Path:
     """Rebuild indexes/graph/adjacency.json from all link files.
 
-    Reads all links from pkg_root/links/.
+    Reads all links through the profile's storage backend.
     Builds: {from_id: [{to_id, type, confidence, rule_id}, ...]}.
-    Writes atomically. Returns path.
+    Writes atomically, then writes the CSR index (forward and reverse)
+    under indexes/graph/csr/. Returns the adjacency.json path.
     """
-    links_dir = pkg_root / "links"
     adjacency: dict[str, list[dict[str, object]]] = defaultdict(list)
 
-    if links_dir.exists():
-        for path in sorted(links_dir.rglob("*.json"), key=lambda p: p.name):
-            data = json.loads(path.read_text())
-            from_id = str(data.get("from_id", ""))
-            if not from_id:
-                continue
-            edge = {
-                "to_id": str(data.get("to_id", "")),
-                "type": str(data.get("type", "")),
-                "confidence": data.get("confidence", 1.0),
-                "rule_id": str(data.get("rule_id", "")),
-            }
-            adjacency[from_id].append(edge)
+    for data in load_links(pkg_root):
+        from_id = str(data.get("from_id", ""))
+        if not from_id:
+            continue
+        edge = {
+            "to_id": str(data.get("to_id", "")),
+            "type": str(data.get("type", "")),
+            "confidence": data.get("confidence", 1.0),
+            "rule_id": str(data.get("rule_id", "")),
+        }
+        adjacency[from_id].append(edge)
 
     # Sort edges within each source for determinism
     for from_id in adjacency:
@@ -40,6 +41,7 @@ def build_adjacency_index(pkg_root: Path) -> Path:
     out_dir = pkg_root / "indexes" / "graph"
     out_dir.mkdir(parents=True, exist_ok=True)
     out_path = out_dir / "adjacency.json"
-    out_path.write_text(json.dumps(sorted_adj, indent=2))
+    write_json(out_path, sorted_adj, compact=True)
+    write_csr_adjacency(pkg_root, sorted_adj, out_path)
 
     return out_path
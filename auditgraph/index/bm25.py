@@ -1,46 +1,320 @@
+"""BM25 index over entity names and aliases.
+
+``indexes/bm25/index.json`` holds, per term, the entities containing it
+with their per-field term frequencies, plus the statistics BM25 needs:
+
+    {
+      "type": "bm25", "version": 2,
+      "fields": ["name", "aliases"],
+      "doc_count": N,
+      "avg_length": {"name": ..., "aliases": ...},
+      "lengths": {entity_id: [name_len, aliases_len]},
+      "postings": {term: [[entity_id, name_tf, aliases_tf], ...]}
+    }
+
+Document frequency is the length of a posting list. Terms come from
+``tokenize``; the whole lower-cased name and each whole alias are also
+indexed as one term each (tf 1, not counted in field length) so an exact
+name match outranks a partial one. Indexes written before version 2 have
+only ``entries`` (term → entity IDs); ``score_bm25`` scores those hits 1.0.
+
+Next to it, ``indexes/bm25/lexicon/`` holds the same postings as a
+memory-mapped ``index.lexicon.Lexicon`` whose entries carry each
+entity's field lengths inline (``[entity_id, name_tf, aliases_tf,
+name_len, aliases_len]``), so ``search_bm25`` scores a query by reading
+only its terms' postings instead of parsing index.json.
+``indexes/bm25/trigrams/`` maps each character trigram to the terms
+containing it, for fuzzy lookups (``index.term_expansion``).
+"""
 from __future__ import annotations
 
+import heapq
+import math
 import re
+from bisect import bisect_left
 from collections import defaultdict
 from pathlib import Path
-from typing import Iterable
+from typing import Any, Callable, Iterable, Iterator
 
-from auditgraph.storage.artifacts import write_json
+from auditgraph.index.lexicon import Lexicon, write_lexicon
+from auditgraph.index.term_expansion import trigram_entries
+from auditgraph.storage.artifacts import read_json, write_json
 
 _TOKEN_SPLIT = re.compile(r"[\s_\-./]+")
 
+BM25_FIELDS: tuple[str, ...] = ("name", "aliases")
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+
+def bm25_index_path(pkg_root: Path) -> Path:
+    return pkg_root / "indexes" / "bm25" / "index.json"
+
+
+def bm25_lexicon_dir(pkg_root: Path) -> Path:
+    return pkg_root / "indexes" / "bm25" / "lexicon"
+
+
+def bm25_trigram_dir(pkg_root: Path) -> Path:
+    return pkg_root / "indexes" / "bm25" / "trigrams"
+
 
 def tokenize(text: str) -> list[str]:
     """Split text into searchable tokens on whitespace, underscores, hyphens, dots, slashes."""
     return [t for t in _TOKEN_SPLIT.split(text.lower()) if t]
 
 
+def query_terms(query: str) -> list[str]:
+    """Distinct terms of ``query`` in order: its tokens, then the whole
+    normalized query when it differs (matches an indexed full name)."""
+    terms = list(dict.fromkeys(tokenize(query)))
+    full = query.lower().strip()
+    if full and full not in terms:
+        terms.append(full)
+    return terms
+
+
+def _field_terms(values: Iterable[str]) -> tuple[dict[str, int], int]:
+    """Return ``(term frequencies, field length)`` for one field's values."""
+    frequencies: dict[str, int] = defaultdict(int)
+    length = 0
+    for value in values:
+        tokens = tokenize(value)
+        length += len(tokens)
+        for token in tokens:
+            frequencies[token] += 1
+        full = value.lower().strip()
+        if full and full not in tokens:
+            frequencies[full] += 1
+    return frequencies, length
+
+
 def build_bm25_index(pkg_root: Path, entities: Iterable[dict[str, object]]) -> Path:
-    inverted: dict[str, list[str]] = defaultdict(list)
-    for entity in entities:
-        name = str(entity.get("name", ""))
+    postings: dict[str, list[list[Any]]] = defaultdict(list)
+    lengths: dict[str, list[int]] = {}
+    for entity in sorted(entities, key=lambda item: str(item.get("id"))):
         entity_id = str(entity.get("id"))
-        # Index the full name as a single key (for exact match)
-        full_key = name.lower().strip()
-        if full_key:
-            inverted[full_key].append(entity_id)
-        # Index individual tokens (for partial match)
-        for token in tokenize(name):
-            if token != full_key:
-                inverted[token].append(entity_id)
-        # Index aliases
-        for alias in entity.get("aliases", []):
-            alias_str = str(alias).lower().strip()
-            if alias_str:
-                inverted[alias_str].append(entity_id)
-                for token in tokenize(alias_str):
-                    if token != alias_str:
-                        inverted[token].append(entity_id)
-
-    index = {
-        "type": "bm25",
-        "entries": {k: sorted(set(v)) for k, v in inverted.items()},
+        fields = (
+            [str(entity.get("name", ""))],
+            [str(alias) for alias in entity.get("aliases", []) or []],
+        )
+        per_field = [_field_terms(values) for values in fields]
+        lengths[entity_id] = [length for _, length in per_field]
+        terms = sorted({term for frequencies, _ in per_field for term in frequencies})
+        for term in terms:
+            postings[term].append([entity_id, *(frequencies.get(term, 0) for frequencies, _ in per_field)])
+
+    doc_count = len(lengths)
+    stats = {
+        "fields": list(BM25_FIELDS),
+        "doc_count": doc_count,
+        "avg_length": {
+            field: (sum(values[position] for values in lengths.values()) / doc_count if doc_count else 0.0)
+            for position, field in enumerate(BM25_FIELDS)
+        },
     }
-    index_path = pkg_root / "indexes" / "bm25" / "index.json"
-    write_json(index_path, index)
+    index = {"type": "bm25", "version": 2, **stats, "lengths": lengths, "postings": dict(sorted(postings.items()))}
+    index_path = bm25_index_path(pkg_root)
+    write_json(index_path, index, compact=True)
+    write_lexicon(
+        bm25_lexicon_dir(pkg_root),
+        {
+            term: [[entity_id, *frequencies, *lengths[entity_id]] for entity_id, *frequencies in term_postings]
+            for term, term_postings in postings.items()
+        },
+        index_path,
+        stats,
+    )
+    write_lexicon(bm25_trigram_dir(pkg_root), trigram_entries(postings), index_path)
     return index_path
+
+
+def idf(doc_count: int, doc_freq: int) -> float:
+    """Okapi BM25 IDF, floored at zero by the ``1 +`` inside the log."""
+    return math.log(1.0 + (doc_count - doc_freq + 0.5) / (doc_freq + 0.5))
+
+
+def score_bm25(
+    index: dict[str, Any],
+    terms: Iterable[str],
+    *,
+    k1: float = BM25_K1,
+    b: float = BM25_B,
+) -> tuple[dict[str, float], dict[str, list[str]]]:
+    """Score every entity matching any of ``terms``.
+
+    Field frequencies are length-normalized per field and summed before
+    saturation (BM25F with unit field weights). Returns ``(scores,
+    matched_terms)`` keyed by entity ID.
+    """
+    return Bm25Reader.from_index(index).score(terms, k1=k1, b=b)
+
+
+class Bm25Reader:
+    """Term-at-a-time access to a keyword index.
+
+    ``postings(term)`` returns ``[entity_id, *field_tfs, *field_lengths]``
+    rows in entity-ID order, whichever form the index is stored in.
+    ``prefix_terms`` walks the sorted term dictionary and
+    ``trigram_terms`` reads the trigram index, when there is one.
+    """
+
+    def __init__(
+        self,
+        stats: dict[str, Any],
+        lookup: Callable[[str], list[list[Any]] | None],
+        prefix_terms: Callable[[str], Iterator[str]],
+        *,
+        trigram_lookup: Callable[[str], list[str] | None] | None = None,
+        legacy: bool = False,
+    ) -> None:
+        self.stats = stats
+        self.fields: list[str] = list(stats.get("fields", BM25_FIELDS))
+        self.legacy = legacy
+        self._lookup = lookup
+        self._prefix_terms = prefix_terms
+        self._trigram_lookup = trigram_lookup
+
+    @classmethod
+    def from_index(cls, index: dict[str, Any]) -> Bm25Reader:
+        postings = index.get("postings")
+        if not isinstance(postings, dict):
+            # Pre-version-2 index: term → entity IDs, no statistics.
+            entries = index.get("entries", {})
+            return cls(
+                {"fields": ["name"]},
+                lambda term: [[entity_id, 1, 0] for entity_id in sorted(entries.get(term, []))],
+                _sorted_prefix_scan(sorted(entries)),
+                legacy=True,
+            )
+        lengths = index.get("lengths", {})
+        width = len(index.get("fields", BM25_FIELDS))
+
+        def lookup(term: str) -> list[list[Any]] | None:
+            term_postings = postings.get(term)
+            if not term_postings:
+                return None
+            return [
+                [entity_id, *frequencies, *lengths.get(entity_id, [0] * width)]
+                for entity_id, *frequencies in term_postings
+            ]
+
+        return cls(index, lookup, _sorted_prefix_scan(sorted(postings)))
+
+    @classmethod
+    def open(cls, pkg_root: Path) -> Bm25Reader | None:
+        """Read from the lexicon when it is current, otherwise parse
+        index.json (older stores, or an index.json written without a
+        lexicon). None when neither exists."""
+        index_path = bm25_index_path(pkg_root)
+        lexicon = Lexicon.open(bm25_lexicon_dir(pkg_root), index_path)
+        if lexicon is not None:
+            trigrams = Lexicon.open(bm25_trigram_dir(pkg_root), index_path)
+            return cls(
+                lexicon.stats,
+                lexicon.get,
+                lexicon.prefix,
+                trigram_lookup=trigrams.get if trigrams is not None else None,
+            )
+        if not index_path.exists():
+            return None
+        return cls.from_index(read_json(index_path))
+
+    @property
+    def has_trigrams(self) -> bool:
+        return self._trigram_lookup is not None
+
+    def prefix_terms(self, prefix: str) -> Iterator[str]:
+        """Indexed terms starting with ``prefix``, in sorted order."""
+        return self._prefix_terms(prefix)
+
+    def trigram_terms(self, gram: str) -> list[str]:
+        """Indexed terms containing ``gram`` (see ``term_expansion.trigrams``);
+        empty without a trigram index."""
+        if self._trigram_lookup is None:
+            return []
+        return self._trigram_lookup(gram) or []
+
+    def postings(self, term: str) -> list[list[Any]]:
+        return self._lookup(term) or []
+
+    def ids(self, term: str, field: str | None = None) -> list[str]:
+        """Sorted IDs of entities containing ``term``, optionally only in ``field``."""
+        if field is None:
+            return [str(row[0]) for row in self.postings(term)]
+        if field not in self.fields:
+            return []
+        position = 1 + self.fields.index(field)
+        return [str(row[0]) for row in self.postings(term) if row[position]]
+
+    def score(
+        self,
+        terms: Iterable[str],
+        *,
+        k1: float = BM25_K1,
+        b: float = BM25_B,
+        weights: dict[str, float] | None = None,
+    ) -> tuple[dict[str, float], dict[str, list[str]]]:
+        """``weights`` scales individual terms' contributions (default 1.0),
+        e.g. to discount fuzzy expansions."""
+        scores: dict[str, float] = defaultdict(float)
+        matched: dict[str, list[str]] = defaultdict(list)
+        doc_count = int(self.stats.get("doc_count", 0))
+        width = len(self.fields)
+        averages = [float(self.stats.get("avg_length", {}).get(field, 0.0)) or 1.0 for field in self.fields]
+        # (tf column, length column, average) per field; rows are
+        # [entity_id, *field_tfs, *field_lengths].
+        slots = [(1 + position, 1 + width + position, average) for position, average in enumerate(averages)]
+        saturation = k1 + 1.0
+        for term in terms:
+            term_postings = self.postings(term)
+            if not term_postings:
+                continue
+            term_weight = (weights or {}).get(term, 1.0)
+            weight = idf(doc_count, len(term_postings)) * term_weight
+            for row in term_postings:
+                entity_id = row[0]
+                matched[entity_id].append(term)
+                if self.legacy:
+                    scores[entity_id] = max(scores[entity_id], term_weight)
+                    continue
+                pseudo_tf = 0.0
+                for tf_column, length_column, average in slots:
+                    frequency = row[tf_column]
+                    if frequency:
+                        pseudo_tf += frequency / (1.0 - b + b * row[length_column] / average)
+                scores[entity_id] += weight * pseudo_tf * saturation / (pseudo_tf + k1)
+        return dict(scores), dict(matched)
+
+
+def _sorted_prefix_scan(terms: list[str]) -> Callable[[str], Iterator[str]]:
+    def scan(prefix: str) -> Iterator[str]:
+        for term in terms[bisect_left(terms, prefix) :]:
+            if not term.startswith(prefix):
+                return
+            yield term
+
+    return scan
+
+
+def search_bm25(
+    pkg_root: Path,
+    terms: Iterable[str],
+    *,
+    k1: float = BM25_K1,
+    b: float = BM25_B,
+) -> tuple[dict[str, float], dict[str, list[str]]]:
+    """Score ``terms`` against the store's keyword index; empty results
+    when the store has none. See ``Bm25Reader.open``."""
+    reader = Bm25Reader.open(pkg_root)
+    if reader is None:
+        return {}, {}
+    return reader.score(terms, k1=k1, b=b)
+
+
+def top_k(scores: dict[str, float], k: int | None) -> list[tuple[str, float]]:
+    """Highest scores first, ties by ID; a heap selects ``k`` without
+    sorting every hit."""
+    if k is None:
+        return sorted(scores.items(), key=lambda item: (-item[1], item[0]))
+    return heapq.nsmallest(k, scores.items(), key=lambda item: (-item[1], item[0]))
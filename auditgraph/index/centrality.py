@@ -0,0 +1,184 @@
+"""PageRank and degree centrality over the graph adjacency.
+
+An optional index sub-stage (``search.centrality.enabled``) run after
+the adjacency index. Scores are computed on the CSR arrays
+(``index.csr_adjacency``) and stored as float64 arrays aligned with its
+node ordinals under ``indexes/graph/centrality/``::
+
+    meta.json     version, byte order, settings, CSR source signature
+    pagerank.bin  float64[n]  PageRank, scaled so the top node is 1.0
+    degree.bin    float64[n]  (in + out degree) / (n - 1)
+
+PageRank runs a fixed number of power iterations (no convergence test),
+pulling each node's rank from its incoming edges in CSR order and
+spreading the rank of nodes without outgoing edges evenly, so a build
+always performs the same float operations in the same order. Stored
+scores go through ``round_score``. Like the CSR index, the scores are
+ignored once adjacency.json changes.
+"""
+from __future__ import annotations
+
+import os
+import shutil
+import sys
+from array import array
+from operator import mul
+from pathlib import Path
+from typing import Any
+
+from auditgraph.index.csr_adjacency import CsrAdjacency
+from auditgraph.query.ranking import round_score
+from auditgraph.storage.codec import dumps, loads
+
+CENTRALITY_VERSION = 1
+MEASURES = ("pagerank", "degree")
+DEFAULT_ITERATIONS = 50
+DEFAULT_DAMPING = 0.85
+SCORE_ROUNDING = 1e-9
+
+
+def centrality_dir(pkg_root: Path) -> Path:
+    return pkg_root / "indexes" / "graph" / "centrality"
+
+
+def pagerank(
+    csr: CsrAdjacency,
+    *,
+    iterations: int = DEFAULT_ITERATIONS,
+    damping: float = DEFAULT_DAMPING,
+) -> list[float]:
+    """PageRank per node ordinal after exactly ``iterations`` steps."""
+    n = len(csr)
+    if n == 0:
+        return []
+    fwd_offsets = csr.array("fwd_offsets.bin").tolist()
+    rev_offsets = csr.array("rev_offsets.bin").tolist()
+    rev_sources = csr.array("rev_sources.bin").tolist()
+    out_degree = [fwd_offsets[node + 1] - fwd_offsets[node] for node in range(n)]
+    inverse = [1.0 / degree if degree else 0.0 for degree in out_degree]
+    dangling = [node for node in range(n) if not out_degree[node]]
+    spans = [(rev_offsets[node], rev_offsets[node + 1]) for node in range(n)]
+
+    rank = [1.0 / n] * n
+    for _ in range(iterations):
+        base = (1.0 - damping) / n + damping * sum(rank[node] for node in dangling) / n
+        share = list(map(mul, rank, inverse))
+        pull = share.__getitem__
+        rank = [base + damping * sum(map(pull, rev_sources[start:stop])) for start, stop in spans]
+    return rank
+
+
+def degree_centrality(csr: CsrAdjacency) -> list[float]:
+    """Edges touching each node over the ``n - 1`` other nodes."""
+    n = len(csr)
+    if n < 2:
+        return [0.0] * n
+    fwd = csr.array("fwd_offsets.bin").tolist()
+    rev = csr.array("rev_offsets.bin").tolist()
+    return [(fwd[node + 1] - fwd[node] + rev[node + 1] - rev[node]) / (n - 1) for node in range(n)]
+
+
+def build_centrality(
+    pkg_root: Path,
+    *,
+    iterations: int = DEFAULT_ITERATIONS,
+    damping: float = DEFAULT_DAMPING,
+) -> Path | None:
+    """Write ``indexes/graph/centrality/`` for the current CSR index.
+    Returns None (and writes nothing) when there is no CSR index."""
+    csr = CsrAdjacency.open(pkg_root)
+    if csr is None:
+        return None
+    ranks = pagerank(csr, iterations=iterations, damping=damping)
+    top = max(ranks, default=0.0)
+    columns = {
+        "pagerank.bin": array("d", (round_score(value / top, SCORE_ROUNDING) if top else 0.0 for value in ranks)),
+        "degree.bin": array("d", (round_score(value, SCORE_ROUNDING) for value in degree_centrality(csr))),
+    }
+    meta = {
+        "version": CENTRALITY_VERSION,
+        "byteorder": sys.byteorder,
+        "nodes": len(csr),
+        "iterations": iterations,
+        "damping": damping,
+        "source": csr.meta.get("source"),
+    }
+
+    target_dir = centrality_dir(pkg_root)
+    tmp_dir = target_dir.with_name(target_dir.name + ".tmp")
+    if tmp_dir.exists():
+        shutil.rmtree(tmp_dir)
+    tmp_dir.mkdir(parents=True)
+    for name, column in columns.items():
+        with open(tmp_dir / name, "wb") as handle:
+            column.tofile(handle)
+    (tmp_dir / "meta.json").write_bytes(dumps(meta))
+    if target_dir.exists():
+        shutil.rmtree(target_dir)
+    os.replace(tmp_dir, target_dir)
+    _CACHE.pop(str(target_dir), None)
+    return target_dir
+
+
+def remove_centrality(pkg_root: Path) -> None:
+    """Drop stored scores, e.g. once the sub-stage is switched off."""
+    target_dir = centrality_dir(pkg_root)
+    if target_dir.exists():
+        shutil.rmtree(target_dir)
+    _CACHE.pop(str(target_dir), None)
+
+
+class CentralityScores:
+    """Stored centrality scores, looked up by entity ID through the CSR
+    node table."""
+
+    def __init__(self, csr: CsrAdjacency, columns: dict[str, array]) -> None:
+        self._csr = csr
+        self._columns = columns
+
+    @classmethod
+    def open(cls, pkg_root: Path) -> CentralityScores | None:
+        """Return the scores for ``pkg_root``, or None when they are
+        missing or were built from a different adjacency."""
+        csr = CsrAdjacency.open(pkg_root)
+        if csr is None:
+            return None
+        directory = centrality_dir(pkg_root)
+        meta_path = directory / "meta.json"
+        try:
+            meta_stat = meta_path.stat()
+        except FileNotFoundError:
+            return None
+        key = str(directory)
+        signature = (meta_stat.st_mtime_ns, meta_stat.st_size)
+        cached = _CACHE.get(key)
+        if cached is not None and cached[0] == signature:
+            meta, columns = cached[1]
+        else:
+            meta = loads(meta_path.read_bytes())
+            if meta.get("version") != CENTRALITY_VERSION or meta.get("byteorder") != sys.byteorder:
+                return None
+            columns = {}
+            for measure in MEASURES:
+                column = array("d")
+                column.frombytes((directory / f"{measure}.bin").read_bytes())
+                columns[measure] = column
+            _CACHE[key] = (signature, (meta, columns))
+        if meta.get("source") != csr.meta.get("source") or meta.get("nodes") != len(csr):
+            return None
+        return cls(csr, columns)
+
+    def score(self, entity_id: str, measure: str = "pagerank") -> float:
+        """The node's score, or 0.0 for IDs outside the graph."""
+        ordinal = self._csr.ordinal(entity_id)
+        if ordinal is None:
+            return 0.0
+        return self._columns[measure][ordinal]
+
+
+_CACHE: dict[str, tuple[tuple[int, int], tuple[dict[str, Any], dict[str, array]]]] = {}
+
+
+def clear_cache() -> None:
+    """Drop cached scores so the next ``open`` reads the files afresh."""
+    _CACHE.clear()
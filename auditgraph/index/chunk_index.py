@@ -0,0 +1,235 @@
+"""Positional inverted index over chunk text.
+
+``indexes/chunks/``::
+
+    index.json    {"version": 2, "byteorder": ..., "fields": ["chunk_id", "document_id", "order", ...],
+                   "chunks": <row count>, "rows": <rows.bin size and mtime>, "store": <chunk store signature>}
+    rows.bin      the metadata table, one compact JSON row per chunk, concatenated
+    rows.off      uint64[n+1] offsets into rows.bin
+    terms/        an ``index.lexicon.Lexicon``: term → [[ordinal, [position, ...]], ...]
+
+The metadata table has one row per chunk, sorted by ``(document_id,
+order, chunk_id)``, holding the citation fields plus the chunk's
+``text_hash``. A chunk's ordinal is its row number, so every posting list
+is ordinal-sorted and hits come out in the order ``keyword_search``
+reports them. Positions count tokens within the chunk.
+
+A query maps the postings of its own terms from the term-sharded lexicon
+and reads only the rows of the chunks that match, so its cost follows the
+hits rather than the corpus. The index records the backend's
+``signature`` of the chunk store and is ignored once chunks are written
+or deleted after it was built; ``search_chunk_index`` then returns None
+and callers fall back to scanning.
+
+Each distinct body is tokenized once, however many chunks share it (see
+``storage.content_store``). Queries are tokenized the same way and match
+as a phrase: every query token must occur at consecutive positions.
+"""
+from __future__ import annotations
+
+import mmap
+import os
+import re
+import shutil
+import sys
+from array import array
+from collections import defaultdict
+from pathlib import Path
+from typing import Any
+
+from auditgraph.index.lexicon import Lexicon, write_lexicon
+from auditgraph.storage.backends import get_backend
+from auditgraph.storage.codec import dumps, loads
+from auditgraph.storage.content_store import BODY_FIELD, BodyReader, body_key
+
+CHUNK_INDEX_VERSION = 2
+
+CHUNK_META_FIELDS: tuple[str, ...] = (
+    "chunk_id",
+    "document_id",
+    "order",
+    "source_path",
+    "source_hash",
+    "page_start",
+    "page_end",
+    "paragraph_index_start",
+    "paragraph_index_end",
+    BODY_FIELD,
+)
+
+# Runs of letters and digits; punctuation and underscores separate tokens.
+_WORD = re.compile(r"[^\W_]+")
+
+
+def tokenize_text(text: str) -> list[str]:
+    return _WORD.findall(text.lower())
+
+
+def chunk_index_dir(pkg_root: Path) -> Path:
+    return pkg_root / "indexes" / "chunks"
+
+
+def chunk_index_path(pkg_root: Path) -> Path:
+    return chunk_index_dir(pkg_root) / "index.json"
+
+
+def _sort_key(record: dict[str, Any]) -> tuple[str, int, str]:
+    return (str(record.get("document_id", "")), int(record.get("order", 0) or 0), str(record.get("chunk_id", "")))
+
+
+def _file_signature(path: Path) -> dict[str, int]:
+    stat = path.stat()
+    return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+
+def build_chunk_index(pkg_root: Path) -> Path:
+    backend = get_backend(pkg_root)
+    store = backend.signature("chunks")
+    records = sorted(backend.iter_records("chunks"), key=_sort_key)
+    reader = BodyReader(backend)
+    positions_by_body: dict[str, dict[str, list[int]]] = {}
+    postings: dict[str, list[list[Any]]] = defaultdict(list)
+    row_offsets = array("Q", [0])
+    row_bytes = bytearray()
+    for ordinal, record in enumerate(records):
+        key = body_key(record)
+        positions = positions_by_body.get(key)
+        if positions is None:
+            positions = defaultdict(list)
+            for position, token in enumerate(tokenize_text(str(reader.hydrate(record).get("text", "")))):
+                positions[token].append(position)
+            positions_by_body[key] = positions
+        for term, term_positions in positions.items():
+            postings[term].append([ordinal, term_positions])
+        row_bytes.extend(dumps([record.get(field) for field in CHUNK_META_FIELDS]))
+        row_offsets.append(len(row_bytes))
+
+    directory = chunk_index_dir(pkg_root)
+    tmp_dir = directory.with_name(directory.name + ".tmp")
+    if tmp_dir.exists():
+        shutil.rmtree(tmp_dir)
+    tmp_dir.mkdir(parents=True)
+    (tmp_dir / "rows.bin").write_bytes(bytes(row_bytes))
+    with open(tmp_dir / "rows.off", "wb") as handle:
+        row_offsets.tofile(handle)
+    if directory.exists():
+        shutil.rmtree(directory)
+    os.replace(tmp_dir, directory)
+    header = {
+        "version": CHUNK_INDEX_VERSION,
+        "byteorder": sys.byteorder,
+        "fields": list(CHUNK_META_FIELDS),
+        "chunks": len(records),
+        "rows": _file_signature(directory / "rows.bin"),
+        "store": store,
+    }
+    path = chunk_index_path(pkg_root)
+    path.write_bytes(dumps(header))
+    # The lexicon mirrors index.json, so it is written last.
+    write_lexicon(directory / "terms", postings, path)
+    return path
+
+
+def _map(path: Path, code: str) -> memoryview:
+    if path.stat().st_size == 0:
+        return memoryview(array(code))
+    with open(path, "rb") as handle:
+        mapped = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+    view = memoryview(mapped)
+    return view.cast(code) if code != "B" else view
+
+
+class ChunkIndex:
+    """Read-only view over ``indexes/chunks/``; rows are mapped on first use."""
+
+    def __init__(self, directory: Path, header: dict[str, Any], terms: Lexicon) -> None:
+        self.directory = directory
+        self.header = header
+        self.fields: list[str] = list(header.get("fields", CHUNK_META_FIELDS))
+        self.terms = terms
+        self._offsets: memoryview | None = None
+        self._rows: memoryview | None = None
+
+    @classmethod
+    def open(cls, pkg_root: Path) -> ChunkIndex | None:
+        """Return the chunk index, or None when it is missing, from an
+        older version or byte order, or older than the chunk store."""
+        path = chunk_index_path(pkg_root)
+        try:
+            header = loads(path.read_bytes())
+            rows = _file_signature(path.parent / "rows.bin")
+        except FileNotFoundError:
+            return None
+        if header.get("version") != CHUNK_INDEX_VERSION or header.get("byteorder") != sys.byteorder:
+            return None
+        if header.get("rows") != rows or header.get("store") != get_backend(pkg_root).signature("chunks"):
+            return None
+        terms = Lexicon.open(path.parent / "terms", path)
+        if terms is None:
+            return None
+        return cls(path.parent, header, terms)
+
+    def __len__(self) -> int:
+        return int(self.header.get("chunks", 0))
+
+    def postings(self, term: str) -> list[list[Any]]:
+        return self.terms.get(term) or []
+
+    def row(self, ordinal: int) -> dict[str, Any]:
+        """The metadata row of chunk ``ordinal`` as a dict."""
+        if self._offsets is None or self._rows is None:
+            self._offsets = _map(self.directory / "rows.off", "Q")
+            self._rows = _map(self.directory / "rows.bin", "B")
+        data = bytes(self._rows[self._offsets[ordinal] : self._offsets[ordinal + 1]])
+        return dict(zip(self.fields, loads(data)))
+
+
+def phrase_matches(posting_lists: list[list[list[Any]]]) -> list[int]:
+    """Ordinals where the terms of ``posting_lists`` occur consecutively,
+    in the order given."""
+    if not posting_lists:
+        return []
+    by_term = [{ordinal: positions for ordinal, positions in postings} for postings in posting_lists]
+    # Walk the rarest term's ordinals; probe the others by dict lookup.
+    rarest = min(range(len(by_term)), key=lambda position: len(by_term[position]))
+    matches: list[int] = []
+    for ordinal in sorted(by_term[rarest]):
+        per_term = [term_map.get(ordinal) for term_map in by_term]
+        if any(positions is None for positions in per_term):
+            continue
+        later = [set(positions) for positions in per_term[1:]]
+        if any(
+            all(start + offset in positions for offset, positions in enumerate(later, start=1))
+            for start in per_term[0]
+        ):
+            matches.append(ordinal)
+    return matches
+
+
+def search_chunk_index(pkg_root: Path, query: str) -> list[dict[str, Any]] | None:
+    """Return chunks matching ``query`` as a phrase, with ``text`` and
+    citation fields, or ``None`` when no current chunk index exists."""
+    index = ChunkIndex.open(pkg_root)
+    if index is None:
+        return None
+    terms = tokenize_text(query)
+    if not terms:
+        return []
+    posting_lists = []
+    for term in terms:
+        postings_for_term = index.postings(term)
+        if not postings_for_term:
+            return []
+        posting_lists.append(postings_for_term)
+    backend = get_backend(pkg_root)
+    reader = BodyReader(backend)
+    results: list[dict[str, Any]] = []
+    for ordinal in phrase_matches(posting_lists):
+        chunk = index.row(ordinal)
+        text_hash = chunk.get(BODY_FIELD)
+        if text_hash:
+            chunk["text"] = reader.text(str(text_hash))
+        else:
+            chunk = reader.hydrate(backend.load("chunks", str(chunk["chunk_id"])))
+        results.append(chunk)
+    return results
@@ -0,0 +1,347 @@
+"""Weakly connected components and communities of the link graph.
+
+Built by the index stage right after the CSR index
+(``index.csr_adjacency``) and stored as arrays aligned with its node
+ordinals under ``indexes/graph/clusters/``::
+
+    meta.json                 counts, byte order, CSR source signature
+    component.bin             uint32[n]    component label per node ordinal
+    community.bin             uint32[n]    community label per node ordinal
+    component_offsets.bin     uint64[c+1]  member range per component
+    component_members.bin     uint32[n]    node ordinals grouped by component
+    community_offsets.bin     uint64[m+1]  member range per community
+    community_members.bin     uint32[n]    node ordinals grouped by community
+
+Components come from union-find over every edge, ignoring direction.
+Communities come from Louvain modularity optimisation over the same
+undirected edges (parallel edges add weight): nodes are visited in
+ordinal order and move to the neighboring community with the largest
+gain, lowest-numbered on ties, for at most ``iterations`` passes per
+level; communities then collapse into nodes and the next level runs
+until nothing moves. Communities are split by component so one never
+spans two. Both are numbered by size, largest first, ties by lowest
+member ordinal, so a rebuild over the same adjacency writes the same
+bytes. Like the CSR index, the clusters are ignored once adjacency.json
+changes.
+"""
+from __future__ import annotations
+
+import os
+import shutil
+import sys
+import time
+from array import array
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any
+
+from auditgraph.index.csr_adjacency import CsrAdjacency
+from auditgraph.storage.backends import get_backend
+from auditgraph.storage.codec import dumps, loads
+
+CLUSTERS_VERSION = 1
+KINDS = ("component", "community")
+DEFAULT_ITERATIONS = 10
+
+
+def clusters_dir(pkg_root: Path) -> Path:
+    return pkg_root / "indexes" / "graph" / "clusters"
+
+
+@dataclass(frozen=True)
+class ClusterStats:
+    """Counts and cost of one cluster build, for the index manifest.
+    ``memory_bytes`` estimates the peak working set: the weighted
+    undirected adjacency plus the label arrays (the CSR arrays it reads
+    are memory-mapped). ``iterations`` counts local-moving passes over
+    all Louvain levels."""
+
+    nodes: int
+    components: int
+    communities: int
+    iterations: int
+    build_ms: int
+    memory_bytes: int
+
+    def to_dict(self) -> dict[str, int]:
+        return asdict(self)
+
+
+def _components(csr: CsrAdjacency) -> array:
+    """Component root (lowest member ordinal) per node."""
+    n = len(csr)
+    parent = array("I", range(n))
+    offsets = csr.array("fwd_offsets.bin")
+    targets = csr.array("fwd_targets.bin")
+
+    def find(node: int) -> int:
+        while parent[node] != node:
+            parent[node] = parent[parent[node]]
+            node = parent[node]
+        return node
+
+    for source in range(n):
+        for target in targets[offsets[source] : offsets[source + 1]]:
+            a, b = find(source), find(target)
+            if a != b:
+                parent[max(a, b)] = min(a, b)
+    for node in range(n):
+        parent[node] = find(node)
+    return parent
+
+
+def _undirected(csr: CsrAdjacency) -> list[dict[int, float]]:
+    """Edge weight per neighbor, per node: parallel edges and both
+    directions add up, self-loops are dropped."""
+    n = len(csr)
+    offsets = csr.array("fwd_offsets.bin")
+    targets = csr.array("fwd_targets.bin")
+    weights: list[dict[int, float]] = [{} for _ in range(n)]
+    for source in range(n):
+        for target in targets[offsets[source] : offsets[source + 1]]:
+            if target != source:
+                weights[source][target] = weights[source].get(target, 0.0) + 1.0
+                weights[target][source] = weights[target].get(source, 0.0) + 1.0
+    return weights
+
+
+def _move_nodes(weights: list[dict[int, float]], passes: int) -> tuple[list[int], int]:
+    """Louvain local moving: each node, in order, joins the neighboring
+    community with the largest modularity gain (the lowest-numbered on
+    ties) or stays put. Returns a community per node and passes run."""
+    n = len(weights)
+    degree = [sum(neighbors.values()) for neighbors in weights]
+    total = sum(degree)
+    community = list(range(n))
+    totals = list(degree)
+    done = 0
+    for _ in range(passes):
+        done += 1
+        moved = False
+        for node in range(n):
+            if not total or not weights[node]:
+                continue
+            current = community[node]
+            totals[current] -= degree[node]
+            links: dict[int, float] = {}
+            for neighbor, weight in weights[node].items():
+                if neighbor != node:
+                    key = community[neighbor]
+                    links[key] = links.get(key, 0.0) + weight
+            best = current
+            best_gain = links.get(current, 0.0) - totals[current] * degree[node] / total
+            for key in sorted(links):
+                gain = links[key] - totals[key] * degree[node] / total
+                if gain > best_gain:
+                    best, best_gain = key, gain
+            community[node] = best
+            totals[best] += degree[node]
+            moved = moved or best != current
+        if not moved:
+            break
+    return community, done
+
+
+def _weights_size(weights: list[dict[int, float]]) -> int:
+    """Approximate bytes held by ``weights``: the list, each dict's table
+    and an int key plus a float value per entry."""
+    entries = sum(len(neighbors) for neighbors in weights)
+    return sys.getsizeof(weights) + sum(sys.getsizeof(neighbors) for neighbors in weights) + entries * (
+        sys.getsizeof(2**40) + sys.getsizeof(1.0)
+    )
+
+
+def _communities(csr: CsrAdjacency, passes: int) -> tuple[list[int], int, int]:
+    """Louvain community per node: local moving, then each community
+    becomes one node of a smaller graph, until no node moves. Returns
+    the assignment, passes run and the first level's adjacency size."""
+    weights = _undirected(csr)
+    size = _weights_size(weights)
+    assignment = list(range(len(weights)))
+    rounds = 0
+    while True:
+        community, done = _move_nodes(weights, passes)
+        rounds += done
+        numbering: dict[int, int] = {}
+        for key in community:
+            numbering.setdefault(key, len(numbering))
+        if len(numbering) == len(weights):
+            return assignment, rounds, size
+        assignment = [numbering[community[node]] for node in assignment]
+        merged: list[dict[int, float]] = [{} for _ in numbering]
+        for node, neighbors in enumerate(weights):
+            source = numbering[community[node]]
+            for neighbor, weight in neighbors.items():
+                # Edges inside a community stay as a self-loop, so its
+                # degree still counts them.
+                target = numbering[community[neighbor]]
+                merged[source][target] = merged[source].get(target, 0.0) + weight
+        weights = merged
+
+
+def _number(keys: list[Any]) -> tuple[array, array, array]:
+    """Renumber per-node group keys 0.. by group size (largest first,
+    then lowest member ordinal). Returns labels, offsets and members."""
+    sizes: dict[Any, int] = {}
+    first: dict[Any, int] = {}
+    for node, key in enumerate(keys):
+        sizes[key] = sizes.get(key, 0) + 1
+        first.setdefault(key, node)
+    order = sorted(sizes, key=lambda key: (-sizes[key], first[key]))
+    numbering = {key: index for index, key in enumerate(order)}
+    labels = array("I", (numbering[key] for key in keys))
+    offsets = array("Q", [0])
+    for key in order:
+        offsets.append(offsets[-1] + sizes[key])
+    cursor = offsets[:-1]
+    members = array("I", [0]) * len(keys)
+    for node, label in enumerate(labels):
+        members[cursor[label]] = node
+        cursor[label] += 1
+    return labels, offsets, members
+
+
+def build_clusters(pkg_root: Path, *, iterations: int = DEFAULT_ITERATIONS) -> ClusterStats | None:
+    """Write ``indexes/graph/clusters/`` for the current CSR index.
+    Returns None (and writes nothing) when there is no CSR index."""
+    started = time.perf_counter()
+    csr = CsrAdjacency.open(pkg_root)
+    if csr is None:
+        return None
+    roots = _components(csr)
+    assignment, passes, adjacency_bytes = _communities(csr, iterations)
+    component, component_offsets, component_members = _number(list(roots))
+    community, community_offsets, community_members = _number(list(zip(roots, assignment)))
+    columns = {
+        "component.bin": component,
+        "community.bin": community,
+        "component_offsets.bin": component_offsets,
+        "component_members.bin": component_members,
+        "community_offsets.bin": community_offsets,
+        "community_members.bin": community_members,
+    }
+    working = [roots, *columns.values()]
+    label_bytes = sum(column.itemsize * len(column) for column in working) + sys.getsizeof(assignment)
+    stats = ClusterStats(
+        nodes=len(csr),
+        components=len(component_offsets) - 1,
+        communities=len(community_offsets) - 1,
+        iterations=passes,
+        build_ms=int((time.perf_counter() - started) * 1000),
+        memory_bytes=adjacency_bytes + label_bytes,
+    )
+    meta = {
+        "version": CLUSTERS_VERSION,
+        "byteorder": sys.byteorder,
+        "nodes": stats.nodes,
+        "components": stats.components,
+        "communities": stats.communities,
+        "iterations": stats.iterations,
+        "source": csr.meta.get("source"),
+    }
+
+    target_dir = clusters_dir(pkg_root)
+    tmp_dir = target_dir.with_name(target_dir.name + ".tmp")
+    if tmp_dir.exists():
+        shutil.rmtree(tmp_dir)
+    tmp_dir.mkdir(parents=True)
+    for name, column in columns.items():
+        with open(tmp_dir / name, "wb") as handle:
+            column.tofile(handle)
+    (tmp_dir / "meta.json").write_bytes(dumps(meta))
+    if target_dir.exists():
+        shutil.rmtree(target_dir)
+    os.replace(tmp_dir, target_dir)
+    _CACHE.pop(str(target_dir), None)
+    return stats
+
+
+class ClusterIndex:
+    """Stored components and communities, looked up by entity ID through
+    the CSR node table."""
+
+    def __init__(self, csr: CsrAdjacency, meta: dict[str, Any], columns: dict[str, array]) -> None:
+        self._csr = csr
+        self.meta = meta
+        self._columns = columns
+
+    @classmethod
+    def open(cls, pkg_root: Path) -> ClusterIndex | None:
+        """Return the clusters for ``pkg_root``, or None when they are
+        missing or were built from a different adjacency."""
+        csr = CsrAdjacency.open(pkg_root)
+        if csr is None:
+            return None
+        directory = clusters_dir(pkg_root)
+        meta_path = directory / "meta.json"
+        try:
+            meta_stat = meta_path.stat()
+        except FileNotFoundError:
+            return None
+        key = str(directory)
+        signature = (meta_stat.st_mtime_ns, meta_stat.st_size)
+        cached = _CACHE.get(key)
+        if cached is not None and cached[0] == signature:
+            meta, columns = cached[1]
+        else:
+            meta = loads(meta_path.read_bytes())
+            if meta.get("version") != CLUSTERS_VERSION or meta.get("byteorder") != sys.byteorder:
+                return None
+            columns = {}
+            for kind in KINDS:
+                for suffix, code in (("", "I"), ("_offsets", "Q"), ("_members", "I")):
+                    column = array(code)
+                    column.frombytes((directory / f"{kind}{suffix}.bin").read_bytes())
+                    columns[f"{kind}{suffix}"] = column
+            _CACHE[key] = (signature, (meta, columns))
+        if meta.get("source") != csr.meta.get("source") or meta.get("nodes") != len(csr):
+            return None
+        return cls(csr, meta, columns)
+
+    def count(self, kind: str) -> int:
+        return len(self._columns[f"{kind}_offsets"]) - 1
+
+    def label(self, kind: str, entity_id: str) -> int | None:
+        """The entity's component or community, or None outside the graph."""
+        ordinal = self._csr.ordinal(entity_id)
+        if ordinal is None:
+            return None
+        return self._columns[kind][ordinal]
+
+    def resolve(self, kind: str, value: str | int) -> int | None:
+        """A cluster given by number, or by an entity ID inside it."""
+        text = str(value)
+        if text.isdigit():
+            return int(text) if int(text) < self.count(kind) else None
+        return self.label(kind, text)
+
+    def members(self, kind: str, label: int) -> list[str]:
+        """IDs in cluster ``label``, sorted."""
+        offsets = self._columns[f"{kind}_offsets"]
+        members = self._columns[f"{kind}_members"]
+        return [self._csr.node_id(ordinal) for ordinal in members[offsets[label] : offsets[label + 1]]]
+
+
+def cluster_members(pkg_root: Path, kind: str, value: str | int) -> list[str]:
+    """Sorted IDs in the ``kind`` cluster named by ``value`` (a cluster
+    number or an entity ID in it); empty when there is none or the
+    cluster index is missing. A stored entity without links is not in
+    the CSR and is a cluster of its own."""
+    if kind not in KINDS:
+        raise ValueError(f"cluster kind must be one of {KINDS}, got {kind!r}")
+    index = ClusterIndex.open(pkg_root)
+    if index is None:
+        return []
+    label = index.resolve(kind, value)
+    if label is not None:
+        return index.members(kind, label)
+    text = str(value)
+    return [text] if not text.isdigit() and get_backend(pkg_root).exists("entities", text) else []
+
+
+_CACHE: dict[str, tuple[tuple[int, int], tuple[dict[str, Any], dict[str, array]]]] = {}
+
+
+def clear_cache() -> None:
+    """Drop cached clusters so the next ``open`` reads the files afresh."""
+    _CACHE.clear()
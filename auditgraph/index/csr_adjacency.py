@@ -0,0 +1,293 @@
+"""Compressed-sparse-row (CSR) adjacency index with forward and reverse edges.
+
+Built next to ``indexes/graph/adjacency.json`` by the index stage and
+memory-mapped at query time, so traversals cost a binary search plus a
+slice instead of parsing the whole JSON adjacency. Layout under
+``indexes/graph/csr/``::
+
+    meta.json        counts, byte order, string tables, source signature
+    nodes.idx        uint64[n+1]  offsets into nodes.bin
+    nodes.bin        sorted node IDs, UTF-8, concatenated
+    fwd_offsets.bin  uint64[n+1]  edge range per source ordinal
+    fwd_targets.bin  uint32[e]    target ordinal per edge
+    edge_types.bin   uint16[e]    index into meta["edge_types"]
+    edge_rules.bin   uint32[e]    index into meta["rule_ids"]
+    edge_conf.bin    float64[e]   confidence (NaN → meta["confidence_overrides"])
+    rev_offsets.bin  uint64[n+1]  incoming edge range per target ordinal
+    rev_sources.bin  uint32[e]    source ordinal per incoming edge
+    rev_edges.bin    uint32[e]    forward edge index per incoming edge
+
+Forward edges keep adjacency.json order (``(type, to_id)`` per source);
+incoming edges are ordered by ``(type, from_id)``. The index records the
+size and mtime of the adjacency.json it was built from and is ignored
+once that file changes, so callers fall back to the JSON adjacency.
+"""
+from __future__ import annotations
+
+import math
+import mmap
+import os
+import shutil
+import sys
+from array import array
+from pathlib import Path
+from typing import Any
+
+from auditgraph.storage.codec import dumps, loads
+
+CSR_VERSION = 1
+
+_ARRAYS: dict[str, str] = {
+    "nodes.idx": "Q",
+    "fwd_offsets.bin": "Q",
+    "fwd_targets.bin": "I",
+    "edge_types.bin": "H",
+    "edge_rules.bin": "I",
+    "edge_conf.bin": "d",
+    "rev_offsets.bin": "Q",
+    "rev_sources.bin": "I",
+    "rev_edges.bin": "I",
+}
+
+
+def csr_dir(pkg_root: Path) -> Path:
+    return pkg_root / "indexes" / "graph" / "csr"
+
+
+def _source_signature(path: Path) -> dict[str, int]:
+    stat = path.stat()
+    return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+
+def write_csr_adjacency(pkg_root: Path, adjacency: dict[str, list[dict[str, Any]]], source: Path) -> Path:
+    """Write the CSR index for ``adjacency`` (as written to ``source``)."""
+    node_set = set(adjacency)
+    for edges in adjacency.values():
+        node_set.update(str(edge.get("to_id", "")) for edge in edges)
+    nodes = sorted(node_set, key=lambda node: node.encode("utf-8"))
+    ordinals = {node: index for index, node in enumerate(nodes)}
+    edge_types = sorted({str(edge.get("type", "")) for edges in adjacency.values() for edge in edges})
+    rule_ids = sorted({str(edge.get("rule_id", "")) for edges in adjacency.values() for edge in edges})
+    type_codes = {value: index for index, value in enumerate(edge_types)}
+    rule_codes = {value: index for index, value in enumerate(rule_ids)}
+
+    buffers = {name: array(code) for name, code in _ARRAYS.items()}
+    node_bytes = bytearray()
+    buffers["nodes.idx"].append(0)
+    for node in nodes:
+        node_bytes.extend(node.encode("utf-8"))
+        buffers["nodes.idx"].append(len(node_bytes))
+
+    overrides: dict[str, Any] = {}
+    incoming: list[list[tuple[str, str, int, int]]] = [[] for _ in nodes]
+    buffers["fwd_offsets.bin"].append(0)
+    for source_ordinal, node in enumerate(nodes):
+        for edge in adjacency.get(node, []):
+            edge_index = len(buffers["fwd_targets.bin"])
+            target = str(edge.get("to_id", ""))
+            edge_type = str(edge.get("type", ""))
+            buffers["fwd_targets.bin"].append(ordinals[target])
+            buffers["edge_types.bin"].append(type_codes[edge_type])
+            buffers["edge_rules.bin"].append(rule_codes[str(edge.get("rule_id", ""))])
+            confidence = edge.get("confidence", 1.0)
+            if type(confidence) is float and not math.isnan(confidence):
+                buffers["edge_conf.bin"].append(confidence)
+            else:
+                # Keep ints, strings and nulls exactly as adjacency.json has them.
+                buffers["edge_conf.bin"].append(math.nan)
+                overrides[str(edge_index)] = confidence
+            incoming[ordinals[target]].append((edge_type, node, source_ordinal, edge_index))
+        buffers["fwd_offsets.bin"].append(len(buffers["fwd_targets.bin"]))
+
+    buffers["rev_offsets.bin"].append(0)
+    for edges_in in incoming:
+        edges_in.sort(key=lambda item: (item[0], item[1], item[3]))
+        for _edge_type, _from_id, source_ordinal, edge_index in edges_in:
+            buffers["rev_sources.bin"].append(source_ordinal)
+            buffers["rev_edges.bin"].append(edge_index)
+        buffers["rev_offsets.bin"].append(len(buffers["rev_sources.bin"]))
+
+    meta = {
+        "version": CSR_VERSION,
+        "byteorder": sys.byteorder,
+        "nodes": len(nodes),
+        "edges": len(buffers["fwd_targets.bin"]),
+        "edge_types": edge_types,
+        "rule_ids": rule_ids,
+        "confidence_overrides": overrides,
+        "source": _source_signature(source),
+    }
+
+    target_dir = csr_dir(pkg_root)
+    tmp_dir = target_dir.with_name(target_dir.name + ".tmp")
+    if tmp_dir.exists():
+        shutil.rmtree(tmp_dir)
+    tmp_dir.mkdir(parents=True)
+    (tmp_dir / "nodes.bin").write_bytes(bytes(node_bytes))
+    for name, buffer in buffers.items():
+        with open(tmp_dir / name, "wb") as handle:
+            buffer.tofile(handle)
+    (tmp_dir / "meta.json").write_bytes(dumps(meta))
+    if target_dir.exists():
+        shutil.rmtree(target_dir)
+    os.replace(tmp_dir, target_dir)
+    _CACHE.pop(str(target_dir), None)
+    return target_dir
+
+
+def _map(path: Path, code: str) -> memoryview:
+    size = path.stat().st_size
+    if size == 0:
+        return memoryview(array(code))
+    with open(path, "rb") as handle:
+        mapped = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+    view = memoryview(mapped)
+    return view.cast(code) if code != "B" else view
+
+
+class CsrAdjacency:
+    """Read-only, memory-mapped view over ``indexes/graph/csr/``."""
+
+    def __init__(self, directory: Path, meta: dict[str, Any]) -> None:
+        self.directory = directory
+        self.meta = meta
+        self._views = {name: _map(directory / name, code) for name, code in _ARRAYS.items()}
+        self._node_bytes = _map(directory / "nodes.bin", "B")
+        self._edge_types: list[str] = list(meta.get("edge_types", []))
+        self._rule_ids: list[str] = list(meta.get("rule_ids", []))
+        self._overrides: dict[str, Any] = dict(meta.get("confidence_overrides", {}))
+
+    @classmethod
+    def open(cls, pkg_root: Path) -> CsrAdjacency | None:
+        """Return the CSR index for ``pkg_root``, or None when it is missing,
+        built on another byte order, or older than adjacency.json."""
+        directory = csr_dir(pkg_root)
+        meta_path = directory / "meta.json"
+        source = pkg_root / "indexes" / "graph" / "adjacency.json"
+        try:
+            meta_stat = meta_path.stat()
+            source_signature = _source_signature(source)
+        except FileNotFoundError:
+            return None
+        key = str(directory)
+        signature = (meta_stat.st_mtime_ns, meta_stat.st_size)
+        cached = _CACHE.get(key)
+        if cached is not None and cached[0] == signature:
+            csr = cached[1]
+        else:
+            meta = loads(meta_path.read_bytes())
+            if meta.get("version") != CSR_VERSION or meta.get("byteorder") != sys.byteorder:
+                return None
+            csr = cls(directory, meta)
+            _CACHE[key] = (signature, csr)
+        if csr.meta.get("source") != source_signature:
+            return None
+        return csr
+
+    def __len__(self) -> int:
+        return int(self.meta.get("nodes", 0))
+
+    def array(self, name: str) -> memoryview:
+        """The raw mapped array ``name`` (e.g. ``rev_sources.bin``), for
+        whole-graph passes that walk every node."""
+        return self._views[name]
+
+    def node_id(self, ordinal: int) -> str:
+        offsets = self._views["nodes.idx"]
+        return bytes(self._node_bytes[offsets[ordinal] : offsets[ordinal + 1]]).decode("utf-8")
+
+    def ordinal(self, node_id: str) -> int | None:
+        """Binary-search the sorted node table for ``node_id``."""
+        needle = node_id.encode("utf-8")
+        offsets = self._views["nodes.idx"]
+        lo, hi = 0, len(self)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            value = bytes(self._node_bytes[offsets[mid] : offsets[mid + 1]])
+            if value < needle:
+                lo = mid + 1
+            elif value > needle:
+                hi = mid
+            else:
+                return mid
+        return None
+
+    def _confidence(self, edge_index: int) -> Any:
+        value = self._views["edge_conf.bin"][edge_index]
+        if math.isnan(value):
+            return self._overrides.get(str(edge_index))
+        return value
+
+    def out_edges(self, node_id: str) -> list[dict[str, Any]]:
+        """Outgoing edges shaped like adjacency.json entries."""
+        ordinal = self.ordinal(node_id)
+        if ordinal is None:
+            return []
+        offsets = self._views["fwd_offsets.bin"]
+        targets = self._views["fwd_targets.bin"]
+        types = self._views["edge_types.bin"]
+        rules = self._views["edge_rules.bin"]
+        return [
+            {
+                "to_id": self.node_id(targets[index]),
+                "type": self._edge_types[types[index]],
+                "confidence": self._confidence(index),
+                "rule_id": self._rule_ids[rules[index]],
+            }
+            for index in range(offsets[ordinal], offsets[ordinal + 1])
+        ]
+
+    def in_edges(self, node_id: str) -> list[dict[str, Any]]:
+        """Incoming edges as ``{from_id, type, confidence, rule_id}``."""
+        ordinal = self.ordinal(node_id)
+        if ordinal is None:
+            return []
+        offsets = self._views["rev_offsets.bin"]
+        sources = self._views["rev_sources.bin"]
+        edge_ids = self._views["rev_edges.bin"]
+        types = self._views["edge_types.bin"]
+        rules = self._views["edge_rules.bin"]
+        edges: list[dict[str, Any]] = []
+        for position in range(offsets[ordinal], offsets[ordinal + 1]):
+            index = edge_ids[position]
+            edges.append(
+                {
+                    "from_id": self.node_id(sources[position]),
+                    "type": self._edge_types[types[index]],
+                    "confidence": self._confidence(index),
+                    "rule_id": self._rule_ids[rules[index]],
+                }
+            )
+        return edges
+
+    def out_adjacent(self, ordinal: int) -> list[tuple[int, int]]:
+        """``(target ordinal, edge index)`` per outgoing edge, without
+        decoding node IDs."""
+        offsets = self._views["fwd_offsets.bin"]
+        start, stop = offsets[ordinal], offsets[ordinal + 1]
+        return list(zip(self._views["fwd_targets.bin"][start:stop].tolist(), range(start, stop)))
+
+    def in_adjacent(self, ordinal: int) -> list[tuple[int, int]]:
+        """``(source ordinal, edge index)`` per incoming edge."""
+        offsets = self._views["rev_offsets.bin"]
+        start, stop = offsets[ordinal], offsets[ordinal + 1]
+        return list(
+            zip(self._views["rev_sources.bin"][start:stop].tolist(), self._views["rev_edges.bin"][start:stop].tolist())
+        )
+
+    def edge_fields(self, edge_index: int) -> tuple[str, Any, str]:
+        """``(type, confidence, rule_id)`` of a forward edge."""
+        return (
+            self._edge_types[self._views["edge_types.bin"][edge_index]],
+            self._confidence(edge_index),
+            self._rule_ids[self._views["edge_rules.bin"][edge_index]],
+        )
+
+
+_CACHE: dict[str, tuple[tuple[int, int], CsrAdjacency]] = {}
+
+
+def clear_cache() -> None:
+    """Drop every cached ``CsrAdjacency`` so the next ``open`` maps the
+    files afresh."""
+    _CACHE.clear()
@@ -0,0 +1,236 @@
+"""Facet tables for ``list --count`` and ``list --group-by``.
+
+The index stage counts records per facet once, so aggregations do not
+read the store. ``indexes/facets.json`` holds the entity counts::
+
+    {"version": 1, "store": <entity store signature>,
+     "entities": {"total": n, "fields": {"<field>": {"<type>": [[group, count, first_id], ...]}}}}
+
+A group key is what ``filters.apply_aggregation`` would produce:
+``str(value)``, or ``_missing`` when the record has no value. Groups
+are listed in the order a scan first meets them (by record ID), with
+the first ID kept so tables can be merged in scan order. Entity tables
+are split by type because ``--type`` changes that order: the scan walks
+one type at a time.
+
+``indexes/facets/<sanitized field>.json`` keeps the entity IDs of each
+group of an entity field (``{"version": 1, "field": ..., "store": ...,
+"groups": {group: [ids]}}``), so an aggregation over predicates the
+field indexes answer exactly is computed by intersecting postings,
+without loading an entity.
+
+``store`` is the backend's ``signature`` of the entity store at build
+time. Entities written since then (an ``extract`` without ``index``)
+make both files stale: readers return None and callers scan.
+"""
+from __future__ import annotations
+
+import os
+import shutil
+from collections import defaultdict
+from pathlib import Path
+from typing import Any, Iterable
+
+from auditgraph.index.postings import intersect
+from auditgraph.index.type_index import sanitize_type_name
+from auditgraph.storage.codec import dumps, loads
+
+FACETS_VERSION = 1
+MISSING = "_missing"
+
+
+def facets_path(pkg_root: Path) -> Path:
+    return pkg_root / "indexes" / "facets.json"
+
+
+def facet_postings_dir(pkg_root: Path) -> Path:
+    return pkg_root / "indexes" / "facets"
+
+
+def facet_postings_path(pkg_root: Path, field: str) -> Path:
+    return facet_postings_dir(pkg_root) / f"{sanitize_type_name(field)}.json"
+
+
+def group_key(record: dict[str, object], field: str) -> str:
+    """The ``apply_aggregation`` group of *record* for *field*."""
+    from auditgraph.query.filters import field_value
+
+    value = field_value(record, field)
+    return MISSING if value is None else str(value)
+
+
+def build_facets(
+    pkg_root: Path,
+    entities: Iterable[dict[str, object]],
+    fields: Iterable[str],
+) -> Path:
+    """Write ``indexes/facets.json`` and the entity group postings.
+
+    Entities are faceted by ``type`` and every field in ``fields``
+    (``search.field_indexes``). Returns the facet table path.
+    """
+    from auditgraph.storage.backends import get_backend
+
+    store = get_backend(pkg_root).signature("entities")
+    fields = sorted({"type", *fields})
+    by_type: dict[str, dict[str, dict[str, list[Any]]]] = {field: {} for field in fields}
+    postings: dict[str, dict[str, list[str]]] = {field: defaultdict(list) for field in fields}
+    total = 0
+    for entity in sorted(entities, key=lambda item: str(item.get("id", ""))):
+        total += 1
+        entity_id = str(entity.get("id", ""))
+        entity_type = str(entity.get("type", ""))
+        for field in fields:
+            key = group_key(entity, field)
+            postings[field][key].append(entity_id)
+            table = by_type[field].setdefault(entity_type, {})
+            entry = table.get(key)
+            if entry is None:
+                table[key] = [key, 1, entity_id]
+            else:
+                entry[1] += 1
+
+    payload = {
+        "version": FACETS_VERSION,
+        "store": store,
+        "entities": {
+            "total": total,
+            "fields": {
+                field: {entity_type: list(table.values()) for entity_type, table in by_type[field].items()}
+                for field in fields
+            },
+        },
+    }
+
+    directory = facet_postings_dir(pkg_root)
+    tmp_dir = directory.with_name(directory.name + ".tmp")
+    if tmp_dir.exists():
+        shutil.rmtree(tmp_dir)
+    tmp_dir.mkdir(parents=True)
+    for field in fields:
+        body = {"version": FACETS_VERSION, "field": field, "store": store, "groups": dict(postings[field])}
+        (tmp_dir / facet_postings_path(pkg_root, field).name).write_bytes(dumps(body))
+    if directory.exists():
+        shutil.rmtree(directory)
+    os.replace(tmp_dir, directory)
+
+    path = facets_path(pkg_root)
+    tmp_path = path.with_name(path.name + ".tmp")
+    tmp_path.write_bytes(dumps(payload))
+    os.replace(tmp_path, path)
+    return path
+
+
+def _merge(tables: Iterable[list[list[Any]]]) -> dict[str, int]:
+    """Sum group counts across tables, ordered by first ID."""
+    merged: dict[str, list[Any]] = {}
+    for table in tables:
+        for key, count, first_id in table:
+            entry = merged.get(key)
+            if entry is None:
+                merged[key] = [count, first_id]
+            else:
+                entry[0] += count
+                entry[1] = min(entry[1], first_id)
+    ordered = sorted(merged.items(), key=lambda item: item[1][1])
+    return {key: int(count) for key, (count, _) in ordered}
+
+
+class FacetTable:
+    """Read-only view over ``indexes/facets.json``."""
+
+    def __init__(self, payload: dict[str, Any]) -> None:
+        self._payload = payload
+        self._entity_fields: dict[str, dict[str, list[list[Any]]]] = payload.get("entities", {}).get("fields", {})
+
+    @classmethod
+    def open(cls, pkg_root: Path) -> FacetTable | None:
+        """The profile's facet table, or None when the index stage has
+        not written one or entities were written since."""
+        payload = _read_cached(facets_path(pkg_root))
+        if payload is None or payload.get("version") != FACETS_VERSION or not _current(pkg_root, payload):
+            return None
+        return cls(payload)
+
+    def aggregate(self, *, types: list[str] | None = None, group_by: str | None = None) -> dict[str, object] | None:
+        """``apply_aggregation`` over entities of ``types`` (all when
+        empty), or None when ``group_by`` is not faceted."""
+        if not group_by:
+            if not types:
+                return {"count": int(self._payload.get("entities", {}).get("total", 0))}
+            tables = self._entity_fields.get("type", {})
+            return {"count": sum(count for entity_type in types for _, count, _ in tables.get(entity_type, []))}
+        by_type = self._entity_fields.get(group_by)
+        if by_type is None:
+            return None
+        if not types:
+            groups = _merge(by_type.values())
+        else:
+            # The scan walks one type after another, so each type's
+            # groups follow the ones already seen.
+            groups = {}
+            for entity_type in types:
+                for key, count, _ in by_type.get(entity_type, []):
+                    groups[key] = groups.get(key, 0) + int(count)
+        return {"groups": groups, "total_count": sum(groups.values())}
+
+
+def aggregate_postings(
+    pkg_root: Path,
+    ids: list[str],
+    *,
+    group_by: str,
+    type_ids: list[list[str]] | None = None,
+) -> dict[str, object] | None:
+    """Group the sorted entity ``ids`` by ``group_by`` from its facet
+    postings, or None when the field has none or they are stale.
+
+    ``type_ids`` holds the sorted IDs of each ``--type`` in order; the
+    groups then follow the scan's type-by-type order.
+    """
+    payload = _read_cached(facet_postings_path(pkg_root, group_by))
+    if payload is None or payload.get("version") != FACETS_VERSION or payload.get("field") != group_by:
+        return None
+    if not _current(pkg_root, payload):
+        return None
+    postings: dict[str, list[str]] = payload.get("groups", {})
+    groups: dict[str, int] = {}
+    for scope in [intersect([ids, members]) for members in type_ids] if type_ids else [ids]:
+        if not scope:
+            continue
+        found = []
+        for key, members in postings.items():
+            matched = intersect([members, scope])
+            if matched:
+                found.append((matched[0], key, len(matched)))
+        for _, key, count in sorted(found):
+            groups[key] = groups.get(key, 0) + count
+    return {"groups": groups, "total_count": sum(groups.values())}
+
+
+def _current(pkg_root: Path, payload: dict[str, Any]) -> bool:
+    from auditgraph.storage.backends import get_backend
+
+    return payload.get("store") == get_backend(pkg_root).signature("entities")
+
+
+def _read_cached(path: Path) -> dict[str, Any] | None:
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
+        return None
+    key = str(path)
+    signature = (stat.st_mtime_ns, stat.st_size)
+    cached = _CACHE.get(key)
+    if cached is None or cached[0] != signature:
+        cached = (signature, loads(path.read_bytes()))
+        _CACHE[key] = cached
+    return cached[1]
+
+
+def clear_cache() -> None:
+    """Drop cached facet files so the next read re-opens them."""
+    _CACHE.clear()
+
+
+_CACHE: dict[str, tuple[tuple[int, int], dict[str, Any]]] = {}
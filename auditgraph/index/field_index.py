@@ -0,0 +1,240 @@
+"""Secondary indexes on entity fields, for ``list --where`` predicates.
+
+The index stage writes one file per configured field
+(``search.field_indexes``) to ``indexes/fields/<sanitized field>.json``::
+
+    {"version": 1, "field": "authored_at", "entities": <count with a value>,
+     "lists": <count with a list value>, "store": <entity store signature>,
+     "equals":  {"<value>": [ids], ...},
+     "numbers": {"keys": [sorted floats], "ids": [[ids], ...]},
+     "flags":   [ids]}
+
+- ``equals`` holds hash postings keyed by ``str(value)``. A list value
+  adds the entity under each of its string elements. Equality predicates
+  read it directly. String range predicates bisect its sorted keys.
+- ``numbers`` holds the values ``float()`` accepts, sorted, for numeric
+  predicates (``heading_level>=2``).
+- ``flags`` lists entities with boolean values. ``matches`` coerces
+  ``true``/``1``/``yes`` for them, so they join every equality lookup.
+
+A lookup returns a superset of the matching IDs. Callers load only
+those entities and apply ``filters.apply_filters`` with every predicate,
+so the index never changes results. ``!=`` and ``~`` are not answered
+from the index. ``FieldIndex.exact`` tells when a lookup is the match
+set itself, so counts can be taken from postings alone.
+
+``store`` is the backend's ``signature`` of the entity store when the
+index was built. Once entities are written or deleted without
+re-running the index stage, ``FieldIndex.open`` returns None and
+``list`` falls back to scanning, so new entities are never missed.
+"""
+from __future__ import annotations
+
+import math
+import os
+import shutil
+import sys
+from bisect import bisect_left, bisect_right
+from collections import defaultdict
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Iterable
+
+from auditgraph.index.postings import union
+from auditgraph.index.type_index import sanitize_type_name
+from auditgraph.storage.backends import QueryableBackend, get_backend
+from auditgraph.storage.codec import dumps, loads
+
+if TYPE_CHECKING:
+    from auditgraph.query.filters import FilterPredicate
+
+FIELD_INDEX_VERSION = 1
+RANGE_OPERATORS = (">", ">=", "<", "<=")
+
+
+def field_index_dir(pkg_root: Path) -> Path:
+    return pkg_root / "indexes" / "fields"
+
+
+def field_index_path(pkg_root: Path, field: str) -> Path:
+    return field_index_dir(pkg_root) / f"{sanitize_type_name(field)}.json"
+
+
+def _as_number(value: object) -> float | None:
+    """``float(value)``, or None when it fails or is NaN (which compares
+    false with everything). Infinities are clamped to the largest finite
+    float so the keys stay valid JSON."""
+    try:
+        number = float(value)  # type: ignore[arg-type]
+    except (TypeError, ValueError):
+        return None
+    if math.isnan(number):
+        return None
+    return max(-sys.float_info.max, min(number, sys.float_info.max))
+
+
+def build_field_indexes(
+    pkg_root: Path,
+    entities: Iterable[dict[str, object]],
+    fields: Iterable[str],
+) -> dict[str, Path]:
+    """Index ``fields`` over ``entities``, replacing ``indexes/fields/``.
+
+    Returns a mapping of field name to written file path. A queryable
+    backend also gets its own indexes on ``fields``.
+    """
+    from auditgraph.query.filters import field_value
+
+    backend = get_backend(pkg_root)
+    store = backend.signature("entities")
+    fields = sorted(set(fields))
+    equals: dict[str, dict[str, list[str]]] = {field: defaultdict(list) for field in fields}
+    numbers: dict[str, dict[float, list[str]]] = {field: defaultdict(list) for field in fields}
+    flags: dict[str, list[str]] = {field: [] for field in fields}
+    counts = dict.fromkeys(fields, 0)
+    lists = dict.fromkeys(fields, 0)
+    for entity in sorted(entities, key=lambda item: str(item.get("id", ""))):
+        entity_id = str(entity.get("id", ""))
+        if not entity_id:
+            continue
+        for field in fields:
+            value = field_value(entity, field)
+            if value is None:
+                continue
+            counts[field] += 1
+            if isinstance(value, bool):
+                flags[field].append(entity_id)
+            elif isinstance(value, list):
+                lists[field] += 1
+                for element in sorted({item for item in value if isinstance(item, str)}):
+                    equals[field][element].append(entity_id)
+            else:
+                equals[field][str(value)].append(entity_id)
+                number = _as_number(value)
+                if number is not None:
+                    numbers[field][number].append(entity_id)
+
+    directory = field_index_dir(pkg_root)
+    tmp_dir = directory.with_name(directory.name + ".tmp")
+    if tmp_dir.exists():
+        shutil.rmtree(tmp_dir)
+    tmp_dir.mkdir(parents=True)
+    written: dict[str, Path] = {}
+    for field in fields:
+        ordered = sorted(numbers[field])
+        payload = {
+            "version": FIELD_INDEX_VERSION,
+            "field": field,
+            "entities": counts[field],
+            "lists": lists[field],
+            "equals": dict(equals[field]),
+            "numbers": {"keys": ordered, "ids": [numbers[field][key] for key in ordered]},
+            "flags": flags[field],
+            "store": store,
+        }
+        name = field_index_path(pkg_root, field).name
+        (tmp_dir / name).write_bytes(dumps(payload))
+        written[field] = directory / name
+    if directory.exists():
+        shutil.rmtree(directory)
+    os.replace(tmp_dir, directory)
+    if isinstance(backend, QueryableBackend):
+        backend.index_entity_fields(fields)
+    return written
+
+
+class FieldIndex:
+    """Read-only view over one field's index file."""
+
+    def __init__(self, payload: dict[str, Any]) -> None:
+        self.field = str(payload.get("field", ""))
+        self.entities = int(payload.get("entities", 0))
+        self._lists: int | None = payload.get("lists")
+        self._equals: dict[str, list[str]] = payload.get("equals", {})
+        self._keys = sorted(self._equals)
+        numbers = payload.get("numbers", {})
+        self._number_keys: list[float] = numbers.get("keys", [])
+        self._number_ids: list[list[str]] = numbers.get("ids", [])
+        self._flags: list[str] = payload.get("flags", [])
+        self.store = payload.get("store")
+
+    @classmethod
+    def open(cls, pkg_root: Path, field: str) -> FieldIndex | None:
+        """The index for ``field``, or None when the profile has none or
+        entities changed since it was built."""
+        path = field_index_path(pkg_root, field)
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            return None
+        key = str(path)
+        signature = (stat.st_mtime_ns, stat.st_size)
+        cached = _CACHE.get(key)
+        if cached is not None and cached[0] == signature:
+            index = cached[1]
+        else:
+            payload = loads(path.read_bytes())
+            if payload.get("version") != FIELD_INDEX_VERSION:
+                return None
+            index = cls(payload)
+            _CACHE[key] = (signature, index)
+        # Distinct fields can sanitize to the same file name.
+        if index.field != field:
+            return None
+        return index if index.store == get_backend(pkg_root).signature("entities") else None
+
+    def lookup(self, predicate: FilterPredicate) -> list[str] | None:
+        """Sorted IDs that may satisfy ``predicate``, or None when the
+        index cannot narrow it (``!=``, ``~``)."""
+        operator = predicate.operator
+        if operator == "=":
+            lists = [self._equals.get(predicate.value, []), self._flags]
+            if predicate.is_numeric:
+                lists.append(self._number_range(operator, float(predicate.value)))
+            return union(lists)
+        if operator not in RANGE_OPERATORS:
+            return None
+        if predicate.is_numeric:
+            return self._number_range(operator, float(predicate.value))
+        return union(self._key_range(operator, predicate.value))
+
+    def exact(self, predicate: FilterPredicate) -> bool:
+        """Whether ``lookup(predicate)`` holds exactly the matching IDs.
+
+        Boolean values join every equality lookup whatever they coerce
+        to, and list elements sit in the string key range although a
+        comparison never matches a list.
+        """
+        operator = predicate.operator
+        if operator == "=":
+            return not self._flags
+        if operator not in RANGE_OPERATORS:
+            return False
+        return predicate.is_numeric or self._lists == 0
+
+    def _bounds(self, keys: list[Any], operator: str, value: Any) -> tuple[int, int]:
+        if operator == "=":
+            return bisect_left(keys, value), bisect_right(keys, value)
+        if operator == ">":
+            return bisect_right(keys, value), len(keys)
+        if operator == ">=":
+            return bisect_left(keys, value), len(keys)
+        if operator == "<":
+            return 0, bisect_left(keys, value)
+        return 0, bisect_right(keys, value)
+
+    def _key_range(self, operator: str, value: str) -> list[list[str]]:
+        start, stop = self._bounds(self._keys, operator, value)
+        return [self._equals[key] for key in self._keys[start:stop]]
+
+    def _number_range(self, operator: str, value: float) -> list[str]:
+        start, stop = self._bounds(self._number_keys, operator, value)
+        return union(self._number_ids[start:stop])
+
+
+def clear_cache() -> None:
+    """Drop every cached ``FieldIndex`` so the next ``open`` re-reads
+    the files."""
+    _CACHE.clear()
+
+
+_CACHE: dict[str, tuple[tuple[int, int], FieldIndex]] = {}
@@ -0,0 +1,227 @@
+"""Sorted, memory-mapped term dictionary partitioned by term prefix.
+
+A lexicon maps each term to a JSON-encoded postings payload without
+parsing anything but the entries a lookup asks for. Terms are split into
+shards by the first byte of their UTF-8 encoding; each shard is a sorted
+term table plus a postings blob::
+
+    meta.json        version, byte order, shard term counts, caller stats,
+                     source signature
+    <xx>.idx         uint64[n+1]  offsets into <xx>.terms
+    <xx>.terms       sorted terms, UTF-8, concatenated
+    <xx>.off         uint64[n+1]  offsets into <xx>.post
+    <xx>.post        one compact JSON payload per term, concatenated
+
+``<xx>`` is the hex of the shared first byte. A lookup maps one shard,
+binary-searches its term table and decodes a single payload, so it
+touches a handful of pages however large the dictionary grows. Prefix
+scans start from the same binary search and walk the shard in order.
+Like the CSR adjacency index, a lexicon records the size and mtime of
+the JSON index it mirrors and is ignored once that file changes.
+"""
+from __future__ import annotations
+
+import mmap
+import os
+import shutil
+import sys
+from array import array
+from pathlib import Path
+from typing import Any, Iterator
+
+from auditgraph.storage.codec import dumps, loads
+
+LEXICON_VERSION = 1
+
+
+def _shard_name(term_bytes: bytes) -> str:
+    return term_bytes[:1].hex() or "00"
+
+
+def _source_signature(path: Path) -> dict[str, int]:
+    stat = path.stat()
+    return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+
+def write_lexicon(
+    directory: Path,
+    entries: dict[str, Any],
+    source: Path,
+    stats: dict[str, Any] | None = None,
+) -> Path:
+    """Write ``entries`` (term → JSON-serializable payload) as a sharded
+    lexicon in ``directory``, mirroring the index at ``source``."""
+    shards: dict[str, list[tuple[bytes, Any]]] = {}
+    for term, payload in entries.items():
+        encoded = term.encode("utf-8")
+        shards.setdefault(_shard_name(encoded), []).append((encoded, payload))
+
+    tmp_dir = directory.with_name(directory.name + ".tmp")
+    if tmp_dir.exists():
+        shutil.rmtree(tmp_dir)
+    tmp_dir.mkdir(parents=True)
+    counts: dict[str, int] = {}
+    for name, shard in sorted(shards.items()):
+        shard.sort(key=lambda item: item[0])
+        term_offsets = array("Q", [0])
+        post_offsets = array("Q", [0])
+        term_bytes = bytearray()
+        post_bytes = bytearray()
+        for encoded, payload in shard:
+            term_bytes.extend(encoded)
+            term_offsets.append(len(term_bytes))
+            post_bytes.extend(dumps(payload))
+            post_offsets.append(len(post_bytes))
+        (tmp_dir / f"{name}.terms").write_bytes(bytes(term_bytes))
+        (tmp_dir / f"{name}.post").write_bytes(bytes(post_bytes))
+        with open(tmp_dir / f"{name}.idx", "wb") as handle:
+            term_offsets.tofile(handle)
+        with open(tmp_dir / f"{name}.off", "wb") as handle:
+            post_offsets.tofile(handle)
+        counts[name] = len(shard)
+
+    meta = {
+        "version": LEXICON_VERSION,
+        "byteorder": sys.byteorder,
+        "terms": sum(counts.values()),
+        "shards": counts,
+        "stats": dict(stats or {}),
+        "source": _source_signature(source),
+    }
+    (tmp_dir / "meta.json").write_bytes(dumps(meta))
+    if directory.exists():
+        shutil.rmtree(directory)
+    os.replace(tmp_dir, directory)
+    _CACHE.pop(str(directory), None)
+    return directory
+
+
+def _map(path: Path, code: str) -> memoryview:
+    if path.stat().st_size == 0:
+        return memoryview(array(code))
+    with open(path, "rb") as handle:
+        mapped = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+    view = memoryview(mapped)
+    return view.cast(code) if code != "B" else view
+
+
+class _Shard:
+    def __init__(self, directory: Path, name: str) -> None:
+        self.term_offsets = _map(directory / f"{name}.idx", "Q")
+        self.terms = _map(directory / f"{name}.terms", "B")
+        self.post_offsets = _map(directory / f"{name}.off", "Q")
+        self.postings = _map(directory / f"{name}.post", "B")
+
+    def __len__(self) -> int:
+        return max(len(self.term_offsets) - 1, 0)
+
+    def term(self, ordinal: int) -> bytes:
+        return bytes(self.terms[self.term_offsets[ordinal] : self.term_offsets[ordinal + 1]])
+
+    def payload(self, ordinal: int) -> Any:
+        return loads(bytes(self.postings[self.post_offsets[ordinal] : self.post_offsets[ordinal + 1]]))
+
+    def search(self, needle: bytes) -> int:
+        """Leftmost ordinal whose term is ``>= needle``."""
+        lo, hi = 0, len(self)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self.term(mid) < needle:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+
+class Lexicon:
+    """Read-only view over a lexicon directory; shards map on first use."""
+
+    def __init__(self, directory: Path, meta: dict[str, Any]) -> None:
+        self.directory = directory
+        self.meta = meta
+        self._shard_names = set(meta.get("shards", {}))
+        self._shards: dict[str, _Shard] = {}
+
+    @classmethod
+    def open(cls, directory: Path, source: Path) -> Lexicon | None:
+        """Return the lexicon in ``directory``, or None when it is missing,
+        built on another byte order, or older than ``source``."""
+        meta_path = directory / "meta.json"
+        try:
+            meta_stat = meta_path.stat()
+            source_signature = _source_signature(source)
+        except FileNotFoundError:
+            return None
+        key = str(directory)
+        signature = (meta_stat.st_mtime_ns, meta_stat.st_size)
+        cached = _CACHE.get(key)
+        if cached is not None and cached[0] == signature:
+            lexicon = cached[1]
+        else:
+            meta = loads(meta_path.read_bytes())
+            if meta.get("version") != LEXICON_VERSION or meta.get("byteorder") != sys.byteorder:
+                return None
+            lexicon = cls(directory, meta)
+            _CACHE[key] = (signature, lexicon)
+        if lexicon.meta.get("source") != source_signature:
+            return None
+        return lexicon
+
+    def __len__(self) -> int:
+        return int(self.meta.get("terms", 0))
+
+    @property
+    def stats(self) -> dict[str, Any]:
+        return dict(self.meta.get("stats", {}))
+
+    def _shard(self, name: str) -> _Shard | None:
+        if name not in self._shard_names:
+            return None
+        shard = self._shards.get(name)
+        if shard is None:
+            shard = self._shards[name] = _Shard(self.directory, name)
+        return shard
+
+    def get(self, term: str) -> Any | None:
+        """Payload stored for ``term``, or None when it is not indexed."""
+        needle = term.encode("utf-8")
+        shard = self._shard(_shard_name(needle))
+        if shard is None:
+            return None
+        ordinal = shard.search(needle)
+        if ordinal < len(shard) and shard.term(ordinal) == needle:
+            return shard.payload(ordinal)
+        return None
+
+    def prefix(self, prefix: str) -> Iterator[str]:
+        """Terms starting with ``prefix``, in UTF-8 byte order. Only the
+        prefix's shard is read; an empty prefix yields every term."""
+        if not prefix:
+            yield from self.terms()
+            return
+        needle = prefix.encode("utf-8")
+        shard = self._shard(_shard_name(needle))
+        if shard is None:
+            return
+        for ordinal in range(shard.search(needle), len(shard)):
+            term = shard.term(ordinal)
+            if not term.startswith(needle):
+                return
+            yield term.decode("utf-8")
+
+    def terms(self) -> Iterator[str]:
+        """Every term, in UTF-8 byte order."""
+        for name in sorted(self._shard_names):
+            shard = self._shard(name)
+            assert shard is not None
+            for ordinal in range(len(shard)):
+                yield shard.term(ordinal).decode("utf-8")
+
+
+_CACHE: dict[str, tuple[tuple[int, int], Lexicon]] = {}
+
+
+def clear_cache() -> None:
+    """Drop every cached ``Lexicon`` so the next ``open`` maps the
+    files afresh."""
+    _CACHE.clear()
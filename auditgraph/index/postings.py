@@ -0,0 +1,69 @@
+"""Set operations over sorted posting lists of entity IDs.
+
+Posting lists (BM25 postings, per-type ID indexes) are sorted ascending
+and duplicate-free. Intersections walk the shortest list and advance the
+longer ones with galloping search: probe 1, 2, 4, ... entries ahead until
+the target is passed, then binary-search that window. Each probe acts
+as a skip pointer, so a cursor passes over long runs of non-matching
+IDs in ``O(log gap)`` steps instead of one at a time.
+"""
+from __future__ import annotations
+
+import heapq
+from bisect import bisect_left
+from typing import Sequence
+
+
+def gallop(items: Sequence[str], target: str, lo: int = 0) -> int:
+    """Leftmost index ``>= lo`` whose item is ``>= target``."""
+    size = len(items)
+    if lo >= size or items[lo] >= target:
+        return lo
+    step = 1
+    hi = lo + 1
+    while hi < size and items[hi] < target:
+        lo = hi
+        step *= 2
+        hi = lo + step
+    return bisect_left(items, target, lo + 1, min(hi, size))
+
+
+def intersect(lists: Sequence[Sequence[str]]) -> list[str]:
+    """IDs present in every list."""
+    if not lists:
+        return []
+    ordered = sorted(lists, key=len)
+    shortest, others = ordered[0], ordered[1:]
+    cursors = [0] * len(others)
+    result: list[str] = []
+    for item in shortest:
+        for position, other in enumerate(others):
+            cursor = gallop(other, item, cursors[position])
+            cursors[position] = cursor
+            if cursor == len(other):
+                return result
+            if other[cursor] != item:
+                break
+        else:
+            result.append(item)
+    return result
+
+
+def union(lists: Sequence[Sequence[str]]) -> list[str]:
+    """IDs present in any list."""
+    result: list[str] = []
+    for item in heapq.merge(*lists):
+        if not result or result[-1] != item:
+            result.append(item)
+    return result
+
+
+def difference(items: Sequence[str], removed: Sequence[str]) -> list[str]:
+    """IDs of ``items`` not in ``removed``."""
+    result: list[str] = []
+    cursor = 0
+    for item in items:
+        cursor = gallop(removed, item, cursor)
+        if cursor == len(removed) or removed[cursor] != item:
+            result.append(item)
+    return result
@@ -0,0 +1,130 @@
+"""Prefix, wildcard and fuzzy expansion of query terms.
+
+Expansions turn one query term into the indexed terms it stands for;
+callers then score those terms like any other (``index.bm25``).
+
+- Prefix (``auth*``) and wildcard (``a?th*``) patterns walk the sorted
+  term dictionary from the pattern's literal prefix, so only one
+  lexicon shard is read. Wildcards need at least one leading literal
+  character.
+- Fuzzy lookups (``athu~``) use the trigram index written next to the
+  lexicon. Each term is padded as ``$term$`` and split into character
+  trigrams. One edit (insert, delete, substitute or swap adjacent
+  characters) changes at most four of them. So a term within ``k`` edits
+  of the query shares at least ``len(grams) - 4k`` trigrams with it, and
+  never fewer than one. Candidates that pass that count and a length check
+  are verified with a bounded optimal-string-alignment edit distance.
+"""
+from __future__ import annotations
+
+import fnmatch
+import re
+from collections import Counter, defaultdict
+from typing import TYPE_CHECKING, Iterable
+
+if TYPE_CHECKING:
+    from auditgraph.index.bm25 import Bm25Reader
+
+FUZZY_MAX_EDITS = 2
+MAX_EXPANSIONS = 50
+WILDCARD_CHARS = "*?"
+
+
+def trigrams(term: str) -> list[str]:
+    """Distinct padded character trigrams of ``term``, sorted."""
+    padded = f"${term}$"
+    return sorted({padded[start : start + 3] for start in range(len(padded) - 2)})
+
+
+def trigram_entries(terms: Iterable[str]) -> dict[str, list[str]]:
+    """Trigram → sorted terms containing it, for ``write_lexicon``."""
+    entries: dict[str, list[str]] = defaultdict(list)
+    for term in sorted(terms):
+        for gram in trigrams(term):
+            entries[gram].append(term)
+    return dict(entries)
+
+
+def auto_max_edits(term: str, cap: int = FUZZY_MAX_EDITS) -> int:
+    """Edits tolerated for ``term``: none below 3 characters, one up to 5,
+    two beyond, never more than ``cap``."""
+    if len(term) < 3:
+        return 0
+    return min(1 if len(term) < 6 else 2, cap)
+
+
+def edit_distance(source: str, target: str, max_distance: int) -> int | None:
+    """Optimal-string-alignment distance, or None once it exceeds
+    ``max_distance``."""
+    if abs(len(source) - len(target)) > max_distance:
+        return None
+    previous_row: list[int] | None = None
+    row = list(range(len(target) + 1))
+    for i in range(1, len(source) + 1):
+        current = [i] + [0] * len(target)
+        for j in range(1, len(target) + 1):
+            cost = 0 if source[i - 1] == target[j - 1] else 1
+            current[j] = min(row[j] + 1, current[j - 1] + 1, row[j - 1] + cost)
+            if (
+                previous_row is not None
+                and j > 1
+                and source[i - 1] == target[j - 2]
+                and source[i - 2] == target[j - 1]
+            ):
+                current[j] = min(current[j], previous_row[j - 2] + 1)
+        if min(current) > max_distance:
+            return None
+        previous_row, row = row, current
+    return row[-1] if row[-1] <= max_distance else None
+
+
+def has_wildcard(text: str) -> bool:
+    return any(char in text for char in WILDCARD_CHARS)
+
+
+def literal_prefix(pattern: str) -> str:
+    return re.split(r"[*?]", pattern, maxsplit=1)[0]
+
+
+def expand_wildcard(reader: Bm25Reader, pattern: str, max_expansions: int = MAX_EXPANSIONS) -> list[str]:
+    """Indexed terms matching ``pattern`` (``*`` any run, ``?`` one
+    character), in sorted order, at most ``max_expansions``."""
+    prefix = literal_prefix(pattern)
+    if not prefix:
+        return []
+    matcher = re.compile(fnmatch.translate(pattern)).match
+    expanded: list[str] = []
+    for term in reader.prefix_terms(prefix):
+        if matcher(term):
+            expanded.append(term)
+            if len(expanded) >= max_expansions:
+                break
+    return expanded
+
+
+def expand_fuzzy(
+    reader: Bm25Reader,
+    term: str,
+    max_edits: int = FUZZY_MAX_EDITS,
+    max_expansions: int = MAX_EXPANSIONS,
+) -> list[tuple[str, int]]:
+    """Indexed terms within ``max_edits`` of ``term`` as ``(term,
+    distance)``, closest first then by term, at most ``max_expansions``."""
+    if max_edits <= 0:
+        return [(term, 0)] if reader.postings(term) else []
+    if reader.has_trigrams:
+        grams = trigrams(term)
+        shared: Counter[str] = Counter()
+        for gram in grams:
+            shared.update(reader.trigram_terms(gram))
+        needed = max(1, len(grams) - 4 * max_edits)
+        candidates: Iterable[str] = sorted(candidate for candidate, count in shared.items() if count >= needed)
+    else:
+        candidates = reader.prefix_terms("")
+    matches: list[tuple[str, int]] = []
+    for candidate in candidates:
+        distance = edit_distance(term, candidate, max_edits)
+        if distance is not None:
+            matches.append((candidate, distance))
+    matches.sort(key=lambda item: (item[1], item[0]))
+    return matches[:max_expansions]
@@ -1,12 +1,14 @@
 """Per-type entity and link index builders."""
 from __future__ import annotations
 
-import json
 import re
 from collections import defaultdict
 from pathlib import Path
 from typing import Iterable
 
+from auditgraph.storage.backends import get_backend
+from auditgraph.storage.codec import dumps
+
 
 def sanitize_type_name(type_name: str) -> str:
     """Replace non-alphanumeric characters with underscores."""
@@ -35,7 +37,7 @@ def build_type_indexes(pkg_root: Path, entities: Iterable[dict[str, object]]) ->
         ids.sort()
         filename = f"{sanitize_type_name(type_name)}.json"
         path = out_dir / filename
-        path.write_text(json.dumps(ids, indent=None))
+        path.write_bytes(dumps(ids))
         result[type_name] = path
 
     return result
@@ -44,20 +46,17 @@ def build_type_indexes(pkg_root: Path, entities: Iterable[dict[str, object]]) ->
 def build_link_type_indexes(pkg_root: Path) -> dict[str, Path]:
     """Build per-type link index files.
 
-    Reads all link files via rglob.
+    Reads all links through the profile's storage backend.
     Writes: indexes/link-types/<sanitized_type>.json
     Returns: mapping of link_type -> written file path.
     """
-    links_dir = pkg_root / "links"
     by_type: dict[str, list[str]] = defaultdict(list)
 
-    if links_dir.exists():
-        for path in links_dir.rglob("*.json"):
-            data = json.loads(path.read_text())
-            link_type = str(data.get("type", ""))
-            link_id = str(data.get("id", ""))
-            if link_type and link_id:
-                by_type[link_type].append(link_id)
+    for data in get_backend(pkg_root).iter_records("links"):
+        link_type = str(data.get("type", ""))
+        link_id = str(data.get("id", ""))
+        if link_type and link_id:
+            by_type[link_type].append(link_id)
 
     out_dir = pkg_root / "indexes" / "link-types"
     out_dir.mkdir(parents=True, exist_ok=True)
@@ -67,7 +66,7 @@ def build_link_type_indexes(pkg_root: Path) -> dict[str, Path]:
         ids.sort()
         filename = f"{sanitize_type_name(type_name)}.json"
         path = out_dir / filename
-        path.write_text(json.dumps(ids, indent=None))
+        path.write_bytes(dumps(ids))
         result[type_name] = path
 
     return result
@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 from pathlib import Path
+from typing import Iterable, Iterator, Protocol
 
 from auditgraph.storage.artifacts import read_json, write_json
 
@@ -15,5 +16,64 @@ def load_adjacency(pkg_root: Path) -> dict[str, list[dict[str, object]]]:
 
 def write_adjacency(pkg_root: Path, adjacency: dict[str, list[dict[str, object]]]) -> Path:
     path = pkg_root / "indexes" / "graph" / "adjacency.json"
-    write_json(path, adjacency)
+    write_json(path, adjacency, compact=True)
     return path
+
+
+class AdjacencyView(Protocol):
+    """Directional edge lookup used by graph traversals.
+
+    ``out_edges`` returns adjacency.json entries (``to_id``, ...);
+    ``in_edges`` returns the same edges keyed by ``from_id``.
+    """
+
+    def out_edges(self, node_id: str) -> list[dict[str, object]]:
+        ...
+
+    def in_edges(self, node_id: str) -> list[dict[str, object]]:
+        ...
+
+
+class DictAdjacency:
+    """``AdjacencyView`` over an in-memory adjacency.json mapping."""
+
+    def __init__(self, adjacency: dict[str, list[dict[str, object]]]) -> None:
+        self.adjacency = adjacency
+        self._reverse: dict[str, list[dict[str, object]]] | None = None
+
+    def out_edges(self, node_id: str) -> list[dict[str, object]]:
+        return self.adjacency.get(node_id, [])
+
+    def in_edges(self, node_id: str) -> list[dict[str, object]]:
+        if self._reverse is None:
+            reverse: dict[str, list[dict[str, object]]] = {}
+            for from_id, edges in self.adjacency.items():
+                for edge in edges:
+                    incoming = {key: value for key, value in edge.items() if key != "to_id"}
+                    reverse.setdefault(str(edge.get("to_id", "")), []).append({"from_id": from_id, **incoming})
+            for edges in reverse.values():
+                edges.sort(key=lambda item: (str(item.get("type", "")), str(item["from_id"])))
+            self._reverse = reverse
+        return self._reverse.get(node_id, [])
+
+
+def open_adjacency(pkg_root: Path) -> AdjacencyView:
+    """Return the memory-mapped CSR index when current, else adjacency.json."""
+    from auditgraph.index.csr_adjacency import CsrAdjacency
+
+    csr = CsrAdjacency.open(pkg_root)
+    if csr is not None:
+        return csr
+    return DictAdjacency(load_adjacency(pkg_root))
+
+
+def edges_among(pkg_root: Path, node_ids: Iterable[str]) -> Iterator[tuple[str, dict[str, object]]]:
+    """Yield ``(from_id, edge)`` for edges whose both ends are in
+    ``node_ids``, in ``node_ids`` order then adjacency order."""
+    ordered = list(node_ids)
+    members = set(ordered)
+    view = open_adjacency(pkg_root)
+    for node_id in ordered:
+        for edge in view.out_edges(node_id):
+            if str(edge.get("to_id", "")) in members:
+                yield node_id, edge
@@ -6,6 +6,7 @@ from pathlib import Path
 from typing import Any
 
 from auditgraph.storage.artifacts import read_json
+from auditgraph.storage.backends import get_backend
 from auditgraph.utils.redaction import Redactor
 
 
@@ -64,8 +65,8 @@ def _extract_source(payload: dict[str, Any]) -> tuple[str | None, str | None]:
 def load_graph_nodes(pkg_root: Path, redactor: Redactor | None = None) -> list[GraphNodeRecord]:
     profile = pkg_root.name
     records: list[GraphNodeRecord] = []
-    for path in _iter_json_files(pkg_root / "entities"):
-        payload = read_json(path)
+    backend = get_backend(pkg_root)
+    for payload in backend.iter_records("entities"):
         if redactor is not None:
             payload = redactor.redact_payload(payload).value
         if not isinstance(payload, dict):
@@ -119,8 +120,7 @@ def load_graph_nodes(pkg_root: Path, redactor: Redactor | None = None) -> list[G
             )
         )
 
-    for path in _iter_json_files(pkg_root / "chunks"):
-        payload = read_json(path)
+    for payload in backend.iter_records("chunks"):
         if redactor is not None:
             payload = redactor.redact_payload(payload).value
         if not isinstance(payload, dict):
@@ -154,8 +154,7 @@ def load_graph_relationships(
 ) -> tuple[list[GraphRelationshipRecord], int]:
     records: list[GraphRelationshipRecord] = []
     skipped = 0
-    for path in _iter_json_files(pkg_root / "links"):
-        payload = read_json(path)
+    for payload in get_backend(pkg_root).iter_records("links"):
         if redactor is not None:
             payload = redactor.redact_payload(payload).value
         if not isinstance(payload, dict):
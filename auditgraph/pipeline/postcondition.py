@@ -23,7 +23,7 @@ from typing import Any
 
 from auditgraph.config import Config
 from auditgraph.query._shard_scanner import (
-    CANONICAL_SHARD_DIRS,
+    count_shards,
     scan_shards_for_misses,
 )
 from auditgraph.utils.redaction import redaction_policy_for_config
@@ -44,14 +44,7 @@ class PostconditionFailed(RuntimeError):
 
 
 def _count_scanned_shards(profile_root: Path) -> int:
-    if not profile_root.exists():
-        return 0
-    total = 0
-    for shard_dir_name in CANONICAL_SHARD_DIRS:
-        shard_dir = profile_root / shard_dir_name
-        if shard_dir.exists():
-            total += sum(1 for _ in shard_dir.rglob("*.json") if _.is_file())
-    return total
+    return count_shards(profile_root)
 
 
 def skipped_result() -> dict[str, Any]:
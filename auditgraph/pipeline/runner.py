@@ -5,7 +5,14 @@ from dataclasses import dataclass
 from pathlib import Path
 from typing import Any
 
-from auditgraph.config import Config, footprint_budget_settings
+from auditgraph.config import (
+    Config,
+    centrality_settings,
+    field_index_settings,
+    footprint_budget_settings,
+    storage_backend_name,
+    storage_compression,
+)
 from auditgraph.ingest import (
     build_manifest,
     build_source_record,
@@ -26,6 +33,11 @@ from auditgraph.link import build_source_cooccurrence_links, write_links
 from auditgraph.link.adjacency import write_adjacency
 from auditgraph.index.adjacency_builder import build_adjacency_index
 from auditgraph.index.bm25 import build_bm25_index
+from auditgraph.index.chunk_index import build_chunk_index
+from auditgraph.index.centrality import build_centrality, remove_centrality
+from auditgraph.index.clusters import build_clusters
+from auditgraph.index.facets import build_facets
+from auditgraph.index.field_index import build_field_indexes
 from auditgraph.index.type_index import build_link_type_indexes, build_type_indexes
 from auditgraph.storage.artifacts import append_text, profile_pkg_root, read_json, write_json
 from auditgraph.storage.artifacts import write_document_artifacts
@@ -34,6 +46,8 @@ from auditgraph.utils.redaction import build_redactor
 from auditgraph.storage.config_snapshot import ingestion_config_hash, write_config_snapshot
 from auditgraph.storage.hashing import deterministic_run_id, deterministic_timestamp, inputs_hash, outputs_hash, sha256_json, sha256_text
 from auditgraph.storage.hashing import deterministic_document_id, sha256_file
+from auditgraph.storage.backends import activate_backend, get_backend
+from auditgraph.storage.bulk_writer import WriteStats, collect_write_stats
 from auditgraph.storage.loaders import load_entities
 from auditgraph.storage.provenance import ProvenanceRecord, write_provenance_index
 from auditgraph.storage.audit import ARTIFACT_SCHEMA_VERSION, DEFAULT_PIPELINE_VERSION
@@ -84,46 +98,41 @@ def _prune_markdown_subentities_for_source(pkg_root: Path, source_path: str) ->
     """
     from auditgraph.extract.markdown import MARKDOWN_ENTITY_TYPES, MARKDOWN_RULE_IDS
 
-    entities_dir = pkg_root / "entities"
-    links_dir = pkg_root / "links"
+    backend = get_backend(pkg_root)
     stale_ids: set[str] = set()
+    stale_keys: list[str] = []
 
-    if entities_dir.exists():
-        for entity_file in sorted(entities_dir.rglob("*.json")):
-            try:
-                payload = read_json(entity_file)
-            except Exception:
-                continue
-            if payload.get("type") not in MARKDOWN_ENTITY_TYPES:
-                continue
-            refs = payload.get("refs") or []
-            if not refs or not isinstance(refs[0], dict):
-                continue
-            if refs[0].get("source_path") != source_path:
-                continue
-            stale_ids.add(str(payload.get("id", "")))
-            try:
-                entity_file.unlink()
-            except FileNotFoundError:
-                pass
+    for entity_id in backend.iter_ids("entities"):
+        try:
+            payload = backend.load("entities", entity_id)
+        except Exception:
+            continue
+        if payload.get("type") not in MARKDOWN_ENTITY_TYPES:
+            continue
+        refs = payload.get("refs") or []
+        if not refs or not isinstance(refs[0], dict):
+            continue
+        if refs[0].get("source_path") != source_path:
+            continue
+        stale_ids.add(str(payload.get("id", "")))
+        stale_keys.append(entity_id)
+    backend.delete("entities", stale_keys)
 
     if not stale_ids:
         return
 
-    if links_dir.exists():
-        markdown_rule_set = set(MARKDOWN_RULE_IDS)
-        for link_file in sorted(links_dir.rglob("*.json")):
-            try:
-                link = read_json(link_file)
-            except Exception:
-                continue
-            if link.get("rule_id") not in markdown_rule_set:
-                continue
-            if link.get("from_id") in stale_ids or link.get("to_id") in stale_ids:
-                try:
-                    link_file.unlink()
-                except FileNotFoundError:
-                    pass
+    markdown_rule_set = set(MARKDOWN_RULE_IDS)
+    stale_link_ids: list[str] = []
+    for link_id in backend.iter_ids("links"):
+        try:
+            link = backend.load("links", link_id)
+        except Exception:
+            continue
+        if link.get("rule_id") not in markdown_rule_set:
+            continue
+        if link.get("from_id") in stale_ids or link.get("to_id") in stale_ids:
+            stale_link_ids.append(link_id)
+    backend.delete("links", stale_link_ids)
 
 
 def _build_documents_index(
@@ -152,8 +161,9 @@ def _build_documents_index(
     """
     from auditgraph.extract.markdown import DocumentsIndex
 
-    # Build: source_hash → (source_path, record_index)
-    hash_to_relpath: dict[str, str] = {}
+    # Build: source_hash → source paths. Byte-identical files share a
+    # source_hash, so one hash can name several paths.
+    hash_to_relpaths: dict[str, list[str]] = {}
     for record in normalized_records:
         if record.get("parse_status") != "ok":
             continue
@@ -161,7 +171,7 @@ def _build_documents_index(
         source_hash = str(record.get("source_hash", ""))
         if not relative_source_path or not source_hash:
             continue
-        hash_to_relpath[source_hash] = relative_source_path
+        hash_to_relpaths.setdefault(source_hash, []).append(relative_source_path)
 
     by_doc_id: dict[str, Path] = {}
     by_source_path: dict[str, str] = {}
@@ -178,11 +188,22 @@ def _build_documents_index(
             doc_id = str(payload.get("document_id", ""))
             if not doc_source_hash or not doc_id:
                 continue
-            relpath = hash_to_relpath.get(doc_source_hash)
-            if relpath is None:
+            relpaths = hash_to_relpaths.get(doc_source_hash)
+            if not relpaths:
                 # Stale document artifact — its source is not in the current
                 # ingest manifest. Skip it per adjustments3 §4.
                 continue
+            relpath = relpaths[0]
+            if len(relpaths) > 1:
+                doc_source_path = str(payload.get("source_path", ""))
+                matching = [
+                    candidate
+                    for candidate in relpaths
+                    if doc_source_path == candidate or doc_source_path.endswith("/" + candidate)
+                ]
+                if not matching:
+                    continue
+                relpath = matching[0]
             by_doc_id[doc_id] = doc_file
             by_source_path[relpath] = doc_id
     return DocumentsIndex(by_doc_id=by_doc_id, by_source_path=by_source_path)
@@ -236,6 +257,14 @@ class PipelineRunner:
             return self.run_rebuild(**kwargs)
         return StageResult(stage=stage, status="not_implemented", detail=kwargs)
 
+    def _stage_pkg_root(self, root: Path, config: Config) -> Path:
+        """Resolve the profile root and activate the configured storage backend
+        and compression so loaders that only receive ``pkg_root`` read what
+        this stage writes."""
+        pkg_root = profile_pkg_root(root, config)
+        activate_backend(pkg_root, storage_backend_name(config), storage_compression(config))
+        return pkg_root
+
     def _resolve_run_id(self, pkg_root: Path, run_id: str | None) -> str | None:
         if run_id:
             return run_id
@@ -275,6 +304,8 @@ class PipelineRunner:
         status: str = "ok",
         warnings: list[dict[str, str]] | None = None,
         wall_clock_started_at: str | None = None,
+        write_stats: WriteStats | None = None,
+        index_stats: dict[str, Any] | None = None,
     ) -> Path:
         # Spec-028 US6 (BUG-3 fix): `wall_clock_started_at` is captured by
         # each `run_*` method at stage entry and passed in here.
@@ -305,6 +336,8 @@ class PipelineRunner:
             warnings=list(warnings) if warnings else [],
             wall_clock_started_at=started,
             wall_clock_finished_at=finished,
+            write_stats=write_stats.to_dict() if write_stats is not None else {},
+            index_stats=dict(index_stats) if index_stats else {},
         )
         manifest_path = pkg_root / "runs" / run_id / f"{stage}-manifest.json"
         write_json(manifest_path, manifest.to_dict())
@@ -321,7 +354,7 @@ class PipelineRunner:
 
         redactor = build_redactor(root, config)
 
-        pkg_root = profile_pkg_root(root, config)
+        pkg_root = self._stage_pkg_root(root, config)
         if enforce_compatibility:
             ensure_latest_manifest_compatibility(pkg_root, ARTIFACT_SCHEMA_VERSION)
 
@@ -546,6 +579,8 @@ class PipelineRunner:
                 "usage_ratio": budget_status.usage_ratio,
                 "limit_bytes": budget_status.limit_bytes,
                 "projected_bytes": budget_status.projected_bytes,
+                "artifact_bytes": budget_status.artifact_bytes,
+                "logical_bytes": budget_status.logical_bytes,
             }
         return StageResult(stage="ingest", status="ok", detail=detail)
 
@@ -553,7 +588,7 @@ class PipelineRunner:
         _start = time.monotonic()
         from auditgraph.storage.hashing import wall_clock_now as _wc_now
         _wall_clock_started_at = _wc_now()
-        pkg_root = profile_pkg_root(root, config)
+        pkg_root = self._stage_pkg_root(root, config)
         resolved = self._resolve_run_id(pkg_root, run_id)
         if not resolved:
             return StageResult(stage="git-provenance", status="missing_manifest", detail={"run_id": run_id})
@@ -581,7 +616,6 @@ class PipelineRunner:
             build_reverse_index,
         )
         from auditgraph.git.config import load_git_provenance_config
-        from auditgraph.storage.sharding import shard_dir
 
         # Read git history
         try:
@@ -655,22 +689,11 @@ class PipelineRunner:
             # pre-existing dangling-reference bug where modifies links pointed
             # at file entities that were never materialized for non-code paths.
             all_entities = commit_nodes + author_nodes + tag_nodes + ref_nodes + [repo_node] + file_nodes
-            entity_artifacts: list[str] = []
-            for entity in all_entities:
-                eid = entity["id"]
-                entity_dir = shard_dir(pkg_root / "entities", eid)
-                entity_path = entity_dir / f"{eid}.json"
-                write_json(entity_path, entity)
-                entity_artifacts.append(str(entity_path))
-
-            # Write links to sharded storage
-            link_artifacts: list[str] = []
-            for link in links:
-                lid = link["id"]
-                link_dir = shard_dir(pkg_root / "links", lid)
-                link_path = link_dir / f"{lid}.json"
-                write_json(link_path, link)
-                link_artifacts.append(str(link_path))
+            with collect_write_stats() as write_stats:
+                entity_artifacts = [str(path) for path in write_entities(pkg_root, all_entities)]
+
+                # Write links to sharded storage
+                link_artifacts = [str(path) for path in write_links(pkg_root, links)]
 
             # Write reverse index
             idx_dir = pkg_root / "indexes" / "git-provenance"
@@ -710,6 +733,7 @@ class PipelineRunner:
                 config_hash=git_config_hash,
                 artifacts=all_artifacts,
                 wall_clock_started_at=_wall_clock_started_at,
+                write_stats=write_stats,
             )
 
             # Append replay log
@@ -746,7 +770,7 @@ class PipelineRunner:
         _start = time.monotonic()
         from auditgraph.storage.hashing import wall_clock_now as _wc_now
         _wall_clock_started_at = _wc_now()
-        pkg_root = profile_pkg_root(root, config)
+        pkg_root = self._stage_pkg_root(root, config)
         resolved = self._resolve_run_id(pkg_root, run_id)
         if not resolved:
             return StageResult(stage="normalize", status="missing_manifest", detail={"run_id": run_id})
@@ -788,7 +812,7 @@ class PipelineRunner:
         _start = time.monotonic()
         from auditgraph.storage.hashing import wall_clock_now as _wc_now
         _wall_clock_started_at = _wc_now()
-        pkg_root = profile_pkg_root(root, config)
+        pkg_root = self._stage_pkg_root(root, config)
         redactor = build_redactor(root, config)
         resolved = self._resolve_run_id(pkg_root, run_id)
         if not resolved:
@@ -911,6 +935,8 @@ class PipelineRunner:
         if log_claims:
             claims.extend(log_claims)
 
+        write_stats = WriteStats()
+
         # NER entity extraction from chunks
         ner_config = config.profile().get("extraction", {}).get("ner", {})
         ner_link_paths: list[Path] = []
@@ -926,7 +952,8 @@ class PipelineRunner:
             # intermediate artifact that no other stage consumed (Spec NER bug
             # fix).
             if ner_links:
-                ner_link_paths = write_links(pkg_root, ner_links)
+                with collect_write_stats(write_stats):
+                    ner_link_paths = write_links(pkg_root, ner_links)
             # Clean up any vestigial intermediate artifact from prior runs.
             legacy_ner_links_path = pkg_root / "ner" / "links.json"
             if legacy_ner_links_path.exists():
@@ -937,16 +964,17 @@ class PipelineRunner:
                     pass  # directory not empty; leave it
 
         entity_list = list(entities.values())
-        entity_paths = write_entities(pkg_root, entity_list)
-        claim_paths = write_claims(pkg_root, claims)
-
-        # Spec-028 US2: write markdown-generated links (contains_section,
-        # mentions_technology, references, resolves_to_document) through the
-        # canonical link store so they participate in adjacency / index /
-        # query paths.
-        markdown_link_paths: list[Path] = []
-        if markdown_links:
-            markdown_link_paths = write_links(pkg_root, markdown_links)
+        with collect_write_stats(write_stats):
+            entity_paths = write_entities(pkg_root, entity_list)
+            claim_paths = write_claims(pkg_root, claims)
+
+            # Spec-028 US2: write markdown-generated links (contains_section,
+            # mentions_technology, references, resolves_to_document) through the
+            # canonical link store so they participate in adjacency / index /
+            # query paths.
+            markdown_link_paths: list[Path] = []
+            if markdown_links:
+                markdown_link_paths = write_links(pkg_root, markdown_links)
 
         # Spec-028 US3 FR-017: binary throughput check. Emit the
         # `no_entities_produced` warning iff ≥1 upstream input from the
@@ -984,6 +1012,7 @@ class PipelineRunner:
             artifacts=artifacts,
             warnings=stage_warnings,
             wall_clock_started_at=_wall_clock_started_at,
+            write_stats=write_stats,
         )
 
         provenance_records: list[ProvenanceRecord] = []
@@ -1039,7 +1068,7 @@ class PipelineRunner:
         _start = time.monotonic()
         from auditgraph.storage.hashing import wall_clock_now as _wc_now
         _wall_clock_started_at = _wc_now()
-        pkg_root = profile_pkg_root(root, config)
+        pkg_root = self._stage_pkg_root(root, config)
         resolved = self._resolve_run_id(pkg_root, run_id)
         if not resolved:
             return StageResult(stage="link", status="missing_manifest", detail={"run_id": run_id})
@@ -1050,7 +1079,8 @@ class PipelineRunner:
 
         entities = load_entities(pkg_root)
         links = build_source_cooccurrence_links(entities)
-        link_paths = write_links(pkg_root, links)
+        with collect_write_stats() as write_stats:
+            link_paths = write_links(pkg_root, links)
 
         adjacency: dict[str, list[dict[str, object]]] = {}
         for link in links:
@@ -1094,6 +1124,7 @@ class PipelineRunner:
             config_hash=config_hash,
             artifacts=artifacts,
             wall_clock_started_at=_wall_clock_started_at,
+            write_stats=write_stats,
         )
 
         replay_path = pkg_root / "runs" / resolved / "replay-log.jsonl"
@@ -1117,7 +1148,7 @@ class PipelineRunner:
         _start = time.monotonic()
         from auditgraph.storage.hashing import wall_clock_now as _wc_now
         _wall_clock_started_at = _wc_now()
-        pkg_root = profile_pkg_root(root, config)
+        pkg_root = self._stage_pkg_root(root, config)
         resolved = self._resolve_run_id(pkg_root, run_id)
         if not resolved:
             return StageResult(stage="index", status="missing_manifest", detail={"run_id": run_id})
@@ -1131,9 +1162,14 @@ class PipelineRunner:
         # threshold check) and the list (for BM25 construction).
         entities_materialized = list(entities)
         bm25_path = build_bm25_index(pkg_root, iter(entities_materialized))
+        chunk_index_path = build_chunk_index(pkg_root)
         type_index_paths = build_type_indexes(pkg_root, iter(entities_materialized))
+        field_index_paths = build_field_indexes(pkg_root, entities_materialized, field_index_settings(config))
+        facets_path = build_facets(pkg_root, entities_materialized, field_index_settings(config))
         link_type_index_paths = build_link_type_indexes(pkg_root)
         adjacency_path = build_adjacency_index(pkg_root)
+        cluster_stats = build_clusters(pkg_root)
+        centrality_path = self._build_centrality(pkg_root, config)
 
         # Spec-028 US3 FR-017: empty_index warning fires iff ≥1 entities
         # on disk AND the BM25 index ended up empty.
@@ -1154,14 +1190,19 @@ class PipelineRunner:
 
         outputs_hash = sha256_json({
             "bm25": str(bm25_path),
+            "chunks": str(chunk_index_path),
             "semantic": None,
             "type_indexes": sorted(str(p) for p in type_index_paths.values()),
             "link_type_indexes": sorted(str(p) for p in link_type_index_paths.values()),
+            "field_indexes": sorted(str(p) for p in field_index_paths.values()),
+            "facets": str(facets_path),
             "adjacency": str(adjacency_path),
+            "centrality": str(centrality_path) if centrality_path else None,
+            "clusters": [cluster_stats.components, cluster_stats.communities] if cluster_stats else None,
         })
         inputs_hash = str(link_manifest.get("outputs_hash", ""))
         config_hash = str(link_manifest.get("config_hash", ""))
-        artifacts = [str(bm25_path)]
+        artifacts = [str(bm25_path), str(chunk_index_path)]
         manifest_path = self._write_stage_manifest(
             pkg_root,
             stage="index",
@@ -1172,6 +1213,7 @@ class PipelineRunner:
             artifacts=artifacts,
             warnings=stage_warnings,
             wall_clock_started_at=_wall_clock_started_at,
+            index_stats={"clusters": cluster_stats.to_dict()} if cluster_stats else None,
         )
 
         replay_path = pkg_root / "runs" / resolved / "replay-log.jsonl"
@@ -1194,6 +1236,56 @@ class PipelineRunner:
             detail["warnings"] = stage_warnings
         return StageResult(stage="index", status="ok", detail=detail)
 
+    @staticmethod
+    def _build_centrality(pkg_root: Path, config: Config) -> Path | None:
+        """Run the optional centrality sub-stage, or drop stale scores
+        when it is switched off."""
+        settings = centrality_settings(config)
+        if not settings["enabled"]:
+            remove_centrality(pkg_root)
+            return None
+        return build_centrality(pkg_root, iterations=settings["iterations"], damping=settings["damping"])
+
+    def run_gc(
+        self,
+        root: Path,
+        config: Config,
+        *,
+        run_id: str | None = None,
+        dry_run: bool = False,
+        keep_runs: int = 1,
+        archive_dir: Path | None = None,
+    ) -> StageResult:
+        """Remove artifacts unreachable from the latest complete run, then
+        rebuild the query indexes over what remains."""
+        from auditgraph.storage.gc import collect_garbage
+
+        # Read through whichever backend wrote the profile; gc must never
+        # switch it to the configured one.
+        pkg_root = profile_pkg_root(root, config)
+        report = collect_garbage(
+            pkg_root,
+            run_id=run_id,
+            dry_run=dry_run,
+            keep_runs=keep_runs,
+            archive_dir=archive_dir,
+        )
+        detail = report.to_dict()
+        detail["profile"] = config.active_profile()
+        if not dry_run and report.total_count:
+            entities = list(load_entities(pkg_root))
+            build_bm25_index(pkg_root, iter(entities))
+            build_chunk_index(pkg_root)
+            build_type_indexes(pkg_root, iter(entities))
+            build_field_indexes(pkg_root, entities, field_index_settings(config))
+            build_facets(pkg_root, entities, field_index_settings(config))
+            build_link_type_indexes(pkg_root)
+            build_adjacency_index(pkg_root)
+            build_clusters(pkg_root)
+            self._build_centrality(pkg_root, config)
+            detail["indexes_rebuilt"] = True
+        return StageResult(stage="gc", status="ok", detail=detail)
+
     def run_rebuild(
         self,
         root: Path,
@@ -1283,7 +1375,7 @@ class PipelineRunner:
         allowed = import_result.allowed
         skipped = import_result.skipped
         refused_symlinks = import_result.refused_symlinks
-        pkg_root = profile_pkg_root(root, config)
+        pkg_root = self._stage_pkg_root(root, config)
         records = []
         # SECURITY: `run_import` previously wrote sources/, documents/,
         # segments/, and chunks/ with plain `write_json`, bypassing the
@@ -8,7 +8,9 @@ set. This module is their single source of truth per Constitution
 Principle I (DRY).
 
 Scope: walks only the canonical shard directories —
-`entities/`, `chunks/`, `segments/`, `documents/`, `sources/`. Explicitly
+`entities/`, `chunks/`, `segments/`, `bodies/`, `documents/`, `sources/`.
+Chunk and segment text lives in `bodies/` (see `storage.content_store`),
+so that directory is where text-borne secrets are found. Explicitly
 does NOT scan `runs/` (pipeline manifests contain SHA-derived run IDs
 that false-positive), `indexes/` (derived data; redundant), or
 `secrets/` (the redactor's own HMAC key).
@@ -20,17 +22,25 @@ attacker-log-reflection guard.
 """
 from __future__ import annotations
 
-import json
 from pathlib import Path
 from typing import Iterable
 
+from auditgraph.storage.artifacts import read_json
+from auditgraph.storage.backends import (
+    BACKEND_FILES,
+    RECORD_KINDS,
+    active_backend_name,
+    get_backend,
+    record_id,
+    record_path,
+)
 from auditgraph.utils.redaction import RedactionDetector
 
-
 CANONICAL_SHARD_DIRS: tuple[str, ...] = (
     "entities",
     "chunks",
     "segments",
+    "bodies",
     "documents",
     "sources",
 )
@@ -53,6 +63,67 @@ def _iter_shard_files(pkg_profile_root: Path) -> Iterable[tuple[str, Path]]:
             yield rel, path
 
 
+def _iter_shard_payloads(pkg_profile_root: Path) -> Iterable[tuple[str, object]]:
+    """Yield ``(relative_posix_path, payload)`` for every canonical shard.
+
+    Record kinds held by a non-``files`` storage backend are read through
+    the backend and reported under their ``files``-layout path so miss
+    records look the same whichever backend wrote the profile.
+    """
+    if not pkg_profile_root.exists() or not pkg_profile_root.is_dir():
+        return
+    backend_name = active_backend_name(pkg_profile_root)
+    if backend_name == BACKEND_FILES:
+        for rel_path, abs_path in _iter_shard_files(pkg_profile_root):
+            try:
+                payload = read_json(abs_path)
+            except (OSError, ValueError):
+                # Unreadable or malformed JSON: skip silently. The scanner's
+                # job is to flag credential-shaped content, not to validate
+                # JSON integrity. A corrupted file is a separate concern.
+                continue
+            yield rel_path, payload
+        return
+    backend = get_backend(pkg_profile_root, backend_name)
+    entries: list[tuple[str, object]] = []
+    for shard_dir_name in CANONICAL_SHARD_DIRS:
+        if shard_dir_name in RECORD_KINDS:
+            for payload in backend.iter_records(shard_dir_name):
+                path = record_path(pkg_profile_root, shard_dir_name, record_id(shard_dir_name, payload))
+                entries.append((path.relative_to(pkg_profile_root).as_posix(), payload))
+            continue
+        shard_dir = pkg_profile_root / shard_dir_name
+        if not shard_dir.exists() or not shard_dir.is_dir():
+            continue
+        for path in shard_dir.rglob("*.json"):
+            try:
+                payload = read_json(path)
+            except (OSError, ValueError):
+                continue
+            entries.append((path.relative_to(pkg_profile_root).as_posix(), payload))
+    entries.sort(key=lambda item: item[0])
+    yield from entries
+
+
+def count_shards(pkg_profile_root: Path) -> int:
+    """Return the number of canonical shard records under ``pkg_profile_root``."""
+    if not pkg_profile_root.exists() or not pkg_profile_root.is_dir():
+        return 0
+    backend_name = active_backend_name(pkg_profile_root)
+    if backend_name == BACKEND_FILES:
+        return sum(1 for _ in _iter_shard_files(pkg_profile_root))
+    backend = get_backend(pkg_profile_root, backend_name)
+    total = 0
+    for shard_dir_name in CANONICAL_SHARD_DIRS:
+        if shard_dir_name in RECORD_KINDS:
+            total += len(backend.iter_ids(shard_dir_name))
+            continue
+        shard_dir = pkg_profile_root / shard_dir_name
+        if shard_dir.exists():
+            total += sum(1 for path in shard_dir.rglob("*.json") if path.is_file())
+    return total
+
+
 def _scan_string(text: str, detectors: Iterable[RedactionDetector]) -> list[str]:
     """Return the list of detector category names that match the given string.
 
@@ -102,7 +173,7 @@ def scan_shards_for_misses(
     Args:
         pkg_profile_root: A path like ``.pkg/profiles/default/``. The
             function walks only ``entities/``, ``chunks/``, ``segments/``,
-            ``documents/``, ``sources/`` under this root.
+            ``bodies/``, ``documents/``, ``sources/`` under this root.
         detectors: The detector set to apply (typically from
             ``_default_detectors()`` or ``Redactor.policy.detectors``).
 
@@ -120,14 +191,7 @@ def scan_shards_for_misses(
     det_list = list(detectors)
     misses: list[dict[str, str]] = []
 
-    for rel_path, abs_path in _iter_shard_files(pkg_profile_root):
-        try:
-            payload = json.loads(abs_path.read_text(encoding="utf-8"))
-        except (OSError, ValueError):
-            # Unreadable or malformed JSON: skip silently. The scanner's
-            # job is to flag credential-shaped content, not to validate
-            # JSON integrity. A corrupted file is a separate concern.
-            continue
+    for rel_path, payload in _iter_shard_payloads(pkg_profile_root):
         for field_name, category in _scan_document(payload, det_list):
             misses.append(
                 {
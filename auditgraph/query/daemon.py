@@ -0,0 +1,463 @@
+"""Long-lived query daemon (``auditgraph serve``).
+
+A daemon serves one workspace and config. It listens on a Unix socket
+and answers the read commands in ``SERVE_COMMANDS``. The process keeps
+its imports, the loaded config and the memory-mapped indexes: the BM25
+lexicon and trigram index, the CSR adjacency, the field indexes and
+the storage backends.
+So a request costs only the lookup itself.
+
+Protocol: a client connects, writes one JSON object
+``{"command": ..., "params": {...}}`` and a newline, then reads one JSON
+line back. The reply is ``{"status": "ok", "payload": ...}`` or
+``{"status": "error", "error": <exception class>, "message": ...}``.
+The stdlib ``json`` module is used on the wire, not ``storage.codec``,
+because codec sorts keys and the reply must match in-process output.
+
+Before each request the daemon compares the newest
+``runs/*/index-manifest.json`` and the config file's mtime with what it
+loaded. When either has changed (a new run was indexed, or the config
+was edited), it drops its caches and loads them again. Requests run
+under the read side of a reader/writer lock and a reload under the write
+side, so caches are never dropped while a request is still reading them.
+
+The socket lives in a per-user directory under the system temp dir. Its
+name is a hash of the workspace root and config path, so a CLI process
+finds it without loading config. ``request`` returns None when no
+daemon answers, and callers then run the command in process.
+``AUDITGRAPH_NO_DAEMON=1`` turns the lookup off, and
+``AUDITGRAPH_SOCKET`` overrides the socket path on both sides.
+"""
+from __future__ import annotations
+
+import getpass
+import hashlib
+import json
+import os
+import socket
+import socketserver
+import tempfile
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Iterator
+
+from auditgraph.config import Config, bm25_settings, centrality_settings, fuzzy_settings, load_config
+from auditgraph.errors import ServeError
+from auditgraph.storage.artifacts import profile_pkg_root
+
+NO_DAEMON_ENV = "AUDITGRAPH_NO_DAEMON"
+SOCKET_ENV = "AUDITGRAPH_SOCKET"
+
+SERVE_COMMANDS = (
+    "query",
+    "node",
+    "neighbors",
+    "list",
+    "why-connected",
+    "git-who",
+    "git-log",
+    "git-introduced",
+    "git-history",
+)
+CONTROL_COMMANDS = ("status", "shutdown")
+
+MAX_REQUEST_BYTES = 1 << 20
+CONNECT_TIMEOUT = 0.5
+REQUEST_TIMEOUT = 300.0
+
+
+def socket_path(root: Path, config_path: Path | None) -> Path:
+    """Socket a daemon for ``root`` and ``config_path`` listens on."""
+    override = os.environ.get(SOCKET_ENV)
+    if override:
+        return Path(override)
+    key = f"{Path(root).resolve()}\0{Path(config_path).resolve() if config_path else ''}"
+    digest = hashlib.sha256(key.encode("utf-8")).hexdigest()[:16]
+    user = os.getuid() if hasattr(os, "getuid") else getpass.getuser()
+    return Path(tempfile.gettempdir()) / f"auditgraph-{user}" / f"{digest}.sock"
+
+
+def _owned_by_us(directory: Path) -> bool:
+    """Only trust a socket directory this user owns (the temp dir is shared)."""
+    try:
+        owner = directory.stat().st_uid
+    except FileNotFoundError:
+        return False
+    return not hasattr(os, "getuid") or owner == os.getuid()
+
+
+def _query(pkg_root: Path, config: Config, params: dict[str, Any]) -> dict[str, object]:
+    from auditgraph.query.keyword import keyword_search
+
+    search_cfg = config.profile().get("search", {})
+    bm25 = bm25_settings(config)
+    fuzzy = fuzzy_settings(config)
+    centrality = centrality_settings(config)
+    results = keyword_search(
+        pkg_root,
+        params.get("q", ""),
+        enable_semantic=bool(search_cfg.get("semantic", {}).get("enabled", False)),
+        score_rounding=float(search_cfg.get("ranking", {}).get("score_rounding", 0.000001)),
+        types=params.get("types"),
+        where=params.get("where"),
+        sort=params.get("sort"),
+        descending=bool(params.get("descending", False)),
+        limit=params.get("limit"),
+        offset=int(params.get("offset", 0)),
+        k1=bm25["k1"],
+        b=bm25["b"],
+        fuzzy=fuzzy["enabled"],
+        max_edits=fuzzy["max_edits"],
+        max_expansions=fuzzy["max_expansions"],
+        graph_weight=centrality["weight"] if centrality["enabled"] else 0.0,
+        graph_measure=centrality["measure"],
+    )
+    return {"query": params.get("q", ""), "results": results}
+
+
+def _node(pkg_root: Path, config: Config, params: dict[str, Any]) -> dict[str, object]:
+    from auditgraph.query.node_view import node_view
+
+    return node_view(pkg_root, params["id"])
+
+
+def _neighbors(pkg_root: Path, config: Config, params: dict[str, Any]) -> dict[str, object]:
+    from auditgraph.query.neighbors import neighbors
+
+    return neighbors(
+        pkg_root,
+        params["id"],
+        depth=int(params.get("depth", 1)),
+        edge_types=params.get("edge_types"),
+        min_confidence=params.get("min_confidence"),
+        direction=str(params.get("direction", "out")),
+        max_fanout=params.get("max_fanout"),
+        max_edges=params.get("max_edges"),
+        max_nodes=params.get("max_nodes"),
+        component=params.get("component"),
+        community=params.get("community"),
+    )
+
+
+def _list(pkg_root: Path, config: Config, params: dict[str, Any]) -> dict[str, object]:
+    from auditgraph.query.list_entities import list_entities
+
+    return list_entities(
+        pkg_root,
+        types=params.get("types"),
+        where=params.get("where"),
+        sort=params.get("sort"),
+        descending=bool(params.get("descending", False)),
+        limit=params.get("limit"),
+        offset=int(params.get("offset", 0)),
+        count_only=bool(params.get("count_only", False)),
+        group_by=params.get("group_by"),
+        component=params.get("component"),
+        community=params.get("community"),
+    )
+
+
+def _why_connected(pkg_root: Path, config: Config, params: dict[str, Any]) -> dict[str, object]:
+    from auditgraph.query.why_connected import (
+        DEFAULT_MAX_DEPTH,
+        DEFAULT_MAX_EXPANSIONS,
+        DEFAULT_PATHS,
+        why_connected,
+    )
+
+    return why_connected(
+        pkg_root,
+        params["from_id"],
+        params["to_id"],
+        k=int(params.get("k", DEFAULT_PATHS)),
+        max_depth=int(params.get("max_depth", DEFAULT_MAX_DEPTH)),
+        direction=str(params.get("direction", "both")),
+        max_expansions=int(params.get("max_expansions", DEFAULT_MAX_EXPANSIONS)),
+    )
+
+
+def _git(name: str) -> Callable[[Path, Config, dict[str, Any]], dict[str, Any]]:
+    def handler(pkg_root: Path, config: Config, params: dict[str, Any]) -> dict[str, Any]:
+        from auditgraph.query import git_history, git_introduced, git_log, git_who
+
+        modules = {
+            "git-who": git_who.git_who,
+            "git-log": git_log.git_log,
+            "git-introduced": git_introduced.git_introduced,
+            "git-history": git_history.git_history,
+        }
+        return modules[name](pkg_root, params["file"])
+
+    return handler
+
+
+_HANDLERS: dict[str, Callable[[Path, Config, dict[str, Any]], Any]] = {
+    "query": _query,
+    "node": _node,
+    "neighbors": _neighbors,
+    "list": _list,
+    "why-connected": _why_connected,
+    **{name: _git(name) for name in ("git-who", "git-log", "git-introduced", "git-history")},
+}
+
+
+def execute(pkg_root: Path, config: Config, command: str, params: dict[str, Any]) -> Any:
+    """Run read ``command`` in this process. The daemon and the CLI
+    fallback both use it, so they return the same payloads."""
+    handler = _HANDLERS.get(command)
+    if handler is None:
+        raise ServeError(f"Unsupported command: {command!r} (expected one of {SERVE_COMMANDS})")
+    return handler(pkg_root, config, params)
+
+
+def request(
+    root: Path,
+    config_path: Path | None,
+    command: str,
+    params: dict[str, Any] | None = None,
+    *,
+    timeout: float = REQUEST_TIMEOUT,
+) -> Any | None:
+    """Send ``command`` to the daemon serving ``root``/``config_path``.
+
+    Returns its payload, or None when no daemon is reachable (no socket,
+    a stale socket, or ``AUDITGRAPH_NO_DAEMON`` is set). Raises
+    ``ServeError`` with the daemon's message when the command failed
+    there.
+    """
+    if os.environ.get(NO_DAEMON_ENV) or not hasattr(socket, "AF_UNIX"):
+        return None
+    path = socket_path(root, config_path)
+    if not path.exists() or not _owned_by_us(path.parent):
+        return None
+    message = json.dumps({"command": command, "params": params or {}}).encode("utf-8") + b"\n"
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+            client.settimeout(CONNECT_TIMEOUT)
+            client.connect(str(path))
+            client.settimeout(timeout)
+            client.sendall(message)
+            with client.makefile("rb") as stream:
+                line = stream.readline()
+    except OSError:
+        return None
+    if not line:
+        return None
+    reply = json.loads(line)
+    if reply.get("status") != "ok":
+        raise ServeError(str(reply.get("message", "query daemon error")))
+    return reply.get("payload")
+
+
+def _latest_index_manifest(pkg_root: Path) -> tuple[int, str] | None:
+    runs_dir = pkg_root / "runs"
+    if not runs_dir.is_dir():
+        return None
+    latest: tuple[int, str] | None = None
+    for entry in runs_dir.iterdir():
+        try:
+            candidate = ((entry / "index-manifest.json").stat().st_mtime_ns, entry.name)
+        except (FileNotFoundError, NotADirectoryError):
+            continue
+        if latest is None or candidate > latest:
+            latest = candidate
+    return latest
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    server: _Server
+
+    def handle(self) -> None:
+        line = self.rfile.readline(MAX_REQUEST_BYTES)
+        if not line:
+            return
+        try:
+            message = json.loads(line)
+            reply = self.server.daemon.handle(str(message.get("command", "")), message.get("params") or {})
+        except Exception as exc:
+            reply = {"status": "error", "error": type(exc).__name__, "message": str(exc)}
+        self.wfile.write(json.dumps(reply).encode("utf-8") + b"\n")
+        if reply.get("shutdown"):
+            threading.Thread(target=self.server.shutdown, daemon=True).start()
+
+
+if hasattr(socketserver, "ThreadingUnixStreamServer"):
+
+    class _Server(socketserver.ThreadingUnixStreamServer):
+        daemon_threads = True
+
+        def __init__(self, path: Path, daemon: QueryDaemon) -> None:
+            self.daemon = daemon
+            super().__init__(str(path), _Handler)
+
+
+class _ReadWriteLock:
+    """Many readers or one writer. A waiting writer holds back new
+    readers, so a reload is not starved by a stream of requests."""
+
+    def __init__(self) -> None:
+        self._condition = threading.Condition()
+        self._readers = 0
+        self._writing = False
+        self._waiting_writers = 0
+
+    @contextmanager
+    def read(self) -> Iterator[None]:
+        with self._condition:
+            while self._writing or self._waiting_writers:
+                self._condition.wait()
+            self._readers += 1
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._readers -= 1
+                if not self._readers:
+                    self._condition.notify_all()
+
+    @contextmanager
+    def write(self) -> Iterator[None]:
+        with self._condition:
+            self._waiting_writers += 1
+            while self._writing or self._readers:
+                self._condition.wait()
+            self._waiting_writers -= 1
+            self._writing = True
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._writing = False
+                self._condition.notify_all()
+
+
+class QueryDaemon:
+    """Warm query state for one workspace, served over a Unix socket."""
+
+    def __init__(self, root: Path, config_path: Path | None, *, socket: Path | None = None) -> None:
+        self.root = Path(root).resolve()
+        self.config_path = config_path
+        self.socket = socket or socket_path(self.root, config_path)
+        self.requests = 0
+        self.reloads = 0
+        self._lock = threading.Lock()
+        self._state = _ReadWriteLock()
+        self._signature: tuple[object, ...] | None = None
+        self._server: _Server | None = None
+        self.config: Config = load_config(config_path)
+        self.pkg_root = profile_pkg_root(self.root, self.config)
+
+    def _current_signature(self) -> tuple[object, ...]:
+        config_mtime = None
+        if self.config_path is not None:
+            try:
+                config_mtime = Path(self.config_path).stat().st_mtime_ns
+            except FileNotFoundError:
+                pass
+        return (config_mtime, _latest_index_manifest(self.pkg_root))
+
+    def refresh(self) -> bool:
+        """Reload config and caches when a newer run was indexed or the
+        config changed. Returns True when it reloaded.
+
+        The reload waits for requests in flight to finish."""
+        if self._current_signature() == self._signature:
+            return False
+        with self._state.write():
+            signature = self._current_signature()
+            if signature == self._signature:
+                return False
+            if self._signature is not None:
+                self.config = load_config(self.config_path)
+                self.pkg_root = profile_pkg_root(self.root, self.config)
+                self.reloads += 1
+                signature = self._current_signature()
+            self._drop_caches()
+            self._warm()
+            self._signature = signature
+            return True
+
+    def _drop_caches(self) -> None:
+        from auditgraph.index import centrality, clusters, csr_adjacency, facets, field_index, lexicon
+        from auditgraph.storage.backends import release_backends
+
+        lexicon.clear_cache()
+        csr_adjacency.clear_cache()
+        centrality.clear_cache()
+        clusters.clear_cache()
+        field_index.clear_cache()
+        facets.clear_cache()
+        release_backends(self.pkg_root)
+
+    def _warm(self) -> None:
+        """Map the indexes now rather than on the first request."""
+        from auditgraph.index.bm25 import Bm25Reader
+        from auditgraph.index.csr_adjacency import CsrAdjacency
+        from auditgraph.storage.backends import get_backend
+
+        Bm25Reader.open(self.pkg_root)
+        CsrAdjacency.open(self.pkg_root)
+        get_backend(self.pkg_root)
+
+    def status(self) -> dict[str, object]:
+        return {
+            "status": "serving",
+            "pid": os.getpid(),
+            "root": str(self.root),
+            "pkg_root": str(self.pkg_root),
+            "socket": str(self.socket),
+            "requests": self.requests,
+            "reloads": self.reloads,
+        }
+
+    def handle(self, command: str, params: dict[str, Any]) -> dict[str, object]:
+        if command == "status":
+            return {"status": "ok", "payload": self.status()}
+        if command == "shutdown":
+            return {"status": "ok", "payload": {"status": "stopping"}, "shutdown": True}
+        self.refresh()
+        with self._state.read():
+            with self._lock:
+                self.requests += 1
+            return {"status": "ok", "payload": execute(self.pkg_root, self.config, command, params)}
+
+    def bind(self) -> None:
+        """Create the socket, replacing a stale one. Raises ``ServeError``
+        when another daemon already answers on it."""
+        if not hasattr(socket, "AF_UNIX"):
+            raise ServeError("auditgraph serve needs Unix domain sockets")
+        if self.socket.exists():
+            try:
+                with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as probe:
+                    probe.settimeout(CONNECT_TIMEOUT)
+                    probe.connect(str(self.socket))
+            except OSError:
+                self.socket.unlink()
+            else:
+                raise ServeError(f"A query daemon is already serving on {self.socket}")
+        self.socket.parent.mkdir(mode=0o700, parents=True, exist_ok=True)
+        if not _owned_by_us(self.socket.parent):
+            raise ServeError(f"Socket directory {self.socket.parent} belongs to another user")
+        self.refresh()
+        self._server = _Server(self.socket, self)
+        os.chmod(self.socket, 0o600)
+
+    def serve_forever(self) -> None:
+        if self._server is None:
+            self.bind()
+        assert self._server is not None
+        try:
+            self._server.serve_forever()
+        finally:
+            self.close()
+
+    def shutdown(self) -> None:
+        if self._server is not None:
+            self._server.shutdown()
+
+    def close(self) -> None:
+        if self._server is not None:
+            self._server.server_close()
+            self._server = None
+            self.socket.unlink(missing_ok=True)
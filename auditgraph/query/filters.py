@@ -1,9 +1,11 @@
 """Predicate parser, filter engine, sort, pagination, and aggregation."""
 from __future__ import annotations
 
+import heapq
+import operator as _operator
 import re
 from dataclasses import dataclass
-from typing import Iterator
+from typing import Callable, Iterable, Iterator
 
 
 @dataclass
@@ -35,9 +37,41 @@ def parse_predicate(expr: str) -> FilterPredicate:
     raise ValueError(f"Cannot parse predicate: {expr!r}")
 
 
+def split_type_predicates(
+    predicates: list[FilterPredicate],
+) -> tuple[list[str], list[FilterPredicate]]:
+    """Separate ``type=<value>`` predicates, which a per-type ID index can
+    answer without loading entities, from the rest.
+
+    Returns ``(type_values, remaining)``; every type value must hold.
+    """
+    type_values: list[str] = []
+    remaining: list[FilterPredicate] = []
+    for predicate in predicates:
+        if predicate.field == "type" and predicate.operator == "=" and not predicate.is_numeric:
+            type_values.append(predicate.value)
+        else:
+            remaining.append(predicate)
+    return type_values, remaining
+
+
+def field_value(entity: dict, field: str) -> object:
+    """Value of *field* in *entity*. A dotted name such as
+    ``metadata.heading_level`` walks nested objects when the entity has
+    no top-level key spelled that way."""
+    if field in entity or "." not in field:
+        return entity.get(field)
+    value: object = entity
+    for part in field.split("."):
+        if not isinstance(value, dict):
+            return None
+        value = value.get(part)
+    return value
+
+
 def matches(entity: dict, predicate: FilterPredicate) -> bool:
     """Test whether *entity* satisfies *predicate*."""
-    field_val = entity.get(predicate.field)
+    field_val = field_value(entity, predicate.field)
     if field_val is None:
         return False
 
@@ -103,6 +137,103 @@ def matches(entity: dict, predicate: FilterPredicate) -> bool:
     return False
 
 
+_COMPARISONS: dict[str, Callable[[object, object], bool]] = {
+    "=": _operator.eq,
+    "!=": _operator.ne,
+    ">": _operator.gt,
+    ">=": _operator.ge,
+    "<": _operator.lt,
+    "<=": _operator.le,
+}
+
+
+# ``str_val <op> value`` as a bound method of the predicate value, so
+# string fields compare in C without a Python-level frame.
+_STRING_TESTS: dict[str, Callable[[str], Callable[[str], bool]]] = {
+    "=": lambda value: value.__eq__,
+    "!=": lambda value: value.__ne__,
+    ">": lambda value: value.__lt__,
+    ">=": lambda value: value.__le__,
+    "<": lambda value: value.__gt__,
+    "<=": lambda value: value.__ge__,
+}
+
+
+def _never(_: object) -> bool:
+    return False
+
+
+def compile_predicate(predicate: FilterPredicate) -> Callable[[dict], bool]:
+    """Specialise *predicate* into a test with the semantics of
+    ``matches``. The operator, the coerced boolean and the numeric
+    operand are resolved once, not per entity, and string field values
+    (the common case) take a single bound comparison."""
+    field = predicate.field
+    dotted = "." in field
+    op = predicate.operator
+    value = predicate.value
+    compare = _COMPARISONS.get(op)
+
+    def list_has(items: list) -> bool:
+        return value in items
+
+    def list_lacks(items: list) -> bool:
+        return value not in items
+
+    def list_mentions(items: list) -> bool:
+        return any(value in str(item) for item in items)
+
+    test_list = {"=": list_has, "!=": list_lacks, "~": list_mentions}.get(op, _never)
+
+    bool_val = value.lower() in ("true", "1", "yes")
+    test_bool: Callable[[bool], bool] = _never
+    if op == "=":
+        test_bool = bool_val.__eq__
+    elif op == "!=":
+        test_bool = bool_val.__ne__
+
+    test_string: Callable[[str], bool]
+    if predicate.is_numeric:
+        number = float(value)
+
+        def test_scalar(field_val: object) -> bool:
+            if compare is None:
+                return False
+            try:
+                return compare(float(field_val), number)  # type: ignore[arg-type]
+            except (TypeError, ValueError):
+                return False
+
+        test_string = test_scalar
+    else:
+        def text_contains(text: str) -> bool:
+            return value in text
+
+        if op == "~":
+            test_string = text_contains
+        elif op in _STRING_TESTS:
+            test_string = _STRING_TESTS[op](value)
+        else:
+            test_string = _never
+
+        def test_scalar(field_val: object) -> bool:
+            return test_string(str(field_val))
+
+    def test(entity: dict) -> bool:
+        field_val = field_value(entity, field) if dotted else entity.get(field)
+        if field_val.__class__ is str:
+            return test_string(field_val)
+        if field_val is None:
+            return False
+        if isinstance(field_val, list):
+            return test_list(field_val)
+        if isinstance(field_val, bool):
+            return test_bool(field_val)
+        return test_scalar(field_val)
+
+    return test
+
+
 def _sort_key(entity: dict, sort_field: str | None) -> tuple:
     """Build a sort key tuple: (has_value, field_value, id).
 
@@ -111,7 +242,7 @@ def _sort_key(entity: dict, sort_field: str | None) -> tuple:
     entity_id = str(entity.get("id", ""))
     if sort_field is None:
         return (0, "", entity_id)
-    val = entity.get(sort_field)
+    val = field_value(entity, sort_field)
     if val is None:
         return (1, "", entity_id)  # missing → last
     # Try numeric comparison
@@ -143,7 +274,7 @@ def apply_sort(
     has_val = []
     missing = []
     for e in entities:
-        if e.get(sort_field) is None:
+        if field_value(e, sort_field) is None:
             missing.append(e)
         else:
             has_val.append(e)
@@ -152,6 +283,65 @@ def apply_sort(
     return has_val_sorted + missing_sorted
 
 
+class _Descending:
+    """Inverts the order of a sort key, so one ``nsmallest`` pass can
+    return a descending page."""
+
+    __slots__ = ("key",)
+
+    def __init__(self, key: tuple) -> None:
+        self.key = key
+
+    def __lt__(self, other: _Descending) -> bool:
+        return other.key < self.key
+
+
+def _order_key(sort_field: str | None, descending: bool) -> Callable[[dict], tuple]:
+    """Key whose ascending order is ``apply_sort``'s output order."""
+    if sort_field is None:
+        return lambda entity: (0, str(entity.get("id", "")))
+    if not descending:
+        return lambda entity: _sort_key(entity, sort_field)
+
+    def key(entity: dict) -> tuple:
+        if field_value(entity, sort_field) is None:
+            return (1, str(entity.get("id", "")))
+        return (0, _Descending(_sort_key(entity, sort_field)))
+
+    return key
+
+
+def select_page(
+    entities: Iterable[dict[str, object]],
+    sort_field: str | None = None,
+    descending: bool = False,
+    limit: int | None = None,
+    offset: int = 0,
+) -> tuple[list[dict[str, object]], int]:
+    """``apply_sort`` then ``apply_pagination`` in one pass.
+
+    With a ``limit`` only the first ``offset + limit`` entities in sort
+    order are kept, in a bounded heap, so *entities* can be a stream.
+    Returns ``(page_results, total_count_pre_pagination)``.
+    """
+    if limit is None:
+        return apply_pagination(apply_sort(list(entities), sort_field, descending), offset=offset)
+    total = 0
+
+    def counted() -> Iterator[dict[str, object]]:
+        nonlocal total
+        for entity in entities:
+            total += 1
+            yield entity
+
+    stream = counted()
+    head = heapq.nsmallest(offset + limit, stream, key=_order_key(sort_field, descending))
+    # nsmallest(0, ...) returns without reading; the total still counts.
+    for _ in stream:
+        pass
+    return head[offset:], total
+
+
 def apply_pagination(
     entities: list[dict[str, object]],
     limit: int | None = None,
@@ -165,23 +355,25 @@ def apply_pagination(
 
 
 def apply_aggregation(
-    entities: list[dict[str, object]],
+    entities: Iterable[dict[str, object]],
     count_only: bool = False,
     group_by: str | None = None,
 ) -> dict[str, object] | None:
     """Apply aggregation to entities. Returns dict or None if no aggregation requested."""
     if group_by:
         groups: dict[str, int] = {}
+        total = 0
         for entity in entities:
-            key = entity.get(group_by)
+            total += 1
+            key = field_value(entity, group_by)
             if key is None:
                 group_key = "_missing"
             else:
                 group_key = str(key)
             groups[group_key] = groups.get(group_key, 0) + 1
-        return {"groups": groups, "total_count": len(entities)}
+        return {"groups": groups, "total_count": total}
     if count_only:
-        return {"count": len(entities)}
+        return {"count": sum(1 for _ in entities)}
     return None
 
 
@@ -191,12 +383,15 @@ def apply_filters(
     types: list[str] | None = None,
     predicates: list[FilterPredicate] | None = None,
 ) -> Iterator[dict[str, object]]:
-    """Yield entities matching all type and predicate filters."""
+    """Yield entities matching all type and predicate filters. Predicates
+    are compiled once (``compile_predicate``) and entities are streamed."""
     type_set = set(types) if types else None
+    tests = [compile_predicate(p) for p in predicates or []]
     for entity in entities:
         if type_set and entity.get("type") not in type_set:
             continue
-        if predicates:
-            if not all(matches(entity, p) for p in predicates):
-                continue
-        yield entity
+        for test in tests:
+            if not test(entity):
+                break
+        else:
+            yield entity
@@ -11,8 +11,9 @@ from pathlib import Path
 from typing import Any
 
 from auditgraph.storage.artifacts import read_json
+from auditgraph.storage.backends import get_backend
 from auditgraph.storage.hashing import entity_id
-from auditgraph.storage.loaders import load_entity
+from auditgraph.storage.loaders import iter_entities, load_entity
 
 
 def _load_reverse_index(pkg_root: Path) -> dict[str, list[str]]:
@@ -28,12 +29,12 @@ def _find_lineage(pkg_root: Path, file_eid: str) -> list[dict[str, Any]]:
     Returns list of dicts: [{old_path, confidence, detection_method}]
     """
     lineage: list[dict[str, Any]] = []
-    links_dir = pkg_root / "links"
-    if not links_dir.exists():
-        return lineage
-    for path in links_dir.rglob("lnk_*.json"):
+    backend = get_backend(pkg_root)
+    for link_id in backend.iter_ids("links"):
+        if not link_id.startswith("lnk_"):
+            continue
         try:
-            link = read_json(path)
+            link = backend.load("links", link_id)
         except Exception:
             continue
         if (link.get("type") == "succeeded_from"
@@ -107,11 +108,7 @@ def git_introduced(pkg_root: Path, file_path: str) -> dict[str, Any]:
 def _get_tags_for_sha(pkg_root: Path, sha: str) -> list[str]:
     """Find tag names pointing at the given commit sha."""
     tags: list[str] = []
-    entities_dir = pkg_root / "entities"
-    if not entities_dir.exists():
-        return tags
-    for path in entities_dir.rglob("tag_*.json"):
-        entity = read_json(path)
+    for entity in iter_entities(pkg_root, prefix="tag_"):
         if entity.get("type") == "tag" and str(entity.get("target_sha", "")) == sha:
             tags.append(str(entity.get("name", "")))
     return tags
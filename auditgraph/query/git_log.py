@@ -11,7 +11,7 @@ from typing import Any
 
 from auditgraph.storage.artifacts import read_json
 from auditgraph.storage.hashing import entity_id
-from auditgraph.storage.loaders import load_entity
+from auditgraph.storage.loaders import iter_entities, load_entity
 
 
 def _load_reverse_index(pkg_root: Path) -> dict[str, list[str]]:
@@ -24,11 +24,7 @@ def _load_reverse_index(pkg_root: Path) -> dict[str, list[str]]:
 def _load_tag_index(pkg_root: Path) -> dict[str, list[str]]:
     """Build sha -> [tag_names] mapping from tag entities."""
     tag_map: dict[str, list[str]] = {}
-    entities_dir = pkg_root / "entities"
-    if not entities_dir.exists():
-        return tag_map
-    for path in entities_dir.rglob("tag_*.json"):
-        entity = read_json(path)
+    for entity in iter_entities(pkg_root, prefix="tag_"):
         if entity.get("type") == "tag":
             target_sha = str(entity.get("target_sha", ""))
             tag_name = str(entity.get("name", ""))
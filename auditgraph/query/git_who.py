@@ -12,7 +12,7 @@ from typing import Any
 
 from auditgraph.storage.artifacts import read_json
 from auditgraph.storage.hashing import entity_id
-from auditgraph.storage.loaders import load_entity
+from auditgraph.storage.loaders import iter_entities, load_entity
 
 
 def _load_reverse_index(pkg_root: Path) -> dict[str, list[str]]:
@@ -112,11 +112,7 @@ def git_who(pkg_root: Path, file_path: str) -> dict[str, Any]:
 
 def _find_repo_path(pkg_root: Path) -> str:
     """Find the repository path from a repo entity in the pkg_root."""
-    entities_dir = pkg_root / "entities"
-    if not entities_dir.exists():
-        return ""
-    for path in entities_dir.rglob("repo_*.json"):
-        entity = read_json(path)
+    for entity in iter_entities(pkg_root, prefix="repo_"):
         if entity.get("type") == "repository":
             return str(entity.get("path", ""))
     return ""
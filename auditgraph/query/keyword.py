@@ -1,15 +1,33 @@
 from __future__ import annotations
 
+from itertools import islice
 from pathlib import Path
+from typing import Iterator
 
+from auditgraph.index.bm25 import BM25_B, BM25_K1, query_terms, search_bm25, tokenize, top_k
+from auditgraph.index.chunk_index import search_chunk_index
+from auditgraph.index.postings import union
+from auditgraph.index.term_expansion import FUZZY_MAX_EDITS, MAX_EXPANSIONS
 from auditgraph.query.filters import (
+    FilterPredicate,
     apply_filters,
-    apply_sort,
     parse_predicate,
+    select_page,
+    split_type_predicates,
 )
-from auditgraph.query.ranking import apply_ranking
-from auditgraph.storage.artifacts import read_json
-from auditgraph.storage.loaders import load_chunks, load_entity
+from auditgraph.query.query_language import Fuzzy, Or, evaluate_query, is_structured_query, parse_query
+from auditgraph.query.ranking import apply_ranking, graph_boost, round_score
+from auditgraph.storage.backends import QueryableBackend, get_backend
+from auditgraph.storage.loaders import load_chunks, load_entity, load_type_ids
+
+
+def _type_postings(pkg_root: Path, types: list[str]) -> set[str] | None:
+    """IDs of entities of any of ``types`` from the type index, or None
+    when the store has no type index."""
+    postings = [load_type_ids(pkg_root, entity_type) for entity_type in types]
+    if any(ids is None for ids in postings):
+        return None
+    return set(union([ids for ids in postings if ids is not None]))
 
 
 def keyword_search(
@@ -24,74 +42,120 @@ def keyword_search(
     descending: bool = False,
     limit: int | None = None,
     offset: int = 0,
+    k1: float = BM25_K1,
+    b: float = BM25_B,
+    fuzzy: bool = True,
+    max_edits: int = FUZZY_MAX_EDITS,
+    max_expansions: int = MAX_EXPANSIONS,
+    graph_weight: float = 0.0,
+    graph_measure: str = "pagerank",
 ) -> list[dict[str, object]]:
-    index_path = pkg_root / "indexes" / "bm25" / "index.json"
+    structured = is_structured_query(query)
+    edit_distances: dict[str, int] = {}
+    expansion = {"k1": k1, "b": b, "max_edits": max_edits, "max_expansions": max_expansions}
+    if structured:
+        scores, matched, edit_distances = evaluate_query(pkg_root, parse_query(query), **expansion)
+    else:
+        scores, matched = search_bm25(pkg_root, query_terms(query), k1=k1, b=b)
+        tokens = list(dict.fromkeys(tokenize(query)))
+        if not scores and fuzzy and tokens:
+            # A miss is retried as a typo-tolerant query over the same tokens.
+            fallback = Or(tuple(Fuzzy(token) for token in tokens))
+            scores, matched, edit_distances = evaluate_query(pkg_root, fallback, **expansion)
+
+    # Answer --type and --where type=... from the type index before any
+    # entity JSON is loaded; whatever the index cannot answer is left to
+    # the filter engine below.
+    need_filter = types or where or sort or limit is not None or offset > 0
+    predicates = [parse_predicate(w) for w in where] if where else []
+    type_values, predicates = split_type_predicates(predicates)
+    if types:
+        allowed = _type_postings(pkg_root, types)
+        if allowed is not None:
+            scores = {entity_id: score for entity_id, score in scores.items() if entity_id in allowed}
+            types = None
+    for value in type_values:
+        allowed = _type_postings(pkg_root, [value])
+        if allowed is None:
+            predicates.append(FilterPredicate(field="type", operator="=", value=value, is_numeric=False))
+        else:
+            scores = {entity_id: score for entity_id, score in scores.items() if entity_id in allowed}
+
+    # Without type/where filters or a custom sort, only the first
+    # ``offset + limit`` hits can be returned.
+    k = offset + limit if limit is not None and not (types or predicates or sort) else None
+    rounded = {entity_id: round_score(score, score_rounding) for entity_id, score in scores.items()}
+    # Blend stored centrality in before the top-k cut so a boosted hit
+    # can enter the page.
+    boosts: dict[str, float] = {}
+    centrality = None
+    if graph_weight and rounded:
+        from auditgraph.index.centrality import CentralityScores
+
+        centrality = CentralityScores.open(pkg_root)
+    if centrality is not None:
+        boosts = {
+            entity_id: graph_boost(centrality.score(entity_id, graph_measure), graph_weight, score_rounding)
+            for entity_id in rounded
+        }
+        rounded = {
+            entity_id: round_score(score + boosts[entity_id], score_rounding) for entity_id, score in rounded.items()
+        }
     results = []
-    if index_path.exists():
-        index = read_json(index_path)
-        entries = index.get("entries", {})
-        hits = entries.get(query.lower(), [])
-        for entity_id in hits:
-            results.append(
-                {
-                    "id": entity_id,
-                    "score": 1.0,
-                    "explanation": {
-                        "matched_terms": [query],
-                        "bm25_score": 1.0,
-                        "semantic_score": 0.0,
-                        "graph_boost": 0.0,
-                        "tie_break": [entity_id],
-                    },
-                }
-            )
+    for entity_id, score in top_k(rounded, k):
+        explanation: dict[str, object] = {
+            "matched_terms": matched[entity_id],
+            "bm25_score": scores[entity_id],
+            "semantic_score": 0.0,
+            "graph_boost": boosts.get(entity_id, 0.0),
+            "tie_break": [entity_id],
+        }
+        if entity_id in edit_distances:
+            explanation["edit_distance"] = edit_distances[entity_id]
+        results.append({"id": entity_id, "score": score, "explanation": explanation})
     ranked = apply_ranking(results, score_rounding)
 
     # Apply filter engine to BM25 results
-    need_filter = types or where or sort or limit is not None or offset > 0
     if need_filter and ranked:
-        # Load full entity data for each hit so filters can inspect fields
-        predicates = [parse_predicate(w) for w in where] if where else None
-        enriched: list[dict[str, object]] = []
-        for hit in ranked:
-            entity_id = str(hit["id"])
-            try:
-                entity = load_entity(pkg_root, entity_id)
-            except Exception:
-                continue
-            enriched.append({"_hit": hit, "_entity": entity})
+        # Stream full entity data for each hit so filters can inspect fields
+        hit_map: dict[str, dict[str, object]] = {}
 
-        # Filter by types and predicates on the entity data
-        entity_list = [item["_entity"] for item in enriched]
-        hit_map = {str(item["_entity"]["id"]): item["_hit"] for item in enriched}
+        def hit_entities() -> Iterator[dict[str, object]]:
+            for hit in ranked:
+                entity_id = str(hit["id"])
+                try:
+                    entity = load_entity(pkg_root, entity_id)
+                except Exception:
+                    continue
+                hit_map[str(entity["id"])] = hit
+                yield entity
 
-        filtered = list(apply_filters(entity_list, types=types, predicates=predicates))
+        filtered = apply_filters(hit_entities(), types=types, predicates=predicates or None)
 
-        # Sort if requested
         if sort:
-            filtered = apply_sort(filtered, sort_field=sort, descending=descending)
-
-        # Pagination
-        total = len(filtered)
-        page = filtered[offset:]
-        if limit is not None:
-            page = page[:limit]
+            page, _ = select_page(filtered, sort, descending, limit, offset)
+        else:
+            # Rank order: stop loading entities once the page is full.
+            page = list(islice(filtered, offset, None if limit is None else offset + limit))
 
         # Rebuild ranked results preserving original hit structure
-        ranked = []
-        for entity in page:
-            eid = str(entity["id"])
-            if eid in hit_map:
-                ranked.append(hit_map[eid])
+        ranked = [hit_map[str(entity["id"])] for entity in page if str(entity["id"]) in hit_map]
 
     chunk_results: list[dict[str, object]] = []
     query_token = query.strip().lower()
-    if query_token and not need_filter:
-        chunks = load_chunks(pkg_root)
+    # Chunk hits are only returned with ``enable_semantic``; skip the lookup otherwise.
+    if query_token and enable_semantic and not need_filter and not structured:
+        chunks = search_chunk_index(pkg_root, query)
+        if chunks is None:
+            # No chunk index yet (index stage not run): substring scan.
+            backend = get_backend(pkg_root)
+            if isinstance(backend, QueryableBackend):
+                chunks = backend.search_chunks(query_token)
+            else:
+                chunks = load_chunks(pkg_root)
+            chunks = [chunk for chunk in chunks if query_token in str(chunk.get("text", "")).lower()]
         for chunk in chunks:
             text = str(chunk.get("text", ""))
-            if query_token not in text.lower():
-                continue
             chunk_results.append(
                 {
                     "id": str(chunk.get("chunk_id", "")),
@@ -114,7 +178,6 @@ def keyword_search(
                     },
                 }
             )
-    ranked_chunks = apply_ranking(chunk_results, score_rounding)
     if enable_semantic:
-        return ranked + ranked_chunks
+        return ranked + apply_ranking(chunk_results, score_rounding)
     return ranked
@@ -1,16 +1,23 @@
 """List entities with filtering, sorting, pagination, and aggregation."""
 from __future__ import annotations
 
+from itertools import chain
 from pathlib import Path
+from typing import Iterable
 
+from auditgraph.index.clusters import cluster_members
+from auditgraph.index.facets import FacetTable, aggregate_postings
+from auditgraph.index.postings import intersect
 from auditgraph.query.filters import (
+    FilterPredicate,
     apply_aggregation,
     apply_filters,
-    apply_pagination,
-    apply_sort,
     parse_predicate,
+    select_page,
 )
-from auditgraph.storage.loaders import load_entities, load_entities_by_type
+from auditgraph.query.planner import plan_entity_filters
+from auditgraph.storage.backends import QueryableBackend, get_backend
+from auditgraph.storage.loaders import iter_entities, load_entities_by_type, load_entity, load_type_ids
 
 
 def list_entities(
@@ -24,30 +31,166 @@ def list_entities(
     offset: int = 0,
     count_only: bool = False,
     group_by: str | None = None,
+    component: str | int | None = None,
+    community: str | int | None = None,
 ) -> dict[str, object]:
-    """Query entities with optional type filter, predicates, sort, and pagination."""
-    # Load entities
-    if types:
-        entities: list[dict[str, object]] = []
-        for t in types:
-            entities.extend(load_entities_by_type(pkg_root, t))
+    """Query entities with optional type filter, predicates, sort, and pagination.
+
+    ``component`` / ``community`` keep only entities in that cluster of
+    the link graph, given by number or by an entity ID inside it.
+    """
+    predicates = [parse_predicate(w) for w in where] if where else None
+    members = _cluster_filter(pkg_root, component=component, community=community)
+    backend = get_backend(pkg_root)
+    if isinstance(backend, QueryableBackend):
+        return _list_entities_pushdown(
+            backend,
+            types=types,
+            predicates=predicates,
+            sort=sort,
+            descending=descending,
+            limit=limit,
+            offset=offset,
+            count_only=count_only,
+            group_by=group_by,
+            members=members,
+        )
+
+    # Aggregations over whole types come from the facet tables
+    if (count_only or group_by) and not predicates and members is None:
+        facets = FacetTable.open(pkg_root)
+        agg = facets.aggregate(types=types, group_by=group_by) if facets is not None else None
+        if agg is not None:
+            return agg
+
+    # Stream entities: only the candidates field indexes allow, else a scan
+    plan = plan_entity_filters(pkg_root, types=types, predicates=predicates)
+    ids = plan.ids
+    if members is not None:
+        # Cluster members may include non-entity nodes; keep stored entities.
+        ids = intersect([ids, members]) if ids is not None else members
+        ids = [entity_id for entity_id in ids if backend.exists("entities", entity_id)]
+    # Members alone are an exact match set, as is an exact plan.
+    exact = plan.exact if plan.ids is not None else not (predicates or types)
+    if ids is not None and exact and (count_only or group_by):
+        agg = _aggregate_plan(pkg_root, ids, types=types, group_by=group_by)
+        if agg is not None:
+            return agg
+    entities: Iterable[dict[str, object]]
+    if ids is not None:
+        candidates: Iterable[dict[str, object]] = (load_entity(pkg_root, entity_id) for entity_id in ids)
+        if types:
+            # Keep the scan's order: grouped by --type, then by ID.
+            rank = {entity_type: position for position, entity_type in reversed(list(enumerate(types)))}
+            candidates = sorted(candidates, key=lambda entity: rank.get(str(entity.get("type", "")), len(types)))
+        entities = apply_filters(candidates, types=types)
+    elif types:
+        entities = chain.from_iterable(load_entities_by_type(pkg_root, t) for t in types)
     else:
-        entities = load_entities(pkg_root)
+        entities = iter_entities(pkg_root)
 
     # Apply predicate filters
-    predicates = [parse_predicate(w) for w in where] if where else None
-    filtered = list(apply_filters(entities, predicates=predicates))
+    filtered = apply_filters(entities, predicates=predicates)
 
     # Aggregation short-circuit
     agg = apply_aggregation(filtered, count_only=count_only, group_by=group_by)
     if agg is not None:
         return agg
 
-    # Sort
-    sorted_entities = apply_sort(filtered, sort_field=sort, descending=descending)
+    # Sort and paginate (a bounded heap when --limit is set)
+    results, total_count = select_page(filtered, sort, descending, limit, offset)
+    truncated = limit is not None and total_count > (offset + limit)
+
+    return {
+        "results": results,
+        "total_count": total_count,
+        "limit": limit,
+        "offset": offset,
+        "truncated": truncated,
+    }
+
 
-    # Pagination
-    results, total_count = apply_pagination(sorted_entities, limit=limit, offset=offset)
+def _cluster_filter(
+    pkg_root: Path,
+    *,
+    component: str | int | None,
+    community: str | int | None,
+) -> list[str] | None:
+    """Sorted IDs in the requested component and/or community, or None
+    when neither is given."""
+    selected = [
+        cluster_members(pkg_root, kind, value)
+        for kind, value in (("component", component), ("community", community))
+        if value is not None
+    ]
+    if not selected:
+        return None
+    return intersect(selected) if len(selected) > 1 else selected[0]
+
+
+def _aggregate_plan(
+    pkg_root: Path,
+    ids: list[str],
+    *,
+    types: list[str] | None,
+    group_by: str | None,
+) -> dict[str, object] | None:
+    """Count an exact plan's IDs from postings, or None when ``group_by``
+    has no facet postings and entities must be loaded."""
+    type_ids = [load_type_ids(pkg_root, entity_type) or [] for entity_type in types] if types else None
+    if group_by:
+        return aggregate_postings(pkg_root, ids, group_by=group_by, type_ids=type_ids)
+    if type_ids is None:
+        return {"count": len(ids)}
+    return {"count": sum(len(intersect([ids, members])) for members in type_ids)}
+
+
+def _list_entities_pushdown(
+    backend: QueryableBackend,
+    *,
+    types: list[str] | None,
+    predicates: list[FilterPredicate] | None,
+    sort: str | None,
+    descending: bool,
+    limit: int | None,
+    offset: int,
+    count_only: bool,
+    group_by: str | None,
+    members: list[str] | None = None,
+) -> dict[str, object]:
+    """Answer ``list_entities`` with filters evaluated by the backend.
+
+    The default ID order paginates in the backend; an explicit ``sort``
+    field sorts the filtered rows with ``select_page`` so ordering rules
+    (numeric coercion, missing-last) stay in one place. A cluster filter
+    (``members``) is applied to the backend's rows before paging.
+    """
+    if members is not None:
+        allowed = set(members)
+        rows, _ = backend.select_entities(types=types, predicates=predicates)
+        filtered = [row for row in rows if str(row.get("id", "")) in allowed]
+        agg = apply_aggregation(filtered, count_only=count_only, group_by=group_by)
+        if agg is not None:
+            return agg
+        results, total_count = select_page(filtered, sort, descending, limit, offset)
+        return {
+            "results": results,
+            "total_count": total_count,
+            "limit": limit,
+            "offset": offset,
+            "truncated": limit is not None and total_count > (offset + limit),
+        }
+
+    if count_only or group_by:
+        return backend.aggregate_entities(types=types, predicates=predicates, group_by=group_by)
+
+    if sort is None:
+        results, total_count = backend.select_entities(
+            types=types, predicates=predicates, limit=limit, offset=offset
+        )
+    else:
+        filtered, _ = backend.select_entities(types=types, predicates=predicates)
+        results, total_count = select_page(filtered, sort, descending, limit, offset)
     truncated = limit is not None and total_count > (offset + limit)
 
     return {
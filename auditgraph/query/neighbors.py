@@ -1,27 +1,89 @@
+"""Breadth-first neighbors of an entity, with traversal budgets.
+
+``iter_neighbors`` walks the graph level by level and yields each edge
+as soon as it is found, so callers can stream results (``auditgraph
+neighbors --ndjson``). ``neighbors`` collects the same walk into one
+payload. Outgoing edges come from the forward adjacency and incoming
+edges from the reverse index (the CSR ``rev_*`` arrays, or the storage
+backend's indexed link queries).
+
+An edge is reported once, however many times the walk reaches it: from
+both endpoints with ``direction="both"``, or from two frontier nodes.
+``max_fanout`` caps the edges followed from one node per hop, and
+``max_edges`` / ``max_nodes`` cap the whole walk. Hitting any cap sets
+``truncated``. ``component`` / ``community`` keep the walk inside one
+cluster of the link graph (``index.clusters``), given by number or by
+an entity ID inside it.
+"""
 from __future__ import annotations
 
 from pathlib import Path
+from typing import Iterator
 
-from auditgraph.link.adjacency import load_adjacency
+from auditgraph.index.clusters import cluster_members
+from auditgraph.link.adjacency import open_adjacency
+from auditgraph.storage.backends import QueryableBackend, get_backend
 
+DIRECTIONS = ("out", "in", "both")
 
-def neighbors(
+
+def iter_neighbors(
     pkg_root: Path,
     entity_id: str,
     depth: int = 1,
     edge_types: list[str] | None = None,
     min_confidence: float | None = None,
-) -> dict[str, object]:
-    adjacency = load_adjacency(pkg_root)
+    direction: str = "out",
+    *,
+    max_fanout: int | None = None,
+    max_edges: int | None = None,
+    max_nodes: int | None = None,
+    component: str | int | None = None,
+    community: str | int | None = None,
+) -> Iterator[dict[str, object]]:
+    """Yield ``{"center_id": ...}``, then ``{"depth": n, "edge": {...}}``
+    per edge in traversal order, then ``{"truncated": bool, "edges": n,
+    "nodes": n}``. Every edge carries both ``from_id`` and ``to_id``,
+    whichever direction it was walked in."""
+    if direction not in DIRECTIONS:
+        raise ValueError(f"direction must be one of {DIRECTIONS}, got {direction!r}")
+    backend = get_backend(pkg_root)
+    pushdown = isinstance(backend, QueryableBackend)
+    view = None if pushdown else open_adjacency(pkg_root)
     edge_type_set = set(edge_types) if edge_types else None
+    allowed: set[str] | None = None
+    for kind, value in (("component", component), ("community", community)):
+        if value is not None:
+            members = set(cluster_members(pkg_root, kind, value))
+            allowed = members if allowed is None else allowed & members
     seen = {entity_id}
+    emitted: set[tuple[str, str, str, str]] = set()
     frontier = [entity_id]
-    edges: list[dict[str, object]] = []
+    truncated = exhausted = False
+    yield {"center_id": entity_id}
 
-    for _ in range(depth):
+    for level in range(1, depth + 1):
+        if not frontier or exhausted:
+            break
+        outgoing: dict[str, list[dict[str, object]]] = {}
+        incoming: dict[str, list[dict[str, object]]] = {}
+        if pushdown:
+            # One indexed query per BFS level instead of reading the adjacency index.
+            if direction != "in":
+                outgoing = backend.outgoing_edges(frontier, edge_types=edge_types, min_confidence=min_confidence)
+            if direction != "out":
+                incoming = backend.incoming_edges(frontier, edge_types=edge_types, min_confidence=min_confidence)
         next_frontier: list[str] = []
         for node_id in frontier:
-            for edge in adjacency.get(node_id, []):
+            candidates: list[tuple[dict[str, object], str]] = []
+            if direction != "in":
+                out_edges = outgoing.get(node_id, []) if pushdown else view.out_edges(node_id)
+                candidates.extend((edge, "to_id") for edge in out_edges)
+            if direction != "out":
+                in_edges = incoming.get(node_id, []) if pushdown else view.in_edges(node_id)
+                candidates.extend((edge, "from_id") for edge in in_edges)
+            followed = 0
+            for edge, endpoint in candidates:
                 # Apply edge-type filter
                 if edge_type_set and edge.get("type") not in edge_type_set:
                     continue
@@ -30,11 +92,68 @@ def neighbors(
                     conf = edge.get("confidence", 1.0)
                     if isinstance(conf, (int, float)) and conf < min_confidence:
                         continue
-                edges.append(edge)
-                target = edge.get("to_id")
-                if isinstance(target, str) and target not in seen:
+                target = str(edge.get(endpoint, ""))
+                if allowed is not None and target not in allowed:
+                    continue
+                source, sink = (node_id, target) if endpoint == "to_id" else (target, node_id)
+                key = (source, sink, str(edge.get("type", "")), str(edge.get("rule_id", "")))
+                if key in emitted:
+                    continue
+                if max_fanout is not None and followed >= max_fanout:
+                    truncated = True
+                    break
+                if max_edges is not None and len(emitted) >= max_edges:
+                    truncated = exhausted = True
+                    break
+                is_new = target not in seen
+                if is_new and max_nodes is not None and len(seen) - 1 >= max_nodes:
+                    truncated = True
+                    continue
+                followed += 1
+                emitted.add(key)
+                if is_new:
                     seen.add(target)
                     next_frontier.append(target)
+                # Adjacency entries only hold the far end of the edge.
+                yield {"depth": level, "edge": {**edge, "from_id": source, "to_id": sink}}
+            if exhausted:
+                break
         frontier = next_frontier
 
-    return {"center_id": entity_id, "neighbors": edges}
+    yield {"truncated": truncated, "edges": len(emitted), "nodes": len(seen) - 1}
+
+
+def neighbors(
+    pkg_root: Path,
+    entity_id: str,
+    depth: int = 1,
+    edge_types: list[str] | None = None,
+    min_confidence: float | None = None,
+    direction: str = "out",
+    *,
+    max_fanout: int | None = None,
+    max_edges: int | None = None,
+    max_nodes: int | None = None,
+    component: str | int | None = None,
+    community: str | int | None = None,
+) -> dict[str, object]:
+    edges: list[dict[str, object]] = []
+    truncated = False
+    for record in iter_neighbors(
+        pkg_root,
+        entity_id,
+        depth,
+        edge_types,
+        min_confidence,
+        direction,
+        max_fanout=max_fanout,
+        max_edges=max_edges,
+        max_nodes=max_nodes,
+        component=component,
+        community=community,
+    ):
+        if "edge" in record:
+            edges.append(record["edge"])  # type: ignore[arg-type]
+        elif "truncated" in record:
+            truncated = bool(record["truncated"])
+    return {"center_id": entity_id, "neighbors": edges, "truncated": truncated}
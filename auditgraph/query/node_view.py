@@ -17,7 +17,7 @@ from pathlib import Path
 from typing import Any, Callable
 
 from auditgraph.storage.artifacts import read_json
-from auditgraph.storage.loaders import load_entity
+from auditgraph.storage.loaders import load_chunk, load_entity
 
 
 def _resolve_document(pkg_root: Path, entity_id: str) -> dict[str, Any] | None:
@@ -39,29 +39,27 @@ def _resolve_document(pkg_root: Path, entity_id: str) -> dict[str, Any] | None:
 
 
 def _resolve_chunk(pkg_root: Path, entity_id: str) -> dict[str, Any] | None:
-    chunks_dir = pkg_root / "chunks"
-    if not chunks_dir.exists():
+    try:
+        payload = load_chunk(pkg_root, entity_id)
+    except FileNotFoundError:
+        return None
+    if not isinstance(payload, dict):
         return None
-    for path in chunks_dir.rglob(f"{entity_id}.json"):
-        payload = read_json(path)
-        if not isinstance(payload, dict):
-            continue
-        return {
-            "id": payload.get("chunk_id"),
-            "type": "chunk",
-            "name": payload.get("chunk_id"),
-            "text": payload.get("text"),
-            "citation": {
-                "source_path": payload.get("source_path"),
-                "source_hash": payload.get("source_hash"),
-                "page_start": payload.get("page_start"),
-                "page_end": payload.get("page_end"),
-                "paragraph_index_start": payload.get("paragraph_index_start"),
-                "paragraph_index_end": payload.get("paragraph_index_end"),
-            },
-            "refs": [],
-        }
-    return None
+    return {
+        "id": payload.get("chunk_id"),
+        "type": "chunk",
+        "name": payload.get("chunk_id"),
+        "text": payload.get("text"),
+        "citation": {
+            "source_path": payload.get("source_path"),
+            "source_hash": payload.get("source_hash"),
+            "page_start": payload.get("page_start"),
+            "page_end": payload.get("page_end"),
+            "paragraph_index_start": payload.get("paragraph_index_start"),
+            "paragraph_index_end": payload.get("paragraph_index_end"),
+        },
+        "refs": [],
+    }
 
 
 def _resolve_entity(pkg_root: Path, entity_id: str) -> dict[str, Any] | None:
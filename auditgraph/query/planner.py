@@ -0,0 +1,67 @@
+"""Pick the indexes that narrow an entity filter before anything loads.
+
+``plan_entity_filters`` looks up each ``--where`` predicate that has a
+field index (``index.field_index``), and the ``--type`` values in the
+per-type index. The candidate lists are ranked by size and intersected
+from the most selective one, so the galloping intersection (``index.
+postings``) walks the shortest list. Predicates without an index
+(``!=``, ``~``, unindexed fields) are left to ``apply_filters`` on the
+loaded candidates. With no usable field index the plan is a scan.
+When every filter was answered exactly the plan is marked ``exact``
+and counts need no entity at all.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from auditgraph.index.field_index import FieldIndex
+from auditgraph.index.postings import intersect, union
+from auditgraph.query.filters import FilterPredicate
+from auditgraph.storage.loaders import load_type_ids
+
+
+@dataclass(frozen=True)
+class EntityPlan:
+    """Candidate entity IDs (sorted), or None to scan every entity.
+
+    ``indexes`` names the lookups used, most selective first, as
+    ``<field><op><value>`` or ``type``. ``exact`` is set when ``ids``
+    are precisely the entities matching every filter.
+    """
+
+    ids: list[str] | None
+    indexes: tuple[str, ...] = field(default_factory=tuple)
+    exact: bool = False
+
+
+def plan_entity_filters(
+    pkg_root: Path,
+    *,
+    types: list[str] | None = None,
+    predicates: list[FilterPredicate] | None = None,
+) -> EntityPlan:
+    lookups: list[tuple[str, list[str]]] = []
+    exact = True
+    for predicate in predicates or []:
+        index = FieldIndex.open(pkg_root, predicate.field)
+        ids = index.lookup(predicate) if index is not None else None
+        if ids is None:
+            exact = False
+        else:
+            lookups.append((f"{predicate.field}{predicate.operator}{predicate.value}", ids))
+            exact = exact and index.exact(predicate)  # type: ignore[union-attr]
+    if not lookups:
+        return EntityPlan(None)
+    if types:
+        type_lists = [load_type_ids(pkg_root, entity_type) for entity_type in types]
+        if all(ids is not None for ids in type_lists):
+            lookups.append(("type", union([ids for ids in type_lists if ids is not None])))
+        else:
+            exact = False
+    lookups.sort(key=lambda item: len(item[1]))
+    return EntityPlan(
+        intersect([ids for _, ids in lookups]),
+        tuple(label for label, _ in lookups),
+        exact,
+    )
@@ -0,0 +1,388 @@
+"""Boolean keyword query language evaluated over sorted posting lists.
+
+Grammar (operators are upper-case; adjacent clauses are OR'ed, as plain
+multi-term queries are)::
+
+    query   := and ("OR" and)*
+    and     := clauses ("AND" clauses)*
+    clauses := unary+
+    unary   := ("NOT" | "-") unary | atom
+    atom    := "(" query ")" | [field ":"] (word | "quoted phrase")
+    word    := term | term "*" | pattern-with-*-or-? | term "~" [digit]
+    field   := name | alias | aliases | type
+
+Words are split with ``index.bm25.tokenize``; a word that splits into
+several tokens (``auth_token``) is matched as a phrase. ``name:`` and
+``alias:`` restrict a term to that BM25 field; ``type:`` matches the
+entity type exactly through the per-type ID index. ``auth*`` and
+``a?th*`` expand to the indexed terms matching the pattern; ``athu~``
+(or ``athu~1``) expands to the terms within that many edits, by default
+``term_expansion.auto_max_edits``. Negated clauses are
+subtracted from the positive clauses beside them, so ``redis -cache`` and
+``redis AND NOT cache`` both mean "redis but not cache"; a query made only
+of negations is rejected.
+
+Every node evaluates to a sorted list of entity IDs, combined with the
+galloping set operations in ``index.postings``. Phrases intersect their
+tokens' postings and load only the surviving candidates to check token
+order. Hits are scored with BM25 over the query's positive terms and
+expansions; fuzzy expansions are discounted by their edit distance.
+"""
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Union
+
+from auditgraph.errors import QuerySyntaxError
+from auditgraph.index.bm25 import BM25_B, BM25_K1, Bm25Reader, tokenize
+from auditgraph.index.postings import difference, intersect, union
+from auditgraph.index.term_expansion import (
+    FUZZY_MAX_EDITS,
+    MAX_EXPANSIONS,
+    auto_max_edits,
+    expand_fuzzy,
+    expand_wildcard,
+    has_wildcard,
+    literal_prefix,
+)
+
+FIELDS: dict[str, str] = {"name": "name", "alias": "aliases", "aliases": "aliases", "type": "type"}
+OPERATORS = frozenset({"AND", "OR", "NOT"})
+
+_LEXER = re.compile(
+    r"""\s*(?:
+        (?P<lparen>\() | (?P<rparen>\)) |
+        (?P<minus>-)(?=[^\s\-)]) |
+        (?P<field>(?:%s)):(?=[^\s)]) |
+        "(?P<phrase>[^"]*)" |
+        (?P<word>[^\s()"]+)
+    )"""
+    % "|".join(sorted(FIELDS, key=len, reverse=True)),
+    re.VERBOSE,
+)
+_SYNTAX_HINT = re.compile(
+    r'["()]|(?:^|\s)-\S|\b(?:AND|OR|NOT)\b|\b(?:%s):\S|\S\*|\S~\d?(?=\s|\)|$)' % "|".join(FIELDS)
+)
+_FUZZY = re.compile(r"^(?P<term>.+)~(?P<edits>\d)?$")
+
+
+@dataclass(frozen=True)
+class Term:
+    text: str
+    field: str | None = None
+
+
+@dataclass(frozen=True)
+class Phrase:
+    tokens: tuple[str, ...]
+    text: str
+    field: str | None = None
+
+
+@dataclass(frozen=True)
+class Wildcard:
+    pattern: str
+    field: str | None = None
+
+
+@dataclass(frozen=True)
+class Fuzzy:
+    text: str
+    field: str | None = None
+    max_edits: int | None = None
+
+
+@dataclass(frozen=True)
+class TypeMatch:
+    value: str
+
+
+@dataclass(frozen=True)
+class And:
+    children: tuple[Node, ...]
+
+
+@dataclass(frozen=True)
+class Or:
+    children: tuple[Node, ...]
+
+
+@dataclass(frozen=True)
+class Not:
+    child: Node
+
+
+Node = Union[Term, Phrase, Wildcard, Fuzzy, TypeMatch, And, Or, Not]
+
+
+def is_structured_query(query: str) -> bool:
+    """True when ``query`` uses any query-language syntax; plain queries
+    keep the bag-of-terms BM25 path."""
+    return bool(_SYNTAX_HINT.search(query))
+
+
+def _lex(query: str) -> list[tuple[str, str]]:
+    tokens: list[tuple[str, str]] = []
+    position = 0
+    query = query.rstrip()
+    while position < len(query):
+        match = _LEXER.match(query, position)
+        if match is None or match.end() == position:
+            raise QuerySyntaxError(f"Unterminated quote in query: {query!r}")
+        kind = match.lastgroup or "word"
+        value = match.group(kind)
+        if kind == "word" and value in OPERATORS:
+            kind = value
+        tokens.append((kind, value))
+        position = match.end()
+    return tokens
+
+
+class _Parser:
+    def __init__(self, query: str) -> None:
+        self.query = query
+        self.tokens = _lex(query)
+        self.position = 0
+
+    def peek(self) -> str | None:
+        return self.tokens[self.position][0] if self.position < len(self.tokens) else None
+
+    def take(self) -> tuple[str, str]:
+        token = self.tokens[self.position]
+        self.position += 1
+        return token
+
+    def error(self, message: str) -> QuerySyntaxError:
+        return QuerySyntaxError(f"{message} in query: {self.query!r}")
+
+    def parse(self) -> Node:
+        node = self.parse_or()
+        if self.peek() is not None:
+            raise self.error(f"Unexpected {self.tokens[self.position][1]!r}")
+        return node
+
+    def parse_or(self) -> Node:
+        children = [self.parse_and()]
+        while self.peek() == "OR":
+            self.take()
+            children.append(self.parse_and())
+        return children[0] if len(children) == 1 else Or(tuple(children))
+
+    def parse_and(self) -> Node:
+        children = [self.parse_clauses()]
+        while self.peek() == "AND":
+            self.take()
+            children.append(self.parse_clauses(negated_ok=True))
+        return children[0] if len(children) == 1 else And(tuple(children))
+
+    def parse_clauses(self, negated_ok: bool = False) -> Node:
+        positives: list[Node] = []
+        negatives: list[Node] = []
+        while self.peek() not in (None, "AND", "OR", "rparen"):
+            clause = self.parse_unary()
+            (negatives if isinstance(clause, Not) else positives).append(clause)
+        if not positives and not negatives:
+            raise self.error("Expected a term")
+        if not positives:
+            # ``a AND NOT b``: the AND supplies the positive side.
+            if not negated_ok:
+                raise self.error("NOT needs a positive clause to subtract from")
+            return negatives[0] if len(negatives) == 1 else Not(Or(tuple(negative.child for negative in negatives)))
+        core = positives[0] if len(positives) == 1 else Or(tuple(positives))
+        return And((core, *negatives)) if negatives else core
+
+    def parse_unary(self) -> Node:
+        if self.peek() in ("NOT", "minus"):
+            self.take()
+            if self.peek() in (None, "AND", "OR", "rparen"):
+                raise self.error("NOT without a clause")
+            return Not(self.parse_unary())
+        return self.parse_atom()
+
+    def parse_atom(self) -> Node:
+        kind, value = self.take()
+        if kind == "lparen":
+            node = self.parse_or()
+            if self.peek() != "rparen":
+                raise self.error("Missing ')'")
+            self.take()
+            return node
+        if kind == "field":
+            if self.peek() not in ("word", "phrase"):
+                raise self.error(f"Expected a term after '{value}:'")
+            _, text = self.take()
+            if FIELDS[value] == "type":
+                return TypeMatch(text)
+            return self._text_node(text, FIELDS[value], quoted=self.tokens[self.position - 1][0] == "phrase")
+        if kind in ("word", "phrase"):
+            return self._text_node(value, None, quoted=kind == "phrase")
+        raise self.error(f"Unexpected {value!r}")
+
+    def _text_node(self, text: str, field: str | None, *, quoted: bool = False) -> Node:
+        fuzzy = None if quoted else _FUZZY.match(text)
+        if fuzzy or (not quoted and has_wildcard(text)):
+            term = fuzzy.group("term") if fuzzy else text
+            tokens = tokenize(term)
+            if len(tokens) != 1:
+                raise self.error(f"'*', '?' and '~' apply to single terms, not {text!r}")
+            if fuzzy:
+                edits = fuzzy.group("edits")
+                return Fuzzy(tokens[0], field, int(edits) if edits is not None else None)
+            if not literal_prefix(tokens[0]):
+                raise self.error(f"Wildcard {text!r} needs a leading literal character")
+            return Wildcard(tokens[0], field)
+        tokens = tuple(tokenize(text))
+        if not tokens:
+            raise self.error(f"Nothing searchable in {text!r}")
+        if len(tokens) == 1:
+            return Term(tokens[0], field)
+        return Phrase(tokens, text.lower().strip(), field)
+
+
+def parse_query(query: str) -> Node:
+    """Parse ``query``; raises ``QuerySyntaxError`` when it is malformed."""
+    return _Parser(query).parse()
+
+
+def positive_terms(node: Node) -> list[str]:
+    """Distinct BM25 terms of the clauses that are not negated, in order."""
+    terms: list[str] = []
+    if isinstance(node, Term):
+        terms.append(node.text)
+    elif isinstance(node, Phrase):
+        terms.extend((*node.tokens, node.text))
+    elif isinstance(node, (And, Or)):
+        for child in node.children:
+            terms.extend(positive_terms(child))
+    return list(dict.fromkeys(terms))
+
+
+def _contains_run(tokens: list[str], run: tuple[str, ...]) -> bool:
+    width = len(run)
+    return any(tuple(tokens[start : start + width]) == run for start in range(len(tokens) - width + 1))
+
+
+class _Evaluator:
+    def __init__(
+        self,
+        pkg_root: Path,
+        reader: Bm25Reader | None,
+        *,
+        max_edits: int = FUZZY_MAX_EDITS,
+        max_expansions: int = MAX_EXPANSIONS,
+    ) -> None:
+        self.pkg_root = pkg_root
+        self.reader = reader
+        self.max_edits = max_edits
+        self.max_expansions = max_expansions
+        # Expanded terms of positive wildcard/fuzzy clauses → edit distance.
+        self.expansions: dict[str, int] = {}
+        self._backend = None
+
+    def ids(self, node: Node, negated: bool = False) -> list[str]:
+        if isinstance(node, Term):
+            return self.reader.ids(node.text, node.field) if self.reader else []
+        if isinstance(node, Phrase):
+            return self.phrase_ids(node)
+        if isinstance(node, (Wildcard, Fuzzy)):
+            return self.expansion_ids(node, negated)
+        if isinstance(node, TypeMatch):
+            return self.type_ids(node.value)
+        if isinstance(node, Or):
+            return union([self.ids(child, negated) for child in node.children])
+        if isinstance(node, And):
+            positives = [child for child in node.children if not isinstance(child, Not)]
+            result = intersect([self.ids(child, negated) for child in positives])
+            for child in node.children:
+                if isinstance(child, Not) and result:
+                    result = difference(result, self.ids(child.child, not negated))
+            return result
+        raise QuerySyntaxError(f"NOT needs a positive clause to subtract from: {node!r}")
+
+    def expansion_ids(self, node: Wildcard | Fuzzy, negated: bool) -> list[str]:
+        if self.reader is None:
+            return []
+        if isinstance(node, Wildcard):
+            expanded = [(term, 0) for term in expand_wildcard(self.reader, node.pattern, self.max_expansions)]
+        else:
+            edits = node.max_edits if node.max_edits is not None else auto_max_edits(node.text, self.max_edits)
+            expanded = expand_fuzzy(self.reader, node.text, edits, self.max_expansions)
+        if not negated:
+            for term, distance in expanded:
+                self.expansions[term] = min(distance, self.expansions.get(term, distance))
+        return union([self.reader.ids(term, node.field) for term, _ in expanded])
+
+    def phrase_ids(self, node: Phrase) -> list[str]:
+        if self.reader is None:
+            return []
+        exact = self.reader.ids(node.text, node.field)
+        candidates = difference(intersect([self.reader.ids(token, node.field) for token in node.tokens]), exact)
+        verified = [entity_id for entity_id in candidates if self._has_phrase(entity_id, node)]
+        return union([exact, verified])
+
+    def _has_phrase(self, entity_id: str, node: Phrase) -> bool:
+        from auditgraph.storage.backends import get_backend
+
+        if self._backend is None:
+            self._backend = get_backend(self.pkg_root)
+        try:
+            entity = self._backend.load("entities", entity_id)
+        except Exception:
+            return False
+        values: list[str] = []
+        if node.field in (None, "name"):
+            values.append(str(entity.get("name", "")))
+        if node.field in (None, "aliases"):
+            values.extend(str(alias) for alias in entity.get("aliases", []) or [])
+        return any(_contains_run(tokenize(value), node.tokens) for value in values)
+
+    def type_ids(self, entity_type: str) -> list[str]:
+        from auditgraph.storage.loaders import load_type_ids
+
+        return load_type_ids(self.pkg_root, entity_type) or []
+
+
+def evaluate_query(
+    pkg_root: Path,
+    node: Node,
+    *,
+    k1: float = BM25_K1,
+    b: float = BM25_B,
+    max_edits: int = FUZZY_MAX_EDITS,
+    max_expansions: int = MAX_EXPANSIONS,
+) -> tuple[dict[str, float], dict[str, list[str]], dict[str, int]]:
+    """Entities matching ``node`` as ``(scores, matched_terms,
+    edit_distances)``.
+
+    Scores are BM25 over the query's positive terms and expansions, each
+    fuzzy expansion weighted by ``1 - distance / len(term)``. Hits matched
+    only by ``type:`` score 0.0 with no matched terms. ``edit_distances``
+    holds, for hits matched through a wildcard or fuzzy clause, the
+    smallest edit distance among their expanded terms.
+    """
+    reader = Bm25Reader.open(pkg_root)
+    evaluator = _Evaluator(pkg_root, reader, max_edits=max_edits, max_expansions=max_expansions)
+    hits = evaluator.ids(node)
+    scores: dict[str, float] = {}
+    matched: dict[str, list[str]] = {}
+    if reader is not None and hits:
+        literal = positive_terms(node)
+        terms = list(dict.fromkeys([*literal, *evaluator.expansions]))
+        weights = {
+            term: 1.0 - distance / max(len(term), 1)
+            for term, distance in evaluator.expansions.items()
+            if term not in literal
+        }
+        scores, matched = reader.score(terms, k1=k1, b=b, weights=weights)
+    distances: dict[str, int] = {}
+    for entity_id in hits:
+        expanded = [evaluator.expansions[term] for term in matched.get(entity_id, []) if term in evaluator.expansions]
+        if expanded:
+            distances[entity_id] = min(expanded)
+    return (
+        {entity_id: scores.get(entity_id, 0.0) for entity_id in hits},
+        {entity_id: matched.get(entity_id, []) for entity_id in hits},
+        distances,
+    )
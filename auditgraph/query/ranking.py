@@ -17,6 +17,11 @@ def _tie_break_key(item: dict[str, object]) -> tuple:
     return (str(item.get("id", "")),)
 
 
+def graph_boost(centrality: float, weight: float, rounding: float) -> float:
+    """Score added for a hit with graph ``centrality`` (``w_graph``)."""
+    return round_score(weight * centrality, rounding)
+
+
 def apply_ranking(results: Iterable[dict[str, object]], rounding: float) -> list[dict[str, object]]:
     ranked = []
     for item in results:
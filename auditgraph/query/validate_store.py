@@ -20,7 +20,7 @@ from pathlib import Path
 from typing import Any
 
 from auditgraph.config import Config
-from auditgraph.query._shard_scanner import scan_shards_for_misses
+from auditgraph.query._shard_scanner import count_shards, scan_shards_for_misses
 from auditgraph.utils.redaction import redaction_policy_for_config
 
 
@@ -43,17 +43,7 @@ def _scan_one_profile(
     started_ns = time.monotonic_ns()
     profile_root = pkg_root / "profiles" / profile
     misses = scan_shards_for_misses(profile_root, detectors)
-    # Count scanned shards by walking canonical dirs directly.
-    from auditgraph.query._shard_scanner import CANONICAL_SHARD_DIRS
-
-    scanned_shards = 0
-    if profile_root.exists():
-        for shard_dir_name in CANONICAL_SHARD_DIRS:
-            shard_dir = profile_root / shard_dir_name
-            if shard_dir.exists():
-                scanned_shards += sum(
-                    1 for _ in shard_dir.rglob("*.json") if _.is_file()
-                )
+    scanned_shards = count_shards(profile_root)
     elapsed_ms = int((time.monotonic_ns() - started_ns) / 1_000_000)
     return {
         "profile": profile,
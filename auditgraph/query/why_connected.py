@@ -1,13 +1,324 @@
+"""Explain how two nodes are connected: the k shortest paths between them.
+
+Paths are found on node ordinals, either the memory-mapped CSR index
+(``index.csr_adjacency``) or, when it is missing or stale, a compact
+graph built once from adjacency.json. Each shortest path comes from a
+bidirectional breadth-first search that always grows the smaller
+frontier. Further paths follow Yen's algorithm: every node of the
+previous path is tried as a spur, with the root path's nodes and the
+edges earlier paths left it by removed, and candidates are ranked by
+hop count, then by summed ``1 - confidence``, then by node IDs.
+
+``max_depth`` bounds the hops of a path and ``max_expansions`` the nodes
+expanded across all searches; when the budget runs out the paths found
+so far are returned with ``truncated`` set. Each edge of a returned
+path carries its ``rule_id`` and the ``evidence`` of its link record.
+"""
 from __future__ import annotations
 
+import heapq
 from pathlib import Path
+from typing import Any, Iterable, Protocol
+
+from auditgraph.storage.hashing import sha256_text
+
+DIRECTIONS = ("out", "in", "both")
+DEFAULT_MAX_DEPTH = 4
+DEFAULT_PATHS = 3
+DEFAULT_MAX_EXPANSIONS = 100_000
+
+# Edge kinds a search may follow from a node, per direction: "out" walks
+# an edge from its source to its target, "in" from its target back to
+# its source. The search from the target end follows the opposite kinds.
+_FORWARD = {"out": ("out",), "in": ("in",), "both": ("out", "in")}
+_BACKWARD = {"out": ("in",), "in": ("out",), "both": ("in", "out")}
+
+
+class _Graph(Protocol):
+    def ordinal(self, node_id: str) -> int | None:
+        ...
+
+    def node_id(self, ordinal: int) -> str:
+        ...
+
+    def out_adjacent(self, ordinal: int) -> list[tuple[int, int]]:
+        ...
+
+    def in_adjacent(self, ordinal: int) -> list[tuple[int, int]]:
+        ...
+
+    def edge_fields(self, edge_index: int) -> tuple[str, Any, str]:
+        ...
+
+
+class CompactGraph:
+    """Integer-ordinal forward and reverse adjacency built from an
+    adjacency.json mapping, with the ``CsrAdjacency`` traversal API."""
+
+    def __init__(self, adjacency: dict[str, list[dict[str, Any]]]) -> None:
+        node_set = set(adjacency)
+        for edges in adjacency.values():
+            node_set.update(str(edge.get("to_id", "")) for edge in edges)
+        self._nodes = sorted(node_set)
+        self._ordinals = {node: index for index, node in enumerate(self._nodes)}
+        self._out: list[list[tuple[int, int]]] = [[] for _ in self._nodes]
+        self._in: list[list[tuple[int, int]]] = [[] for _ in self._nodes]
+        self._edges: list[tuple[str, Any, str]] = []
+        for from_id in sorted(adjacency):
+            source = self._ordinals[from_id]
+            for edge in adjacency[from_id]:
+                target = self._ordinals[str(edge.get("to_id", ""))]
+                index = len(self._edges)
+                self._edges.append((str(edge.get("type", "")), edge.get("confidence"), str(edge.get("rule_id", ""))))
+                self._out[source].append((target, index))
+                self._in[target].append((source, index))
+        for incoming in self._in:
+            incoming.sort(key=lambda item: (self._edges[item[1]][0], item[0]))
+
+    def ordinal(self, node_id: str) -> int | None:
+        return self._ordinals.get(node_id)
+
+    def node_id(self, ordinal: int) -> str:
+        return self._nodes[ordinal]
+
+    def out_adjacent(self, ordinal: int) -> list[tuple[int, int]]:
+        return self._out[ordinal]
+
+    def in_adjacent(self, ordinal: int) -> list[tuple[int, int]]:
+        return self._in[ordinal]
+
+    def edge_fields(self, edge_index: int) -> tuple[str, Any, str]:
+        return self._edges[edge_index]
+
+
+def open_graph(pkg_root: Path) -> _Graph:
+    """The CSR index when current, else a ``CompactGraph`` of adjacency.json."""
+    from auditgraph.index.csr_adjacency import CsrAdjacency
+    from auditgraph.link.adjacency import load_adjacency
+
+    csr = CsrAdjacency.open(pkg_root)
+    if csr is not None:
+        return csr
+    return CompactGraph(load_adjacency(pkg_root))
+
+
+class _BudgetExhausted(Exception):
+    pass
+
+
+# A step walks from one node to the next along an edge:
+# (from ordinal, to ordinal, edge index, edge source ordinal, edge target ordinal).
+_Step = tuple[int, int, int, int, int]
+
+
+class _Search:
+    def __init__(self, graph: _Graph, direction: str, max_expansions: int) -> None:
+        self.graph = graph
+        self.forward = _FORWARD[direction]
+        self.backward = _BACKWARD[direction]
+        self.remaining = max_expansions
+        self.expanded = 0
+
+    def _moves(self, node: int, kinds: Iterable[str]) -> Iterable[tuple[int, int, str]]:
+        if self.remaining <= 0:
+            raise _BudgetExhausted
+        self.remaining -= 1
+        self.expanded += 1
+        for kind in kinds:
+            adjacent = self.graph.out_adjacent(node) if kind == "out" else self.graph.in_adjacent(node)
+            for neighbor, edge in adjacent:
+                yield neighbor, edge, kind
+
+    def shortest(
+        self,
+        source: int,
+        target: int,
+        max_hops: int,
+        banned_nodes: set[int],
+        banned_edges: set[int],
+    ) -> list[_Step] | None:
+        """Fewest-hop path from ``source`` to ``target`` avoiding the
+        banned nodes and edges, or None within ``max_hops``."""
+        if source == target:
+            return []
+        ahead: dict[int, tuple[int, int, int, int] | None] = {source: None}
+        behind: dict[int, tuple[int, int, int, int] | None] = {target: None}
+        ahead_frontier, behind_frontier = [source], [target]
+        hops = 0
+        while ahead_frontier and behind_frontier and hops < max_hops:
+            hops += 1
+            forward = len(ahead_frontier) <= len(behind_frontier)
+            frontier = ahead_frontier if forward else behind_frontier
+            parents, other = (ahead, behind) if forward else (behind, ahead)
+            kinds = self.forward if forward else self.backward
+            grown: list[int] = []
+            meet: int | None = None
+            for node in frontier:
+                for neighbor, edge, kind in self._moves(node, kinds):
+                    if neighbor in parents or neighbor in banned_nodes or edge in banned_edges:
+                        continue
+                    edge_from, edge_to = (node, neighbor) if kind == "out" else (neighbor, node)
+                    parents[neighbor] = (node, edge, edge_from, edge_to)
+                    grown.append(neighbor)
+                    if meet is None and neighbor in other:
+                        meet = neighbor
+                if meet is not None:
+                    return self._join(meet, ahead, behind)
+            if forward:
+                ahead_frontier = grown
+            else:
+                behind_frontier = grown
+        return None
+
+    @staticmethod
+    def _join(
+        meet: int,
+        ahead: dict[int, tuple[int, int, int, int] | None],
+        behind: dict[int, tuple[int, int, int, int] | None],
+    ) -> list[_Step]:
+        head: list[_Step] = []
+        node = meet
+        while (parent := ahead[node]) is not None:
+            previous, edge, edge_from, edge_to = parent
+            head.append((previous, node, edge, edge_from, edge_to))
+            node = previous
+        head.reverse()
+        node = meet
+        while (parent := behind[node]) is not None:
+            following, edge, edge_from, edge_to = parent
+            head.append((node, following, edge, edge_from, edge_to))
+            node = following
+        return head
+
+
+def _cost(confidence: Any) -> float:
+    if isinstance(confidence, bool) or not isinstance(confidence, (int, float)):
+        return 0.0
+    return 1.0 - min(max(float(confidence), 0.0), 1.0)
+
+
+def k_shortest_paths(
+    graph: _Graph,
+    from_id: str,
+    to_id: str,
+    *,
+    k: int = DEFAULT_PATHS,
+    max_depth: int = DEFAULT_MAX_DEPTH,
+    direction: str = "both",
+    max_expansions: int = DEFAULT_MAX_EXPANSIONS,
+) -> tuple[list[list[_Step]], bool, int]:
+    """Up to ``k`` loopless paths, shortest first.
+
+    Returns ``(paths, truncated, expanded)``; ``truncated`` is set when
+    ``max_expansions`` stopped the search early.
+    """
+    source, target = graph.ordinal(from_id), graph.ordinal(to_id)
+    if source is None or target is None or source == target or k < 1:
+        return [], False, 0
+    search = _Search(graph, direction, max_expansions)
+
+    def rank(path: list[_Step]) -> tuple[int, float, tuple[str, ...], tuple[int, ...]]:
+        cost = sum(_cost(graph.edge_fields(step[2])[1]) for step in path)
+        nodes = (graph.node_id(path[0][0]), *(graph.node_id(step[1]) for step in path))
+        return len(path), round(cost, 12), nodes, tuple(step[2] for step in path)
+
+    found: list[list[_Step]] = []
+    try:
+        first = search.shortest(source, target, max_depth, set(), set())
+        if first is None:
+            return [], False, search.expanded
+        found.append(first)
+        candidates: list[tuple[tuple[int, float, tuple[str, ...], tuple[int, ...]], list[_Step]]] = []
+        seen = {tuple(step[2] for step in first)}
+        while len(found) < k:
+            previous = found[-1]
+            for spur_index in range(len(previous)):
+                root = previous[:spur_index]
+                spur = previous[spur_index][0]
+                banned_edges = {
+                    path[spur_index][2]
+                    for path in found
+                    if len(path) > spur_index and path[:spur_index] == root
+                }
+                banned_nodes = {step[0] for step in root}
+                tail = search.shortest(spur, target, max_depth - spur_index, banned_nodes, banned_edges)
+                if tail is None:
+                    continue
+                path = root + tail
+                key = tuple(step[2] for step in path)
+                if key not in seen:
+                    seen.add(key)
+                    heapq.heappush(candidates, (rank(path), path))
+            if not candidates:
+                break
+            found.append(heapq.heappop(candidates)[1])
+    except _BudgetExhausted:
+        return found, True, search.expanded
+    return found, False, search.expanded
+
+
+def _link_id(rule_id: str, from_id: str, to_id: str) -> str:
+    return f"lnk_{sha256_text(rule_id + ':' + from_id + ':' + to_id)}"
+
+
+def _evidence(pkg_root: Path, rule_id: str, from_id: str, to_id: str) -> list[Any]:
+    """Evidence of the link record behind an edge, when its ID follows
+    the ``rule_id:from_id:to_id`` scheme the link rules use."""
+    from auditgraph.storage.backends import get_backend
 
-from auditgraph.link.adjacency import load_adjacency
+    backend = get_backend(pkg_root)
+    link_id = _link_id(rule_id, from_id, to_id)
+    if not backend.exists("links", link_id):
+        return []
+    evidence = backend.load("links", link_id).get("evidence")
+    return list(evidence) if isinstance(evidence, list) else []
 
 
-def why_connected(pkg_root: Path, from_id: str, to_id: str) -> dict[str, object]:
-    adjacency = load_adjacency(pkg_root)
-    for edge in adjacency.get(from_id, []):
-        if edge.get("to_id") == to_id:
-            return {"path": [edge]}
-    return {"path": []}
+def why_connected(
+    pkg_root: Path,
+    from_id: str,
+    to_id: str,
+    *,
+    k: int = DEFAULT_PATHS,
+    max_depth: int = DEFAULT_MAX_DEPTH,
+    direction: str = "both",
+    max_expansions: int = DEFAULT_MAX_EXPANSIONS,
+) -> dict[str, object]:
+    if direction not in DIRECTIONS:
+        raise ValueError(f"direction must be one of {DIRECTIONS}, got {direction!r}")
+    graph = open_graph(pkg_root)
+    steps, truncated, expanded = k_shortest_paths(
+        graph,
+        from_id,
+        to_id,
+        k=k,
+        max_depth=max_depth,
+        direction=direction,
+        max_expansions=max_expansions,
+    )
+    paths: list[dict[str, object]] = []
+    for path in steps:
+        edges: list[dict[str, object]] = []
+        for _, _, edge_index, edge_from, edge_to in path:
+            edge_type, confidence, rule_id = graph.edge_fields(edge_index)
+            source, target = graph.node_id(edge_from), graph.node_id(edge_to)
+            edges.append(
+                {
+                    "from_id": source,
+                    "to_id": target,
+                    "type": edge_type,
+                    "confidence": confidence,
+                    "rule_id": rule_id,
+                    "evidence": _evidence(pkg_root, rule_id, source, target),
+                }
+            )
+        cost = sum(_cost(edge["confidence"]) for edge in edges)
+        paths.append({"hops": len(edges), "cost": round(cost, 6), "edges": edges})
+    return {
+        "from_id": from_id,
+        "to_id": to_id,
+        "path": paths[0]["edges"] if paths else [],
+        "paths": paths,
+        "truncated": truncated,
+        "expanded": expanded,
+    }
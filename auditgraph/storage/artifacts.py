@@ -1,10 +1,11 @@
 from __future__ import annotations
 
-import json
 from pathlib import Path
 from typing import Any
 
 from auditgraph.config import Config
+from auditgraph.storage.codec import dumps, loads
+from auditgraph.storage.compression import COMPRESSION_NONE, compress, decompress, is_framed
 from auditgraph.utils.paths import ensure_within_base
 from auditgraph.utils.profile import validate_profile_name
 
@@ -13,13 +14,30 @@ def ensure_dir(path: Path) -> None:
     path.mkdir(parents=True, exist_ok=True)
 
 
-def write_json(path: Path, payload: Any) -> None:
+def json_text(payload: Any) -> str:
+    return dumps(payload, pretty=True).decode("utf-8")
+
+
+def json_bytes(payload: Any, compression: str = COMPRESSION_NONE, *, compact: bool = False) -> bytes:
+    """Serialize ``payload`` as written to disk: ``indent=2`` JSON (compact
+    with ``compact``), or compact JSON inside a compressed frame."""
+    if compression == COMPRESSION_NONE:
+        return dumps(payload, pretty=not compact)
+    return compress(dumps(payload), compression)
+
+
+def write_json(path: Path, payload: Any, *, compression: str = COMPRESSION_NONE, compact: bool = False) -> None:
+    """Write ``payload`` as JSON. ``compact`` drops the indentation and is
+    meant for machine-only artifacts such as indexes."""
     ensure_dir(path.parent)
-    path.write_text(json.dumps(payload, indent=2, sort_keys=True), encoding="utf-8")
+    path.write_bytes(json_bytes(payload, compression, compact=compact))
 
 
 def read_json(path: Path) -> dict[str, Any]:
-    return json.loads(path.read_text(encoding="utf-8"))
+    data = path.read_bytes()
+    if is_framed(data):
+        data = decompress(data)
+    return loads(data)
 
 
 def write_text(path: Path, text: str) -> None:
@@ -45,16 +63,6 @@ def _document_path(pkg_root: Path, document_id: str) -> Path:
     return pkg_root / "documents" / f"{document_id}.json"
 
 
-def _segment_path(pkg_root: Path, segment_id: str) -> Path:
-    shard = segment_id[:2] if segment_id else "sg"
-    return pkg_root / "segments" / shard / f"{segment_id}.json"
-
-
-def _chunk_path(pkg_root: Path, chunk_id: str) -> Path:
-    shard = chunk_id[:2] if chunk_id else "ch"
-    return pkg_root / "chunks" / shard / f"{chunk_id}.json"
-
-
 def write_document_artifacts(
     pkg_root: Path,
     document: dict[str, Any],
@@ -74,19 +82,23 @@ def write_document_artifacts(
             if previous_hash not in history:
                 history.append(previous_hash)
             document["hash_history"] = sorted({*history, *document.get("hash_history", [])})
-    write_json(doc_path, document)
-
-    for segment in segments:
-        segment_id = str(segment.get("segment_id", ""))
-        if not segment_id:
-            continue
-        write_json(_segment_path(pkg_root, segment_id), segment)
-
-    for chunk in chunks:
-        chunk_id = str(chunk.get("chunk_id", ""))
-        if not chunk_id:
-            continue
-        write_json(_chunk_path(pkg_root, chunk_id), chunk)
+    # Local import: storage.backends builds on the helpers in this module.
+    from auditgraph.storage.backends import artifact_compression, get_backend
+    from auditgraph.storage.content_store import split_bodies, write_bodies
+
+    write_json(doc_path, document, compression=artifact_compression(pkg_root))
+
+    backend = get_backend(pkg_root)
+    if "documents" in backend.kinds:
+        # Indexed backends keep a documents table alongside the JSON file.
+        backend.write("documents", [document])
+    # Texts are stored once by content hash; segments and chunks keep references.
+    segment_refs, bodies = split_bodies(segments)
+    chunk_refs, chunk_bodies = split_bodies(chunks)
+    bodies.update(chunk_bodies)
+    write_bodies(backend, bodies)
+    backend.write("segments", segment_refs)
+    backend.write("chunks", chunk_refs)
 
     return {
         "document": doc_path,
@@ -0,0 +1,680 @@
+"""Pluggable storage backends for sharded graph records.
+
+Entities, links, claims, chunks and segments are addressed by ID. Three
+backends persist them:
+
+- ``files`` — the historical layout: one pretty-printed JSON file per
+  record at ``<kind>/<shard>/<id>.json``, listed in a binary catalog
+  (``storage.catalog``) so lookups and iteration skip directory walks.
+  With ``storage.compression`` set, each file holds compact JSON in a
+  gzip/zstd frame instead (``storage.compression``).
+- ``packed`` — compact JSON records appended to segment files under
+  ``packed/<kind>/`` plus an ID → ``(segment, offset, length)`` index, so
+  bulk loads read a handful of large files and point lookups do one seek.
+- ``sqlite`` — a single ``graph.sqlite`` database with indexed columns
+  (see ``storage.sqlite_backend``). It also implements
+  ``QueryableBackend`` so query paths can push filters into SQL.
+
+Read paths only receive ``pkg_root``, so the backend (and compression)
+that wrote a profile is recorded in ``<pkg_root>/storage.json``. A
+profile without that file uses the uncompressed ``files`` backend.
+"""
+from __future__ import annotations
+
+import os
+import time
+import uuid
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Iterable, Iterator, Protocol, runtime_checkable
+
+from auditgraph.storage.artifacts import ensure_dir, json_bytes, read_json, write_json
+from auditgraph.storage.bulk_writer import BULK_WRITE_THREADS, HEX_SHARDS, BulkArtifactWriter
+from auditgraph.storage.catalog import CatalogEntry, WorkspaceCatalog
+from auditgraph.storage.codec import dumps, loads
+from auditgraph.storage.compression import COMPRESSION_NONE, resolve_compression
+from auditgraph.storage.sharding import shard_dir
+
+if TYPE_CHECKING:
+    from auditgraph.query.filters import FilterPredicate
+
+RECORD_KINDS: tuple[str, ...] = ("entities", "links", "claims", "chunks", "segments", "bodies")
+
+BACKEND_FILES = "files"
+BACKEND_PACKED = "packed"
+BACKEND_SQLITE = "sqlite"
+
+STORAGE_DESCRIPTOR = "storage.json"
+
+_ID_FIELDS: dict[str, str] = {
+    "entities": "id",
+    "links": "id",
+    "claims": "id",
+    "chunks": "chunk_id",
+    "segments": "segment_id",
+    "bodies": "body_id",
+    "documents": "document_id",
+}
+
+# Chunks and segments shard on the first two characters of the full ID
+# (historical behavior of storage.artifacts); the other kinds shard on the
+# token after the type prefix via storage.sharding.shard_dir.
+_PREFIX_SHARDED: dict[str, str] = {"chunks": "ch", "segments": "sg"}
+
+PACKED_SEGMENT_MAX_BYTES = 64 * 1024 * 1024
+# The packed index log is folded into index.json once it is larger than
+# both the snapshot and this floor, keeping replay cost proportional.
+PACKED_LOG_MIN_FOLD_BYTES = 1024 * 1024
+
+# FilesBackend batches at least this large go through writer threads, and
+# hash-sharded kinds get all 256 shard directories created up front.
+BULK_THREADED_MIN_RECORDS = 64
+BULK_PRECREATE_MIN_RECORDS = 1024
+
+
+def record_id(kind: str, record: dict[str, object]) -> str:
+    return str(record.get(_ID_FIELDS[kind], ""))
+
+
+def record_path(pkg_root: Path, kind: str, identifier: str) -> Path:
+    """Return the ``files``-layout path for a record."""
+    if kind == "documents":
+        return pkg_root / kind / f"{identifier}.json"
+    if kind in _PREFIX_SHARDED:
+        shard = identifier[:2] if identifier else _PREFIX_SHARDED[kind]
+        return pkg_root / kind / shard / f"{identifier}.json"
+    return shard_dir(pkg_root / kind, identifier) / f"{identifier}.json"
+
+
+@runtime_checkable
+class StorageBackend(Protocol):
+    """Protocol for record stores keyed by ``(kind, id)``.
+
+    ``load`` raises ``FileNotFoundError`` for unknown IDs so callers written
+    against the ``files`` layout keep their error handling. ``kinds`` lists
+    the record kinds the backend stores.
+    """
+
+    name: str
+    kinds: tuple[str, ...]
+
+    def write(self, kind: str, records: Iterable[dict[str, object]]) -> list[Path]:
+        ...
+
+    def load(self, kind: str, identifier: str) -> dict[str, object]:
+        ...
+
+    def exists(self, kind: str, identifier: str) -> bool:
+        ...
+
+    def iter_ids(self, kind: str) -> list[str]:
+        ...
+
+    def iter_records(self, kind: str, *, prefix: str | None = None) -> Iterator[dict[str, object]]:
+        ...
+
+    def delete(self, kind: str, identifiers: Iterable[str]) -> int:
+        ...
+
+    def record_size(self, kind: str, identifier: str) -> int:
+        """Bytes the record occupies in the store (0 when absent)."""
+        ...
+
+    def compact(self, *, dry_run: bool = False) -> int:
+        """Reclaim space left by rewrites and deletes; return bytes reclaimed
+        (or reclaimable, with ``dry_run``)."""
+        ...
+
+    def signature(self, kind: str) -> list[object]:
+        """A cheap token that changes whenever records of ``kind`` are
+        written or deleted, but not when the store is only compacted.
+        Indexes derived from a kind record it to detect that they are
+        stale."""
+        ...
+
+
+@runtime_checkable
+class QueryableBackend(Protocol):
+    """Optional query pushdown implemented by indexed backends.
+
+    Results must match what the Python filter/sort paths in
+    ``auditgraph.query`` produce over the same records.
+    """
+
+    def select_entities(
+        self,
+        *,
+        types: list[str] | None = None,
+        predicates: list[FilterPredicate] | None = None,
+        limit: int | None = None,
+        offset: int = 0,
+    ) -> tuple[list[dict[str, object]], int]:
+        ...
+
+    def aggregate_entities(
+        self,
+        *,
+        types: list[str] | None = None,
+        predicates: list[FilterPredicate] | None = None,
+        group_by: str | None = None,
+    ) -> dict[str, object]:
+        ...
+
+    def outgoing_edges(
+        self,
+        node_ids: list[str],
+        *,
+        edge_types: list[str] | None = None,
+        min_confidence: float | None = None,
+    ) -> dict[str, list[dict[str, object]]]:
+        ...
+
+    def incoming_edges(
+        self,
+        node_ids: list[str],
+        *,
+        edge_types: list[str] | None = None,
+        min_confidence: float | None = None,
+    ) -> dict[str, list[dict[str, object]]]:
+        ...
+
+    def search_chunks(self, token: str) -> list[dict[str, object]]:
+        ...
+
+    def index_entity_fields(self, fields: Iterable[str]) -> None:
+        ...
+
+
+class FilesBackend:
+    """One JSON file per record under ``<kind>/<shard>/<id>.json``."""
+
+    name = BACKEND_FILES
+    kinds = RECORD_KINDS
+
+    def __init__(self, pkg_root: Path, compression: str | None = None) -> None:
+        self.pkg_root = pkg_root
+        self.compression = compression if compression is not None else artifact_compression(pkg_root)
+        self.catalog = WorkspaceCatalog(pkg_root)
+
+    def path_for(self, kind: str, identifier: str) -> Path:
+        return record_path(self.pkg_root, kind, identifier)
+
+    def write(self, kind: str, records: Iterable[dict[str, object]]) -> list[Path]:
+        records = list(records)
+        fresh = self.catalog.is_fresh(kind)
+        paths: list[Path] = []
+        written: list[CatalogEntry] = []
+        precreate: list[Path] = []
+        if len(records) >= BULK_PRECREATE_MIN_RECORDS and kind not in _PREFIX_SHARDED:
+            # A batch this size touches nearly every hex shard anyway.
+            precreate = [self.pkg_root / kind / shard for shard in HEX_SHARDS]
+        threads = BULK_WRITE_THREADS if len(records) >= BULK_THREADED_MIN_RECORDS else 0
+        with BulkArtifactWriter(threads=threads, precreate=precreate) as writer:
+            for record in records:
+                identifier = record_id(kind, record)
+                if not identifier:
+                    continue
+                path = self.path_for(kind, identifier)
+                started = time.perf_counter()
+                data = json_bytes(record, self.compression)
+                writer.add_encode_time(time.perf_counter() - started)
+                writer.write(path, data)
+                paths.append(path)
+                written.append(self.catalog.entry_for(kind, identifier, path, data))
+        if written:
+            self.catalog.record_writes(kind, written, fresh=fresh, dirs=writer.created_dirs)
+        return paths
+
+    def _locate(self, kind: str, identifier: str) -> Path:
+        path = self.path_for(kind, identifier)
+        if path.exists() or kind not in _PREFIX_SHARDED:
+            return path
+        # Chunk and segment files written by other tools may use the
+        # token shard rather than the ID-prefix shard; consult the catalog,
+        # or search when it is stale.
+        if self.catalog.is_fresh(kind):
+            entry = self.catalog.get(kind, identifier)
+            return self.pkg_root / entry.path if entry is not None else path
+        base = self.pkg_root / kind
+        if base.exists():
+            for candidate in base.rglob(f"{identifier}.json"):
+                return candidate
+        return path
+
+    def load(self, kind: str, identifier: str) -> dict[str, object]:
+        return read_json(self._locate(kind, identifier))
+
+    def exists(self, kind: str, identifier: str) -> bool:
+        return self._locate(kind, identifier).exists()
+
+    def _iter_paths(self, kind: str, prefix: str | None = None) -> list[Path]:
+        if self.catalog.is_fresh(kind):
+            return [self.pkg_root / entry.path for entry in self.catalog.entries(kind, prefix)]
+        base = self.pkg_root / kind
+        if not base.exists():
+            return []
+        pattern = f"{prefix}*.json" if prefix else "*.json"
+        return sorted(base.rglob(pattern), key=lambda path: path.name)
+
+    def iter_ids(self, kind: str) -> list[str]:
+        if self.catalog.is_fresh(kind):
+            return self.catalog.ids(kind)
+        return [path.stem for path in self._iter_paths(kind)]
+
+    def iter_records(self, kind: str, *, prefix: str | None = None) -> Iterator[dict[str, object]]:
+        for path in self._iter_paths(kind, prefix):
+            yield read_json(path)
+
+    def delete(self, kind: str, identifiers: Iterable[str]) -> int:
+        fresh = self.catalog.is_fresh(kind)
+        removed: list[CatalogEntry] = []
+        for identifier in identifiers:
+            entry = self.catalog.get(kind, identifier) if fresh else None
+            path = self.pkg_root / entry.path if entry is not None else self.path_for(kind, identifier)
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                continue
+            removed.append(CatalogEntry(kind, identifier, path.relative_to(self.pkg_root).as_posix(), 0, ""))
+        if removed:
+            self.catalog.record_deletes(kind, removed, fresh=fresh)
+        return len(removed)
+
+    def record_size(self, kind: str, identifier: str) -> int:
+        entry = self.catalog.get(kind, identifier) if self.catalog.is_fresh(kind) else None
+        if entry is not None:
+            return entry.size
+        try:
+            return self._locate(kind, identifier).stat().st_size
+        except FileNotFoundError:
+            return 0
+
+    def compact(self, *, dry_run: bool = False) -> int:
+        # Record files are deleted in place; only the catalog log accumulates
+        # superseded entries.
+        return 0 if dry_run else self.catalog.compact()
+
+    def signature(self, kind: str) -> list[object]:
+        # Records are renamed into place, so every write or delete touches
+        # the mtime of its shard directory.
+        base = self.pkg_root / kind
+        try:
+            stamps: list[object] = [["", base.stat().st_mtime_ns]]
+            with os.scandir(base) as entries:
+                stamps.extend(sorted([entry.name, entry.stat().st_mtime_ns] for entry in entries if entry.is_dir()))
+        except FileNotFoundError:
+            return []
+        return stamps
+
+
+class PackedBackend:
+    """Append-only segment files with an ID → offset index per kind.
+
+    Layout under ``packed/<kind>/``::
+
+        seg-000001.pack   newline-delimited compact JSON records
+        index.json        {"version": 1, "store": token, "generation": n,
+                           "segments": [...], "records": {id: [seg, offset, length]}}
+        index.log         one compact JSON delta per write/delete since index.json:
+                          {"store": token, "segments": [...], "records": {id: [seg, offset, length] | null}}
+
+    Rewriting a record appends a new copy and repoints the index; deletes
+    only drop the index entry. A write appends one delta line instead of
+    rewriting the whole index, so ingest (one write per document) stays
+    linear. Readers replay the log over ``index.json``; it is folded into
+    a fresh ``index.json`` once it outgrows the snapshot and on
+    ``compact``, which also copies live records into fresh segments to
+    reclaim dead bytes. ``store`` is a random token chosen by the first
+    write and ``generation`` counts deltas; together they are the kind's
+    ``signature``.
+    """
+
+    name = BACKEND_PACKED
+    kinds = RECORD_KINDS
+
+    def __init__(self, pkg_root: Path, *, segment_max_bytes: int = PACKED_SEGMENT_MAX_BYTES) -> None:
+        self.pkg_root = pkg_root
+        self.segment_max_bytes = segment_max_bytes
+        self._indexes: dict[str, tuple[tuple[tuple[int, int] | None, tuple[int, int] | None], dict[str, Any]]] = {}
+
+    def kind_dir(self, kind: str) -> Path:
+        return self.pkg_root / "packed" / kind
+
+    def _index_path(self, kind: str) -> Path:
+        return self.kind_dir(kind) / "index.json"
+
+    def _log_path(self, kind: str) -> Path:
+        return self.kind_dir(kind) / "index.log"
+
+    def _signature(self, kind: str) -> tuple[tuple[int, int] | None, tuple[int, int] | None]:
+        signatures: list[tuple[int, int] | None] = []
+        for path in (self._index_path(kind), self._log_path(kind)):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                signatures.append(None)
+            else:
+                signatures.append((stat.st_mtime_ns, stat.st_size))
+        return signatures[0], signatures[1]
+
+    def _read_index(self, kind: str) -> dict[str, Any]:
+        """The current index (``index.json`` plus replayed deltas). The
+        returned dict is cached and updated in place by later writes."""
+        signature = self._signature(kind)
+        cached = self._indexes.get(kind)
+        if cached is not None and cached[0] == signature:
+            return cached[1]
+        snapshot = read_json(self._index_path(kind)) if signature[0] is not None else {}
+        index: dict[str, Any] = {
+            "version": 1,
+            "store": snapshot.get("store"),
+            "generation": int(snapshot.get("generation", 0)),
+            "segments": list(snapshot.get("segments", [])),
+            "records": dict(snapshot.get("records", {})),
+        }
+        if signature[1] is not None:
+            with open(self._log_path(kind), "rb") as handle:
+                for line in handle:
+                    try:
+                        delta = loads(line)
+                    except ValueError:
+                        continue  # torn line from an interrupted write
+                    _apply_delta(index, delta)
+        self._indexes[kind] = (signature, index)
+        return index
+
+    def _write_index(self, kind: str, index: dict[str, Any]) -> None:
+        """Write ``index`` as the new snapshot and drop the folded log."""
+        path = self._index_path(kind)
+        ensure_dir(path.parent)
+        tmp_path = path.with_suffix(".json.tmp")
+        tmp_path.write_bytes(dumps(index))
+        os.replace(tmp_path, path)
+        # Replaying a log already folded into the snapshot is harmless, so
+        # a crash before this unlink loses nothing.
+        self._log_path(kind).unlink(missing_ok=True)
+        self._indexes[kind] = (self._signature(kind), index)
+
+    def _append_delta(self, kind: str, segments: list[str], records: dict[str, list[int] | None]) -> None:
+        index = self._read_index(kind)
+        delta = {"store": index["store"] or uuid.uuid4().hex, "segments": segments, "records": records}
+        ensure_dir(self.kind_dir(kind))
+        with open(self._log_path(kind), "a+b") as handle:
+            data = dumps(delta) + b"\n"
+            if handle.tell():
+                handle.seek(-1, os.SEEK_END)
+                if handle.read(1) != b"\n":
+                    data = b"\n" + data  # start clear of a torn line
+            handle.write(data)
+        _apply_delta(index, delta)
+        signature = self._signature(kind)
+        self._indexes[kind] = (signature, index)
+        log_bytes = signature[1][1] if signature[1] is not None else 0
+        snapshot_bytes = signature[0][1] if signature[0] is not None else 0
+        if log_bytes > max(snapshot_bytes, PACKED_LOG_MIN_FOLD_BYTES):
+            self._write_index(kind, index)
+
+    def _segment_path(self, kind: str, segment: str) -> Path:
+        return self.kind_dir(kind) / segment
+
+    def write(self, kind: str, records: Iterable[dict[str, object]]) -> list[Path]:
+        segments: list[str] = list(self._read_index(kind)["segments"])
+        entries: dict[str, list[int] | None] = {}
+        if not segments:
+            segments.append("seg-000001.pack")
+        ensure_dir(self.kind_dir(kind))
+        paths: list[Path] = []
+        segment_path = self._segment_path(kind, segments[-1])
+        handle = open(segment_path, "ab")
+        try:
+            offset = handle.tell()
+            for record in records:
+                identifier = record_id(kind, record)
+                if not identifier:
+                    continue
+                data = dumps(record) + b"\n"
+                if offset and offset + len(data) > self.segment_max_bytes:
+                    handle.close()
+                    segments.append(_next_segment_name(segments))
+                    segment_path = self._segment_path(kind, segments[-1])
+                    handle = open(segment_path, "ab")
+                    offset = handle.tell()
+                handle.write(data)
+                entries[identifier] = [len(segments) - 1, offset, len(data)]
+                offset += len(data)
+                paths.append(Path(f"{segment_path}#{identifier}"))
+        finally:
+            handle.close()
+        if entries:
+            self._append_delta(kind, segments, entries)
+        return paths
+
+    def _read_entry(self, kind: str, segments: list[str], entry: list[int]) -> dict[str, object]:
+        segment, offset, length = entry
+        with open(self._segment_path(kind, segments[segment]), "rb") as handle:
+            handle.seek(offset)
+            return loads(handle.read(length))
+
+    def load(self, kind: str, identifier: str) -> dict[str, object]:
+        index = self._read_index(kind)
+        entry = index.get("records", {}).get(identifier)
+        if entry is None:
+            raise FileNotFoundError(f"No {kind} record for id '{identifier}' in packed store")
+        return self._read_entry(kind, list(index.get("segments", [])), entry)
+
+    def exists(self, kind: str, identifier: str) -> bool:
+        return identifier in self._read_index(kind).get("records", {})
+
+    def iter_ids(self, kind: str) -> list[str]:
+        return sorted(self._read_index(kind).get("records", {}))
+
+    def iter_records(self, kind: str, *, prefix: str | None = None) -> Iterator[dict[str, object]]:
+        index = self._read_index(kind)
+        segments = list(index.get("segments", []))
+        entries = index.get("records", {})
+        handles: dict[int, object] = {}
+        try:
+            for identifier in sorted(entries):
+                if prefix and not identifier.startswith(prefix):
+                    continue
+                segment, offset, length = entries[identifier]
+                handle = handles.get(segment)
+                if handle is None:
+                    handle = open(self._segment_path(kind, segments[segment]), "rb")
+                    handles[segment] = handle
+                handle.seek(offset)
+                yield loads(handle.read(length))
+        finally:
+            for handle in handles.values():
+                handle.close()
+
+    def delete(self, kind: str, identifiers: Iterable[str]) -> int:
+        index = self._read_index(kind)
+        entries = index["records"]
+        removed: dict[str, list[int] | None] = {
+            identifier: None for identifier in identifiers if identifier in entries
+        }
+        if removed:
+            self._append_delta(kind, list(index["segments"]), removed)
+        return len(removed)
+
+    def record_size(self, kind: str, identifier: str) -> int:
+        entry = self._read_index(kind).get("records", {}).get(identifier)
+        return int(entry[2]) if entry is not None else 0
+
+    def compact(self, *, dry_run: bool = False) -> int:
+        reclaimed = 0
+        for kind in self.kinds:
+            index = self._read_index(kind)
+            segments: list[str] = list(index.get("segments", []))
+            if not segments:
+                continue
+            entries: dict[str, list[int]] = dict(index.get("records", {}))
+            on_disk = sum(
+                path.stat().st_size for path in (self._segment_path(kind, name) for name in segments) if path.exists()
+            )
+            dead = on_disk - sum(entry[2] for entry in entries.values())
+            if dead <= 0:
+                if not dry_run and self._log_path(kind).exists():
+                    self._write_index(kind, index)
+                continue
+            reclaimed += dead
+            if not dry_run:
+                self._compact_kind(kind, segments, entries)
+        return reclaimed
+
+    def signature(self, kind: str) -> list[object]:
+        index = self._read_index(kind)
+        return [index["store"], index["generation"]] if index["store"] else []
+
+    def _compact_kind(self, kind: str, segments: list[str], entries: dict[str, list[int]]) -> None:
+        # New segments get fresh names so the old index stays valid until
+        # the new one replaces it.
+        fresh: list[str] = [_next_segment_name(segments)]
+        compacted: dict[str, list[int]] = {}
+        sources: dict[int, object] = {}
+        handle = open(self._segment_path(kind, fresh[-1]), "wb")
+        try:
+            offset = 0
+            for identifier in sorted(entries):
+                segment, source_offset, length = entries[identifier]
+                source = sources.get(segment)
+                if source is None:
+                    source = open(self._segment_path(kind, segments[segment]), "rb")
+                    sources[segment] = source
+                source.seek(source_offset)
+                data = source.read(length)
+                if offset and offset + length > self.segment_max_bytes:
+                    handle.close()
+                    fresh.append(_next_segment_name(segments + fresh))
+                    handle = open(self._segment_path(kind, fresh[-1]), "wb")
+                    offset = 0
+                handle.write(data)
+                compacted[identifier] = [len(fresh) - 1, offset, length]
+                offset += length
+        finally:
+            handle.close()
+            for source in sources.values():
+                source.close()
+        index = self._read_index(kind)
+        self._write_index(
+            kind,
+            {
+                "version": 1,
+                "store": index["store"],
+                "generation": index["generation"],
+                "segments": fresh,
+                "records": compacted,
+            },
+        )
+        for name in segments:
+            self._segment_path(kind, name).unlink(missing_ok=True)
+
+
+def _apply_delta(index: dict[str, Any], delta: dict[str, Any]) -> None:
+    index["store"] = delta.get("store", index["store"])
+    index["generation"] += 1
+    index["segments"] = list(delta.get("segments", index["segments"]))
+    entries = index["records"]
+    for identifier, entry in delta.get("records", {}).items():
+        if entry is None:
+            entries.pop(identifier, None)
+        else:
+            entries[identifier] = entry
+
+
+def _next_segment_name(segments: list[str]) -> str:
+    numbers = [int(name[len("seg-") : -len(".pack")]) for name in segments]
+    return f"seg-{max(numbers, default=0) + 1:06d}.pack"
+
+
+def _sqlite_backend(pkg_root: Path) -> StorageBackend:
+    # Local import: storage.sqlite_backend builds on the helpers in this module.
+    from auditgraph.storage.sqlite_backend import SqliteBackend
+
+    return SqliteBackend(pkg_root)
+
+
+_BACKEND_CLASSES = {
+    BACKEND_FILES: FilesBackend,
+    BACKEND_PACKED: PackedBackend,
+    BACKEND_SQLITE: _sqlite_backend,
+}
+
+_BACKENDS: dict[tuple[str, str], StorageBackend] = {}
+
+_DESCRIPTORS: dict[str, tuple[tuple[int, int], dict[str, object]]] = {}
+
+
+def backend_names() -> tuple[str, ...]:
+    return tuple(sorted(_BACKEND_CLASSES))
+
+
+def _descriptor_path(pkg_root: Path) -> Path:
+    return pkg_root / STORAGE_DESCRIPTOR
+
+
+def _descriptor(pkg_root: Path) -> dict[str, object]:
+    path = _descriptor_path(pkg_root)
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
+        return {}
+    signature = (stat.st_mtime_ns, stat.st_size)
+    cached = _DESCRIPTORS.get(str(path))
+    if cached is not None and cached[0] == signature:
+        return cached[1]
+    descriptor = read_json(path)
+    _DESCRIPTORS[str(path)] = (signature, descriptor)
+    return descriptor
+
+
+def active_backend_name(pkg_root: Path) -> str:
+    name = str(_descriptor(pkg_root).get("backend", BACKEND_FILES))
+    return name if name in _BACKEND_CLASSES else BACKEND_FILES
+
+
+def artifact_compression(pkg_root: Path) -> str:
+    """Return the compression recorded for ``pkg_root`` (``none`` by default)."""
+    return str(_descriptor(pkg_root).get("compression", COMPRESSION_NONE))
+
+
+def get_backend(pkg_root: Path, name: str | None = None) -> StorageBackend:
+    """Return the backend recorded for ``pkg_root`` (or the named one)."""
+    resolved = name or active_backend_name(pkg_root)
+    if resolved not in _BACKEND_CLASSES:
+        raise ValueError(f"Unknown storage backend: {resolved!r} (expected one of {backend_names()})")
+    key = (str(pkg_root), resolved)
+    backend = _BACKENDS.get(key)
+    if backend is None:
+        backend = _BACKEND_CLASSES[resolved](pkg_root)
+        _BACKENDS[key] = backend
+    return backend
+
+
+def activate_backend(pkg_root: Path, name: str, compression: str = COMPRESSION_NONE) -> StorageBackend:
+    """Record ``name`` (and ``compression``) as the profile's storage
+    settings and return the backend.
+
+    The descriptor is only written when it would change what the profile
+    reports, so default ``files`` profiles keep their historical on-disk
+    layout.
+    """
+    if name not in _BACKEND_CLASSES:
+        raise ValueError(f"Unknown storage backend: {name!r} (expected one of {backend_names()})")
+    resolve_compression(compression)
+    desired: dict[str, object] = {"backend": name}
+    if compression != COMPRESSION_NONE:
+        desired["compression"] = compression
+    path = _descriptor_path(pkg_root)
+    if path.exists() or desired != {"backend": BACKEND_FILES}:
+        if not path.exists() or _descriptor(pkg_root) != desired:
+            write_json(path, desired)
+            release_backends(pkg_root)
+    return get_backend(pkg_root, name)
+
+
+def release_backends(pkg_root: Path) -> None:
+    """Forget the cached backends for ``pkg_root`` so the next
+    ``get_backend`` re-reads the descriptor and any segment indexes."""
+    for key in [key for key in _BACKENDS if key[0] == str(pkg_root)]:
+        del _BACKENDS[key]
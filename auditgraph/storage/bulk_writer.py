@@ -0,0 +1,168 @@
+"""Batched, threaded writer for record files.
+
+``BulkArtifactWriter`` takes already-encoded buffers from the calling
+thread (which does the CPU-bound JSON encoding) and hands them to a small
+pool of writer threads. Each file is written to a temporary sibling and
+renamed into place, so readers never observe a partial record. Paths are
+routed to workers by hash, so repeated writes of one path within a batch
+keep their order and the last one wins.
+
+Directories are created once per batch: the writer remembers what it
+created, and ``precreate`` makes a whole shard fan-out up front.
+
+Throughput is recorded in ``WriteStats``. Stages wrap their writes in
+``collect_write_stats()`` to total the stats of every writer used inside
+the block and copy the totals into the stage manifest.
+"""
+from __future__ import annotations
+
+import os
+import queue
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterable, Iterator
+
+BULK_WRITE_THREADS = max(1, min(4, os.cpu_count() or 1))
+BULK_WRITE_QUEUE_SIZE = 256
+
+# Two-character hex shard names used by storage.sharding for hash IDs.
+HEX_SHARDS: tuple[str, ...] = tuple(f"{value:02x}" for value in range(256))
+
+
+@dataclass
+class WriteStats:
+    files: int = 0
+    bytes: int = 0
+    encode_s: float = 0.0
+    write_s: float = 0.0
+    threads: int = 0
+
+    def merge(self, other: WriteStats) -> None:
+        self.files += other.files
+        self.bytes += other.bytes
+        self.encode_s += other.encode_s
+        self.write_s += other.write_s
+        self.threads = max(self.threads, other.threads)
+
+    def to_dict(self) -> dict[str, object]:
+        elapsed = self.encode_s + self.write_s
+        return {
+            "files": self.files,
+            "bytes": self.bytes,
+            "threads": self.threads,
+            "encode_ms": round(self.encode_s * 1000, 3),
+            "write_ms": round(self.write_s * 1000, 3),
+            "files_per_s": round(self.files / elapsed, 1) if elapsed else 0.0,
+            "mb_per_s": round(self.bytes / elapsed / 1e6, 3) if elapsed else 0.0,
+        }
+
+
+_ACTIVE_STATS: ContextVar[WriteStats | None] = ContextVar("auditgraph_write_stats", default=None)
+
+
+@contextmanager
+def collect_write_stats(stats: WriteStats | None = None) -> Iterator[WriteStats]:
+    """Total the stats of every ``BulkArtifactWriter`` closed inside the block."""
+    collected = stats if stats is not None else WriteStats()
+    token = _ACTIVE_STATS.set(collected)
+    try:
+        yield collected
+    finally:
+        _ACTIVE_STATS.reset(token)
+
+
+def write_atomic(path: Path, data: bytes) -> None:
+    """Write ``data`` to a temporary sibling of ``path`` and rename it over ``path``."""
+    tmp_path = path.with_name(f".{path.name}.{threading.get_ident()}.tmp")
+    with open(tmp_path, "wb") as handle:
+        handle.write(data)
+    os.replace(tmp_path, path)
+
+
+_STOP = object()
+
+
+class BulkArtifactWriter:
+    """Context manager that writes encoded record files in bulk.
+
+    With ``threads=0`` every write happens inline on the calling thread;
+    otherwise writes are queued to ``threads`` workers and ``__exit__``
+    waits for them. The first worker error is re-raised on exit.
+    """
+
+    def __init__(
+        self,
+        *,
+        threads: int = BULK_WRITE_THREADS,
+        queue_size: int = BULK_WRITE_QUEUE_SIZE,
+        precreate: Iterable[Path] = (),
+    ) -> None:
+        self.threads = max(threads, 0)
+        self.queue_size = queue_size
+        self.precreate = list(precreate)
+        self.stats = WriteStats(threads=self.threads)
+        self.created_dirs: set[Path] = set()
+        self._queues: list[queue.Queue] = []
+        self._workers: list[threading.Thread] = []
+        self._errors: list[BaseException] = []
+        self._started = 0.0
+
+    def __enter__(self) -> BulkArtifactWriter:
+        self._started = time.perf_counter()
+        for directory in self.precreate:
+            self._ensure_dir(directory)
+        for _ in range(self.threads):
+            work: queue.Queue = queue.Queue(maxsize=self.queue_size)
+            worker = threading.Thread(target=self._drain, args=(work,), daemon=True)
+            worker.start()
+            self._queues.append(work)
+            self._workers.append(worker)
+        return self
+
+    def _ensure_dir(self, directory: Path) -> None:
+        if directory not in self.created_dirs:
+            directory.mkdir(parents=True, exist_ok=True)
+            self.created_dirs.add(directory)
+
+    def _drain(self, work: queue.Queue) -> None:
+        while True:
+            item = work.get()
+            if item is _STOP:
+                return
+            if self._errors:
+                continue
+            path, data = item
+            try:
+                write_atomic(path, data)
+            except BaseException as exc:  # surfaced to the caller in __exit__
+                self._errors.append(exc)
+
+    def write(self, path: Path, data: bytes) -> None:
+        if self._errors:
+            raise self._errors[0]
+        self._ensure_dir(path.parent)
+        self.stats.files += 1
+        self.stats.bytes += len(data)
+        if not self._queues:
+            write_atomic(path, data)
+            return
+        self._queues[hash(path) % len(self._queues)].put((path, data))
+
+    def add_encode_time(self, seconds: float) -> None:
+        self.stats.encode_s += seconds
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        for work in self._queues:
+            work.put(_STOP)
+        for worker in self._workers:
+            worker.join()
+        self.stats.write_s = max(time.perf_counter() - self._started - self.stats.encode_s, 0.0)
+        active = _ACTIVE_STATS.get()
+        if active is not None:
+            active.merge(self.stats)
+        if exc_type is None and self._errors:
+            raise self._errors[0]
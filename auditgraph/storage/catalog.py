@@ -0,0 +1,290 @@
+"""Binary catalog of ``files``-backend records for one profile.
+
+``<pkg_root>/catalog.bin`` maps every record ID to its kind, shard path,
+size and SHA-256 so loaders can look records up and iterate them in order
+without walking ``entities/``, ``links/``, ``chunks/`` … with ``rglob``.
+
+The file is a magic header followed by append-only binary records::
+
+    <B op> <B kind> <H id_len> <Q value> <32s sha256> <H path_len> id path
+
+``op`` is put (``value`` = size), delete, or stamp. Stamps record the
+``mtime_ns`` of the kind directory and of every shard directory after the
+catalog last saw a write. A kind is trusted only while those stamps still
+match the directories on disk; files added or removed behind the
+backend's back (other tools, hand-written fixtures) make the kind stale
+and readers fall back to walking the tree until the next backend write
+rescans it. Later records win; the file is rewritten as a sorted snapshot
+once dead records outnumber live ones.
+"""
+from __future__ import annotations
+
+import bisect
+import hashlib
+import os
+import struct
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Iterable
+
+CATALOG_FILENAME = "catalog.bin"
+
+# Kind codes are part of the on-disk format; append only.
+CATALOG_KINDS: tuple[str, ...] = ("entities", "links", "claims", "chunks", "segments", "documents", "bodies")
+
+_MAGIC = b"AGCAT01\n"
+_RECORD = struct.Struct("<BBHQ32sH")
+_OP_PUT = 1
+_OP_DELETE = 2
+_OP_STAMP = 3
+_KIND_CODES = {kind: code for code, kind in enumerate(CATALOG_KINDS)}
+_NO_DIGEST = b"\x00" * 32
+_COMPACT_MIN_RECORDS = 4096
+
+
+@dataclass(frozen=True)
+class CatalogEntry:
+    kind: str
+    id: str
+    path: str
+    size: int
+    sha256: str
+
+
+@dataclass
+class _CatalogState:
+    entries: dict[str, dict[str, CatalogEntry]] = field(default_factory=dict)
+    stamps: dict[str, dict[str, int]] = field(default_factory=dict)
+    records: int = 0
+    sorted_keys: dict[str, list[str]] = field(default_factory=dict)
+
+    def live_records(self) -> int:
+        return sum(len(items) for items in self.entries.values()) + sum(len(items) for items in self.stamps.values())
+
+
+def _encode(op: int, kind: str, identifier: str, value: int, digest: bytes, path: str) -> bytes:
+    ident_bytes = identifier.encode("utf-8")
+    path_bytes = path.encode("utf-8")
+    header = _RECORD.pack(op, _KIND_CODES[kind], len(ident_bytes), value, digest, len(path_bytes))
+    return header + ident_bytes + path_bytes
+
+
+def _parse(data: bytes) -> _CatalogState:
+    state = _CatalogState()
+    if not data.startswith(_MAGIC):
+        return state
+    offset = len(_MAGIC)
+    size = len(data)
+    while offset + _RECORD.size <= size:
+        op, kind_code, id_len, value, digest, path_len = _RECORD.unpack_from(data, offset)
+        end = offset + _RECORD.size + id_len + path_len
+        if end > size or kind_code >= len(CATALOG_KINDS):
+            break  # truncated tail from an interrupted append
+        start = offset + _RECORD.size
+        identifier = data[start : start + id_len].decode("utf-8")
+        path = data[start + id_len : end].decode("utf-8")
+        kind = CATALOG_KINDS[kind_code]
+        if op == _OP_PUT:
+            state.entries.setdefault(kind, {})[identifier] = CatalogEntry(kind, identifier, path, value, digest.hex())
+        elif op == _OP_DELETE:
+            state.entries.get(kind, {}).pop(identifier, None)
+        elif op == _OP_STAMP:
+            state.stamps.setdefault(kind, {})[identifier] = value
+        state.records += 1
+        offset = end
+    return state
+
+
+class WorkspaceCatalog:
+    """Reader/writer for ``<pkg_root>/catalog.bin``."""
+
+    def __init__(self, pkg_root: Path) -> None:
+        self.pkg_root = pkg_root
+        self.path = pkg_root / CATALOG_FILENAME
+        self._cached: tuple[tuple[int, int] | None, _CatalogState] | None = None
+
+    # -- state ------------------------------------------------------------
+
+    def _signature(self) -> tuple[int, int] | None:
+        try:
+            stat = self.path.stat()
+        except FileNotFoundError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def _state(self) -> _CatalogState:
+        signature = self._signature()
+        if self._cached is not None and self._cached[0] == signature:
+            return self._cached[1]
+        state = _parse(self.path.read_bytes()) if signature is not None else _CatalogState()
+        self._cached = (signature, state)
+        return state
+
+    def _dir_mtime(self, rel_dir: str) -> int | None:
+        try:
+            return (self.pkg_root / rel_dir).stat().st_mtime_ns
+        except FileNotFoundError:
+            return None
+
+    def is_fresh(self, kind: str) -> bool:
+        """Return True when the catalog's view of ``kind`` matches disk."""
+        state = self._state()
+        stamps = state.stamps.get(kind, {})
+        if not (self.pkg_root / kind).exists():
+            return not state.entries.get(kind)
+        if kind not in stamps:
+            return False
+        return all(self._dir_mtime(rel_dir) == mtime for rel_dir, mtime in stamps.items())
+
+    # -- reads ------------------------------------------------------------
+
+    def _keys(self, kind: str) -> list[str]:
+        # Keyed by file name so ordering matches sorting rglob results by name.
+        state = self._state()
+        keys = state.sorted_keys.get(kind)
+        if keys is None:
+            keys = sorted(f"{identifier}.json" for identifier in state.entries.get(kind, {}))
+            state.sorted_keys[kind] = keys
+        return keys
+
+    def get(self, kind: str, identifier: str) -> CatalogEntry | None:
+        return self._state().entries.get(kind, {}).get(identifier)
+
+    def entries(self, kind: str, prefix: str | None = None) -> list[CatalogEntry]:
+        """Return catalog entries for ``kind`` in file-name order."""
+        keys = self._keys(kind)
+        if prefix:
+            start = bisect.bisect_left(keys, prefix)
+            stop = start
+            while stop < len(keys) and keys[stop].startswith(prefix):
+                stop += 1
+            keys = keys[start:stop]
+        items = self._state().entries.get(kind, {})
+        return [items[key[: -len(".json")]] for key in keys]
+
+    def ids(self, kind: str) -> list[str]:
+        return [entry.id for entry in self.entries(kind)]
+
+    # -- writes -----------------------------------------------------------
+
+    def entry_for(self, kind: str, identifier: str, path: Path, data: bytes) -> CatalogEntry:
+        return CatalogEntry(
+            kind=kind,
+            id=identifier,
+            path=path.relative_to(self.pkg_root).as_posix(),
+            size=len(data),
+            sha256=hashlib.sha256(data).hexdigest(),
+        )
+
+    def _stamp_records(self, kind: str, rel_dirs: Iterable[str]) -> list[tuple[str, int]]:
+        stamps: list[tuple[str, int]] = []
+        for rel_dir in sorted({kind, *rel_dirs}):
+            mtime = self._dir_mtime(rel_dir)
+            if mtime is not None:
+                stamps.append((rel_dir, mtime))
+        return stamps
+
+    def record_writes(
+        self, kind: str, written: list[CatalogEntry], *, fresh: bool, dirs: Iterable[Path] = ()
+    ) -> None:
+        """Record entries just written by the backend.
+
+        ``fresh`` is ``is_fresh(kind)`` sampled *before* the write; a stale
+        kind is rescanned instead of patched. ``dirs`` are directories the
+        write created without necessarily filling; they are stamped too.
+        """
+        if not fresh:
+            self.rebuild(kind)
+            return
+        state = self._state()
+        rel_dirs = {str(Path(entry.path).parent.as_posix()) for entry in written}
+        rel_dirs.update(directory.relative_to(self.pkg_root).as_posix() for directory in dirs)
+        stamps = self._stamp_records(kind, rel_dirs)
+        chunks: list[bytes] = []
+        items = state.entries.setdefault(kind, {})
+        for entry in written:
+            chunks.append(_encode(_OP_PUT, kind, entry.id, entry.size, bytes.fromhex(entry.sha256), entry.path))
+            items[entry.id] = entry
+        self._apply_stamps(state, kind, stamps, chunks)
+        self._append(state, kind, chunks)
+
+    def record_deletes(self, kind: str, removed: list[CatalogEntry], *, fresh: bool) -> None:
+        if not fresh:
+            self.rebuild(kind)
+            return
+        state = self._state()
+        stamps = self._stamp_records(kind, (str(Path(entry.path).parent.as_posix()) for entry in removed))
+        chunks: list[bytes] = []
+        items = state.entries.setdefault(kind, {})
+        for entry in removed:
+            chunks.append(_encode(_OP_DELETE, kind, entry.id, 0, _NO_DIGEST, ""))
+            items.pop(entry.id, None)
+        self._apply_stamps(state, kind, stamps, chunks)
+        self._append(state, kind, chunks)
+
+    @staticmethod
+    def _apply_stamps(state: _CatalogState, kind: str, stamps: list[tuple[str, int]], chunks: list[bytes]) -> None:
+        kind_stamps = state.stamps.setdefault(kind, {})
+        for rel_dir, mtime in stamps:
+            chunks.append(_encode(_OP_STAMP, kind, rel_dir, mtime, _NO_DIGEST, ""))
+            kind_stamps[rel_dir] = mtime
+
+    def _append(self, state: _CatalogState, kind: str, chunks: list[bytes]) -> None:
+        state.sorted_keys.pop(kind, None)
+        state.records += len(chunks)
+        if state.records > _COMPACT_MIN_RECORDS and state.records > 2 * state.live_records():
+            self._rewrite(state)
+            return
+        self.pkg_root.mkdir(parents=True, exist_ok=True)
+        with open(self.path, "ab") as handle:
+            if handle.tell() == 0:
+                handle.write(_MAGIC)
+            handle.write(b"".join(chunks))
+        self._cached = (self._signature(), state)
+
+    def _rewrite(self, state: _CatalogState) -> None:
+        chunks: list[bytes] = [_MAGIC]
+        records = 0
+        for kind in CATALOG_KINDS:
+            for identifier in sorted(state.entries.get(kind, {})):
+                entry = state.entries[kind][identifier]
+                chunks.append(_encode(_OP_PUT, kind, identifier, entry.size, bytes.fromhex(entry.sha256), entry.path))
+                records += 1
+            for rel_dir in sorted(state.stamps.get(kind, {})):
+                chunks.append(_encode(_OP_STAMP, kind, rel_dir, state.stamps[kind][rel_dir], _NO_DIGEST, ""))
+                records += 1
+        state.records = records
+        self.pkg_root.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(".bin.tmp")
+        tmp_path.write_bytes(b"".join(chunks))
+        os.replace(tmp_path, self.path)
+        self._cached = (self._signature(), state)
+
+    def compact(self) -> int:
+        """Rewrite the catalog with live records only; return bytes reclaimed."""
+        if self._signature() is None:
+            return 0
+        before = self.path.stat().st_size
+        self._rewrite(self._state())
+        return max(before - self.path.stat().st_size, 0)
+
+    def rebuild(self, kind: str) -> None:
+        """Rescan ``<pkg_root>/<kind>/`` and replace the catalog's view of it."""
+        state = self._state()
+        base = self.pkg_root / kind
+        items: dict[str, CatalogEntry] = {}
+        rel_dirs: list[str] = []
+        if base.exists():
+            for dirpath, _dirnames, filenames in os.walk(base):
+                directory = Path(dirpath)
+                rel_dirs.append(directory.relative_to(self.pkg_root).as_posix())
+                for filename in filenames:
+                    if not filename.endswith(".json"):
+                        continue
+                    path = directory / filename
+                    entry = self.entry_for(kind, filename[: -len(".json")], path, path.read_bytes())
+                    items[entry.id] = entry
+        state.entries[kind] = items
+        state.stamps[kind] = dict(self._stamp_records(kind, rel_dirs)) if base.exists() else {}
+        state.sorted_keys.pop(kind, None)
+        self._rewrite(state)
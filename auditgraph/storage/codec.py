@@ -0,0 +1,111 @@
+"""JSON codec used for all artifact I/O.
+
+Two encodings are produced, both with sorted keys and ASCII-only output:
+
+- pretty — ``indent=2``, the historical layout of record files and
+  manifests. Files that feed hashes and the workspace catalog keep it.
+- compact — no whitespace (``separators=(",", ":")``), for machine-only
+  artifacts: indexes, adjacency, packed/SQLite payloads and provenance.
+
+When ``orjson`` is installed it is used for both encoding and decoding,
+and the stdlib ``json`` module is the fallback. The bytes are the same
+whichever codec runs. orjson output is accepted only if it is pure
+ASCII, has no DEL byte and no exponent-form float. Anything else is
+re-encoded with the stdlib, which escapes non-ASCII, writes ``1e-07``
+rather than ``1e-7``, and handles non-string keys and very large ints.
+Non-finite floats are not valid JSON and are the one exception: the
+stdlib writes ``NaN``/``Infinity``, while orjson writes ``null``.
+
+``AUDITGRAPH_JSON_CODEC=stdlib`` (or ``use_codec``) forces the fallback,
+for example to check determinism (see ``scripts/bench_codec.py``).
+"""
+from __future__ import annotations
+
+import json
+import os
+import re
+from contextlib import contextmanager
+from typing import Any, Iterator
+
+CODEC_AUTO = "auto"
+CODEC_STDLIB = "stdlib"
+CODEC_ORJSON = "orjson"
+CODECS: tuple[str, ...] = (CODEC_AUTO, CODEC_STDLIB, CODEC_ORJSON)
+
+CODEC_ENV = "AUDITGRAPH_JSON_CODEC"
+
+# A number in exponent form directly follows ``:``, ``,`` or ``[`` (or a
+# newline plus indent in pretty output). Matches inside strings only cost
+# a stdlib re-encode.
+_EXPONENT_FLOAT = re.compile(rb"(?:[:,\[]|\n) *-?\d+(?:\.\d+)?e")
+
+try:
+    import orjson as _orjson
+except ImportError:  # pragma: no cover - depends on the environment
+    _orjson = None
+
+_forced: str | None = None
+
+
+def available_codecs() -> tuple[str, ...]:
+    return (CODEC_STDLIB, CODEC_ORJSON) if _orjson is not None else (CODEC_STDLIB,)
+
+
+def active_codec() -> str:
+    """Resolve ``use_codec`` / ``AUDITGRAPH_JSON_CODEC`` / auto-detection."""
+    requested = _forced or os.environ.get(CODEC_ENV, CODEC_AUTO).strip().lower() or CODEC_AUTO
+    if requested not in CODECS:
+        raise ValueError(f"Unknown JSON codec: {requested!r} (expected one of {CODECS})")
+    if requested == CODEC_STDLIB or _orjson is None:
+        return CODEC_STDLIB
+    return CODEC_ORJSON
+
+
+@contextmanager
+def use_codec(name: str) -> Iterator[None]:
+    """Force ``name`` for the duration of the block."""
+    global _forced
+    if name not in CODECS:
+        raise ValueError(f"Unknown JSON codec: {name!r} (expected one of {CODECS})")
+    previous = _forced
+    _forced = name
+    try:
+        yield
+    finally:
+        _forced = previous
+
+
+def _stdlib_dumps(payload: Any, pretty: bool) -> bytes:
+    if pretty:
+        return json.dumps(payload, indent=2, sort_keys=True).encode("utf-8")
+    return json.dumps(payload, sort_keys=True, separators=(",", ":")).encode("utf-8")
+
+
+def dumps(payload: Any, *, pretty: bool = False) -> bytes:
+    """Encode ``payload`` as sorted-key JSON bytes (compact unless ``pretty``)."""
+    if active_codec() == CODEC_ORJSON:
+        # Passthrough options make orjson reject the same types the stdlib does.
+        option = (
+            _orjson.OPT_SORT_KEYS
+            | _orjson.OPT_PASSTHROUGH_DATACLASS
+            | _orjson.OPT_PASSTHROUGH_DATETIME
+            | (_orjson.OPT_INDENT_2 if pretty else 0)
+        )
+        try:
+            data = _orjson.dumps(payload, option=option)
+        except (TypeError, _orjson.JSONEncodeError):
+            data = None
+        if data is not None and data.isascii() and b"\x7f" not in data and not _EXPONENT_FLOAT.search(data):
+            return data
+    return _stdlib_dumps(payload, pretty)
+
+
+def loads(data: bytes | str) -> Any:
+    """Decode JSON text; the stdlib handles what orjson rejects (``NaN``,
+    integers beyond 64 bits)."""
+    if active_codec() == CODEC_ORJSON:
+        try:
+            return _orjson.loads(data)
+        except _orjson.JSONDecodeError:
+            pass
+    return json.loads(data)
@@ -0,0 +1,106 @@
+"""Optional compressed framing for JSON artifacts.
+
+``storage.compression`` selects how record files are written:
+
+- ``none`` — plain ``indent=2`` JSON (default).
+- ``gzip`` — compact JSON in a gzip frame (stdlib, ``mtime=0`` so output
+  is byte-for-byte deterministic).
+- ``zstd`` — compact JSON in a zstd frame. Requires the optional
+  ``zstandard`` package; without it writes fall back to gzip.
+
+Readers never need the setting: ``read_json`` detects the frame from the
+leading magic bytes, so compressed and plain files can coexist in one
+profile (e.g. after toggling the option).
+"""
+from __future__ import annotations
+
+import gzip
+import logging
+import struct
+from pathlib import Path
+from typing import Any
+
+from auditgraph.errors import CompatibilityError
+
+logger = logging.getLogger(__name__)
+
+COMPRESSION_NONE = "none"
+COMPRESSION_GZIP = "gzip"
+COMPRESSION_ZSTD = "zstd"
+COMPRESSIONS: tuple[str, ...] = (COMPRESSION_NONE, COMPRESSION_GZIP, COMPRESSION_ZSTD)
+
+GZIP_MAGIC = b"\x1f\x8b"
+ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+
+GZIP_LEVEL = 6
+ZSTD_LEVEL = 3
+
+_zstd_warned = False
+
+
+def _zstandard() -> Any:
+    try:
+        import zstandard
+    except ImportError:
+        return None
+    return zstandard
+
+
+def resolve_compression(name: str) -> str:
+    """Validate ``name`` and downgrade ``zstd`` to ``gzip`` when the
+    ``zstandard`` package is not installed."""
+    global _zstd_warned
+    if name not in COMPRESSIONS:
+        raise ValueError(f"Unknown storage compression: {name!r} (expected one of {COMPRESSIONS})")
+    if name == COMPRESSION_ZSTD and _zstandard() is None:
+        if not _zstd_warned:
+            logger.warning("zstandard is not installed; compressing artifacts with gzip instead.")
+            _zstd_warned = True
+        return COMPRESSION_GZIP
+    return name
+
+
+def compress(data: bytes, compression: str) -> bytes:
+    codec = resolve_compression(compression)
+    if codec == COMPRESSION_GZIP:
+        return gzip.compress(data, compresslevel=GZIP_LEVEL, mtime=0)
+    if codec == COMPRESSION_ZSTD:
+        return _zstandard().ZstdCompressor(level=ZSTD_LEVEL, write_content_size=True).compress(data)
+    return data
+
+
+def is_framed(data: bytes) -> bool:
+    return data.startswith(GZIP_MAGIC) or data.startswith(ZSTD_MAGIC)
+
+
+def decompress(data: bytes) -> bytes:
+    """Return the payload of a gzip/zstd frame; other data is returned as-is."""
+    if data.startswith(GZIP_MAGIC):
+        return gzip.decompress(data)
+    if data.startswith(ZSTD_MAGIC):
+        zstandard = _zstandard()
+        if zstandard is None:
+            raise CompatibilityError("Artifact is zstd-compressed but the zstandard package is not installed")
+        return zstandard.ZstdDecompressor().decompress(data)
+    return data
+
+
+def logical_size(path: Path) -> int:
+    """Return the uncompressed size of ``path`` without decompressing it.
+
+    Uses the gzip ISIZE trailer or the zstd frame content size; plain files
+    (and frames that do not record a size) report their on-disk size.
+    """
+    size = path.stat().st_size
+    with open(path, "rb") as handle:
+        head = handle.read(18)
+        if head.startswith(GZIP_MAGIC) and size >= 18:
+            handle.seek(size - 4)
+            return struct.unpack("<I", handle.read(4))[0]
+    if head.startswith(ZSTD_MAGIC):
+        zstandard = _zstandard()
+        if zstandard is not None:
+            content_size = zstandard.frame_content_size(head)
+            if content_size >= 0:
+                return int(content_size)
+    return size
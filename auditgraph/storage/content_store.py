@@ -0,0 +1,126 @@
+"""Content-addressed bodies for chunks and segments.
+
+Chunk and segment IDs include the document ID, so text repeated across
+documents (boilerplate notes, templated PDFs, pasted log excerpts) used to
+be stored once per copy. ``write_document_artifacts`` now stores each
+distinct text once as a ``bodies`` record keyed by its SHA-256
+(``txt_<sha256>``). Chunk and segment records become references: they keep
+their ordering, offset and provenance fields, drop ``text``, and gain
+``text_hash`` (the body ID) and ``text_length``.
+
+``BodyReader`` restores ``text`` when records are read back, with one body
+load per distinct hash. ``storage.loaders`` uses ``BodyReader.restore``,
+which also drops the reference fields, so callers of
+``load_chunk``/``iter_chunks``/``load_chunks`` (and JSON exports) see the
+same records as before. Records written before the split still carry ``text`` inline and
+pass through unchanged.
+"""
+from __future__ import annotations
+
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Any, Iterable, Iterator
+
+from auditgraph.storage.hashing import sha256_text
+
+if TYPE_CHECKING:
+    from auditgraph.storage.backends import StorageBackend
+
+BODY_KIND = "bodies"
+BODY_PREFIX = "txt_"
+BODY_FIELD = "text_hash"
+LENGTH_FIELD = "text_length"
+
+# Record kinds whose ``text`` is moved into the body store.
+BODY_KINDS: tuple[str, ...] = ("chunks", "segments")
+
+# Bodies kept in memory while streaming records; duplicates are rarely
+# adjacent in ID order, so this bounds memory rather than guaranteeing hits.
+BODY_CACHE_SIZE = 4096
+
+
+def body_id(text: str) -> str:
+    return f"{BODY_PREFIX}{sha256_text(text)}"
+
+
+def body_key(record: dict[str, Any]) -> str:
+    """Body ID of ``record`` whether it is a reference or carries ``text``."""
+    identifier = record.get(BODY_FIELD)
+    if isinstance(identifier, str) and identifier:
+        return identifier
+    return body_id(str(record.get("text", "")))
+
+
+def split_bodies(records: Iterable[dict[str, Any]]) -> tuple[list[dict[str, Any]], dict[str, dict[str, Any]]]:
+    """Return ``(references, bodies)`` for ``records``.
+
+    Records without a string ``text`` are passed through as-is. ``bodies``
+    maps body ID to the ``bodies`` record, one per distinct text.
+    """
+    references: list[dict[str, Any]] = []
+    bodies: dict[str, dict[str, Any]] = {}
+    for record in records:
+        text = record.get("text")
+        if not isinstance(text, str):
+            references.append(record)
+            continue
+        identifier = body_id(text)
+        bodies.setdefault(identifier, {"body_id": identifier, "text": text})
+        reference = {key: value for key, value in record.items() if key != "text"}
+        reference[BODY_FIELD] = identifier
+        reference[LENGTH_FIELD] = len(text)
+        references.append(reference)
+    return references, bodies
+
+
+def write_bodies(backend: StorageBackend, bodies: dict[str, dict[str, Any]]) -> int:
+    """Write the bodies not already in the store; return how many were new."""
+    fresh = [body for identifier, body in sorted(bodies.items()) if not backend.exists(BODY_KIND, identifier)]
+    if fresh:
+        backend.write(BODY_KIND, fresh)
+    return len(fresh)
+
+
+class BodyReader:
+    """Restores ``text`` on reference records, caching recently read bodies."""
+
+    def __init__(self, backend: StorageBackend, *, cache_size: int = BODY_CACHE_SIZE) -> None:
+        self.backend = backend
+        self.cache_size = cache_size
+        self._cache: OrderedDict[str, str] = OrderedDict()
+        self.loads = 0
+
+    def text(self, identifier: str) -> str:
+        cached = self._cache.get(identifier)
+        if cached is not None:
+            self._cache.move_to_end(identifier)
+            return cached
+        text = str(self.backend.load(BODY_KIND, identifier).get("text", ""))
+        self.loads += 1
+        self._cache[identifier] = text
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return text
+
+    def hydrate(self, record: dict[str, Any]) -> dict[str, Any]:
+        identifier = record.get(BODY_FIELD)
+        if "text" in record or not isinstance(identifier, str) or not identifier:
+            return record
+        return {**record, "text": self.text(identifier)}
+
+    def hydrate_all(self, records: Iterable[dict[str, Any]]) -> Iterator[dict[str, Any]]:
+        for record in records:
+            yield self.hydrate(record)
+
+    def restore(self, record: dict[str, Any]) -> dict[str, Any]:
+        """The record as written before the body split: ``text`` inline and
+        no ``text_hash``/``text_length``."""
+        identifier = record.get(BODY_FIELD)
+        if "text" in record or not isinstance(identifier, str) or not identifier:
+            return record
+        restored = {key: value for key, value in record.items() if key not in (BODY_FIELD, LENGTH_FIELD)}
+        restored["text"] = self.text(identifier)
+        return restored
+
+    def restore_all(self, records: Iterable[dict[str, Any]]) -> Iterator[dict[str, Any]]:
+        for record in records:
+            yield self.restore(record)
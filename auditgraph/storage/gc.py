@@ -0,0 +1,311 @@
+"""Garbage collection for a profile store.
+
+Stages only ever add artifacts, so records for deleted sources, stale
+co-occurrence links, superseded chunks and old ``runs/*`` directories
+accumulate. ``collect_garbage`` computes the live set from one complete
+run (by default the most recently indexed one) and removes the rest:
+
+- ``entities``, ``links``, ``claims`` — live when listed in the artifacts
+  of the run's ``runs/<run_id>/*-manifest.json`` files (every stage
+  rewrites all of its records, so the manifests name the full set).
+- ``sources`` — live when listed in the run's ingest manifest.
+- ``documents`` — live when their ``source_hash`` is a live source.
+- ``chunks`` — live when their document is live and either their own
+  ``source_hash`` is a live source or the run's manifests list them.
+  Document IDs only depend on the path, so this is what drops the chunks
+  of an earlier version of an edited file.
+- ``segments`` — live when their document is live and a live chunk lists
+  them in ``segment_ids`` (or the manifests do). Records written without
+  ``source_hash`` / ``segment_ids`` fall back to the document's liveness.
+- ``bodies`` — live while a live chunk or segment references them.
+- ``runs`` — the live run plus the ``keep_runs - 1`` most recent others
+  are kept; removed runs take their provenance logs with them.
+
+The live set assumes the chosen run is a full rebuild; an ``import`` run
+only covers the files it imported. With ``dry_run`` nothing is touched and
+the report lists what would be reclaimed. With ``archive_dir`` removed
+records are appended to ``<archive_dir>/<kind>.jsonl`` and removed run
+directories are moved there before deletion.
+"""
+from __future__ import annotations
+
+import shutil
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Iterable
+
+from auditgraph.errors import GarbageCollectionError
+from auditgraph.storage.artifacts import ensure_dir, read_json
+from auditgraph.storage.backends import StorageBackend, get_backend
+from auditgraph.storage.codec import dumps
+from auditgraph.storage.content_store import BODY_FIELD, BODY_KIND
+
+GC_RECORD_KINDS: tuple[str, ...] = ("entities", "links", "claims", "chunks", "segments", BODY_KIND)
+GC_FILE_KINDS: tuple[str, ...] = ("sources", "documents")
+REQUIRED_STAGES: tuple[str, ...] = ("ingest", "extract", "link", "index")
+
+
+@dataclass
+class GcCategory:
+    count: int = 0
+    bytes: int = 0
+
+    def add(self, size: int) -> None:
+        self.count += 1
+        self.bytes += size
+
+    def to_dict(self) -> dict[str, int]:
+        return {"count": self.count, "bytes": self.bytes}
+
+
+@dataclass
+class GcReport:
+    run_id: str
+    dry_run: bool
+    removed: dict[str, GcCategory] = field(default_factory=dict)
+    kept: dict[str, int] = field(default_factory=dict)
+    runs_removed: list[str] = field(default_factory=list)
+    compaction_bytes: int = 0
+    archive: str | None = None
+
+    @property
+    def total_count(self) -> int:
+        return sum(category.count for category in self.removed.values())
+
+    @property
+    def total_bytes(self) -> int:
+        return sum(category.bytes for category in self.removed.values()) + self.compaction_bytes
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "run_id": self.run_id,
+            "dry_run": self.dry_run,
+            "removed": {name: category.to_dict() for name, category in self.removed.items()},
+            "kept": dict(self.kept),
+            "runs_removed": list(self.runs_removed),
+            "compaction_bytes": self.compaction_bytes,
+            "total": {"count": self.total_count, "bytes": self.total_bytes},
+            "archive": self.archive,
+        }
+
+
+def _is_complete(run_dir: Path) -> bool:
+    return all((run_dir / f"{stage}-manifest.json").exists() for stage in REQUIRED_STAGES)
+
+
+def latest_complete_run(pkg_root: Path) -> str | None:
+    """Return the run whose index manifest was written last, among runs that
+    have every stage manifest."""
+    runs_dir = pkg_root / "runs"
+    if not runs_dir.exists():
+        return None
+    candidates = [
+        ((entry / "index-manifest.json").stat().st_mtime_ns, entry.name)
+        for entry in runs_dir.iterdir()
+        if entry.is_dir() and _is_complete(entry)
+    ]
+    return max(candidates)[1] if candidates else None
+
+
+def _artifact_key(artifact: str) -> tuple[str, str] | None:
+    """Map a manifest artifact path to ``(kind, id)``.
+
+    Handles the three backend spellings: ``<kind>/<shard>/<id>.json``
+    (files), ``packed/<kind>/seg-N.pack#<id>`` and ``graph.sqlite#<kind>/<id>``.
+    """
+    location, _, fragment = artifact.partition("#")
+    if fragment:
+        if "/" in fragment:
+            kind, _, identifier = fragment.partition("/")
+        else:
+            kind, identifier = Path(location).parent.name, fragment
+    else:
+        path = Path(location)
+        if path.suffix != ".json":
+            return None
+        identifier = path.stem
+        kind = path.parent.name if path.parent.name in GC_FILE_KINDS else path.parent.parent.name
+    if kind in GC_RECORD_KINDS or kind in GC_FILE_KINDS:
+        return kind, identifier
+    return None
+
+
+def _live_manifest_ids(run_dir: Path) -> dict[str, set[str]]:
+    live: dict[str, set[str]] = {kind: set() for kind in GC_RECORD_KINDS + GC_FILE_KINDS}
+    for manifest_path in sorted(run_dir.glob("*-manifest.json")):
+        manifest = read_json(manifest_path)
+        for artifact in manifest.get("artifacts", []) if isinstance(manifest, dict) else []:
+            key = _artifact_key(str(artifact))
+            if key is not None:
+                live[key[0]].add(key[1])
+    return live
+
+
+def _dir_bytes(path: Path) -> int:
+    return sum(entry.stat().st_size for entry in path.rglob("*") if entry.is_file())
+
+
+def _run_order(run_dir: Path) -> int:
+    for name in ("index-manifest.json", "ingest-manifest.json"):
+        manifest = run_dir / name
+        if manifest.exists():
+            return manifest.stat().st_mtime_ns
+    return run_dir.stat().st_mtime_ns
+
+
+def _archive_records(archive_dir: Path, kind: str, records: Iterable[dict[str, Any]]) -> None:
+    ensure_dir(archive_dir)
+    with open(archive_dir / f"{kind}.jsonl", "ab") as handle:
+        for record in records:
+            handle.write(dumps(record) + b"\n")
+
+
+def collect_garbage(
+    pkg_root: Path,
+    *,
+    run_id: str | None = None,
+    dry_run: bool = False,
+    keep_runs: int = 1,
+    archive_dir: Path | None = None,
+) -> GcReport:
+    """Remove artifacts unreachable from ``run_id`` (default: latest complete run)."""
+    resolved = run_id or latest_complete_run(pkg_root)
+    if not resolved:
+        raise GarbageCollectionError("No complete run (ingest through index) found; nothing to collect against")
+    run_dir = pkg_root / "runs" / resolved
+    if not _is_complete(run_dir):
+        raise GarbageCollectionError(f"Run {resolved} is missing stage manifests; refusing to collect garbage")
+
+    backend = get_backend(pkg_root)
+    live = _live_manifest_ids(run_dir)
+    report = GcReport(run_id=resolved, dry_run=dry_run, archive=str(archive_dir) if archive_dir else None)
+
+    # Sources and documents are plain files under the profile root.
+    source_dir = pkg_root / "sources"
+    dead_sources = sorted(
+        path for path in (source_dir.glob("*.json") if source_dir.exists() else []) if path.stem not in live["sources"]
+    )
+    live_sources = live["sources"]
+    live_documents: set[str] = set()
+    dead_documents: list[Path] = []
+    document_dir = pkg_root / "documents"
+    for path in sorted(document_dir.glob("*.json")) if document_dir.exists() else []:
+        document = read_json(path)
+        if str(document.get("source_hash", "")) in live_sources:
+            live_documents.add(path.stem)
+        else:
+            dead_documents.append(path)
+    report.kept["sources"] = len(live_sources)
+    report.kept["documents"] = len(live_documents)
+
+    dead_records: dict[str, list[str]] = {}
+    # Chunks and segments come before bodies in GC_RECORD_KINDS, so every
+    # live reference is known when bodies are checked.
+    live_bodies: set[str] = set()
+    # Chunks come before segments, so the segments live chunks use are
+    # known when segments are checked.
+    live_segments: set[str] = set()
+    unlisted_segment_documents: set[str] = set()
+    for kind in GC_RECORD_KINDS:
+        if kind in ("chunks", "segments"):
+            ids: list[str] = []
+            for record in backend.iter_records(kind):
+                identifier = str(record.get("chunk_id" if kind == "chunks" else "segment_id", ""))
+                document_id = str(record.get("document_id", ""))
+                if kind == "chunks":
+                    source_hash = record.get("source_hash")
+                    alive = document_id in live_documents and (
+                        source_hash is None or str(source_hash) in live_sources or identifier in live[kind]
+                    )
+                else:
+                    alive = document_id in live_documents and (
+                        identifier in live_segments
+                        or identifier in live[kind]
+                        or document_id in unlisted_segment_documents
+                    )
+                if not alive:
+                    ids.append(identifier)
+                    continue
+                if record.get(BODY_FIELD):
+                    live_bodies.add(str(record[BODY_FIELD]))
+                if kind == "chunks":
+                    segment_ids = record.get("segment_ids")
+                    if isinstance(segment_ids, list):
+                        live_segments.update(str(segment_id) for segment_id in segment_ids)
+                    else:
+                        unlisted_segment_documents.add(document_id)
+            dead = sorted(identifier for identifier in ids if identifier)
+            report.kept[kind] = len(backend.iter_ids(kind)) - len(dead)
+        else:
+            all_ids = backend.iter_ids(kind)
+            alive = live_bodies if kind == BODY_KIND else live[kind]
+            dead = [identifier for identifier in all_ids if identifier not in alive]
+            report.kept[kind] = len(all_ids) - len(dead)
+        dead_records[kind] = dead
+
+    runs_dir = pkg_root / "runs"
+    others = sorted(
+        (entry for entry in runs_dir.iterdir() if entry.is_dir() and entry.name != resolved),
+        key=_run_order,
+        reverse=True,
+    )
+    dead_runs = others[max(keep_runs - 1, 0) :]
+    provenance_dir = pkg_root / "provenance"
+    dead_provenance = [
+        path
+        for run in dead_runs
+        for path in (provenance_dir / f"{run.name}{suffix}" for suffix in (".jsonl", ".idx", ".json"))
+        if path.exists()
+    ]
+    report.kept["runs"] = len(others) - len(dead_runs) + 1
+
+    # -- report ---------------------------------------------------------------
+    for name, paths in (("sources", dead_sources), ("documents", dead_documents), ("provenance", dead_provenance)):
+        category = report.removed.setdefault(name, GcCategory())
+        for path in paths:
+            category.add(path.stat().st_size)
+    for kind, identifiers in dead_records.items():
+        category = report.removed.setdefault(kind, GcCategory())
+        for identifier in identifiers:
+            category.add(backend.record_size(kind, identifier))
+    runs_category = report.removed.setdefault("runs", GcCategory())
+    for run in dead_runs:
+        runs_category.add(_dir_bytes(run))
+    report.runs_removed = sorted(run.name for run in dead_runs)
+
+    if dry_run:
+        report.compaction_bytes = backend.compact(dry_run=True)
+        return report
+
+    # -- apply ----------------------------------------------------------------
+    if archive_dir is not None:
+        _archive_records(archive_dir, "sources", (read_json(path) for path in dead_sources))
+        _archive_records(archive_dir, "documents", (read_json(path) for path in dead_documents))
+        for kind, identifiers in dead_records.items():
+            _archive_records(archive_dir, kind, (backend.load(kind, identifier) for identifier in identifiers))
+    for path in dead_sources + dead_documents:
+        path.unlink()
+    _delete_documents(backend, [path.stem for path in dead_documents])
+    for kind, identifiers in dead_records.items():
+        if identifiers:
+            backend.delete(kind, identifiers)
+    for path in dead_provenance:
+        if archive_dir is not None:
+            ensure_dir(archive_dir / "provenance")
+            shutil.move(str(path), str(archive_dir / "provenance" / path.name))
+        else:
+            path.unlink()
+    for run in dead_runs:
+        if archive_dir is not None:
+            ensure_dir(archive_dir / "runs")
+            shutil.move(str(run), str(archive_dir / "runs" / run.name))
+        else:
+            shutil.rmtree(run)
+    report.compaction_bytes = backend.compact()
+    return report
+
+
+def _delete_documents(backend: StorageBackend, identifiers: list[str]) -> None:
+    # Backends that mirror documents (sqlite) hold a second copy.
+    if identifiers and "documents" in backend.kinds:
+        backend.delete("documents", identifiers)
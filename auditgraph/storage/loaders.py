@@ -1,54 +1,104 @@
 from __future__ import annotations
 
-import json
 from pathlib import Path
-from typing import Iterator
+from typing import Any, Callable, Iterator
 
 from auditgraph.index.type_index import sanitize_type_name
 from auditgraph.storage.artifacts import read_json
+from auditgraph.storage.backends import StorageBackend, get_backend, record_id
+from auditgraph.storage.codec import loads
+from auditgraph.storage.content_store import BodyReader
 
 
-def _entity_path(pkg_root: Path, entity_id: str) -> Path:
-    token = entity_id.split("_", 1)[-1]
-    shard = token[:2] if token else entity_id[:2]
-    return pkg_root / "entities" / shard / f"{entity_id}.json"
+def load_entity(pkg_root: Path, entity_id: str) -> dict[str, object]:
+    return get_backend(pkg_root).load("entities", entity_id)
 
 
-def load_entity(pkg_root: Path, entity_id: str) -> dict[str, object]:
-    path = _entity_path(pkg_root, entity_id)
-    return read_json(path)
+def iter_entities(pkg_root: Path, *, prefix: str | None = None) -> Iterator[dict[str, object]]:
+    """Yield entities in ID order, optionally restricted to an ID prefix."""
+    yield from get_backend(pkg_root).iter_records("entities", prefix=prefix)
 
 
 def load_entities(pkg_root: Path, *, sorted_by_id: bool = False) -> list[dict[str, object]]:
-    entities_dir = pkg_root / "entities"
-    if not entities_dir.exists():
-        return []
-    entities: list[dict[str, object]] = []
-    for path in entities_dir.rglob("*.json"):
-        entities.append(read_json(path))
+    entities = list(iter_entities(pkg_root))
     if sorted_by_id:
-        entities.sort(key=lambda item: str(item.get("id", "")))
+        entities.sort(key=_entity_key)
     return entities
 
 
-def load_documents(pkg_root: Path) -> list[dict[str, object]]:
+def _entity_key(record: dict[str, object]) -> str:
+    return str(record.get("id", ""))
+
+
+def _chunk_key(record: dict[str, object]) -> tuple[str, int]:
+    return str(record.get("document_id", "")), int(record.get("order", 0))
+
+
+def _iter_sorted(
+    backend: StorageBackend,
+    kind: str,
+    key: Callable[[dict[str, object]], Any],
+) -> Iterator[dict[str, object]]:
+    """Yield ``kind`` records in stable ``key`` order holding only the keys.
+
+    A first scan collects the keys. When the store order already matches,
+    a second sequential scan yields the records; otherwise they are loaded
+    one at a time by ID in sorted order.
+    """
+    records = enumerate(backend.iter_records(kind))
+    keys = [(key(record), position, record_id(kind, record)) for position, record in records]
+    if all(keys[index][0] <= keys[index + 1][0] for index in range(len(keys) - 1)):
+        yield from backend.iter_records(kind)
+        return
+    keys.sort()
+    for _, _, identifier in keys:
+        yield backend.load(kind, identifier)
+
+
+def iter_sorted_entities(pkg_root: Path) -> Iterator[dict[str, object]]:
+    """Yield entities in ``load_entities(sorted_by_id=True)`` order without
+    holding them all in memory."""
+    yield from _iter_sorted(get_backend(pkg_root), "entities", _entity_key)
+
+
+def iter_documents(pkg_root: Path) -> Iterator[dict[str, object]]:
     documents_dir = pkg_root / "documents"
     if not documents_dir.exists():
-        return []
-    records: list[dict[str, object]] = []
+        return
     for path in sorted(documents_dir.rglob("*.json"), key=lambda item: item.as_posix()):
-        records.append(read_json(path))
-    return records
+        yield read_json(path)
+
+
+def load_documents(pkg_root: Path) -> list[dict[str, object]]:
+    return list(iter_documents(pkg_root))
+
+
+def load_chunk(pkg_root: Path, chunk_id: str) -> dict[str, object]:
+    backend = get_backend(pkg_root)
+    return BodyReader(backend).restore(backend.load("chunks", chunk_id))
+
+
+def iter_chunks(pkg_root: Path) -> Iterator[dict[str, object]]:
+    """Yield chunks in chunk-ID order (no document/order sort), with ``text``
+    restored from the body store."""
+    backend = get_backend(pkg_root)
+    yield from BodyReader(backend).restore_all(backend.iter_records("chunks"))
 
 
 def load_chunks(pkg_root: Path) -> list[dict[str, object]]:
-    chunks_dir = pkg_root / "chunks"
-    if not chunks_dir.exists():
-        return []
-    records: list[dict[str, object]] = []
-    for path in sorted(chunks_dir.rglob("*.json"), key=lambda item: item.as_posix()):
-        records.append(read_json(path))
-    return sorted(records, key=lambda item: (str(item.get("document_id", "")), int(item.get("order", 0))))
+    backend = get_backend(pkg_root)
+    records = list(backend.iter_records("chunks"))
+    # Every record is in memory anyway, so each distinct body is read once.
+    reader = BodyReader(backend, cache_size=max(len(records), 1))
+    records = list(reader.restore_all(records))
+    return sorted(records, key=_chunk_key)
+
+
+def iter_sorted_chunks(pkg_root: Path) -> Iterator[dict[str, object]]:
+    """Yield chunks in ``load_chunks`` order (document, then position),
+    with ``text`` restored, without holding them all in memory."""
+    backend = get_backend(pkg_root)
+    yield from BodyReader(backend).restore_all(_iter_sorted(backend, "chunks", _chunk_key))
 
 
 def load_entities_by_type(pkg_root: Path, entity_type: str) -> Iterator[dict[str, object]]:
@@ -58,38 +108,44 @@ def load_entities_by_type(pkg_root: Path, entity_type: str) -> Iterator[dict[str
     then loads each entity via load_entity().
     Yields dicts (generator, not list).
     """
-    index_file = pkg_root / "indexes" / "types" / f"{sanitize_type_name(entity_type)}.json"
-    if not index_file.exists():
-        return
-    entity_ids = json.loads(index_file.read_text())
-    for entity_id in entity_ids:
+    for entity_id in load_type_ids(pkg_root, entity_type) or []:
         yield load_entity(pkg_root, entity_id)
 
 
+def load_type_ids(pkg_root: Path, entity_type: str) -> list[str] | None:
+    """Sorted IDs of entities of ``entity_type`` from the type index.
+
+    Returns ``[]`` for a type with no index file and ``None`` when the
+    store has no type indexes at all (index stage not run).
+    """
+    types_dir = pkg_root / "indexes" / "types"
+    index_file = types_dir / f"{sanitize_type_name(entity_type)}.json"
+    if not index_file.exists():
+        return [] if types_dir.is_dir() else None
+    return [str(entity_id) for entity_id in loads(index_file.read_bytes())]
+
+
+def load_link(pkg_root: Path, link_id: str) -> dict[str, object]:
+    return get_backend(pkg_root).load("links", link_id)
+
+
 def load_links(pkg_root: Path) -> Iterator[dict[str, object]]:
-    """Iterate all link files. Generator over rglob('*.json')."""
-    links_dir = pkg_root / "links"
-    if not links_dir.exists():
-        return
-    for path in sorted(links_dir.rglob("*.json"), key=lambda p: p.name):
-        yield json.loads(path.read_text())
+    """Iterate all links in link-ID order."""
+    yield from get_backend(pkg_root).iter_records("links")
 
 
 def load_links_by_type(pkg_root: Path, link_type: str) -> Iterator[dict[str, object]]:
     """Load links of a specific type using the link-type index.
 
     Reads indexes/link-types/<sanitized_type>.json for the ID list,
-    then loads each link file.
+    then loads each link record.
     Yields dicts.
     """
     index_file = pkg_root / "indexes" / "link-types" / f"{sanitize_type_name(link_type)}.json"
     if not index_file.exists():
         return
-    link_ids = json.loads(index_file.read_text())
-    links_dir = pkg_root / "links"
+    link_ids = loads(index_file.read_bytes())
+    backend = get_backend(pkg_root)
     for link_id in link_ids:
-        token = link_id.split("_", 1)[-1]
-        shard = token[:2] if token else link_id[:2]
-        path = links_dir / shard / f"{link_id}.json"
-        if path.exists():
-            yield json.loads(path.read_text())
+        if backend.exists("links", link_id):
+            yield backend.load("links", link_id)
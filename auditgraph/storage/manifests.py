@@ -70,6 +70,12 @@ class StageManifest:
     # Spec-028 US6 (BUG-3 fix): see IngestManifest.wall_clock_started_at.
     wall_clock_started_at: str | None = None
     wall_clock_finished_at: str | None = None
+    # Record-file write throughput (storage.bulk_writer.WriteStats). Timing
+    # data like the wall-clock fields; never part of outputs_hash.
+    write_stats: dict[str, Any] = field(default_factory=dict)
+    # Build time and working memory of index sub-stages (index stage
+    # only, e.g. ``{"clusters": ClusterStats}``); timing data as above.
+    index_stats: dict[str, Any] = field(default_factory=dict)
 
     def to_dict(self) -> dict[str, Any]:
         return asdict(self)
@@ -1,10 +1,24 @@
+"""Per-run provenance log.
+
+Each run appends to ``provenance/<run_id>.jsonl`` (one compact JSON record
+per line) and to a sidecar index ``provenance/<run_id>.idx`` holding one
+``artifact_id<TAB>offset<TAB>length`` line per record. Stages only ever
+append, so writing provenance costs O(records written) rather than
+rewriting the whole run, and ``lookup_provenance`` answers "which rule and
+input produced artifact X" by scanning the small index and seeking to the
+matching lines.
+
+Profiles written before the log existed keep ``provenance/<run_id>.json``
+(a JSON list); the readers below fall back to it.
+"""
 from __future__ import annotations
 
 from dataclasses import asdict, dataclass
 from pathlib import Path
-from typing import Iterable
+from typing import Any, Iterable, Iterator
 
-from auditgraph.storage.artifacts import read_json, write_json
+from auditgraph.storage.artifacts import ensure_dir, read_json
+from auditgraph.storage.codec import dumps, loads
 
 
 @dataclass(frozen=True)
@@ -20,11 +34,116 @@ class ProvenanceRecord:
         return asdict(self)
 
 
+def provenance_dir(pkg_root: Path) -> Path:
+    return pkg_root / "provenance"
+
+
+def provenance_log_path(pkg_root: Path, run_id: str) -> Path:
+    return provenance_dir(pkg_root) / f"{run_id}.jsonl"
+
+
+def _index_path(log_path: Path) -> Path:
+    return log_path.with_suffix(".idx")
+
+
+def _legacy_path(pkg_root: Path, run_id: str) -> Path:
+    return provenance_dir(pkg_root) / f"{run_id}.json"
+
+
 def write_provenance_index(pkg_root: Path, run_id: str, records: Iterable[ProvenanceRecord]) -> Path:
-    path = pkg_root / "provenance" / f"{run_id}.json"
-    existing: list[dict[str, object]] = []
-    if path.exists():
-        existing = list(read_json(path))
-    payload = existing + [record.to_dict() for record in records]
-    write_json(path, payload)
-    return path
+    """Append ``records`` to the run's provenance log and index."""
+    log_path = provenance_log_path(pkg_root, run_id)
+    ensure_dir(log_path.parent)
+    lines: list[bytes] = []
+    index_lines: list[str] = []
+    with open(log_path, "ab") as log:
+        offset = log.tell()
+        for record in records:
+            line = dumps(record.to_dict()) + b"\n"
+            lines.append(line)
+            index_lines.append(f"{record.artifact_id}\t{offset}\t{len(line)}\n")
+            offset += len(line)
+        log.write(b"".join(lines))
+    with open(_index_path(log_path), "a", encoding="utf-8") as index:
+        index.write("".join(index_lines))
+    return log_path
+
+
+def _read_index(log_path: Path) -> list[tuple[str, int, int]]:
+    """Return ``(artifact_id, offset, length)`` for every line of ``log_path``.
+
+    Lines appended to the log without a matching index entry (e.g. after an
+    interrupted write) are recovered by scanning the unindexed tail.
+    """
+    entries: list[tuple[str, int, int]] = []
+    index_path = _index_path(log_path)
+    if index_path.exists():
+        for raw in index_path.read_text(encoding="utf-8").splitlines():
+            parts = raw.split("\t")
+            if len(parts) == 3:
+                entries.append((parts[0], int(parts[1]), int(parts[2])))
+    indexed_end = max((offset + length for _, offset, length in entries), default=0)
+    if log_path.stat().st_size > indexed_end:
+        with open(log_path, "rb") as log:
+            log.seek(indexed_end)
+            offset = indexed_end
+            for line in log:
+                if line.endswith(b"\n"):
+                    try:
+                        artifact_id = str(loads(line).get("artifact_id", ""))
+                    except ValueError:
+                        artifact_id = ""
+                    entries.append((artifact_id, offset, len(line)))
+                offset += len(line)
+    return entries
+
+
+def iter_provenance(pkg_root: Path, run_id: str) -> Iterator[dict[str, Any]]:
+    """Yield every provenance record of ``run_id`` in write order."""
+    log_path = provenance_log_path(pkg_root, run_id)
+    if log_path.exists():
+        with open(log_path, "rb") as log:
+            for line in log:
+                if line.strip():
+                    yield loads(line)
+        return
+    legacy = _legacy_path(pkg_root, run_id)
+    if legacy.exists():
+        yield from read_json(legacy)
+
+
+def load_provenance(pkg_root: Path, run_id: str) -> list[dict[str, Any]]:
+    return list(iter_provenance(pkg_root, run_id))
+
+
+def provenance_runs(pkg_root: Path) -> list[str]:
+    """Run IDs with provenance, sorted."""
+    directory = provenance_dir(pkg_root)
+    if not directory.exists():
+        return []
+    runs = {path.stem for path in directory.iterdir() if path.suffix in (".jsonl", ".json")}
+    return sorted(runs)
+
+
+def lookup_provenance(pkg_root: Path, artifact_id: str, run_id: str | None = None) -> list[dict[str, Any]]:
+    """Return the provenance records for ``artifact_id``.
+
+    Searches ``run_id`` when given, otherwise every run in sorted order.
+    Only the index and the matching log lines are read.
+    """
+    matches: list[dict[str, Any]] = []
+    for run in [run_id] if run_id is not None else provenance_runs(pkg_root):
+        log_path = provenance_log_path(pkg_root, run)
+        if not log_path.exists():
+            matches.extend(
+                record for record in iter_provenance(pkg_root, run) if record.get("artifact_id") == artifact_id
+            )
+            continue
+        hits = [(offset, length) for key, offset, length in _read_index(log_path) if key == artifact_id]
+        if not hits:
+            continue
+        with open(log_path, "rb") as log:
+            for offset, length in hits:
+                log.seek(offset)
+                matches.append(loads(log.read(length)))
+    return matches
@@ -1,17 +1,16 @@
 from __future__ import annotations
 
-import json
 from pathlib import Path
 from typing import Any
 
-from auditgraph.storage.artifacts import ensure_dir
+from auditgraph.storage.artifacts import ensure_dir, json_bytes
 from auditgraph.utils.redaction import RedactionResult, Redactor
 
 
 def write_json_redacted(path: Path, payload: Any, redactor: Redactor) -> RedactionResult:
     result = redactor.redact_payload(payload)
     ensure_dir(path.parent)
-    path.write_text(json.dumps(result.value, indent=2, sort_keys=True), encoding="utf-8")
+    path.write_bytes(json_bytes(result.value))
     return result
 
 
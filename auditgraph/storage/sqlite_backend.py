@@ -0,0 +1,565 @@
+"""SQLite storage backend with indexed columns and query pushdown.
+
+All records for a profile live in ``<pkg_root>/graph.sqlite``. Every table
+keeps the full record as compact JSON in ``payload`` next to the columns
+queries filter on::
+
+    entities   id, type, name, source_path
+    links      id, type, from_id, to_id, rule_id, confidence
+    claims     id, type, subject_id, source_path
+    chunks     id, document_id, source_path, ord
+    segments   id, document_id, source_path
+    documents  id, source_path
+
+``generations`` counts the writes and deletes per kind, plus a random
+token for the database under the empty kind; they make up ``signature``.
+
+Predicates from ``auditgraph list --where`` are compiled to native SQL per
+JSON type of the field: text values compare directly (on the ``type`` and
+``name`` columns, or on ``json_extract(payload, ...)``), numbers compare
+numerically, booleans and string arrays are matched with ``json_type`` and
+``json_each``. The combinations SQL cannot express with the semantics of
+``query.filters.matches`` (``float()`` of a string, ``str()`` of a number
+or object, substrings of array items) fall back to ``ag_match``, a
+registered function applying ``matches`` to the extracted field, so
+pushed-down results are identical to the Python filter path.
+
+``index_entity_fields`` adds expression indexes on ``json_extract`` and
+``json_type`` for the profile's ``search.field_indexes``, so ``=`` and
+range predicates on those fields are index lookups rather than scans.
+"""
+from __future__ import annotations
+
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Any, Iterable, Iterator
+
+from auditgraph.query.filters import FilterPredicate, matches
+from auditgraph.storage.backends import BACKEND_SQLITE, RECORD_KINDS, record_id
+from auditgraph.storage.codec import dumps, loads
+
+SQLITE_FILENAME = "graph.sqlite"
+
+SQLITE_KINDS: tuple[str, ...] = RECORD_KINDS + ("documents",)
+
+_COLUMNS: dict[str, tuple[str, ...]] = {
+    "entities": ("type", "name", "source_path"),
+    "links": ("type", "from_id", "to_id", "rule_id", "confidence"),
+    "claims": ("type", "subject_id", "source_path"),
+    "chunks": ("document_id", "source_path", "ord"),
+    "segments": ("document_id", "source_path"),
+    "bodies": (),
+    "documents": ("source_path",),
+}
+
+_COLUMN_TYPES: dict[str, str] = {"confidence": "REAL", "ord": "INTEGER"}
+
+_INDEXES: tuple[tuple[str, str], ...] = (
+    ("entities", "type"),
+    ("entities", "name"),
+    ("entities", "source_path"),
+    ("links", "from_id"),
+    ("links", "to_id"),
+    ("links", "rule_id"),
+    ("links", "type"),
+    ("claims", "type"),
+    ("claims", "source_path"),
+    ("chunks", "document_id, ord"),
+    ("chunks", "source_path"),
+    ("segments", "document_id"),
+    ("documents", "source_path"),
+)
+
+# SQLite's default SQLITE_MAX_VARIABLE_NUMBER is 999 on older builds.
+_IN_BATCH = 500
+
+# Entity fields whose column holds ``str(record[field])``: for text values
+# the column is the value itself.
+_ENTITY_VALUE_COLUMNS = ("type", "name")
+
+_SQL_OPERATORS = ("=", "!=", ">", ">=", "<", "<=")
+
+# Expression indexes created by ``index_entity_fields`` are named with
+# this prefix so stale ones can be dropped when the field list changes.
+_FIELD_INDEX_PREFIX = "idx_entities_field:"
+
+
+def _source_path(record: dict[str, Any]) -> str | None:
+    value = record.get("source_path")
+    if value:
+        return str(value)
+    refs = record.get("refs")
+    if isinstance(refs, list) and refs and isinstance(refs[0], dict):
+        value = refs[0].get("source_path")
+        if value:
+            return str(value)
+    provenance = record.get("provenance")
+    if isinstance(provenance, dict) and provenance.get("source_file"):
+        return str(provenance["source_file"])
+    return None
+
+
+def _column_values(kind: str, record: dict[str, Any]) -> tuple[object, ...]:
+    values: list[object] = []
+    for column in _COLUMNS[kind]:
+        if column == "source_path":
+            values.append(_source_path(record))
+        elif column == "confidence":
+            confidence = record.get("confidence", 1.0)
+            # Non-numeric confidences are stored as NULL and never filtered
+            # out, matching the adjacency-based neighbors path.
+            values.append(float(confidence) if isinstance(confidence, (int, float)) else None)
+        elif column == "ord":
+            values.append(int(record.get("order", 0)))
+        elif column == "subject_id":
+            subject = record.get("subject_id")
+            values.append(str(subject) if subject is not None else None)
+        else:
+            values.append(str(record.get(column, "")))
+    return tuple(values)
+
+
+def _json_path(field: str) -> str:
+    """JSON path for a filter field; dotted names address nested objects."""
+    return "$" + "".join('."' + part.replace('"', '\\"') + '"' for part in field.split("."))
+
+
+def _sql_literal(text: str) -> str:
+    return "'" + text.replace("'", "''") + "'"
+
+
+def _field_exprs(field: str) -> tuple[str, str]:
+    """``(json_extract, json_type)`` SQL for an entity field, with the path
+    inlined so the expressions match the indexes of ``index_entity_fields``."""
+    path = _sql_literal(_json_path(field))
+    return f"json_extract(payload, {path})", f"json_type(payload, {path})"
+
+
+def _compile_predicate(predicate: FilterPredicate) -> tuple[str, list[object]]:
+    """SQL with the semantics of ``query.filters.matches`` for one predicate.
+
+    The clause is an OR of one branch per JSON type of the field. Every
+    branch has an indexable term, so with the field's expression indexes
+    SQLite answers it with a multi-index OR instead of a scan. Unary ``+``
+    keeps the type guards from being chosen as the index.
+    """
+    operator = predicate.operator
+    value_sql, type_sql = _field_exprs(predicate.field)
+    if predicate.field in _ENTITY_VALUE_COLUMNS and not predicate.is_numeric:
+        value_sql = predicate.field
+    branches: list[str] = []
+    params: list[object] = []
+    # Scalars: strings compare as text, numeric predicates as floats.
+    if not predicate.is_numeric:
+        if operator == "~":
+            branches.append(f"(instr({value_sql}, ?) > 0 AND +{type_sql} = 'text')")
+            params.append(predicate.value)
+        elif operator in _SQL_OPERATORS:
+            branches.append(f"({value_sql} {operator} ? AND +{type_sql} = 'text')")
+            params.append(predicate.value)
+    elif operator in _SQL_OPERATORS:
+        branches.append(f"({value_sql} {operator} ? AND +{type_sql} IN ('integer', 'real'))")
+        params.append(float(predicate.value))
+    # Booleans: true/1/yes against the flag; other operators never match.
+    if operator in ("=", "!="):
+        flag = predicate.value.lower() in ("true", "1", "yes")
+        branches.append(f"{type_sql} = ?")
+        params.append("true" if flag == (operator == "=") else "false")
+    # String arrays: membership.
+    if operator in ("=", "!="):
+        negate = "NOT " if operator == "!=" else ""
+        path = _sql_literal(_json_path(predicate.field))
+        branches.append(
+            f"({type_sql} = 'array' AND {negate}EXISTS (SELECT 1 FROM json_each(entities.payload, {path})"
+            " WHERE json_each.type = 'text' AND json_each.value = ?))"
+        )
+        params.append(predicate.value)
+    # The rest goes through ``matches``.
+    fallback = [
+        *(("text",) if predicate.is_numeric and operator != "~" else ()),
+        *(("integer", "real", "object") if not predicate.is_numeric else ()),
+        *(("array",) if operator == "~" else ()),
+    ]
+    if fallback:
+        branches.append(
+            f"({type_sql} IN ({', '.join(_sql_literal(json_type) for json_type in fallback)})"
+            f" AND ag_match({type_sql}, {_field_exprs(predicate.field)[0]}, ?, ?, ?))"
+        )
+        params.extend([operator, predicate.value, int(predicate.is_numeric)])
+    if not branches:
+        return "0", []
+    return "(" + " OR ".join(branches) + ")", params
+
+
+def _decode_field(json_type: str | None, value: object) -> object:
+    if json_type is None or json_type == "null":
+        return None
+    if json_type == "true":
+        return True
+    if json_type == "false":
+        return False
+    if json_type in ("array", "object"):
+        return loads(str(value))
+    return value
+
+
+def _sql_match(json_type: str | None, value: object, operator: str, expected: str, is_numeric: int) -> int:
+    predicate = FilterPredicate(field="_", operator=operator, value=expected, is_numeric=bool(is_numeric))
+    return int(matches({"_": _decode_field(json_type, value)}, predicate))
+
+
+def _sql_group_key(json_type: str | None, value: object) -> str:
+    decoded = _decode_field(json_type, value)
+    return "_missing" if decoded is None else str(decoded)
+
+
+def _sql_lower(value: object) -> str:
+    return str(value or "").lower()
+
+
+def _sql_identifier(name: str) -> str:
+    return '"' + name.replace('"', '""') + '"'
+
+
+def _bump_generation(conn: sqlite3.Connection, kind: str) -> None:
+    conn.execute(
+        "INSERT INTO generations (kind, value) VALUES (?, 1) ON CONFLICT (kind) DO UPDATE SET value = value + 1",
+        (kind,),
+    )
+
+
+def _prefix_upper_bound(prefix: str) -> str:
+    return prefix[:-1] + chr(ord(prefix[-1]) + 1)
+
+
+class SqliteBackend:
+    """Single-file SQLite store implementing ``StorageBackend`` and
+    ``QueryableBackend``."""
+
+    name = BACKEND_SQLITE
+    kinds = SQLITE_KINDS
+
+    def __init__(self, pkg_root: Path) -> None:
+        self.pkg_root = pkg_root
+        self.db_path = pkg_root / SQLITE_FILENAME
+        self._conn: sqlite3.Connection | None = None
+        self._inode: int | None = None
+        self._lock = threading.RLock()
+
+    # -- connection -------------------------------------------------------
+
+    def _connect(self, *, create: bool) -> sqlite3.Connection | None:
+        try:
+            inode = self.db_path.stat().st_ino
+        except FileNotFoundError:
+            inode = None
+        if self._conn is not None and inode is not None and inode == self._inode:
+            return self._conn
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+        if inode is None and not create:
+            return None
+        self.pkg_root.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.create_function("ag_match", 5, _sql_match, deterministic=True)
+        conn.create_function("ag_group_key", 2, _sql_group_key, deterministic=True)
+        conn.create_function("ag_lower", 1, _sql_lower, deterministic=True)
+        with conn:
+            for kind in SQLITE_KINDS:
+                columns = ", ".join(
+                    (
+                        "id TEXT PRIMARY KEY",
+                        *(f"{column} {_COLUMN_TYPES.get(column, 'TEXT')}" for column in _COLUMNS[kind]),
+                        "payload TEXT NOT NULL",
+                    )
+                )
+                conn.execute(f"CREATE TABLE IF NOT EXISTS {kind} ({columns})")
+            for table, columns in _INDEXES:
+                index_name = f"idx_{table}_{columns.replace(', ', '_')}"
+                conn.execute(f"CREATE INDEX IF NOT EXISTS {index_name} ON {table} ({columns})")
+            conn.execute("CREATE TABLE IF NOT EXISTS generations (kind TEXT PRIMARY KEY, value INTEGER NOT NULL)")
+            conn.execute("INSERT OR IGNORE INTO generations (kind, value) VALUES ('', random())")
+        self._conn = conn
+        self._inode = self.db_path.stat().st_ino
+        return conn
+
+    def _fetch(self, sql: str, params: Iterable[object] = ()) -> list[tuple[Any, ...]]:
+        with self._lock:
+            conn = self._connect(create=False)
+            if conn is None:
+                return []
+            return conn.execute(sql, tuple(params)).fetchall()
+
+    @staticmethod
+    def _check_kind(kind: str) -> None:
+        if kind not in _COLUMNS:
+            raise ValueError(f"Unknown record kind for sqlite backend: {kind!r}")
+
+    # -- StorageBackend ---------------------------------------------------
+
+    def write(self, kind: str, records: Iterable[dict[str, object]]) -> list[Path]:
+        self._check_kind(kind)
+        rows: list[tuple[object, ...]] = []
+        paths: list[Path] = []
+        for record in records:
+            identifier = record_id(kind, record)
+            if not identifier:
+                continue
+            payload = dumps(record).decode("ascii")
+            rows.append((identifier, *_column_values(kind, record), payload))
+            paths.append(Path(f"{self.db_path}#{kind}/{identifier}"))
+        if not rows:
+            return paths
+        placeholders = ", ".join("?" for _ in range(len(_COLUMNS[kind]) + 2))
+        columns = ", ".join(("id", *_COLUMNS[kind], "payload"))
+        with self._lock:
+            conn = self._connect(create=True)
+            with conn:
+                conn.executemany(f"INSERT OR REPLACE INTO {kind} ({columns}) VALUES ({placeholders})", rows)
+                _bump_generation(conn, kind)
+        return paths
+
+    def load(self, kind: str, identifier: str) -> dict[str, object]:
+        self._check_kind(kind)
+        rows = self._fetch(f"SELECT payload FROM {kind} WHERE id = ?", (identifier,))
+        if not rows:
+            raise FileNotFoundError(f"No {kind} record for id '{identifier}' in {self.db_path}")
+        return loads(rows[0][0])
+
+    def exists(self, kind: str, identifier: str) -> bool:
+        self._check_kind(kind)
+        return bool(self._fetch(f"SELECT 1 FROM {kind} WHERE id = ?", (identifier,)))
+
+    def iter_ids(self, kind: str) -> list[str]:
+        self._check_kind(kind)
+        return [row[0] for row in self._fetch(f"SELECT id FROM {kind} ORDER BY id")]
+
+    def iter_records(self, kind: str, *, prefix: str | None = None) -> Iterator[dict[str, object]]:
+        self._check_kind(kind)
+        if prefix:
+            rows = self._fetch(
+                f"SELECT payload FROM {kind} WHERE id >= ? AND id < ? ORDER BY id",
+                (prefix, _prefix_upper_bound(prefix)),
+            )
+        else:
+            rows = self._fetch(f"SELECT payload FROM {kind} ORDER BY id")
+        for row in rows:
+            yield loads(row[0])
+
+    def delete(self, kind: str, identifiers: Iterable[str]) -> int:
+        self._check_kind(kind)
+        ids = list(identifiers)
+        removed = 0
+        with self._lock:
+            conn = self._connect(create=False)
+            if conn is None:
+                return 0
+            with conn:
+                for start in range(0, len(ids), _IN_BATCH):
+                    batch = ids[start : start + _IN_BATCH]
+                    placeholders = ", ".join("?" for _ in batch)
+                    cursor = conn.execute(f"DELETE FROM {kind} WHERE id IN ({placeholders})", batch)
+                    removed += cursor.rowcount
+                if removed:
+                    _bump_generation(conn, kind)
+        return removed
+
+    def record_size(self, kind: str, identifier: str) -> int:
+        self._check_kind(kind)
+        rows = self._fetch(f"SELECT length(CAST(payload AS BLOB)) FROM {kind} WHERE id = ?", (identifier,))
+        return int(rows[0][0]) if rows else 0
+
+    def compact(self, *, dry_run: bool = False) -> int:
+        with self._lock:
+            conn = self._connect(create=False)
+            if conn is None:
+                return 0
+            if dry_run:
+                free_pages = conn.execute("PRAGMA freelist_count").fetchone()[0]
+                page_size = conn.execute("PRAGMA page_size").fetchone()[0]
+                return int(free_pages) * int(page_size)
+            before = self.db_path.stat().st_size
+            conn.execute("VACUUM")
+            return max(before - self.db_path.stat().st_size, 0)
+
+    def signature(self, kind: str) -> list[object]:
+        self._check_kind(kind)
+        rows = self._fetch("SELECT kind, value FROM generations WHERE kind IN ('', ?) ORDER BY kind", (kind,))
+        return [value for _, value in rows]
+
+    # -- QueryableBackend -------------------------------------------------
+
+    def index_entity_fields(self, fields: Iterable[str]) -> None:
+        """Keep expression indexes on exactly ``fields`` (plus ``json_type``
+        indexes on the ``type`` and ``name`` columns' fields), so the
+        predicates ``_compile_predicate`` emits for them use an index."""
+        wanted: dict[str, str] = {}
+        for field in sorted({"type", "name", *fields}):
+            value_sql, type_sql = _field_exprs(field)
+            wanted[f"{_FIELD_INDEX_PREFIX}type:{field}"] = type_sql
+            if field not in _ENTITY_VALUE_COLUMNS:
+                wanted[f"{_FIELD_INDEX_PREFIX}value:{field}"] = value_sql
+        with self._lock:
+            conn = self._connect(create=True)
+            existing = {
+                row[0]
+                for row in conn.execute(
+                    "SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = 'entities' AND name LIKE ?",
+                    (_FIELD_INDEX_PREFIX + "%",),
+                )
+            }
+            with conn:
+                for name in sorted(existing - set(wanted)):
+                    conn.execute(f"DROP INDEX {_sql_identifier(name)}")
+                for name, expression in wanted.items():
+                    conn.execute(f"CREATE INDEX IF NOT EXISTS {_sql_identifier(name)} ON entities ({expression})")
+
+    @staticmethod
+    def _entity_where(
+        types: list[str] | None,
+        predicates: list[FilterPredicate] | None,
+    ) -> tuple[str, list[object]]:
+        clauses: list[str] = []
+        params: list[object] = []
+        if types:
+            clauses.append(f"type IN ({', '.join('?' for _ in types)})")
+            params.extend(types)
+        for predicate in predicates or []:
+            clause, clause_params = _compile_predicate(predicate)
+            clauses.append(clause)
+            params.extend(clause_params)
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+        return where, params
+
+    def select_entities(
+        self,
+        *,
+        types: list[str] | None = None,
+        predicates: list[FilterPredicate] | None = None,
+        limit: int | None = None,
+        offset: int = 0,
+    ) -> tuple[list[dict[str, object]], int]:
+        """Return ``(page, total)`` for matching entities in ID order."""
+        where, params = self._entity_where(types, predicates)
+        total_rows = self._fetch(f"SELECT COUNT(*) FROM entities{where}", params)
+        total = int(total_rows[0][0]) if total_rows else 0
+        rows = self._fetch(
+            f"SELECT payload FROM entities{where} ORDER BY id LIMIT ? OFFSET ?",
+            [*params, -1 if limit is None else limit, offset],
+        )
+        return [loads(row[0]) for row in rows], total
+
+    def aggregate_entities(
+        self,
+        *,
+        types: list[str] | None = None,
+        predicates: list[FilterPredicate] | None = None,
+        group_by: str | None = None,
+    ) -> dict[str, object]:
+        """Count matching entities, optionally grouped by a field."""
+        where, params = self._entity_where(types, predicates)
+        if not group_by:
+            rows = self._fetch(f"SELECT COUNT(*) FROM entities{where}", params)
+            return {"count": int(rows[0][0]) if rows else 0}
+        value_sql, type_sql = _field_exprs(group_by)
+        rows = self._fetch(
+            f"SELECT CASE {type_sql} WHEN 'text' THEN {value_sql}"
+            f" ELSE ag_group_key({type_sql}, {value_sql}) END AS group_key, COUNT(*)"
+            f" FROM entities{where} GROUP BY group_key ORDER BY MIN(id)",
+            params,
+        )
+        groups = {str(key): int(count) for key, count in rows}
+        return {"groups": groups, "total_count": sum(groups.values())}
+
+    def _edges(
+        self,
+        node_ids: list[str],
+        *,
+        key: str,
+        edge_types: list[str] | None,
+        min_confidence: float | None,
+    ) -> dict[str, list[dict[str, object]]]:
+        other = "to_id" if key == "from_id" else "from_id"
+        edges: dict[str, list[dict[str, object]]] = {}
+        unique = sorted(set(node_ids))
+        for start in range(0, len(unique), _IN_BATCH):
+            batch = unique[start : start + _IN_BATCH]
+            clauses = [f"{key} IN ({', '.join('?' for _ in batch)})"]
+            params: list[object] = list(batch)
+            if edge_types:
+                clauses.append(f"type IN ({', '.join('?' for _ in edge_types)})")
+                params.extend(edge_types)
+            if min_confidence is not None:
+                clauses.append("(confidence IS NULL OR confidence >= ?)")
+                params.append(min_confidence)
+            rows = self._fetch(
+                f"SELECT {key}, payload FROM links WHERE {' AND '.join(clauses)} ORDER BY {key}, type, {other}, id",
+                params,
+            )
+            for node_id, payload in rows:
+                link = loads(payload)
+                edges.setdefault(node_id, []).append(
+                    {
+                        other: str(link.get(other, "")),
+                        "type": str(link.get("type", "")),
+                        "confidence": link.get("confidence", 1.0),
+                        "rule_id": str(link.get("rule_id", "")),
+                    }
+                )
+        return edges
+
+    def outgoing_edges(
+        self,
+        node_ids: list[str],
+        *,
+        edge_types: list[str] | None = None,
+        min_confidence: float | None = None,
+    ) -> dict[str, list[dict[str, object]]]:
+        """Return adjacency-shaped edges leaving ``node_ids``.
+
+        Edges per source are ordered by ``(type, to_id)`` like
+        ``indexes/graph/adjacency.json``.
+        """
+        return self._edges(node_ids, key="from_id", edge_types=edge_types, min_confidence=min_confidence)
+
+    def incoming_edges(
+        self,
+        node_ids: list[str],
+        *,
+        edge_types: list[str] | None = None,
+        min_confidence: float | None = None,
+    ) -> dict[str, list[dict[str, object]]]:
+        """Return ``{from_id, type, confidence, rule_id}`` edges entering
+        ``node_ids``, ordered by ``(type, from_id)``."""
+        return self._edges(node_ids, key="to_id", edge_types=edge_types, min_confidence=min_confidence)
+
+    def search_chunks(self, token: str) -> list[dict[str, object]]:
+        """Return chunks whose lower-cased text contains ``token``, ordered
+        by ``(document_id, order)``.
+
+        Each distinct body is matched once and joined back to the chunks
+        that reference it; chunks that still carry ``text`` inline are
+        matched directly.
+        """
+        rows = self._fetch(
+            "WITH hits AS ("
+            " SELECT id, json_extract(payload, '$.text') AS text FROM bodies"
+            " WHERE instr(ag_lower(json_extract(payload, '$.text')), ?) > 0)"
+            " SELECT chunks.payload, hits.text, chunks.document_id, chunks.ord, chunks.id FROM chunks"
+            " JOIN hits ON hits.id = json_extract(chunks.payload, '$.text_hash')"
+            " UNION ALL"
+            " SELECT payload, NULL, document_id, ord, id FROM chunks"
+            " WHERE instr(ag_lower(json_extract(payload, '$.text')), ?) > 0"
+            " ORDER BY 3, 4, 5",
+            (token, token),
+        )
+        results: list[dict[str, object]] = []
+        for payload, text, *_ in rows:
+            record = loads(payload)
+            if text is not None:
+                record["text"] = text
+            results.append(record)
+        return results
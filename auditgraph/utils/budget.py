@@ -5,6 +5,8 @@ from pathlib import Path
 from typing import Iterable
 
 from auditgraph.errors import BudgetError
+from auditgraph.storage.backends import artifact_compression
+from auditgraph.storage.compression import COMPRESSION_NONE, logical_size
 
 MIN_SOURCE_BYTES = 1024 * 1024
 
@@ -16,16 +18,32 @@ class BudgetStatus:
     limit_bytes: int
     projected_bytes: int
     message: str
+    # On-disk (possibly compressed) and uncompressed size of the artifacts
+    # already in the profile; the budget is evaluated on on-disk bytes.
+    artifact_bytes: int = 0
+    logical_bytes: int = 0
 
 
 def _dir_size(path: Path) -> int:
+    return _dir_sizes(path)[0]
+
+
+def _dir_sizes(path: Path, *, compressed: bool = False) -> tuple[int, int]:
+    """Return ``(on_disk_bytes, logical_bytes)`` for files under ``path``.
+
+    Logical sizes read gzip/zstd frame headers only when ``compressed``;
+    otherwise both totals are the on-disk size.
+    """
     if not path.exists():
-        return 0
+        return 0, 0
     total = 0
+    logical = 0
     for entry in path.rglob("*"):
         if entry.is_file():
-            total += entry.stat().st_size
-    return total
+            size = entry.stat().st_size
+            total += size
+            logical += logical_size(entry) if compressed and entry.suffix == ".json" else size
+    return total, logical
 
 
 def _latest_manifest_path(pkg_root: Path) -> Path | None:
@@ -74,6 +92,7 @@ def evaluate_budget(
     settings: dict[str, object],
     *,
     additional_bytes: int = 0,
+    logical_bytes: int | None = None,
 ) -> BudgetStatus:
     multiplier = float(settings.get("multiplier", 3.0))
     warn_threshold = float(settings.get("warn_threshold", 0.8))
@@ -95,7 +114,10 @@ def evaluate_budget(
         f"Budget {status}: projected={projected_bytes}B limit={limit_bytes}B "
         f"ratio={usage_ratio:.2f}"
     )
-    return BudgetStatus(status, usage_ratio, limit_bytes, projected_bytes, message)
+    logical = int(artifact_bytes) if logical_bytes is None else int(logical_bytes)
+    if logical != int(artifact_bytes):
+        message += f" logical={logical}B"
+    return BudgetStatus(status, usage_ratio, limit_bytes, projected_bytes, message, int(artifact_bytes), logical)
 
 
 def evaluate_pkg_budget(
@@ -105,8 +127,15 @@ def evaluate_pkg_budget(
     *,
     additional_bytes: int = 0,
 ) -> BudgetStatus:
-    artifact_bytes = _dir_size(pkg_root)
-    return evaluate_budget(source_bytes, artifact_bytes, settings, additional_bytes=additional_bytes)
+    compressed = artifact_compression(pkg_root) != COMPRESSION_NONE
+    artifact_bytes, logical_bytes = _dir_sizes(pkg_root, compressed=compressed)
+    return evaluate_budget(
+        source_bytes,
+        artifact_bytes,
+        settings,
+        additional_bytes=additional_bytes,
+        logical_bytes=logical_bytes,
+    )
 
 
 def enforce_budget(status: BudgetStatus) -> None:
@@ -0,0 +1,95 @@
+#!/usr/bin/env python
+"""Compare JSON codecs on representative artifacts.
+
+Usage: python scripts/bench_codec.py [--records N] [--repeat N]
+
+Builds synthetic entities, links, an adjacency map and a BM25-style index,
+checks that every available codec produces byte-identical pretty and
+compact encodings, then reports encode and decode throughput per codec.
+"""
+from __future__ import annotations
+
+import argparse
+import time
+
+from auditgraph.storage.codec import available_codecs, dumps, loads, use_codec
+from auditgraph.storage.hashing import sha256_text
+
+
+def _artifacts(count: int) -> dict[str, object]:
+    entities = [
+        {
+            "id": f"ent_{sha256_text(str(index))}",
+            "type": "note",
+            "name": f"Entity {index} — café",
+            "canonical_key": f"note:entity-{index}",
+            "aliases": [f"alias-{index}"],
+            "refs": [{"source_path": f"notes/{index}.md", "source_hash": sha256_text(f"src{index}")}],
+        }
+        for index in range(count)
+    ]
+    links = [
+        {
+            "id": f"lnk_{sha256_text(str(index))}",
+            "from_id": entities[index]["id"],
+            "to_id": entities[(index * 7 + 1) % count]["id"],
+            "type": "relates_to",
+            "confidence": round(1 / (index + 1), 6),
+        }
+        for index in range(count)
+    ]
+    adjacency = {
+        str(link["from_id"]): [{"to_id": link["to_id"], "type": link["type"], "id": link["id"]}] for link in links
+    }
+    index = {
+        "type": "bm25",
+        "entries": {f"token{index}": [str(entity["id"]) for entity in entities[index::97]] for index in range(97)},
+    }
+    return {"entities": entities, "links": links, "adjacency": adjacency, "bm25": index}
+
+
+def _check_identical(artifacts: dict[str, object], codecs: tuple[str, ...]) -> None:
+    for name, payload in artifacts.items():
+        for pretty in (True, False):
+            encoded = set()
+            for codec in codecs:
+                with use_codec(codec):
+                    encoded.add(dumps(payload, pretty=pretty))
+            if len(encoded) != 1:
+                raise SystemExit(f"codec output differs for {name} (pretty={pretty})")
+
+
+def _bench(codec: str, artifacts: dict[str, object], repeat: int) -> tuple[float, float, int]:
+    with use_codec(codec):
+        started = time.perf_counter()
+        for _ in range(repeat):
+            encoded = [dumps(payload) for payload in artifacts.values()]
+        encode_s = time.perf_counter() - started
+        started = time.perf_counter()
+        for _ in range(repeat):
+            for data in encoded:
+                loads(data)
+        decode_s = time.perf_counter() - started
+    size = sum(len(data) for data in encoded)
+    return encode_s, decode_s, size
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--records", type=int, default=20000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    artifacts = _artifacts(args.records)
+    codecs = available_codecs()
+    _check_identical(artifacts, codecs)
+    print(f"byte-identical across: {', '.join(codecs)}")
+    print(f"{'codec':<8} {'bytes':>12} {'encode MB/s':>12} {'decode MB/s':>12}")
+    for codec in codecs:
+        encode_s, decode_s, size = _bench(codec, artifacts, args.repeat)
+        volume = size * args.repeat / 1e6
+        print(f"{codec:<8} {size:>12} {volume / encode_s:>12.1f} {volume / decode_s:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
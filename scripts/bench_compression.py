@@ -0,0 +1,77 @@
+#!/usr/bin/env python
+"""Compare artifact compression settings on synthetic entity records.
+
+Usage: python scripts/bench_compression.py [--records N] [--lookups N]
+
+For each ``storage.compression`` value (``zstd`` only when the zstandard
+package is installed) writes N entities through the files backend into a
+temporary profile, then reports bytes on disk, write throughput and cold
+point-lookup latency (first ``load`` of each sampled record).
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import tempfile
+import time
+from pathlib import Path
+
+from auditgraph.storage.backends import FilesBackend
+from auditgraph.storage.compression import COMPRESSION_ZSTD, COMPRESSIONS, _zstandard
+from auditgraph.storage.hashing import sha256_text
+
+
+def _records(count: int) -> list[dict[str, object]]:
+    return [
+        {
+            "id": f"ent_{sha256_text(str(index))}",
+            "type": "note",
+            "name": f"Entity {index}",
+            "canonical_key": f"note:entity-{index}",
+            "aliases": [f"alias-{index}", f"alt-{index % 97}"],
+            "refs": [{"source_path": f"notes/{index}.md", "source_hash": sha256_text(f"src{index}")}],
+        }
+        for index in range(count)
+    ]
+
+
+def _bench(compression: str, records: list[dict[str, object]], lookups: int) -> dict[str, float]:
+    with tempfile.TemporaryDirectory() as tmp:
+        pkg_root = Path(tmp)
+        backend = FilesBackend(pkg_root, compression=compression)
+        started = time.perf_counter()
+        backend.write("entities", records)
+        write_s = time.perf_counter() - started
+
+        on_disk = sum(path.stat().st_size for path in (pkg_root / "entities").rglob("*.json"))
+
+        rng = random.Random(0)
+        ids = [str(record["id"]) for record in rng.sample(records, min(lookups, len(records)))]
+        reader = FilesBackend(pkg_root)
+        started = time.perf_counter()
+        for identifier in ids:
+            reader.load("entities", identifier)
+        lookup_s = time.perf_counter() - started
+    return {
+        "bytes": float(on_disk),
+        "records_per_s": len(records) / write_s if write_s else 0.0,
+        "lookup_us": lookup_s / max(len(ids), 1) * 1e6,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--records", type=int, default=20000)
+    parser.add_argument("--lookups", type=int, default=2000)
+    args = parser.parse_args()
+
+    records = _records(args.records)
+    names = [name for name in COMPRESSIONS if name != COMPRESSION_ZSTD or _zstandard() is not None]
+    print(f"{'compression':<12} {'bytes':>12} {'records/s':>12} {'lookup_us':>10}")
+    for name in names:
+        result = _bench(name, records, args.lookups)
+        print(f"{name:<12} {int(result['bytes']):>12} {result['records_per_s']:>12.0f} {result['lookup_us']:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
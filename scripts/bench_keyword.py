@@ -0,0 +1,95 @@
+#!/usr/bin/env python
+"""Measure keyword query latency and check it against performance gates.
+
+Usage: python scripts/bench_keyword.py [--entities N] [--queries N] [--gates PATH]
+
+Builds a BM25 index (lexicon and trigram index included) over synthetic
+entities in a temporary store, then times exact, prefix (``term*``) and
+fuzzy (``term~`` and misspelled plain) queries through ``keyword_search``.
+Reports p50/p95 in seconds as ``keyword_*`` metrics and evaluates them
+with ``utils.quality_gates.evaluate_performance_gates``; exits 1 when a
+gate fails.
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import statistics
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable
+
+from auditgraph.index.bm25 import build_bm25_index
+from auditgraph.query.keyword import keyword_search
+from auditgraph.utils.quality_gates import evaluate_performance_gates
+
+_WORDS = [
+    "auth", "token", "cache", "redis", "postgres", "session", "payment", "ledger", "router",
+    "gateway", "scheduler", "worker", "queue", "billing", "invoice", "search", "index", "vector",
+]
+
+
+def _entities(count: int, rng: random.Random) -> list[dict[str, object]]:
+    return [
+        {
+            "id": f"ent_{index:07d}",
+            "name": " ".join(rng.sample(_WORDS, 2) + [f"{rng.choice(_WORDS)}{index}"]),
+            "aliases": [f"{rng.choice(_WORDS)}-{index % 997}"],
+        }
+        for index in range(count)
+    ]
+
+
+def _misspell(word: str, rng: random.Random) -> str:
+    position = rng.randrange(1, len(word) - 1)
+    return word[:position] + word[position + 1] + word[position] + word[position + 2 :]
+
+
+def _percentiles(pkg_root: Path, queries: list[str], search: Callable[..., object]) -> tuple[float, float]:
+    timings = []
+    for query in queries:
+        started = time.perf_counter()
+        search(pkg_root, query, limit=10)
+        timings.append(time.perf_counter() - started)
+    timings.sort()
+    return statistics.median(timings), timings[max(int(len(timings) * 0.95) - 1, 0)]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--entities", type=int, default=50000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--gates", type=Path, default=Path("tests/fixtures/spec013/performance/config.yaml"))
+    args = parser.parse_args()
+
+    rng = random.Random(13)
+    with tempfile.TemporaryDirectory() as tmp:
+        pkg_root = Path(tmp)
+        started = time.perf_counter()
+        build_bm25_index(pkg_root, _entities(args.entities, rng))
+        print(f"index build: {time.perf_counter() - started:.2f}s for {args.entities} entities")
+
+        words = [rng.choice(_WORDS) for _ in range(args.queries)]
+        workloads = {
+            "keyword": [f"{word} {rng.choice(_WORDS)}" for word in words],
+            "keyword_prefix": [f"{word[:3]}*" for word in words],
+            "keyword_fuzzy": [_misspell(word, rng) for word in words],
+        }
+        metrics: dict[str, float] = {}
+        for name, queries in workloads.items():
+            p50, p95 = _percentiles(pkg_root, queries, keyword_search)
+            metrics[f"{name}_p50"] = p50
+            metrics[f"{name}_p95"] = p95
+            print(f"{name:<16} p50 {p50 * 1000:8.2f}ms  p95 {p95 * 1000:8.2f}ms")
+
+    # Gates for metrics this script does not measure (ingest) are skipped.
+    gates = [result for result in evaluate_performance_gates(args.gates, metrics) if result.stage in metrics]
+    for result in gates:
+        print(f"gate {result.stage}: {result.status} ({result.message})")
+    if any(result.status == "fail" for result in gates):
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
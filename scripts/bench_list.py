@@ -0,0 +1,117 @@
+#!/usr/bin/env python
+"""Time the ``list --where ... --sort ... --limit`` pipeline.
+
+Usage: python scripts/bench_list.py [--entities N] [--limit N] [--repeat N] [--store BACKEND]
+
+Builds N synthetic commit-like entities (default 10^6) and runs
+``--where author_email=... --where authored_at>=... --sort authored_at
+--desc --limit 20`` two ways over the same in-memory list:
+
+- baseline: ``matches`` per entity and predicate, then ``apply_sort`` and
+  ``apply_pagination``, as the pipeline used to run.
+- compiled: ``apply_filters`` with compiled predicates streaming into
+  ``select_page``'s bounded heap.
+
+Both must return the same page. With ``--store`` the entities are also
+written to a temporary profile on that backend, with type and field
+indexes, and ``list_entities`` is timed end to end.
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import statistics
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable
+
+from auditgraph.index.field_index import build_field_indexes
+from auditgraph.index.type_index import build_type_indexes
+from auditgraph.query.filters import (
+    apply_filters,
+    apply_pagination,
+    apply_sort,
+    matches,
+    parse_predicate,
+    select_page,
+)
+from auditgraph.query.list_entities import list_entities
+from auditgraph.storage.backends import activate_backend
+
+WHERE = ["author_email=alice@example.com", "authored_at>=2023-06-01"]
+SORT = "authored_at"
+
+
+def _entities(count: int, rng: random.Random) -> list[dict[str, object]]:
+    emails = [f"{name}@example.com" for name in ("alice", "bob", "carol", "dave", "erin")]
+    return [
+        {
+            "id": f"ent_{index:08d}",
+            "type": "commit",
+            "name": f"commit {index}",
+            "author_email": rng.choice(emails),
+            "authored_at": f"20{rng.randint(20, 24)}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+            "parent_shas": [f"{rng.getrandbits(40):010x}"],
+        }
+        for index in range(count)
+    ]
+
+
+def _baseline(entities: list[dict[str, object]], limit: int) -> list[dict[str, object]]:
+    predicates = [parse_predicate(expr) for expr in WHERE]
+    filtered = [entity for entity in entities if all(matches(entity, p) for p in predicates)]
+    return apply_pagination(apply_sort(filtered, SORT, True), limit=limit)[0]
+
+
+def _compiled(entities: list[dict[str, object]], limit: int) -> list[dict[str, object]]:
+    predicates = [parse_predicate(expr) for expr in WHERE]
+    return select_page(apply_filters(entities, predicates=predicates), SORT, True, limit)[0]
+
+
+def _time(run: Callable[[], object], repeat: int) -> tuple[float, object]:
+    timings = []
+    result: object = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = run()
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings), result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--entities", type=int, default=1_000_000)
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--store", default=None, help="Also time list_entities on this storage backend")
+    args = parser.parse_args()
+
+    entities = _entities(args.entities, random.Random(18))
+    print(f"{args.entities} entities, --where {' --where '.join(WHERE)} --sort {SORT} --desc --limit {args.limit}")
+    baseline_s, baseline = _time(lambda: _baseline(entities, args.limit), args.repeat)
+    compiled_s, compiled = _time(lambda: _compiled(entities, args.limit), args.repeat)
+    if baseline != compiled:
+        raise SystemExit("compiled pipeline returned a different page")
+    print(f"baseline (matches + full sort)  {baseline_s * 1000:9.1f}ms")
+    print(f"compiled (closures + heap)      {compiled_s * 1000:9.1f}ms  ({baseline_s / compiled_s:.1f}x)")
+
+    if args.store:
+        with tempfile.TemporaryDirectory() as tmp:
+            pkg_root = Path(tmp)
+            started = time.perf_counter()
+            activate_backend(pkg_root, args.store).write("entities", entities)
+            build_type_indexes(pkg_root, entities)
+            build_field_indexes(pkg_root, entities, ["author_email", "authored_at"])
+            print(f"store build ({args.store}): {time.perf_counter() - started:.1f}s")
+            store_s, payload = _time(
+                lambda: list_entities(pkg_root, where=WHERE, sort=SORT, descending=True, limit=args.limit),
+                args.repeat,
+            )
+            if payload["results"] != compiled:  # type: ignore[index]
+                raise SystemExit("list_entities returned a different page")
+            print(f"list_entities ({args.store})        {store_s * 1000:9.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
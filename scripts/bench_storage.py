@@ -0,0 +1,72 @@
+#!/usr/bin/env python
+"""Compare storage backends on synthetic records.
+
+Usage: python scripts/bench_storage.py [--records N] [--lookups N]
+
+Writes N entities into a temporary profile per backend, then times a bulk
+load (``iter_records``) and random point lookups (``load``).
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import tempfile
+import time
+from pathlib import Path
+
+from auditgraph.storage.backends import backend_names, get_backend
+from auditgraph.storage.hashing import sha256_text
+
+
+def _records(count: int) -> list[dict[str, object]]:
+    return [
+        {
+            "id": f"ent_{sha256_text(str(index))}",
+            "type": "note",
+            "name": f"Entity {index}",
+            "canonical_key": f"note:entity-{index}",
+            "aliases": [],
+            "refs": [{"source_path": f"notes/{index}.md", "source_hash": sha256_text(f"src{index}")}],
+        }
+        for index in range(count)
+    ]
+
+
+def _bench(name: str, records: list[dict[str, object]], lookups: int) -> dict[str, float]:
+    with tempfile.TemporaryDirectory() as tmp:
+        pkg_root = Path(tmp)
+        backend = get_backend(pkg_root, name)
+        started = time.perf_counter()
+        backend.write("entities", records)
+        write_s = time.perf_counter() - started
+
+        started = time.perf_counter()
+        loaded = sum(1 for _ in backend.iter_records("entities"))
+        bulk_s = time.perf_counter() - started
+        assert loaded == len(records)
+
+        rng = random.Random(0)
+        ids = [str(rng.choice(records)["id"]) for _ in range(lookups)]
+        started = time.perf_counter()
+        for identifier in ids:
+            backend.load("entities", identifier)
+        lookup_s = time.perf_counter() - started
+    return {"write_s": write_s, "bulk_load_s": bulk_s, "point_lookup_us": lookup_s / max(lookups, 1) * 1e6}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--records", type=int, default=20000)
+    parser.add_argument("--lookups", type=int, default=2000)
+    args = parser.parse_args()
+
+    records = _records(args.records)
+    print(f"{'backend':<10} {'write_s':>10} {'bulk_load_s':>12} {'lookup_us':>10}")
+    for name in backend_names():
+        result = _bench(name, records, args.lookups)
+        write_s, bulk_load_s, lookup_us = result["write_s"], result["bulk_load_s"], result["point_lookup_us"]
+        print(f"{name:<10} {write_s:>10.3f} {bulk_load_s:>12.3f} {lookup_us:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
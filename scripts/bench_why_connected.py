@@ -0,0 +1,83 @@
+#!/usr/bin/env python
+"""Time ``why-connected`` path search on a large synthetic graph.
+
+Usage: python scripts/bench_why_connected.py [--nodes N] [--edges N] [--pairs N] [--paths K]
+
+Writes adjacency.json and the CSR index for a random graph (default
+250k nodes, 2M edges) to a temporary store, then runs
+``k_shortest_paths`` between random node pairs over the memory-mapped
+index and reports p50/p95 latency, hop counts and nodes expanded.
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+from auditgraph.index.csr_adjacency import CsrAdjacency, write_csr_adjacency
+from auditgraph.link.adjacency import write_adjacency
+from auditgraph.query.why_connected import k_shortest_paths
+
+
+def _adjacency(nodes: int, edges: int, rng: random.Random) -> dict[str, list[dict[str, object]]]:
+    adjacency: dict[str, list[dict[str, object]]] = {}
+    for _ in range(edges):
+        source, target = rng.randrange(nodes), rng.randrange(nodes)
+        adjacency.setdefault(f"ent_{source:08d}", []).append(
+            {
+                "to_id": f"ent_{target:08d}",
+                "type": "relates_to",
+                "confidence": round(rng.random(), 2),
+                "rule_id": "rule.v1",
+            }
+        )
+    for items in adjacency.values():
+        items.sort(key=lambda edge: (edge["type"], edge["to_id"]))
+    return dict(sorted(adjacency.items()))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--nodes", type=int, default=250_000)
+    parser.add_argument("--edges", type=int, default=2_000_000)
+    parser.add_argument("--pairs", type=int, default=50)
+    parser.add_argument("--paths", type=int, default=3)
+    parser.add_argument("--max-depth", type=int, default=4)
+    args = parser.parse_args()
+
+    rng = random.Random(20)
+    with tempfile.TemporaryDirectory() as tmp:
+        pkg_root = Path(tmp)
+        started = time.perf_counter()
+        adjacency = _adjacency(args.nodes, args.edges, rng)
+        source = write_adjacency(pkg_root, adjacency)
+        write_csr_adjacency(pkg_root, adjacency, source)
+        del adjacency
+        print(f"build: {time.perf_counter() - started:.1f}s ({args.nodes} nodes, {args.edges} edges)")
+        graph = CsrAdjacency.open(pkg_root)
+        assert graph is not None
+
+        timings: list[float] = []
+        hops: list[int] = []
+        expanded: list[int] = []
+        for _ in range(args.pairs):
+            from_id = f"ent_{rng.randrange(args.nodes):08d}"
+            to_id = f"ent_{rng.randrange(args.nodes):08d}"
+            started = time.perf_counter()
+            paths, _, count = k_shortest_paths(graph, from_id, to_id, k=args.paths, max_depth=args.max_depth)
+            timings.append(time.perf_counter() - started)
+            expanded.append(count)
+            if paths:
+                hops.append(len(paths[0]))
+        timings.sort()
+        p95 = timings[min(len(timings) - 1, int(len(timings) * 0.95))]
+        print(f"pairs connected: {len(hops)}/{args.pairs}, median shortest hops: {statistics.median(hops or [0])}")
+        print(f"nodes expanded (median): {statistics.median(expanded)}")
+        print(f"p50 {statistics.median(timings) * 1000:.1f}ms  p95 {p95 * 1000:.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -10,6 +10,7 @@ from auditgraph.query.keyword import keyword_search
 from auditgraph.query.node_view import node_view
 from auditgraph.query.neighbors import neighbors
 from auditgraph.storage.artifacts import read_json, profile_pkg_root
+from auditgraph.storage.provenance import load_provenance, provenance_log_path
 
 
 def _run_pipeline(root: Path) -> tuple[Path, str]:
@@ -97,9 +98,9 @@ def test_provenance_tracks_artifacts(tmp_path: Path) -> None:
 
     pkg_root, run_id = _run_pipeline(tmp_path)
 
-    provenance_path = pkg_root / "provenance" / f"{run_id}.json"
+    provenance_path = provenance_log_path(pkg_root, run_id)
     assert provenance_path.exists()
-    records = read_json(provenance_path)
+    records = load_provenance(pkg_root, run_id)
     assert len(records) > 0
     # Each record should have required provenance fields
     for record in records:
@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+import os
+from pathlib import Path
+
+import pytest
+
+from auditgraph.index import lexicon as lexicon_module
+from auditgraph.index.bm25 import (
+    bm25_index_path,
+    bm25_lexicon_dir,
+    build_bm25_index,
+    query_terms,
+    score_bm25,
+    search_bm25,
+)
+from auditgraph.index.lexicon import Lexicon, write_lexicon
+from auditgraph.query.keyword import keyword_search
+from auditgraph.storage.artifacts import read_json
+
+ENTITIES = [
+    {"id": "ent_a", "name": "auth token validator", "aliases": []},
+    {"id": "ent_b", "name": "auth", "aliases": ["authentication"]},
+    {"id": "ent_c", "name": "token bucket rate limiter service", "aliases": ["rate limiter"]},
+    {"id": "ent_d", "name": "Ünïcode zebra", "aliases": []},
+]
+
+
+def test_lexicon_shards_by_first_byte(tmp_path: Path) -> None:
+    source = tmp_path / "source.json"
+    source.write_text("{}", encoding="utf-8")
+    entries = {"apple": [1], "avocado": [2], "banana": {"x": 3}, "ünïcode": [4], "a": []}
+
+    directory = write_lexicon(tmp_path / "lexicon", entries, source, {"doc_count": 5})
+    lexicon = Lexicon.open(directory, source)
+
+    assert lexicon is not None
+    assert lexicon.meta["shards"] == {"61": 3, "62": 1, "c3": 1}
+    assert (directory / "61.terms").read_bytes() == b"aappleavocado"
+    assert all(lexicon.get(term) == payload for term, payload in entries.items())
+    assert lexicon.get("apples") is None and lexicon.get("zebra") is None
+    assert list(lexicon.terms()) == ["a", "apple", "avocado", "banana", "ünïcode"]
+    assert lexicon.stats == {"doc_count": 5}
+
+
+def test_lookup_maps_only_the_queried_shard(tmp_path: Path) -> None:
+    build_bm25_index(tmp_path, ENTITIES)
+    lexicon = Lexicon.open(bm25_lexicon_dir(tmp_path), bm25_index_path(tmp_path))
+    assert lexicon is not None
+
+    lexicon.get("token")
+
+    assert set(lexicon._shards) == {"74"}
+
+
+def test_search_matches_json_scoring(tmp_path: Path) -> None:
+    build_bm25_index(tmp_path, ENTITIES)
+    index = read_json(bm25_index_path(tmp_path))
+
+    for query in ("auth token", "rate limiter", "ünïcode zebra", "missing"):
+        terms = query_terms(query)
+        assert search_bm25(tmp_path, terms, k1=1.5, b=0.5) == score_bm25(index, terms, k1=1.5, b=0.5)
+
+
+def test_keyword_search_does_not_parse_index_json(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    build_bm25_index(tmp_path, ENTITIES)
+    expected = keyword_search(tmp_path, "auth token")
+
+    def fail(path: Path) -> object:
+        raise AssertionError(f"parsed {path}")
+
+    monkeypatch.setattr("auditgraph.index.bm25.read_json", fail)
+
+    assert keyword_search(tmp_path, "auth token") == expected
+
+
+def test_stale_lexicon_falls_back_to_index_json(tmp_path: Path) -> None:
+    build_bm25_index(tmp_path, ENTITIES)
+    index_path = bm25_index_path(tmp_path)
+    stat = index_path.stat()
+    os.utime(index_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+    assert Lexicon.open(bm25_lexicon_dir(tmp_path), index_path) is None
+    assert keyword_search(tmp_path, "auth")[0]["id"] == "ent_b"
+
+    lexicon_module._CACHE.clear()
+    build_bm25_index(tmp_path, ENTITIES[:1])
+    assert [hit["id"] for hit in keyword_search(tmp_path, "auth")] == ["ent_a"]
@@ -0,0 +1,104 @@
+from __future__ import annotations
+
+import math
+from pathlib import Path
+
+from auditgraph.config import load_config
+from auditgraph.extract.manifest import write_entities
+from auditgraph.index.bm25 import build_bm25_index, idf, query_terms, score_bm25, top_k
+from auditgraph.pipeline.runner import PipelineRunner
+from auditgraph.query.keyword import keyword_search
+from auditgraph.storage.artifacts import profile_pkg_root, read_json, write_json
+
+ENTITIES = [
+    {"id": "ent_a", "name": "auth token validator", "aliases": []},
+    {"id": "ent_b", "name": "auth", "aliases": ["authentication"]},
+    {"id": "ent_c", "name": "token bucket rate limiter service", "aliases": ["rate limiter"]},
+    {"id": "ent_d", "name": "unrelated", "aliases": []},
+]
+
+
+def _index(tmp_path: Path) -> dict:
+    return read_json(build_bm25_index(tmp_path, ENTITIES))
+
+
+def test_index_stores_term_statistics(tmp_path: Path) -> None:
+    index = _index(tmp_path)
+
+    assert index["version"] == 2
+    assert index["doc_count"] == 4
+    assert index["lengths"]["ent_c"] == [5, 2]
+    assert index["avg_length"]["name"] == (3 + 1 + 5 + 1) / 4
+    assert index["postings"]["token"] == [["ent_a", 1, 0], ["ent_c", 1, 0]]
+    assert index["postings"]["limiter"] == [["ent_c", 1, 1]]
+    # Whole names and aliases are indexed as single terms for exact matches.
+    assert index["postings"]["rate limiter"] == [["ent_c", 0, 1]]
+
+
+def test_scores_match_bm25_formula(tmp_path: Path) -> None:
+    index = _index(tmp_path)
+    scores, matched = score_bm25(index, ["token"], k1=1.2, b=0.75)
+
+    average = index["avg_length"]["name"]
+    expected = {}
+    for entity_id, length in (("ent_a", 3), ("ent_c", 5)):
+        tf = 1 / (1 - 0.75 + 0.75 * length / average)
+        expected[entity_id] = idf(4, 2) * tf * 2.2 / (tf + 1.2)
+    assert scores == expected
+    assert scores["ent_a"] > scores["ent_c"]
+    assert matched == {"ent_a": ["token"], "ent_c": ["token"]}
+    assert idf(4, 2) == math.log(1 + 2.5 / 2.5)
+
+
+def test_b_zero_disables_length_normalization(tmp_path: Path) -> None:
+    scores, _ = score_bm25(_index(tmp_path), ["token"], b=0.0)
+    assert scores["ent_a"] == scores["ent_c"]
+
+
+def test_multi_term_and_exact_name_ranking(tmp_path: Path) -> None:
+    build_bm25_index(tmp_path, ENTITIES)
+
+    results = keyword_search(tmp_path, "auth token")
+    assert [result["id"] for result in results] == ["ent_a", "ent_b", "ent_c"]
+    assert results[0]["explanation"]["matched_terms"] == ["auth", "token"]
+    assert results[0]["explanation"]["bm25_score"] > results[1]["explanation"]["bm25_score"] > 0
+
+    assert keyword_search(tmp_path, "auth")[0]["id"] == "ent_b"
+    assert query_terms("Rate Limiter") == ["rate", "limiter", "rate limiter"]
+
+
+def test_limit_takes_top_k(tmp_path: Path) -> None:
+    write_entities(tmp_path, ENTITIES)
+    build_bm25_index(tmp_path, ENTITIES)
+    full = keyword_search(tmp_path, "auth token rate")
+
+    assert keyword_search(tmp_path, "auth token rate", limit=2) == full[:2]
+    assert keyword_search(tmp_path, "auth token rate", limit=1, offset=1) == full[1:2]
+    assert top_k({"x": 1.0, "y": 2.0, "z": 2.0}, 2) == [("y", 2.0), ("z", 2.0)]
+
+
+def test_legacy_entries_index_still_searchable(tmp_path: Path) -> None:
+    write_json(tmp_path / "indexes" / "bm25" / "index.json", {"type": "bm25", "entries": {"auth": ["ent_b"]}})
+
+    [result] = keyword_search(tmp_path, "auth")
+
+    assert result["id"] == "ent_b"
+    assert result["explanation"]["bm25_score"] == 1.0
+
+
+def test_index_stage_has_no_empty_index_warning(tmp_path: Path) -> None:
+    (tmp_path / "notes").mkdir()
+    (tmp_path / "notes" / "a.md").write_text("# Alpha\n\nUses Python.\n", encoding="utf-8")
+    config = load_config(None)
+    result = PipelineRunner().run_rebuild(root=tmp_path, config=config)
+
+    manifest = read_json(profile_pkg_root(tmp_path, config) / "runs" / result.detail["run_id"] / "index-manifest.json")
+    assert manifest["warnings"] == []
+
+
+def test_bm25_settings_read_profile(tmp_path: Path) -> None:
+    from auditgraph.config import Config, bm25_settings
+
+    assert bm25_settings(load_config(None)) == {"k1": 1.2, "b": 0.75}
+    config = Config(raw={"profiles": {"default": {"search": {"keyword": {"bm25": {"k1": 2}}}}}}, source_path=tmp_path)
+    assert bm25_settings(config) == {"k1": 2.0, "b": 0.75}
@@ -0,0 +1,151 @@
+from __future__ import annotations
+
+import json
+import random
+from pathlib import Path
+
+import pytest
+
+from auditgraph.config import DEFAULT_CONFIG, Config, ConfigError, centrality_settings
+from auditgraph.extract.manifest import write_entities
+from auditgraph.index.adjacency_builder import build_adjacency_index
+from auditgraph.index.bm25 import build_bm25_index
+from auditgraph.index.centrality import CentralityScores, build_centrality, centrality_dir, pagerank
+from auditgraph.index.csr_adjacency import CsrAdjacency
+from auditgraph.link.links import write_links
+from auditgraph.pipeline.runner import PipelineRunner
+from auditgraph.query.keyword import keyword_search
+from auditgraph.query.ranking import round_score
+
+# Two equally scored "cache" entities; only ent_hub is linked to.
+ENTITIES = [
+    {"id": "ent_hub", "name": "cache", "aliases": []},
+    {"id": "ent_leaf", "name": "cache", "aliases": []},
+    {"id": "ent_a", "name": "alpha", "aliases": []},
+    {"id": "ent_b", "name": "beta", "aliases": []},
+]
+
+
+def _link(index: int, from_id: str, to_id: str) -> dict[str, object]:
+    return {"id": f"lnk_{index:04d}", "from_id": from_id, "to_id": to_id, "type": "relates_to", "rule_id": "r1"}
+
+
+def _build(pkg_root: Path, links: list[dict[str, object]]) -> Path:
+    write_links(pkg_root, links)
+    build_adjacency_index(pkg_root)
+    return pkg_root
+
+
+def _reference_pagerank(edges: list[tuple[int, int]], n: int, iterations: int, damping: float) -> list[float]:
+    out_degree = [0] * n
+    for source, _ in edges:
+        out_degree[source] += 1
+    rank = [1.0 / n] * n
+    for _ in range(iterations):
+        dangling = sum(rank[node] for node in range(n) if not out_degree[node])
+        following = [(1.0 - damping) / n + damping * dangling / n] * n
+        for source, target in edges:
+            following[target] += damping * rank[source] / out_degree[source]
+        rank = following
+    return rank
+
+
+def test_pagerank_matches_dense_reference(tmp_path: Path) -> None:
+    rng = random.Random(7)
+    nodes = [f"ent_{index:02d}" for index in range(12)]
+    pairs = [tuple(rng.sample(nodes, 2)) for _ in range(30)]
+    _build(tmp_path, [_link(index, a, b) for index, (a, b) in enumerate(pairs)])
+    csr = CsrAdjacency.open(tmp_path)
+    assert csr is not None
+
+    ranks = pagerank(csr, iterations=40, damping=0.85)
+
+    ordinal = {node: csr.ordinal(node) for node in nodes}
+    edges = [(ordinal[a], ordinal[b]) for a, b in pairs]
+    expected = _reference_pagerank(edges, len(csr), 40, 0.85)
+    assert ranks == pytest.approx(expected, abs=1e-12)
+    assert sum(ranks) == pytest.approx(1.0)
+
+
+def test_scores_are_stored_rounded_and_deterministic(tmp_path: Path) -> None:
+    _build(tmp_path, [_link(1, "ent_a", "ent_hub"), _link(2, "ent_b", "ent_hub"), _link(3, "ent_hub", "ent_a")])
+
+    directory = build_centrality(tmp_path, iterations=20)
+    assert directory == centrality_dir(tmp_path)
+    first = {path.name: path.read_bytes() for path in directory.iterdir()}
+    build_centrality(tmp_path, iterations=20)
+    assert {path.name: path.read_bytes() for path in directory.iterdir()} == first
+
+    scores = CentralityScores.open(tmp_path)
+    assert scores is not None
+    assert scores.score("ent_hub") == 1.0
+    assert scores.score("ent_missing") == 0.0
+    assert 0.0 < scores.score("ent_b") < scores.score("ent_a") < 1.0
+    assert scores.score("ent_b") == round_score(scores.score("ent_b"), 1e-9)
+    # hub: two edges in and one out, over the two other nodes
+    assert scores.score("ent_hub", "degree") == 1.5
+    assert scores.score("ent_b", "degree") == 0.5
+
+
+def test_keyword_search_blends_graph_boost(tmp_path: Path) -> None:
+    write_entities(tmp_path, ENTITIES)
+    build_bm25_index(tmp_path, ENTITIES)
+    _build(tmp_path, [_link(1, "ent_a", "ent_hub"), _link(2, "ent_b", "ent_hub")])
+
+    plain = keyword_search(tmp_path, "cache", graph_weight=0.1)
+    assert [hit["explanation"]["graph_boost"] for hit in plain] == [0.0, 0.0]  # type: ignore[index]
+    assert [hit["id"] for hit in plain] == ["ent_hub", "ent_leaf"]
+
+    build_centrality(tmp_path)
+    boosted = keyword_search(tmp_path, "cache", graph_weight=0.1)
+    hub, leaf = boosted
+    boost = round_score(0.1 * 1.0, 0.000001)
+    assert hub["explanation"]["graph_boost"] == boost  # type: ignore[index]
+    assert hub["score"] == round_score(float(plain[0]["score"]) + boost, 0.000001)  # type: ignore[arg-type]
+    assert leaf["explanation"]["graph_boost"] == 0.0  # type: ignore[index]
+    assert keyword_search(tmp_path, "cache", graph_weight=0.1, limit=1) == boosted[:1]
+    assert keyword_search(tmp_path, "cache") == plain
+
+
+def test_graph_boost_can_reorder_hits(tmp_path: Path) -> None:
+    write_entities(tmp_path, ENTITIES)
+    build_bm25_index(tmp_path, ENTITIES)
+    _build(tmp_path, [_link(1, "ent_a", "ent_leaf"), _link(2, "ent_b", "ent_leaf")])
+    build_centrality(tmp_path)
+
+    assert [hit["id"] for hit in keyword_search(tmp_path, "cache")] == ["ent_hub", "ent_leaf"]
+    assert [hit["id"] for hit in keyword_search(tmp_path, "cache", graph_weight=0.5, limit=1)] == ["ent_leaf"]
+
+
+def test_stale_scores_are_ignored(tmp_path: Path) -> None:
+    _build(tmp_path, [_link(1, "ent_a", "ent_hub")])
+    build_centrality(tmp_path)
+    assert CentralityScores.open(tmp_path) is not None
+
+    _build(tmp_path, [_link(1, "ent_a", "ent_hub"), _link(2, "ent_b", "ent_hub")])
+
+    assert CentralityScores.open(tmp_path) is None
+
+
+def _config(centrality: dict[str, object]) -> Config:
+    raw = json.loads(json.dumps(DEFAULT_CONFIG))
+    raw["profiles"]["default"]["search"]["centrality"] = centrality
+    return Config(raw=raw, source_path=Path("pkg.yaml"))
+
+
+def test_settings_and_runner_toggle(tmp_path: Path) -> None:
+    assert centrality_settings(_config({})) == {
+        "enabled": False,
+        "measure": "pagerank",
+        "iterations": 50,
+        "damping": 0.85,
+        "weight": 0.1,
+    }
+    with pytest.raises(ConfigError):
+        centrality_settings(_config({"measure": "betweenness"}))
+
+    _build(tmp_path, [_link(1, "ent_a", "ent_hub")])
+    assert PipelineRunner._build_centrality(tmp_path, _config({"enabled": True})) == centrality_dir(tmp_path)
+    assert CentralityScores.open(tmp_path) is not None
+    assert PipelineRunner._build_centrality(tmp_path, _config({"enabled": False})) is None
+    assert not centrality_dir(tmp_path).exists()
@@ -0,0 +1,95 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+from auditgraph.config import load_config
+from auditgraph.index.chunk_index import (
+    ChunkIndex,
+    build_chunk_index,
+    chunk_index_path,
+    phrase_matches,
+    search_chunk_index,
+    tokenize_text,
+)
+from auditgraph.pipeline.runner import PipelineRunner
+from auditgraph.query.keyword import keyword_search
+from auditgraph.storage.artifacts import profile_pkg_root
+from auditgraph.storage.backends import get_backend
+from auditgraph.storage.loaders import load_chunks
+
+
+def _rebuild(tmp_path: Path) -> Path:
+    notes = tmp_path / "notes"
+    notes.mkdir()
+    (notes / "a.md").write_text("# Alpha\n\nThe cache layer uses Redis (v7).\n", encoding="utf-8")
+    (notes / "b.md").write_text("# Beta\n\nRedis cache, then Postgres.\n", encoding="utf-8")
+    (notes / "c.md").write_text("# Alpha\n\nThe cache layer uses Redis (v7).\n", encoding="utf-8")
+    config = load_config(None)
+    assert PipelineRunner().run_rebuild(root=tmp_path, config=config).status == "ok"
+    return profile_pkg_root(tmp_path, config)
+
+
+def test_tokenize_text_splits_punctuation() -> None:
+    assert tokenize_text("Uses Redis (v7), auth_token.") == ["uses", "redis", "v7", "auth", "token"]
+
+
+def test_index_rows_and_positional_postings(tmp_path: Path) -> None:
+    pkg_root = _rebuild(tmp_path)
+    index = ChunkIndex.open(pkg_root)
+    chunks = load_chunks(pkg_root)
+
+    assert index is not None and len(index) == len(chunks)
+    assert [index.row(ordinal)["chunk_id"] for ordinal in range(len(index))] == [chunk["chunk_id"] for chunk in chunks]
+    assert index.row(1)["source_path"] == chunks[1]["source_path"]
+    redis = index.postings("redis")
+    assert [ordinal for ordinal, _ in redis] == [0, 1, 2]
+    for ordinal, positions in redis:
+        tokens = tokenize_text(str(chunks[ordinal]["text"]))
+        assert [position for position, token in enumerate(tokens) if token == "redis"] == positions
+
+
+def test_phrase_matching(tmp_path: Path) -> None:
+    pkg_root = _rebuild(tmp_path)
+
+    assert len(search_chunk_index(pkg_root, "redis")) == 3
+    assert len(search_chunk_index(pkg_root, "uses redis")) == 2
+    assert [chunk["source_path"].endswith("b.md") for chunk in search_chunk_index(pkg_root, "Redis cache")] == [True]
+    assert search_chunk_index(pkg_root, "redis uses") == []
+    assert search_chunk_index(pkg_root, "missingterm") == []
+    assert phrase_matches([[[0, [1, 5]], [3, [0]]], [[0, [6]], [3, [2]]]]) == [0]
+
+
+def test_keyword_search_chunk_hits_come_from_index(tmp_path: Path) -> None:
+    pkg_root = _rebuild(tmp_path)
+
+    hits = keyword_search(pkg_root, "postgres", enable_semantic=True)
+    indexed = [hit for hit in hits if hit["id"].startswith("chk_")]
+    [hit] = indexed
+    assert "Postgres" in hit["text"]
+    assert hit["citation"]["source_path"].endswith("b.md")
+
+    # Without the index the substring scan gives the same hits.
+    chunk_index_path(pkg_root).unlink()
+    hits = keyword_search(pkg_root, "postgres", enable_semantic=True)
+    scanned = [hit for hit in hits if hit["id"].startswith("chk_")]
+    assert scanned == indexed
+    assert search_chunk_index(pkg_root, "postgres") is None
+
+    build_chunk_index(pkg_root)
+    assert search_chunk_index(pkg_root, "postgres")[0]["chunk_id"] == hit["id"]
+
+
+def test_index_is_ignored_once_chunks_change(tmp_path: Path) -> None:
+    pkg_root = _rebuild(tmp_path)
+    assert search_chunk_index(pkg_root, "postgres") is not None
+
+    [chunk] = [chunk for chunk in load_chunks(pkg_root) if "Postgres" in str(chunk["text"])]
+    get_backend(pkg_root).delete("chunks", [str(chunk["chunk_id"])])
+
+    assert ChunkIndex.open(pkg_root) is None
+    assert search_chunk_index(pkg_root, "postgres") is None
+    hits = keyword_search(pkg_root, "postgres", enable_semantic=True)
+    assert not [hit for hit in hits if hit["id"].startswith("chk_")]
+
+    build_chunk_index(pkg_root)
+    assert search_chunk_index(pkg_root, "postgres") == []
@@ -0,0 +1,152 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+import pytest
+
+from auditgraph.config import load_config
+from auditgraph.export.json import export_json
+from auditgraph.extract.manifest import write_entities
+from auditgraph.index.adjacency_builder import build_adjacency_index
+from auditgraph.index.clusters import ClusterIndex, build_clusters, cluster_members, clusters_dir
+from auditgraph.link.links import write_links
+from auditgraph.pipeline.runner import PipelineRunner
+from auditgraph.query.list_entities import list_entities
+from auditgraph.query.neighbors import neighbors
+from auditgraph.storage.artifacts import profile_pkg_root
+from auditgraph.storage.backends import activate_backend
+
+
+def _link(index: int, from_id: str, to_id: str) -> dict[str, object]:
+    return {"id": f"lnk_{index:04d}", "from_id": from_id, "to_id": to_id, "type": "relates_to", "rule_id": "r1"}
+
+
+def _links() -> list[dict[str, object]]:
+    """Two triangles joined by one bridge edge, plus a separate pair."""
+    pairs = [
+        ("ent_a1", "ent_a2"),
+        ("ent_a2", "ent_a3"),
+        ("ent_a3", "ent_a1"),
+        ("ent_b1", "ent_b2"),
+        ("ent_b2", "ent_b3"),
+        ("ent_b3", "ent_b1"),
+        ("ent_a1", "ent_b1"),
+        ("ent_x1", "ent_x2"),
+    ]
+    return [_link(index, a, b) for index, (a, b) in enumerate(pairs)]
+
+
+def _entities() -> list[dict[str, object]]:
+    ids = ["ent_a1", "ent_a2", "ent_a3", "ent_b1", "ent_b2", "ent_b3", "ent_x1", "ent_x2"]
+    return [{"id": entity_id, "name": entity_id, "type": entity_id[4], "aliases": []} for entity_id in ids]
+
+
+def _build(pkg_root: Path) -> Path:
+    write_entities(pkg_root, _entities())
+    write_links(pkg_root, _links())
+    build_adjacency_index(pkg_root)
+    build_clusters(pkg_root)
+    return pkg_root
+
+
+def test_components_and_communities(tmp_path: Path) -> None:
+    _build(tmp_path)
+    index = ClusterIndex.open(tmp_path)
+    assert index is not None
+
+    assert index.count("component") == 2 and index.count("community") == 3
+    # Numbered largest first
+    assert index.members("component", 0) == ["ent_a1", "ent_a2", "ent_a3", "ent_b1", "ent_b2", "ent_b3"]
+    assert index.members("component", 1) == ["ent_x1", "ent_x2"]
+    communities = sorted(index.members("community", label) for label in range(3))
+    assert communities == [["ent_a1", "ent_a2", "ent_a3"], ["ent_b1", "ent_b2", "ent_b3"], ["ent_x1", "ent_x2"]]
+    assert index.label("community", "ent_a2") == index.label("community", "ent_a3")
+    assert index.label("component", "ent_missing") is None
+
+    assert cluster_members(tmp_path, "community", "ent_b2") == ["ent_b1", "ent_b2", "ent_b3"]
+    assert cluster_members(tmp_path, "component", 1) == ["ent_x1", "ent_x2"]
+    assert cluster_members(tmp_path, "component", 7) == []
+    assert cluster_members(tmp_path, "component", "ent_missing") == []
+    # An entity without links is a cluster of its own
+    write_entities(tmp_path, [{"id": "ent_lone", "name": "ent_lone", "type": "l", "aliases": []}])
+    assert cluster_members(tmp_path, "component", "ent_lone") == ["ent_lone"]
+    assert cluster_members(tmp_path, "community", "ent_lone") == ["ent_lone"]
+    with pytest.raises(ValueError):
+        cluster_members(tmp_path, "clique", 0)
+
+
+def test_rebuild_is_byte_identical_and_stale_index_ignored(tmp_path: Path) -> None:
+    _build(tmp_path)
+    first = {path.name: path.read_bytes() for path in clusters_dir(tmp_path).iterdir()}
+    stats = build_clusters(tmp_path)
+    assert {path.name: path.read_bytes() for path in clusters_dir(tmp_path).iterdir()} == first
+    assert stats is not None and stats.nodes == 8 and stats.memory_bytes > 0
+
+    write_links(tmp_path, _links() + [_link(99, "ent_x2", "ent_b3")])
+    build_adjacency_index(tmp_path)
+    assert ClusterIndex.open(tmp_path) is None
+    assert cluster_members(tmp_path, "component", 0) == []
+
+
+def test_list_filters_by_cluster(tmp_path: Path) -> None:
+    _build(tmp_path)
+
+    payload = list_entities(tmp_path, community="ent_a1")
+    assert [entity["id"] for entity in payload["results"]] == ["ent_a1", "ent_a2", "ent_a3"]  # type: ignore[union-attr]
+    assert list_entities(tmp_path, component="ent_a1", count_only=True) == {"count": 6}
+    assert list_entities(tmp_path, component="ent_a1", community="ent_x1", count_only=True) == {"count": 0}
+    grouped = list_entities(tmp_path, component=0, group_by="type")
+    unfiltered = list_entities(tmp_path, where=["type!=x"], group_by="type")
+    assert grouped == unfiltered
+    assert list_entities(tmp_path, component="ent_a1", where=["type=b"], count_only=True) == {"count": 3}
+
+
+def test_sqlite_list_applies_the_cluster_filter(tmp_path: Path) -> None:
+    files_root = _build(tmp_path / "files")
+    sqlite_root = tmp_path / "sqlite"
+    backend = activate_backend(sqlite_root, "sqlite")
+    backend.write("entities", _entities())
+    backend.write("links", _links())
+    build_adjacency_index(sqlite_root)
+    build_clusters(sqlite_root)
+
+    for kwargs in ({"community": "ent_b3"}, {"component": 1, "count_only": True}, {"component": 0, "limit": 2}):
+        assert list_entities(sqlite_root, **kwargs) == list_entities(files_root, **kwargs)  # type: ignore[arg-type]
+
+
+def test_neighbors_stay_inside_the_cluster(tmp_path: Path) -> None:
+    _build(tmp_path)
+
+    free = neighbors(tmp_path, "ent_a1", depth=2, direction="both")
+    scoped = neighbors(tmp_path, "ent_a1", depth=2, direction="both", community="ent_a1")
+
+    assert any(edge.get("to_id") == "ent_b1" for edge in free["neighbors"])  # type: ignore[union-attr]
+    ends = {edge.get("to_id", edge.get("from_id")) for edge in scoped["neighbors"]}  # type: ignore[union-attr]
+    assert ends <= {"ent_a1", "ent_a2", "ent_a3"}
+    assert len(scoped["neighbors"]) == 3 and scoped["truncated"] is False  # type: ignore[arg-type]
+
+
+def test_export_is_capped_to_a_community(tmp_path: Path) -> None:
+    _build(tmp_path)
+    output = tmp_path / "exports" / "subgraphs" / "community.json"
+
+    export_json(tmp_path, tmp_path, output, entity_ids=set(cluster_members(tmp_path, "community", "ent_x1")))
+
+    payload = json.loads(output.read_text(encoding="utf-8"))
+    assert [entity["id"] for entity in payload["entities"]] == ["ent_x1", "ent_x2"]
+
+
+def test_index_manifest_reports_cluster_stats(tmp_path: Path) -> None:
+    (tmp_path / "notes").mkdir()
+    (tmp_path / "notes" / "a.md").write_text("# Alpha\n\nUses Python.\n\n## Part\n\nText.\n", encoding="utf-8")
+    config = load_config(None)
+
+    result = PipelineRunner().run_rebuild(root=tmp_path, config=config)
+
+    assert result.status == "ok"
+    pkg_root = profile_pkg_root(tmp_path, config)
+    [manifest_path] = sorted(pkg_root.glob("runs/*/index-manifest.json"))
+    stats = json.loads(manifest_path.read_text(encoding="utf-8"))["index_stats"]["clusters"]
+    assert set(stats) == {"nodes", "components", "communities", "iterations", "build_ms", "memory_bytes"}
+    assert stats["components"] >= 1 and stats["communities"] >= stats["components"]
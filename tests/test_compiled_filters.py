@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+import itertools
+import random
+
+import pytest
+
+from auditgraph.query.filters import (
+    _OPERATORS,
+    FilterPredicate,
+    apply_aggregation,
+    apply_pagination,
+    apply_sort,
+    compile_predicate,
+    matches,
+    parse_predicate,
+    select_page,
+)
+
+FIELD_VALUES = [
+    None,
+    "alice",
+    "Bob",
+    "",
+    "2",
+    "2.0",
+    "10",
+    "nan",
+    2,
+    2.5,
+    -1,
+    0,
+    True,
+    False,
+    ["alice", "x2"],
+    [2, "2"],
+    [],
+    {"level": 2},
+]
+PREDICATE_VALUES = ["alice", "2", "2.0", "-1", "10", "true", "1", "no", "", "x", "{"]
+
+
+@pytest.mark.parametrize("operator", _OPERATORS)
+def test_compiled_predicates_agree_with_matches(operator: str) -> None:
+    for value in PREDICATE_VALUES:
+        if value:
+            predicate = parse_predicate(f"field{operator}{value}")
+        else:
+            predicate = FilterPredicate("field", operator, "", False)
+        test = compile_predicate(predicate)
+        for field_value in FIELD_VALUES:
+            entity = {"id": "ent_1", "field": field_value}
+            assert test(entity) == matches(entity, predicate), (predicate, field_value)
+
+
+def test_compiled_predicates_resolve_dotted_fields() -> None:
+    test = compile_predicate(parse_predicate("metadata.heading_level>=2"))
+
+    assert test({"metadata": {"heading_level": 3}})
+    assert not test({"metadata": {"heading_level": 1}})
+    assert not test({"metadata": "flat"})
+
+
+def _entities(count: int) -> list[dict[str, object]]:
+    rng = random.Random(11)
+    entities: list[dict[str, object]] = []
+    for index in range(count):
+        entity: dict[str, object] = {"id": f"ent_{rng.randrange(10**6):06d}_{index}", "kind": rng.choice("abc")}
+        if rng.random() < 0.7:
+            entity["rank"] = rng.choice([1, 2, 2, 3, "4", 5.5])
+        if rng.random() < 0.6:
+            entity["name"] = rng.choice(["delta", "alpha", "charlie", "bravo"])
+        entities.append(entity)
+    return entities
+
+
+@pytest.mark.parametrize(
+    ("sort_field", "descending"),
+    [(None, False), ("rank", False), ("rank", True), ("name", False), ("name", True), ("missing", True)],
+)
+def test_select_page_matches_full_sort(sort_field: str | None, descending: bool) -> None:
+    entities = _entities(200)
+
+    for limit, offset in itertools.product([None, 0, 1, 7, 500], [0, 3, 199, 250]):
+        expected = apply_pagination(apply_sort(entities, sort_field, descending), limit=limit, offset=offset)
+        assert select_page(iter(entities), sort_field, descending, limit, offset) == expected
+
+
+def test_aggregation_accepts_a_stream() -> None:
+    entities = _entities(50)
+
+    assert apply_aggregation(iter(entities), count_only=True) == {"count": 50}
+    assert apply_aggregation(iter(entities), group_by="kind") == apply_aggregation(entities, group_by="kind")
@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+from auditgraph.index.adjacency_builder import build_adjacency_index
+from auditgraph.index.csr_adjacency import CsrAdjacency, csr_dir
+from auditgraph.link.adjacency import DictAdjacency, load_adjacency, open_adjacency
+from auditgraph.link.links import write_links
+from auditgraph.query.neighbors import neighbors
+
+
+def _link(link_id: str, from_id: str, to_id: str, link_type: str, rule_id: str, **extra: object) -> dict[str, object]:
+    return {"id": link_id, "from_id": from_id, "to_id": to_id, "type": link_type, "rule_id": rule_id, **extra}
+
+
+def _links() -> list[dict[str, object]]:
+    return [
+        _link("lnk_01", "ent_a", "ent_b", "relates_to", "r1", confidence=0.9),
+        _link("lnk_02", "ent_a", "ent_c", "mentions", "r2", confidence=1),
+        _link("lnk_03", "ent_b", "ent_c", "relates_to", "r1"),
+        _link("lnk_04", "ent_d", "ent_a", "cites", "r3", confidence="high"),
+    ]
+
+
+def _build(tmp_path: Path) -> Path:
+    write_links(tmp_path, _links())
+    build_adjacency_index(tmp_path)
+    return tmp_path
+
+
+def test_csr_matches_adjacency_json(tmp_path: Path) -> None:
+    pkg_root = _build(tmp_path)
+    csr = CsrAdjacency.open(pkg_root)
+    assert csr is not None
+    assert (csr_dir(pkg_root) / "fwd_offsets.bin").exists()
+
+    adjacency = load_adjacency(pkg_root)
+    reference = DictAdjacency(adjacency)
+    for node in ("ent_a", "ent_b", "ent_c", "ent_d", "ent_missing"):
+        assert csr.out_edges(node) == adjacency.get(node, [])
+        assert csr.in_edges(node) == reference.in_edges(node)
+    # Non-float confidences round-trip exactly.
+    assert [edge["confidence"] for edge in csr.out_edges("ent_a")] == [1, 0.9]
+    assert csr.in_edges("ent_a") == [{"from_id": "ent_d", "type": "cites", "confidence": "high", "rule_id": "r3"}]
+
+
+def test_stale_csr_falls_back_to_json(tmp_path: Path) -> None:
+    pkg_root = _build(tmp_path)
+    adjacency_path = pkg_root / "indexes" / "graph" / "adjacency.json"
+    adjacency_path.write_text(json.dumps({"ent_x": [{"to_id": "ent_y", "type": "t"}]}), encoding="utf-8")
+
+    assert CsrAdjacency.open(pkg_root) is None
+    view = open_adjacency(pkg_root)
+    assert isinstance(view, DictAdjacency)
+    assert view.out_edges("ent_x") == [{"to_id": "ent_y", "type": "t"}]
+
+
+def test_neighbors_directions(tmp_path: Path) -> None:
+    pkg_root = _build(tmp_path)
+
+    outgoing = neighbors(pkg_root, "ent_a")
+    assert [edge["to_id"] for edge in outgoing["neighbors"]] == ["ent_c", "ent_b"]
+
+    incoming = neighbors(pkg_root, "ent_c", direction="in")
+    assert [edge["from_id"] for edge in incoming["neighbors"]] == ["ent_a", "ent_b"]
+
+    both = neighbors(pkg_root, "ent_a", direction="both")
+    far_ends = [edge["from_id"] if edge["to_id"] == "ent_a" else edge["to_id"] for edge in both["neighbors"]]
+    assert far_ends == ["ent_c", "ent_b", "ent_d"]
+    assert all({"from_id", "to_id"} <= set(edge) for edge in both["neighbors"])
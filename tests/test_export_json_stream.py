@@ -0,0 +1,87 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+from auditgraph.config import load_config
+from auditgraph.export.json import export_json
+from auditgraph.extract.manifest import write_entities
+from auditgraph.pipeline.runner import PipelineRunner
+from auditgraph.storage.artifacts import profile_pkg_root
+from auditgraph.storage.codec import dumps
+from auditgraph.storage.loaders import (
+    iter_sorted_chunks,
+    iter_sorted_entities,
+    load_chunks,
+    load_documents,
+    load_entities,
+)
+from auditgraph.utils.redaction import build_redactor_for_pkg_root
+
+SECRET = "token=S025_STREAM_SECRET_VALUE"
+
+
+def _workspace(tmp_path: Path) -> Path:
+    notes = tmp_path / "notes"
+    notes.mkdir()
+    (notes / "b.md").write_text("# Beta\n\nUses Redis.\n\n## Part\n\nMore text.\n", encoding="utf-8")
+    (notes / "a.md").write_text("# Alpha\n\nUses Python and Redis.\n", encoding="utf-8")
+    config = load_config(None)
+    assert PipelineRunner().run_rebuild(root=tmp_path, config=config).status == "ok"
+    pkg_root = profile_pkg_root(tmp_path, config)
+    # "-" sorts before the ".json" suffix, so file-name order differs from ID order here.
+    write_entities(pkg_root, [{"id": "ent_zz", "name": SECRET}, {"id": "ent_zz-1", "aliases": [SECRET]}])
+    return pkg_root
+
+
+def _legacy_bytes(root: Path, pkg_root: Path, export_metadata: dict[str, object]) -> tuple[bytes, dict[str, object]]:
+    """The pre-streaming export: one payload, redacted at once."""
+    redactor = build_redactor_for_pkg_root(pkg_root, load_config(None))
+    data = {
+        "entities": load_entities(pkg_root, sorted_by_id=True),
+        "documents": load_documents(pkg_root),
+        "chunks": load_chunks(pkg_root),
+    }
+    result = redactor.redact_payload(data)
+    payload = dict(result.value)
+    payload["export_metadata"] = export_metadata
+    return dumps(payload, pretty=True), result.summary.to_dict()
+
+
+def test_streamed_export_is_byte_identical(tmp_path: Path) -> None:
+    pkg_root = _workspace(tmp_path)
+    output = tmp_path / "exports" / "subgraphs" / "export.json"
+
+    export_json(tmp_path, pkg_root, output)
+
+    written = output.read_bytes()
+    metadata = json.loads(written)["export_metadata"]
+    expected, summary = _legacy_bytes(tmp_path, pkg_root, metadata)
+    assert written == expected
+    assert metadata["redaction_summary"] == summary and summary["total_matches"] >= 2
+    assert b"S025_STREAM_SECRET_VALUE" not in written
+    # Body-store references stay internal to the store.
+    assert b'"text_hash"' not in written and b'"text_length"' not in written
+    assert list(output.parent.iterdir()) == [output]
+
+
+def test_sorted_iterators_match_loaders(tmp_path: Path) -> None:
+    pkg_root = _workspace(tmp_path)
+
+    assert list(iter_sorted_entities(pkg_root)) == load_entities(pkg_root, sorted_by_id=True)
+    assert [entity["id"] for entity in iter_sorted_entities(pkg_root)][-2:] == ["ent_zz", "ent_zz-1"]
+    assert list(iter_sorted_chunks(pkg_root)) == load_chunks(pkg_root)
+
+
+def test_capped_export_streams_cited_sources(tmp_path: Path) -> None:
+    pkg_root = _workspace(tmp_path)
+    output = tmp_path / "exports" / "subgraphs" / "capped.json"
+    [cited] = [entity for entity in load_entities(pkg_root) if entity.get("refs")][:1]
+
+    export_json(tmp_path, pkg_root, output, entity_ids={str(cited["id"])})
+
+    payload = json.loads(output.read_text(encoding="utf-8"))
+    hashes = {ref["source_hash"] for ref in cited["refs"]}  # type: ignore[union-attr]
+    assert [entity["id"] for entity in payload["entities"]] == [cited["id"]]
+    assert payload["documents"] and {document["source_hash"] for document in payload["documents"]} <= hashes
+    assert {chunk["source_hash"] for chunk in payload["chunks"]} <= hashes
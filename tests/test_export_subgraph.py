@@ -0,0 +1,181 @@
+from __future__ import annotations
+
+import io
+import json
+from pathlib import Path
+
+import pytest
+
+from auditgraph.cli import main as cli_main
+from auditgraph.config import DEFAULT_CONFIG, Config, load_config
+from auditgraph.errors import BudgetError
+from auditgraph.export.dot import export_dot
+from auditgraph.export.graphml import export_graphml
+from auditgraph.export.stream import JsonObjectWriter
+from auditgraph.export.subgraph import export_subgraph
+from auditgraph.extract.manifest import write_entities
+from auditgraph.index.adjacency_builder import build_adjacency_index
+from auditgraph.link.links import write_links
+from auditgraph.storage.artifacts import profile_pkg_root
+from auditgraph.storage.codec import dumps
+
+
+def _link(index: int, from_id: str, to_id: str, link_type: str = "relates_to") -> dict[str, object]:
+    return {"id": f"lnk_{index:04d}", "from_id": from_id, "to_id": to_id, "type": link_type, "rule_id": "r1"}
+
+
+def _build(pkg_root: Path) -> Path:
+    """A chain a -> b -> c -> d with a side edge e -> b of another type;
+    ``ent_d`` has no entity record."""
+    ids = ("ent_a", "ent_b", "ent_c", "ent_e")
+    write_entities(pkg_root, [{"id": entity_id, "name": f"<{entity_id}>", "aliases": []} for entity_id in ids])
+    write_links(
+        pkg_root,
+        [
+            _link(1, "ent_a", "ent_b"),
+            _link(2, "ent_b", "ent_c"),
+            _link(3, "ent_c", "ent_d"),
+            _link(4, "ent_e", "ent_b", "mentions"),
+        ],
+    )
+    build_adjacency_index(pkg_root)
+    return pkg_root
+
+
+def test_json_object_writer_matches_pretty_dumps() -> None:
+    payload = {
+        "chunks": [],
+        "entities": [{"id": "ent_a", "refs": [{"source_hash": "x"}], "tags": {}}, {"id": "ent_b", "name": "é"}],
+        "export_metadata": {"nested": {"deep": [1, 2]}},
+        "flag": True,
+    }
+    handle = io.BytesIO()
+    writer = JsonObjectWriter(handle)
+    writer.array("chunks", iter(payload["chunks"]))
+    writer.array("entities", iter(payload["entities"]))  # type: ignore[arg-type]
+    writer.field("export_metadata", payload["export_metadata"])
+    writer.field("flag", True)
+    writer.close()
+
+    assert handle.getvalue() == dumps(payload, pretty=True)
+    assert writer.bytes_written == len(handle.getvalue())
+    empty = JsonObjectWriter(io.BytesIO())
+    empty.close()
+    assert empty.bytes_written == len(dumps({}, pretty=True))
+
+
+def test_seeded_json_export(tmp_path: Path) -> None:
+    _build(tmp_path)
+    output = tmp_path / "exports" / "subgraphs" / "seed.json"
+
+    result = export_subgraph(tmp_path, tmp_path, output, "ent_b", depth=2)
+
+    payload = json.loads(output.read_text(encoding="utf-8"))
+    assert payload["seed"] == "ent_b"
+    # ent_d has no entity record: it and its edge are left out
+    assert [node["id"] for node in payload["nodes"]] == ["ent_b", "ent_c", "ent_e", "ent_a"]
+    assert payload["nodes"][0]["name"] == "<ent_b>"
+    pairs = [(edge["from_id"], edge["to_id"], edge["type"]) for edge in payload["edges"]]
+    assert pairs == [
+        ("ent_b", "ent_c", "relates_to"),
+        ("ent_e", "ent_b", "mentions"),
+        ("ent_a", "ent_b", "relates_to"),
+    ]
+    assert payload["truncated"] is False
+    assert "redaction_summary" in payload["export_metadata"]
+    assert (result.nodes, result.edges, result.truncated) == (4, 3, False)
+    assert result.budget.status == "ok" and result.budget.projected_bytes == output.stat().st_size
+    assert list(output.parent.iterdir()) == [output]
+
+
+def test_unknown_seed_is_an_error(tmp_path: Path) -> None:
+    _build(tmp_path)
+    output = tmp_path / "seed.json"
+
+    for seed in ("ent_missing", "ent_d"):
+        with pytest.raises(ValueError, match="not a stored entity"):
+            export_subgraph(tmp_path, tmp_path, output, seed)
+    assert not output.exists()
+
+
+def test_walk_limits_apply(tmp_path: Path) -> None:
+    _build(tmp_path)
+    output = tmp_path / "seed.json"
+
+    typed = export_subgraph(tmp_path, tmp_path, output, "ent_b", depth=3, edge_types=["mentions"])
+    payload = json.loads(output.read_text(encoding="utf-8"))
+    assert [node["id"] for node in payload["nodes"]] == ["ent_b", "ent_e"]
+    assert (typed.edges, typed.truncated) == (1, False)
+
+    capped = export_subgraph(tmp_path, tmp_path, output, "ent_b", depth=3, direction="out", max_nodes=1)
+    payload = json.loads(output.read_text(encoding="utf-8"))
+    assert [node["id"] for node in payload["nodes"]] == ["ent_b", "ent_c"]
+    assert capped.truncated is True and payload["truncated"] is True
+
+
+def test_seeded_dot_and_graphml_stream_edges(tmp_path: Path) -> None:
+    _build(tmp_path)
+
+    export_subgraph(tmp_path, tmp_path, tmp_path / "seed.dot", "ent_a", fmt="dot", direction="out")
+    dot = (tmp_path / "seed.dot").read_text(encoding="utf-8")
+    assert dot.splitlines() == [
+        "digraph auditgraph {",
+        '  "ent_a" [label="<ent_a>"]; ',
+        '  "ent_b" [label="<ent_b>"]; ',
+        '  "ent_a" -> "ent_b" [label="relates_to"];',
+        "}",
+    ]
+
+    export_subgraph(tmp_path, tmp_path, tmp_path / "seed.graphml", "ent_a", fmt="graphml", direction="out")
+    graphml = (tmp_path / "seed.graphml").read_text(encoding="utf-8")
+    assert '<data key="label">&lt;ent_b&gt;</data>' in graphml
+    assert '<edge source="ent_a" target="ent_b"><data key="type">relates_to</data></edge>' in graphml
+
+    with pytest.raises(ValueError):
+        export_subgraph(tmp_path, tmp_path, tmp_path / "seed.txt", "ent_a", fmt="txt")
+
+
+def test_full_dot_and_graphml_include_edges_between_entities(tmp_path: Path) -> None:
+    _build(tmp_path)
+
+    dot = export_dot(tmp_path, tmp_path / "all.dot", entity_ids={"ent_a", "ent_b", "ent_c", "ent_d"}).read_text()
+    assert '"ent_a" -> "ent_b"' in dot and '"ent_b" -> "ent_c"' in dot
+    # ent_d has no entity record and ent_e is filtered out
+    assert "ent_d" not in dot and "ent_e" not in dot
+
+    graphml = export_graphml(tmp_path, tmp_path / "all.graphml").read_text()
+    assert graphml.count("<edge ") == 3 and graphml.endswith("</graphml>")
+
+
+def _budget_config(multiplier: float) -> Config:
+    raw = json.loads(json.dumps(DEFAULT_CONFIG))
+    raw["storage"]["footprint_budget"] = {"multiplier": multiplier}
+    return Config(raw=raw, source_path=Path("pkg.yaml"))
+
+
+def test_budget_applies_to_the_subgraph(tmp_path: Path) -> None:
+    _build(tmp_path)
+    output = tmp_path / "exports" / "seed.json"
+
+    # 1 MiB minimum source size x 0.0008 is about 840 bytes: the seed alone fits, the walk does not.
+    with pytest.raises(BudgetError):
+        export_subgraph(tmp_path, tmp_path, output, "ent_b", _budget_config(0.0008), depth=2)
+    assert not output.exists() and list(output.parent.iterdir()) == []
+
+    small = export_subgraph(tmp_path, tmp_path, output, "ent_b", _budget_config(0.0008), edge_types=["none"])
+    assert small.budget.status == "ok" and small.nodes == 1 and output.exists()
+
+
+def test_cli_seeded_export(tmp_path: Path, monkeypatch, capsys) -> None:
+    pkg_root = profile_pkg_root(tmp_path, load_config(None))
+    _build(pkg_root)
+    monkeypatch.chdir(tmp_path)
+    argv = ["auditgraph", "export", "--root", str(tmp_path), "--seed", "ent_b", "--direction", "in"]
+    monkeypatch.setattr("sys.argv", [*argv, "--edge-type", "mentions"])
+
+    cli_main()
+
+    payload = json.loads(capsys.readouterr().out)
+    assert (payload["nodes"], payload["edges"], payload["truncated"]) == (2, 1, False)
+    exported = json.loads(Path(payload["output"]).read_text(encoding="utf-8"))
+    assert [node["id"] for node in exported["nodes"]] == ["ent_b", "ent_e"]
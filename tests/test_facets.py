@@ -0,0 +1,158 @@
+from __future__ import annotations
+
+import random
+from pathlib import Path
+
+import pytest
+
+from auditgraph.extract.manifest import write_entities
+from auditgraph.index.facets import FacetTable, aggregate_postings, build_facets
+from auditgraph.index.field_index import FieldIndex, build_field_indexes
+from auditgraph.index.type_index import build_type_indexes
+from auditgraph.query.filters import apply_aggregation, apply_filters, parse_predicate
+from auditgraph.query.list_entities import list_entities
+
+FIELDS = ["type", "author_email", "authored_at", "metadata.heading_level", "tags", "flag"]
+
+
+def _entities(count: int, seed: int = 5) -> list[dict[str, object]]:
+    rng = random.Random(seed)
+    entities: list[dict[str, object]] = []
+    for index in range(count):
+        entity: dict[str, object] = {
+            "id": f"ent_{rng.randrange(10**6):06d}_{index}",
+            "type": rng.choice(["commit", "ag:section", "note"]),
+        }
+        if rng.random() < 0.7:
+            entity["author_email"] = rng.choice(["alice@example.com", "bob@example.com", "carol@example.com"])
+        if rng.random() < 0.7:
+            entity["authored_at"] = f"2024-0{rng.randint(1, 9)}-1{rng.randint(0, 9)}"
+        if rng.random() < 0.5:
+            entity["metadata"] = {"heading_level": rng.choice([1, 2, 3, "4"])}
+        if rng.random() < 0.3:
+            entity["tags"] = rng.sample(["infra", "auth", "db"], 2)
+        if rng.random() < 0.2:
+            entity["flag"] = rng.random() < 0.5
+        entities.append(entity)
+    return entities
+
+
+def _store(tmp_path: Path, entities: list[dict[str, object]]) -> Path:
+    write_entities(tmp_path, entities)
+    build_type_indexes(tmp_path, entities)
+    build_field_indexes(tmp_path, entities, FIELDS)
+    build_facets(tmp_path, entities, FIELDS)
+    return tmp_path
+
+
+def _scan(entities: list[dict[str, object]], types: list[str] | None, where: list[str], **kwargs: object) -> dict:
+    ordered = sorted(entities, key=lambda entity: str(entity["id"]))
+    if types:
+        ordered = [entity for entity_type in types for entity in ordered if entity["type"] == entity_type]
+    filtered = apply_filters(ordered, predicates=[parse_predicate(expr) for expr in where])
+    return apply_aggregation(filtered, **kwargs)  # type: ignore[arg-type]
+
+
+@pytest.mark.parametrize("types", [None, ["note"], ["note", "commit"], ["commit", "missing"]])
+@pytest.mark.parametrize("group_by", [None, "type", "author_email", "metadata.heading_level", "tags", "flag"])
+def test_facet_tables_answer_like_a_scan(tmp_path: Path, monkeypatch: pytest.MonkeyPatch, types, group_by) -> None:
+    entities = _entities(200)
+    pkg_root = _store(tmp_path, entities)
+
+    def no_load(*args: object, **kwargs: object) -> None:
+        raise AssertionError("aggregation read the entity store")
+
+    monkeypatch.setattr("auditgraph.query.list_entities.iter_entities", no_load)
+    monkeypatch.setattr("auditgraph.query.list_entities.load_entity", no_load)
+    monkeypatch.setattr("auditgraph.query.list_entities.load_entities_by_type", no_load)
+
+    payload = list_entities(pkg_root, types=types, count_only=True, group_by=group_by)
+    expected = _scan(entities, types, [], count_only=True, group_by=group_by)
+
+    assert payload == expected
+    if group_by:
+        assert list(payload["groups"]) == list(expected["groups"])
+
+
+@pytest.mark.parametrize(
+    "where",
+    [
+        ["author_email=alice@example.com"],
+        ["authored_at>=2024-05", "metadata.heading_level>=2"],
+        ["tags=auth"],
+        ["type=note", "author_email<carol"],
+    ],
+)
+@pytest.mark.parametrize("types", [None, ["ag:section", "commit"]])
+def test_exact_predicates_aggregate_over_postings(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch, where, types
+) -> None:
+    entities = _entities(200)
+    pkg_root = _store(tmp_path, entities)
+    for predicate in map(parse_predicate, where):
+        assert FieldIndex.open(pkg_root, predicate.field).exact(predicate)  # type: ignore[union-attr]
+
+    def no_load(*args: object, **kwargs: object) -> None:
+        raise AssertionError("aggregation loaded an entity")
+
+    monkeypatch.setattr("auditgraph.query.list_entities.load_entity", no_load)
+
+    for group_by in (None, "author_email", "type"):
+        payload = list_entities(pkg_root, types=types, where=where, count_only=True, group_by=group_by)
+        expected = _scan(entities, types, where, count_only=True, group_by=group_by)
+        assert payload == expected
+        if group_by:
+            assert list(payload["groups"]) == list(expected["groups"])
+
+
+def test_inexact_predicates_fall_back_to_loading(tmp_path: Path) -> None:
+    entities = _entities(200)
+    pkg_root = _store(tmp_path, entities)
+    where = ["flag=true", "tags>b", "author_email~bob"]
+
+    assert not FieldIndex.open(pkg_root, "flag").exact(parse_predicate("flag=true"))  # type: ignore[union-attr]
+    assert not FieldIndex.open(pkg_root, "tags").exact(parse_predicate("tags>b"))  # type: ignore[union-attr]
+    for expr in where:
+        payload = list_entities(pkg_root, where=[expr], group_by="metadata.heading_level")
+        assert payload == _scan(entities, None, [expr], group_by="metadata.heading_level")
+
+
+def test_unfaceted_group_by_scans(tmp_path: Path) -> None:
+    entities = _entities(80)
+    pkg_root = _store(tmp_path, entities)
+
+    payload = list_entities(pkg_root, group_by="id")
+
+    assert payload["total_count"] == 80 and len(payload["groups"]) == 80
+
+
+def test_stale_facets_fall_back_to_the_scan(tmp_path: Path) -> None:
+    entities = _entities(10)
+    pkg_root = _store(tmp_path, entities)
+    added = [
+        {"id": "ent_zzz_1", "type": "note"},
+        {"id": "ent_zzz_2", "type": "commit", "author_email": "dan@example.com"},
+    ]
+    write_entities(pkg_root, added)
+
+    assert FacetTable.open(pkg_root) is None
+    assert aggregate_postings(pkg_root, ["ent_zzz_1"], group_by="type") is None
+    assert list_entities(pkg_root, count_only=True) == {"count": 12}
+    payload = list_entities(pkg_root, group_by="author_email")
+    assert payload == _scan(entities + added, None, [], group_by="author_email")
+
+
+def test_index_stage_writes_facets(tmp_path: Path) -> None:
+    from auditgraph.config import load_config
+    from auditgraph.pipeline.runner import PipelineRunner
+    from auditgraph.storage.artifacts import profile_pkg_root
+
+    (tmp_path / "notes").mkdir()
+    (tmp_path / "notes" / "a.md").write_text("# Alpha\n\nUses Python.\n\n## Setup\n\nRun `make`.\n", encoding="utf-8")
+    config = load_config(None)
+    assert PipelineRunner().run_rebuild(root=tmp_path, config=config).status == "ok"
+    pkg_root = profile_pkg_root(tmp_path, config)
+
+    assert FacetTable.open(pkg_root) is not None
+    scanned = list_entities(pkg_root, group_by="type", where=["name~"])
+    assert list_entities(pkg_root, group_by="type") == scanned
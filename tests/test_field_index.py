@@ -0,0 +1,151 @@
+from __future__ import annotations
+
+import random
+from pathlib import Path
+
+import pytest
+
+from auditgraph.config import Config, field_index_settings, load_config
+from auditgraph.extract.manifest import write_entities
+from auditgraph.index.field_index import FieldIndex, build_field_indexes
+from auditgraph.index.type_index import build_type_indexes
+from auditgraph.query.filters import apply_filters, apply_sort, parse_predicate
+from auditgraph.query.list_entities import list_entities
+from auditgraph.query.planner import plan_entity_filters
+from auditgraph.storage import loaders
+
+FIELDS = ["type", "author_email", "authored_at", "metadata.heading_level", "tags", "flag"]
+
+
+def _entities(count: int, seed: int = 3) -> list[dict[str, object]]:
+    rng = random.Random(seed)
+    entities: list[dict[str, object]] = []
+    for index in range(count):
+        entity: dict[str, object] = {
+            "id": f"ent_{index:04d}",
+            "type": rng.choice(["commit", "ag:section", "note"]),
+            "name": f"entity {index}",
+        }
+        if rng.random() < 0.7:
+            entity["author_email"] = rng.choice(["alice@example.com", "bob@example.com", "carol@example.com"])
+        if rng.random() < 0.7:
+            entity["authored_at"] = f"2024-0{rng.randint(1, 9)}-1{rng.randint(0, 9)}"
+        if rng.random() < 0.5:
+            entity["metadata"] = {"heading_level": rng.choice([1, 2, 3, "4"])}
+        if rng.random() < 0.4:
+            entity["tags"] = rng.sample(["infra", "auth", "db", 7], 2)
+        if rng.random() < 0.2:
+            entity["flag"] = rng.random() < 0.5
+        entities.append(entity)
+    return entities
+
+
+def _store(tmp_path: Path, entities: list[dict[str, object]]) -> Path:
+    write_entities(tmp_path, entities)
+    build_type_indexes(tmp_path, entities)
+    build_field_indexes(tmp_path, entities, FIELDS)
+    return tmp_path
+
+
+PREDICATES = [
+    "author_email=alice@example.com",
+    "authored_at>=2024-05-15",
+    "authored_at<2024-03",
+    "metadata.heading_level=2",
+    "metadata.heading_level>=3",
+    "metadata.heading_level<2",
+    "tags=auth",
+    "flag=true",
+    "flag=1",
+    "type>note",
+    "author_email!=bob@example.com",
+    "authored_at~2024-07",
+]
+
+
+@pytest.mark.parametrize("expr", PREDICATES)
+def test_index_lookups_match_a_scan(tmp_path: Path, expr: str) -> None:
+    entities = _entities(300)
+    pkg_root = _store(tmp_path, entities)
+    predicate = parse_predicate(expr)
+
+    expected = sorted(str(entity["id"]) for entity in apply_filters(entities, predicates=[predicate]))
+    payload = list_entities(pkg_root, where=[expr])
+
+    assert [hit["id"] for hit in payload["results"]] == expected
+    index = FieldIndex.open(pkg_root, predicate.field)
+    assert index is not None
+    candidates = index.lookup(predicate)
+    if predicate.operator in ("!=", "~"):
+        assert candidates is None
+    else:
+        assert candidates is not None and set(expected) <= set(candidates)
+
+
+def test_planner_intersects_from_the_most_selective_index(tmp_path: Path) -> None:
+    pkg_root = _store(tmp_path, _entities(300))
+    predicates = [parse_predicate("authored_at>=2024-01"), parse_predicate("author_email=carol@example.com")]
+
+    plan = plan_entity_filters(pkg_root, types=["commit"], predicates=predicates)
+
+    assert plan.indexes[0] == "author_email=carol@example.com"
+    assert set(plan.indexes) == {"author_email=carol@example.com", "authored_at>=2024-01", "type"}
+    assert plan.ids == sorted(plan.ids or [])
+    assert plan_entity_filters(pkg_root, predicates=[parse_predicate("name~entity")]).ids is None
+
+
+def test_list_loads_only_candidate_entities(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    entities = _entities(300)
+    pkg_root = _store(tmp_path, entities)
+    loaded: list[str] = []
+    original = loaders.load_entity
+
+    def counting_load(root: Path, entity_id: str) -> dict[str, object]:
+        loaded.append(entity_id)
+        return original(root, entity_id)
+
+    def no_scan(*args: object, **kwargs: object) -> list[dict[str, object]]:
+        raise AssertionError("list_entities scanned every entity")
+
+    monkeypatch.setattr("auditgraph.query.list_entities.load_entity", counting_load)
+    monkeypatch.setattr("auditgraph.query.list_entities.iter_entities", no_scan)
+
+    where = ["author_email=bob@example.com", "metadata.heading_level>=2"]
+    payload = list_entities(pkg_root, types=["ag:section", "commit"], where=where, sort="authored_at")
+
+    predicates = [parse_predicate(w) for w in where]
+    wanted = list(apply_filters(entities, types=["ag:section", "commit"], predicates=predicates))
+    assert [hit["id"] for hit in payload["results"]] == [e["id"] for e in apply_sort(wanted, "authored_at")]
+    assert sorted(loaded) == sorted(str(e["id"]) for e in wanted)
+
+
+def test_grouping_keeps_scan_order_with_types(tmp_path: Path) -> None:
+    entities = _entities(120)
+    pkg_root = _store(tmp_path, entities)
+    args = {"types": ["note", "commit"], "where": ["authored_at>=2024-02"], "group_by": "author_email"}
+
+    indexed = list_entities(pkg_root, **args)
+    build_field_indexes(pkg_root, entities, [])
+    scanned = list_entities(pkg_root, **args)
+
+    assert list(indexed["groups"].items()) == list(scanned["groups"].items())
+
+
+def test_stale_indexes_fall_back_to_the_scan(tmp_path: Path) -> None:
+    entities = _entities(50)
+    pkg_root = _store(tmp_path, entities)
+    assert FieldIndex.open(pkg_root, "author_email") is not None
+
+    # Extracted after the index stage ran.
+    write_entities(pkg_root, [{"id": "ent_new", "type": "note", "author_email": "dave@example.com"}])
+
+    assert FieldIndex.open(pkg_root, "author_email") is None
+    assert plan_entity_filters(pkg_root, predicates=[parse_predicate("author_email=dave@example.com")]).ids is None
+    payload = list_entities(pkg_root, where=["author_email=dave@example.com"])
+    assert [hit["id"] for hit in payload["results"]] == ["ent_new"]
+
+
+def test_field_index_settings() -> None:
+    assert "metadata.heading_level" in field_index_settings(load_config(None))
+    raw = {"profiles": {"default": {"search": {"field_indexes": ["author_email"]}}}}
+    assert field_index_settings(Config(raw=raw, source_path=Path("."))) == ["author_email"]
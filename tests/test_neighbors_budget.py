@@ -0,0 +1,127 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+import pytest
+
+from auditgraph.config import load_config
+from auditgraph.index.adjacency_builder import build_adjacency_index
+from auditgraph.link.links import write_links
+from auditgraph.query.neighbors import iter_neighbors, neighbors
+from auditgraph.storage.artifacts import profile_pkg_root
+from auditgraph.storage.backends import activate_backend
+from tests.support import run_cli
+
+
+def _link(index: int, from_id: str, to_id: str, link_type: str = "mentions") -> dict[str, object]:
+    return {"id": f"lnk_{index:04d}", "from_id": from_id, "to_id": to_id, "type": link_type, "rule_id": "r1"}
+
+
+def _hub_links(notes: int = 40) -> list[dict[str, object]]:
+    links = [_link(index, f"ent_note{index:03d}", "ent_redis") for index in range(notes)]
+    links.append(_link(900, "ent_redis", "ent_cache", "relates_to"))
+    links.append(_link(901, "ent_note000", "ent_note001", "cites"))
+    return links
+
+
+def _build(pkg_root: Path, links: list[dict[str, object]]) -> Path:
+    write_links(pkg_root, links)
+    build_adjacency_index(pkg_root)
+    return pkg_root
+
+
+def _pairs(payload: dict[str, object]) -> list[tuple[str, str]]:
+    return [(str(edge.get("from_id", "")), str(edge.get("to_id", ""))) for edge in payload["neighbors"]]  # type: ignore[union-attr]
+
+
+def test_both_directions_report_each_edge_once(tmp_path: Path) -> None:
+    pkg_root = _build(tmp_path, _hub_links(3))
+
+    payload = neighbors(pkg_root, "ent_note000", depth=3, direction="both")
+
+    # 3 mentions + relates_to + cites, with no edge reported from both ends
+    assert sorted(edge["type"] for edge in payload["neighbors"]) == [  # type: ignore[union-attr]
+        "cites",
+        "mentions",
+        "mentions",
+        "mentions",
+        "relates_to",
+    ]
+    assert payload["truncated"] is False
+
+
+def test_fanout_caps_edges_per_node_and_hop(tmp_path: Path) -> None:
+    pkg_root = _build(tmp_path, _hub_links())
+
+    unbounded = neighbors(pkg_root, "ent_redis", direction="in")
+    capped = neighbors(pkg_root, "ent_redis", direction="in", max_fanout=5)
+
+    assert len(unbounded["neighbors"]) == 40 and unbounded["truncated"] is False  # type: ignore[arg-type]
+    assert capped["neighbors"] == unbounded["neighbors"][:5]  # type: ignore[index]
+    assert capped["truncated"] is True
+
+
+def test_edge_and_node_budgets(tmp_path: Path) -> None:
+    pkg_root = _build(tmp_path, _hub_links())
+
+    edges = neighbors(pkg_root, "ent_redis", depth=2, direction="both", max_edges=12)
+    exact = neighbors(pkg_root, "ent_cache", depth=1, direction="in", max_edges=1)
+    nodes = neighbors(pkg_root, "ent_redis", depth=2, direction="both", max_nodes=3)
+
+    assert len(edges["neighbors"]) == 12 and edges["truncated"] is True  # type: ignore[arg-type]
+    assert len(exact["neighbors"]) == 1 and exact["truncated"] is False  # type: ignore[arg-type]
+    reached = {edge.get("from_id", edge.get("to_id")) for edge in nodes["neighbors"]}  # type: ignore[union-attr]
+    assert len(reached) == 3 and nodes["truncated"] is True
+
+
+def test_iter_neighbors_streams_records(tmp_path: Path) -> None:
+    pkg_root = _build(tmp_path, _hub_links(4))
+
+    records = iter_neighbors(pkg_root, "ent_redis", depth=2, direction="in")
+
+    assert next(records) == {"center_id": "ent_redis"}
+    first = next(records)
+    assert first["depth"] == 1 and first["edge"]["from_id"] == "ent_note000"  # type: ignore[index]
+    rest = list(records)
+    # note000 cites note001, found one hop further out
+    assert rest[-1] == {"truncated": False, "edges": 5, "nodes": 4}
+    assert [record["depth"] for record in rest[:-1]] == [1, 1, 1, 2]
+    with pytest.raises(ValueError):
+        list(iter_neighbors(pkg_root, "ent_redis", direction="sideways"))
+
+
+def test_sqlite_pushdown_applies_the_same_budgets(tmp_path: Path) -> None:
+    files_root = _build(tmp_path / "files", _hub_links())
+    sqlite_root = tmp_path / "sqlite"
+    activate_backend(sqlite_root, "sqlite").write("links", _hub_links())
+
+    for kwargs in ({"max_fanout": 3}, {"max_edges": 7}, {"max_nodes": 2}, {}):
+        assert neighbors(sqlite_root, "ent_redis", depth=2, direction="both", **kwargs) == neighbors(
+            files_root, "ent_redis", depth=2, direction="both", **kwargs
+        )
+
+
+def test_cli_direction_and_ndjson(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("AUDITGRAPH_NO_DAEMON", "1")
+    _build(profile_pkg_root(tmp_path, load_config(None)), _hub_links(6))
+
+    payload = json.loads(
+        run_cli(["neighbors", "ent_redis", "--root", str(tmp_path), "--direction", "in", "--max-edges", "4"]).stdout
+    )
+    lines = run_cli(["neighbors", "ent_redis", "--root", str(tmp_path), "--direction", "both", "--ndjson"]).stdout
+
+    assert [pair[0] for pair in _pairs(payload)] == [f"ent_note{index:03d}" for index in range(4)]
+    assert payload["truncated"] is True
+    records = [json.loads(line) for line in lines.splitlines()]
+    assert records[0] == {"center_id": "ent_redis"}
+    assert [record["edge"]["type"] for record in records[1:-1]] == ["relates_to"] + ["mentions"] * 6
+    assert records[-1] == {"truncated": False, "edges": 7, "nodes": 7}
+
+
+def test_cli_walk_is_unbounded_by_default() -> None:
+    from auditgraph.cli import _build_parser
+
+    args = _build_parser().parse_args(["neighbors", "ent_redis"])
+
+    assert (args.max_fanout, args.max_edges, args.max_nodes) == (None, None, None)
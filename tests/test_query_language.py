@@ -0,0 +1,153 @@
+from __future__ import annotations
+
+import random
+from pathlib import Path
+
+import pytest
+
+from auditgraph.errors import QuerySyntaxError
+from auditgraph.extract.manifest import write_entities
+from auditgraph.index.bm25 import build_bm25_index
+from auditgraph.index.postings import difference, gallop, intersect, union
+from auditgraph.index.type_index import build_type_indexes
+from auditgraph.query.keyword import keyword_search
+from auditgraph.query.query_language import (
+    And,
+    Not,
+    Or,
+    Phrase,
+    Term,
+    TypeMatch,
+    is_structured_query,
+    parse_query,
+)
+from auditgraph.storage import loaders
+
+ENTITIES = [
+    {"id": "ent_a", "type": "service", "name": "redis cache", "aliases": ["session store"]},
+    {"id": "ent_b", "type": "service", "name": "cache warmer", "aliases": ["redis primer"]},
+    {"id": "ent_c", "type": "library", "name": "redis client", "aliases": []},
+    {"id": "ent_d", "type": "library", "name": "cache redis adapter", "aliases": []},
+    {"id": "ent_e", "type": "ag:section", "name": "Postgres notes", "aliases": []},
+]
+
+
+def _store(tmp_path: Path) -> Path:
+    write_entities(tmp_path, ENTITIES)
+    build_bm25_index(tmp_path, ENTITIES)
+    build_type_indexes(tmp_path, ENTITIES)
+    return tmp_path
+
+
+def _ids(pkg_root: Path, query: str, **kwargs: object) -> list[str]:
+    return sorted(str(hit["id"]) for hit in keyword_search(pkg_root, query, **kwargs))
+
+
+def test_posting_list_operations_match_set_semantics() -> None:
+    rng = random.Random(7)
+    universe = [f"ent_{index:05d}" for index in range(2000)]
+    lists = [sorted(rng.sample(universe, size)) for size in (5, 300, 1500)]
+
+    assert intersect(lists) == sorted(set(lists[0]) & set(lists[1]) & set(lists[2]))
+    assert union(lists) == sorted(set().union(*lists))
+    assert difference(lists[1], lists[2]) == sorted(set(lists[1]) - set(lists[2]))
+    assert gallop(universe, "ent_01000", 3) == 1000
+    assert gallop(universe, "zzz") == len(universe)
+    assert intersect([]) == [] and intersect([["a"], []]) == []
+
+
+def test_parse_builds_expression_tree() -> None:
+    assert parse_query("redis AND cache") == And((Term("redis"), Term("cache")))
+    assert parse_query("redis cache OR postgres") == Or((Or((Term("redis"), Term("cache"))), Term("postgres")))
+    assert parse_query('name:"redis cache" -alias:primer') == And(
+        (Phrase(("redis", "cache"), "redis cache", "name"), Not(Term("primer", "aliases")))
+    )
+    assert parse_query("type:ag:section NOT (a OR b)") == And(
+        (TypeMatch("ag:section"), Not(Or((Term("a"), Term("b")))))
+    )
+    assert parse_query("auth_token") == Phrase(("auth", "token"), "auth_token")
+
+
+@pytest.mark.parametrize(
+    "query", ['"redis', "NOT redis", "redis AND", "(redis", "redis )", "name:(redis)", "-cache -redis"]
+)
+def test_malformed_queries_raise(query: str) -> None:
+    with pytest.raises(QuerySyntaxError):
+        parse_query(query)
+
+
+def test_plain_queries_keep_bag_of_terms_path() -> None:
+    assert not is_structured_query("redis cache")
+    assert not is_structured_query("cache-warmer and friends")
+    assert is_structured_query("redis AND cache")
+    assert is_structured_query("redis -cache")
+    assert is_structured_query("type:service")
+
+
+def test_boolean_operators(tmp_path: Path) -> None:
+    pkg_root = _store(tmp_path)
+
+    assert _ids(pkg_root, "redis AND cache") == ["ent_a", "ent_b", "ent_d"]
+    assert _ids(pkg_root, "redis AND NOT cache") == ["ent_c"]
+    assert _ids(pkg_root, "redis -cache") == ["ent_c"]
+    assert _ids(pkg_root, "(client OR warmer) AND redis") == ["ent_b", "ent_c"]
+    assert _ids(pkg_root, "postgres OR client") == ["ent_c", "ent_e"]
+
+
+def test_phrases_check_token_order(tmp_path: Path) -> None:
+    pkg_root = _store(tmp_path)
+
+    assert _ids(pkg_root, '"redis cache"') == ["ent_a"]
+    assert _ids(pkg_root, '"cache redis"') == ["ent_d"]
+    assert _ids(pkg_root, '"adapter redis"') == []
+
+
+def test_field_scoping(tmp_path: Path) -> None:
+    pkg_root = _store(tmp_path)
+
+    assert _ids(pkg_root, "alias:redis") == ["ent_b"]
+    assert _ids(pkg_root, "name:redis") == ["ent_a", "ent_c", "ent_d"]
+    assert _ids(pkg_root, 'aliases:"session store"') == ["ent_a"]
+    assert _ids(pkg_root, "type:library redis") == ["ent_a", "ent_b", "ent_c", "ent_d"]
+    assert _ids(pkg_root, "type:library AND redis") == ["ent_c", "ent_d"]
+    assert _ids(pkg_root, "type:ag:section") == ["ent_e"]
+
+
+def test_scores_rank_and_explain_positive_terms(tmp_path: Path) -> None:
+    pkg_root = _store(tmp_path)
+
+    results = keyword_search(pkg_root, '"redis cache" OR type:ag:section')
+
+    assert [hit["id"] for hit in results] == ["ent_a", "ent_e"]
+    assert results[0]["explanation"]["matched_terms"] == ["redis", "cache", "redis cache"]
+    assert results[1]["score"] == 0.0 and results[1]["explanation"]["matched_terms"] == []
+
+
+def test_type_filters_use_index_before_loading_entities(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    pkg_root = _store(tmp_path)
+    loaded: list[str] = []
+    original = loaders.load_entity
+
+    def counting_load(root: Path, entity_id: str) -> dict[str, object]:
+        loaded.append(entity_id)
+        return original(root, entity_id)
+
+    monkeypatch.setattr("auditgraph.query.keyword.load_entity", counting_load)
+
+    hits = keyword_search(pkg_root, "redis", types=["library"], limit=1)
+    assert [hit["id"] for hit in hits] == ["ent_c"]
+    assert loaded == ["ent_c"]
+
+    loaded.clear()
+    assert _ids(pkg_root, "redis", where=["type=service"]) == ["ent_a", "ent_b"]
+    assert sorted(loaded) == ["ent_a", "ent_b"]
+
+
+def test_type_filters_without_type_index(tmp_path: Path) -> None:
+    write_entities(tmp_path, ENTITIES)
+    build_bm25_index(tmp_path, ENTITIES)
+
+    assert _ids(tmp_path, "redis", types=["library"]) == ["ent_c", "ent_d"]
+    assert _ids(tmp_path, "redis", where=["type=service"]) == ["ent_a", "ent_b"]
+    # type: reads the type index, as list --type does; it never scans the store
+    assert _ids(tmp_path, "type:library") == []
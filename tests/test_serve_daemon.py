@@ -0,0 +1,162 @@
+from __future__ import annotations
+
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Iterator
+
+import pytest
+
+from auditgraph.config import load_config
+from auditgraph.errors import ServeError
+from auditgraph.extract.manifest import write_entities
+from auditgraph.index.bm25 import build_bm25_index
+from auditgraph.link.adjacency import write_adjacency
+from auditgraph.query.daemon import NO_DAEMON_ENV, QueryDaemon, request, socket_path
+from auditgraph.storage.artifacts import profile_pkg_root, write_json
+from tests.support import run_cli
+
+pytestmark = pytest.mark.skipif(not hasattr(os, "getuid"), reason="needs Unix domain sockets")
+
+ENTITIES = [
+    {"id": "ent_a", "type": "service", "name": "redis cache", "aliases": []},
+    {"id": "ent_b", "type": "library", "name": "redis client", "aliases": []},
+]
+
+
+def _store(root: Path, entities: list[dict[str, object]]) -> Path:
+    pkg_root = profile_pkg_root(root, load_config(None))
+    write_entities(pkg_root, entities)
+    build_bm25_index(pkg_root, entities)
+    write_adjacency(
+        pkg_root,
+        {"ent_a": [{"from_id": "ent_a", "to_id": "ent_b", "type": "uses", "confidence": 1.0}]},
+    )
+    return pkg_root
+
+
+def _index_run(pkg_root: Path, run_id: str) -> None:
+    write_json(pkg_root / "runs" / run_id / "index-manifest.json", {"run_id": run_id, "stage": "index"})
+
+
+@pytest.fixture
+def daemon(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Iterator[QueryDaemon]:
+    monkeypatch.delenv(NO_DAEMON_ENV, raising=False)
+    _store(tmp_path, ENTITIES)
+    server = QueryDaemon(tmp_path, None)
+    server.bind()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    thread.join(timeout=5)
+
+
+def test_cli_read_commands_go_through_daemon(tmp_path: Path, daemon: QueryDaemon) -> None:
+    assert daemon.socket == socket_path(tmp_path, None) and daemon.socket.exists()
+
+    query = json.loads(run_cli(["query", "--root", str(tmp_path), "--q", "redis", "--type", "library"]).stdout)
+    node = json.loads(run_cli(["node", "ent_a", "--root", str(tmp_path)]).stdout)
+    edges = json.loads(run_cli(["neighbors", "ent_a", "--root", str(tmp_path)]).stdout)
+
+    assert [hit["id"] for hit in query["results"]] == ["ent_b"]
+    assert node["id"] == "ent_a"
+    assert [edge["to_id"] for edge in edges["neighbors"]] == ["ent_b"]
+    assert daemon.requests == 3
+
+
+def test_daemon_output_matches_in_process(
+    tmp_path: Path, daemon: QueryDaemon, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    args = ["list", "--root", str(tmp_path), "--sort", "name"]
+    served = run_cli(args).stdout
+    monkeypatch.setenv(NO_DAEMON_ENV, "1")
+    direct = run_cli(args).stdout
+
+    assert served == direct
+    assert daemon.requests == 1
+
+
+def test_newer_index_manifest_reloads_caches(tmp_path: Path, daemon: QueryDaemon) -> None:
+    assert [hit["id"] for hit in request(tmp_path, None, "query", {"q": "postgres"})["results"]] == []
+
+    pkg_root = _store(tmp_path, ENTITIES + [{"id": "ent_c", "type": "service", "name": "postgres", "aliases": []}])
+    _index_run(pkg_root, "run_0002")
+
+    results = request(tmp_path, None, "query", {"q": "postgres"})["results"]
+    assert [hit["id"] for hit in results] == ["ent_c"]
+    assert daemon.reloads == 1
+    assert request(tmp_path, None, "status")["reloads"] == 1
+
+
+def test_reload_waits_for_requests_in_flight(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    pkg_root = _store(tmp_path, ENTITIES)
+    server = QueryDaemon(tmp_path, None)
+    server.refresh()
+    started, release = threading.Event(), threading.Event()
+    dropped: list[int] = []
+
+    def slow_execute(*args: object) -> dict[str, object]:
+        started.set()
+        release.wait(5)
+        return {"dropped": len(dropped)}
+
+    monkeypatch.setattr("auditgraph.query.daemon.execute", slow_execute)
+    monkeypatch.setattr(server, "_drop_caches", lambda: dropped.append(1))
+    replies: list[dict[str, object]] = []
+    reader = threading.Thread(target=lambda: replies.append(server.handle("node", {"id": "ent_a"})))
+    reader.start()
+    assert started.wait(5)
+
+    _index_run(pkg_root, "run_0002")
+    reloader = threading.Thread(target=server.refresh)
+    reloader.start()
+    reloader.join(timeout=0.2)
+    assert reloader.is_alive() and not dropped
+
+    release.set()
+    reader.join(timeout=5)
+    reloader.join(timeout=5)
+    assert replies == [{"status": "ok", "payload": {"dropped": 0}}]
+    assert dropped == [1] and server.reloads == 1
+
+
+def test_errors_come_back_as_serve_errors(tmp_path: Path, daemon: QueryDaemon) -> None:
+    with pytest.raises(ServeError, match="Unterminated quote"):
+        request(tmp_path, None, "query", {"q": '"redis'})
+    with pytest.raises(ServeError, match="Unsupported command"):
+        request(tmp_path, None, "export")
+
+    result = run_cli(["query", "--root", str(tmp_path), "--q", "redis AND"], check=False)
+    assert result.returncode == 1
+    assert json.loads(result.stdout)["status"] == "error"
+
+
+def test_second_daemon_refuses_and_stop_cleans_up(tmp_path: Path, daemon: QueryDaemon) -> None:
+    with pytest.raises(ServeError, match="already serving"):
+        QueryDaemon(tmp_path, None).bind()
+
+    assert request(tmp_path, None, "shutdown") == {"status": "stopping"}
+    for _ in range(50):
+        if not daemon.socket.exists():
+            break
+        threading.Event().wait(0.05)
+    assert not daemon.socket.exists()
+    assert request(tmp_path, None, "status") is None
+
+
+def test_without_daemon_requests_fall_back(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    _store(tmp_path, ENTITIES)
+    assert request(tmp_path, None, "query", {"q": "redis"}) is None
+
+    # A socket file left behind by a crashed daemon is ignored.
+    stale = socket_path(tmp_path, None)
+    stale.parent.mkdir(mode=0o700, parents=True, exist_ok=True)
+    stale.write_text("")
+    try:
+        assert request(tmp_path, None, "query", {"q": "redis"}) is None
+        payload = json.loads(run_cli(["query", "--root", str(tmp_path), "--q", "redis"]).stdout)
+        assert sorted(hit["id"] for hit in payload["results"]) == ["ent_a", "ent_b"]
+    finally:
+        stale.unlink()
@@ -9,6 +9,7 @@ from auditgraph.storage.artifacts import read_json, profile_pkg_root
 from auditgraph.storage.audit import ARTIFACT_SCHEMA_VERSION
 from auditgraph.storage.hashing import deterministic_run_id, inputs_hash, outputs_hash
 from auditgraph.storage.manifests import IngestRecord
+from auditgraph.storage.provenance import load_provenance, provenance_log_path
 
 
 def test_hashes_are_deterministic() -> None:
@@ -53,10 +54,11 @@ def test_ingest_writes_provenance_index(tmp_path: Path) -> None:
     manifest = read_json(Path(result.detail["manifest"]))
     run_id = manifest["run_id"]
     assert manifest["schema_version"] == ARTIFACT_SCHEMA_VERSION
-    provenance_path = profile_pkg_root(tmp_path, config) / "provenance" / f"{run_id}.json"
+    pkg_root = profile_pkg_root(tmp_path, config)
+    provenance_path = provenance_log_path(pkg_root, run_id)
 
     assert provenance_path.exists()
-    records = read_json(provenance_path)
+    records = load_provenance(pkg_root, run_id)
     assert records
 
 
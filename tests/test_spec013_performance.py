@@ -12,6 +12,8 @@ def test_performance_gates_pass_within_threshold() -> None:
     metrics = {
         "keyword_p50": 0.04,
         "keyword_p95": 0.19,
+        "keyword_prefix_p95": 0.08,
+        "keyword_fuzzy_p95": 0.15,
         "ingest_extract_100_files": 9.0,
     }
 
@@ -24,6 +26,8 @@ def test_performance_gates_fail_on_regression() -> None:
     metrics = {
         "keyword_p50": 0.04,
         "keyword_p95": 0.30,
+        "keyword_prefix_p95": 0.08,
+        "keyword_fuzzy_p95": 0.15,
         "ingest_extract_100_files": 9.0,
     }
 
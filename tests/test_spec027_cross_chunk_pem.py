@@ -11,12 +11,12 @@ hotfix's post-chunking code was actually removed.
 """
 from __future__ import annotations
 
-import json
 import re
 from pathlib import Path
 
 from auditgraph.config import load_config
 from auditgraph.pipeline.runner import PipelineRunner
+from auditgraph.storage.loaders import load_chunks
 
 
 # 2048-bit RSA private keys contain ~1600 chars of base64 body. We emit a
@@ -40,16 +40,11 @@ LONG_BASE64_RE = re.compile(r"[A-Za-z0-9+/=]{41,}")
 
 
 def _walk_chunks(workspace: Path) -> list[dict]:
-    pkg = workspace / ".pkg" / "profiles" / "default" / "chunks"
-    if not pkg.exists():
+    # Chunk files hold references; load_chunks restores text from bodies/.
+    pkg = workspace / ".pkg" / "profiles" / "default"
+    if not (pkg / "chunks").exists():
         return []
-    records = []
-    for path in sorted(pkg.rglob("*.json")):
-        try:
-            records.append(json.loads(path.read_text(encoding="utf-8")))
-        except json.JSONDecodeError:
-            continue
-    return records
+    return load_chunks(pkg)
 
 
 def _run_ingest(workspace: Path):
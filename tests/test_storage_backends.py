@@ -0,0 +1,252 @@
+from __future__ import annotations
+
+import shutil
+from copy import deepcopy
+from pathlib import Path
+
+import pytest
+
+from auditgraph.config import DEFAULT_CONFIG, Config, storage_backend_name
+from auditgraph.pipeline.runner import PipelineRunner
+from auditgraph.query.filters import apply_filters, parse_predicate
+from auditgraph.query.keyword import keyword_search
+from auditgraph.query.list_entities import list_entities
+from auditgraph.query.neighbors import neighbors
+from auditgraph.query.node_view import node_view
+from auditgraph.storage.artifacts import profile_pkg_root
+from auditgraph.storage.backends import (
+    STORAGE_DESCRIPTOR,
+    FilesBackend,
+    PackedBackend,
+    QueryableBackend,
+    StorageBackend,
+    activate_backend,
+    active_backend_name,
+    get_backend,
+)
+from auditgraph.storage.loaders import load_chunks, load_entities, load_entity, load_links
+from auditgraph.storage.sqlite_backend import SqliteBackend
+
+
+def _config(tmp_path: Path, backend: str) -> Config:
+    raw = deepcopy(DEFAULT_CONFIG)
+    raw["storage"]["backend"] = backend
+    return Config(raw=raw, source_path=tmp_path / "pkg.yaml")
+
+
+@pytest.mark.parametrize("backend_cls", [FilesBackend, PackedBackend, SqliteBackend])
+def test_backend_round_trip(tmp_path: Path, backend_cls) -> None:
+    backend = backend_cls(tmp_path)
+    assert isinstance(backend, StorageBackend)
+    records = [
+        {"id": "ent_bb02", "type": "note", "name": "B"},
+        {"id": "ent_aa01", "type": "note", "name": "A"},
+    ]
+
+    backend.write("entities", records)
+
+    assert backend.iter_ids("entities") == ["ent_aa01", "ent_bb02"]
+    assert backend.load("entities", "ent_bb02")["name"] == "B"
+    assert [item["name"] for item in backend.iter_records("entities")] == ["A", "B"]
+    assert [item["name"] for item in backend.iter_records("entities", prefix="ent_b")] == ["B"]
+    with pytest.raises(FileNotFoundError):
+        backend.load("entities", "ent_missing")
+
+
+def test_packed_overwrite_and_delete(tmp_path: Path) -> None:
+    backend = PackedBackend(tmp_path, segment_max_bytes=64)
+    backend.write("links", [{"id": "lnk_1", "from_id": "a", "to_id": "b", "type": "x"}])
+    backend.write("links", [{"id": "lnk_1", "from_id": "a", "to_id": "c", "type": "x"}])
+    backend.write("links", [{"id": "lnk_2", "from_id": "b", "to_id": "c", "type": "x"}])
+
+    assert backend.load("links", "lnk_1")["to_id"] == "c"
+    assert len(list((tmp_path / "packed" / "links").glob("seg-*.pack"))) > 1
+
+    assert backend.delete("links", ["lnk_1", "lnk_missing"]) == 1
+    assert backend.iter_ids("links") == ["lnk_2"]
+    assert not backend.exists("links", "lnk_1")
+
+
+def test_packed_writes_append_index_deltas(tmp_path: Path) -> None:
+    backend = PackedBackend(tmp_path)
+    kind_dir = tmp_path / "packed" / "links"
+    for index in range(5):
+        backend.write("links", [{"id": f"lnk_{index}", "from_id": "a", "to_id": str(index), "type": "x"}])
+    backend.delete("links", ["lnk_0"])
+
+    # No snapshot rewrite per write: one delta line each, replayed by a fresh reader.
+    assert not (kind_dir / "index.json").exists()
+    assert len((kind_dir / "index.log").read_bytes().splitlines()) == 6
+    with open(kind_dir / "index.log", "ab") as handle:
+        handle.write(b'{"records": {"lnk_9"')  # torn line from an interrupted write
+    reader = PackedBackend(tmp_path)
+    assert reader.iter_ids("links") == ["lnk_1", "lnk_2", "lnk_3", "lnk_4"]
+    reader.write("links", [{"id": "lnk_5", "from_id": "a", "to_id": "5", "type": "x"}])
+    assert PackedBackend(tmp_path).load("links", "lnk_5")["to_id"] == "5"
+
+    assert backend.compact() > 0
+    assert (kind_dir / "index.json").exists() and not (kind_dir / "index.log").exists()
+    assert PackedBackend(tmp_path).iter_ids("links") == ["lnk_1", "lnk_2", "lnk_3", "lnk_4", "lnk_5"]
+
+
+def test_activate_backend_keeps_default_layout(tmp_path: Path) -> None:
+    activate_backend(tmp_path, "files")
+    assert not (tmp_path / STORAGE_DESCRIPTOR).exists()
+    assert active_backend_name(tmp_path) == "files"
+
+    activate_backend(tmp_path, "packed")
+    assert active_backend_name(tmp_path) == "packed"
+    assert isinstance(get_backend(tmp_path), PackedBackend)
+
+    with pytest.raises(ValueError):
+        activate_backend(tmp_path, "bogus")
+
+
+def test_rebuild_with_packed_backend(tmp_path: Path) -> None:
+    notes_dir = tmp_path / "notes"
+    notes_dir.mkdir()
+    (notes_dir / "note.md").write_text("# Alpha\n\nSee [[Beta]].\n\n## Details\n\nMore text.\n", encoding="utf-8")
+    (notes_dir / "beta.md").write_text("# Beta\n\nBody.\n", encoding="utf-8")
+    config = _config(tmp_path, "packed")
+    assert storage_backend_name(config) == "packed"
+
+    result = PipelineRunner().run_rebuild(root=tmp_path, config=config)
+
+    assert result.status == "ok"
+    pkg_root = profile_pkg_root(tmp_path, config)
+    assert active_backend_name(pkg_root) == "packed"
+    assert not (pkg_root / "entities").exists()
+    assert not (pkg_root / "chunks").exists()
+
+    entities = load_entities(pkg_root)
+    assert entities
+    assert load_chunks(pkg_root)
+    entity_id = str(entities[0]["id"])
+    assert load_entity(pkg_root, entity_id)["id"] == entity_id
+    assert node_view(pkg_root, entity_id)["id"] == entity_id
+    listed = list_entities(pkg_root, count_only=True)
+    assert listed["count"] == len(entities)
+    for link in load_links(pkg_root):
+        assert link["from_id"]
+
+
+def _build_workspace(tmp_path: Path, backend: str) -> Path:
+    root = tmp_path / backend
+    notes_dir = root / "notes"
+    notes_dir.mkdir(parents=True)
+    (notes_dir / "alpha.md").write_text(
+        "---\ntitle: Alpha\ntags: [x, y]\n---\n"
+        "# Alpha\n\nUses Python and [Beta](beta.md).\n\n## Setup\n\nRun `make`.\n",
+        encoding="utf-8",
+    )
+    (notes_dir / "beta.md").write_text("# Beta\n\nMentions Python and Rust.\n", encoding="utf-8")
+    config = _config(root, backend)
+    assert PipelineRunner().run_rebuild(root=root, config=config).status == "ok"
+    return profile_pkg_root(root, config)
+
+
+def test_rebuild_with_sqlite_backend(tmp_path: Path) -> None:
+    pkg_root = _build_workspace(tmp_path, "sqlite")
+
+    assert isinstance(get_backend(pkg_root), QueryableBackend)
+    assert (pkg_root / "graph.sqlite").exists()
+    assert not (pkg_root / "entities").exists()
+    assert get_backend(pkg_root).iter_ids("documents")
+    assert list_entities(pkg_root, count_only=True)["count"] == len(load_entities(pkg_root))
+    # The index stage mirrors search.field_indexes as expression indexes.
+    indexes = {row[0] for row in get_backend(pkg_root)._fetch("SELECT name FROM sqlite_master WHERE type = 'index'")}
+    assert "idx_entities_field:value:canonical_key" in indexes
+
+
+def test_sqlite_pushdown_matches_files(tmp_path: Path) -> None:
+    files_root = _build_workspace(tmp_path, "files")
+    # Same records and indexes, served from SQLite.
+    sqlite_root = tmp_path / "copy"
+    shutil.copytree(files_root, sqlite_root)
+    sqlite_backend = activate_backend(sqlite_root, "sqlite")
+    files_backend = get_backend(files_root)
+    for kind in ("entities", "links", "chunks", "segments", "bodies"):
+        sqlite_backend.write(kind, files_backend.iter_records(kind))
+
+    queries = [
+        {},
+        {"where": ["name~a"]},
+        {"where": ["type!=ag:section"], "limit": 2, "offset": 1},
+        {"sort": "name", "descending": True, "limit": 3},
+        {"count_only": True, "where": ["name~e"]},
+        {"group_by": "type"},
+        {"where": ["level>=2"], "sort": "provenance.created_by_rule"},
+        {"where": ["type=ag:section"], "group_by": "provenance.created_by_rule"},
+    ]
+    for query in queries:
+        assert list_entities(sqlite_root, **query) == list_entities(files_root, **query), query
+
+    entity_ids = [str(entity["id"]) for entity in load_entities(files_root)]
+    for entity_id in entity_ids:
+        assert neighbors(sqlite_root, entity_id, depth=3) == neighbors(files_root, entity_id, depth=3)
+        assert neighbors(sqlite_root, entity_id, direction="both") == neighbors(
+            files_root, entity_id, direction="both"
+        )
+    assert keyword_search(sqlite_root, "python", enable_semantic=True) == keyword_search(
+        files_root, "python", enable_semantic=True
+    )
+
+
+def test_sqlite_predicates_match_python_filters(tmp_path: Path) -> None:
+    values: list[object] = ["b", "10", "1e+20", 2, 2.5, 1e20, True, False, None, ["b", 2], ["x-b"], {"k": "b"}]
+    entities = [
+        {"id": f"ent_{index:02d}", "type": "t", "name": value, "level": value, "meta": {"level": value}}
+        for index, value in enumerate(values)
+    ]
+    backend = SqliteBackend(tmp_path)
+    backend.write("entities", entities)
+    backend.index_entity_fields(["level", "meta.level"])
+
+    for field in ("name", "level", "meta.level"):
+        for operator in ("=", "!=", ">", ">=", "<", "<=", "~"):
+            for value in ("b", "2", "2.5", "true", "no", "10", "1e+20", ""):
+                predicate = parse_predicate(f"{field}{operator}{value}")
+                rows, total = backend.select_entities(predicates=[predicate])
+                expected = list(apply_filters(entities, predicates=[predicate]))
+                assert [row["id"] for row in rows] == [entity["id"] for entity in expected], predicate
+                assert total == len(expected)
+
+
+def _query_plan(backend: SqliteBackend, where: str, params: list[object]) -> str:
+    rows = backend._fetch(f"EXPLAIN QUERY PLAN SELECT id FROM entities{where}", params)
+    return " ".join(str(row[-1]) for row in rows)
+
+
+def test_sqlite_indexed_predicates_use_indexes(tmp_path: Path) -> None:
+    backend = SqliteBackend(tmp_path)
+    backend.write("entities", [{"id": f"ent_{index}", "type": "t", "name": str(index)} for index in range(50)])
+    backend.index_entity_fields(["authored_at"])
+
+    for where in ("name=b", "type=t", "authored_at>=2024", "authored_at=2024-01-01"):
+        clause, params = backend._entity_where(None, [parse_predicate(where)])
+        assert "SCAN entities" not in _query_plan(backend, clause, params), where
+
+    # Fields dropped from the configuration lose their indexes.
+    backend.index_entity_fields([])
+    reopened = SqliteBackend(tmp_path)
+    clause, params = reopened._entity_where(None, [parse_predicate("authored_at>=2024")])
+    assert "SCAN entities" in _query_plan(reopened, clause, params)
+
+
+@pytest.mark.parametrize("backend_cls", [FilesBackend, PackedBackend, SqliteBackend])
+def test_signature_tracks_writes_not_compaction(tmp_path: Path, backend_cls) -> None:
+    backend = backend_cls(tmp_path)
+    assert backend.signature("chunks") == []
+    backend.write("chunks", [{"chunk_id": "chk_1", "text": "a"}, {"chunk_id": "chk_2", "text": "b"}])
+    written = backend.signature("chunks")
+    backend.write("links", [{"id": "lnk_1", "from_id": "a", "to_id": "b", "type": "x"}])
+    assert backend.signature("chunks") == written
+
+    backend.write("chunks", [{"chunk_id": "chk_1", "text": "c"}])
+    rewritten = backend.signature("chunks")
+    assert rewritten != written
+    backend.compact()
+    assert backend_cls(tmp_path).signature("chunks") == rewritten
+
+    backend.delete("chunks", ["chk_2"])
+    assert backend.signature("chunks") != rewritten
@@ -0,0 +1,64 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+import pytest
+
+from auditgraph.config import load_config
+from auditgraph.pipeline.runner import PipelineRunner
+from auditgraph.storage.artifacts import profile_pkg_root, read_json
+from auditgraph.storage.backends import FilesBackend
+from auditgraph.storage.bulk_writer import BulkArtifactWriter, collect_write_stats
+from auditgraph.storage.hashing import sha256_text
+
+
+def test_threaded_writes_keep_last_value_per_path(tmp_path: Path) -> None:
+    with collect_write_stats() as stats:
+        with BulkArtifactWriter(threads=3) as writer:
+            for round_index in range(5):
+                for index in range(40):
+                    writer.write(tmp_path / f"d{index % 4}" / f"{index}.json", json.dumps(round_index).encode())
+
+    assert sorted(path.name for path in tmp_path.rglob("*.tmp")) == []
+    assert {json.loads((tmp_path / f"d{index % 4}" / f"{index}.json").read_bytes()) for index in range(40)} == {4}
+    assert stats.files == 200
+    assert stats.threads == 3
+    assert stats.to_dict()["bytes"] == 200
+
+
+def test_worker_errors_surface_on_exit(tmp_path: Path) -> None:
+    blocker = tmp_path / "file"
+    blocker.write_text("x", encoding="utf-8")
+    writer = BulkArtifactWriter(threads=2)
+    with pytest.raises(OSError):
+        with writer:
+            # The parent "directory" exists as a file, so the write fails in a worker.
+            writer.created_dirs.add(blocker)
+            writer.write(blocker / "a.json", b"{}")
+
+
+def test_files_backend_bulk_write_precreates_shards(tmp_path: Path) -> None:
+    records = [{"id": f"ent_{sha256_text(str(index))}", "name": str(index)} for index in range(1100)]
+    backend = FilesBackend(tmp_path)
+
+    backend.write("entities", records)
+
+    assert len([path for path in (tmp_path / "entities").iterdir() if path.is_dir()]) == 256
+    assert backend.catalog.is_fresh("entities")
+    assert backend.iter_ids("entities") == sorted(str(record["id"]) for record in records)
+    assert backend.load("entities", str(records[7]["id"])) == records[7]
+
+
+def test_stage_manifests_report_write_stats(tmp_path: Path) -> None:
+    (tmp_path / "notes").mkdir()
+    (tmp_path / "notes" / "a.md").write_text("# Alpha\n\nUses Python.\n\n## Part\n\nText.\n", encoding="utf-8")
+    config = load_config(None)
+    result = PipelineRunner().run_rebuild(root=tmp_path, config=config)
+    assert result.status == "ok"
+
+    run_dir = profile_pkg_root(tmp_path, config) / "runs" / result.detail["run_id"]
+    stats = read_json(run_dir / "extract-manifest.json")["write_stats"]
+    assert stats["files"] > 0
+    assert stats["bytes"] > 0
+    assert "write_stats" in read_json(run_dir / "link-manifest.json")
@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+import hashlib
+from pathlib import Path
+
+import pytest
+
+from auditgraph.storage import catalog as catalog_module
+from auditgraph.storage.artifacts import write_json
+from auditgraph.storage.backends import FilesBackend
+from auditgraph.storage.catalog import CATALOG_FILENAME, WorkspaceCatalog
+
+
+def _entities(count: int) -> list[dict[str, object]]:
+    return [{"id": f"ent_{index:04d}", "type": "note", "name": f"N{index}"} for index in range(count)]
+
+
+def test_writes_record_size_and_hash(tmp_path: Path) -> None:
+    backend = FilesBackend(tmp_path)
+    paths = backend.write("entities", _entities(3))
+
+    assert (tmp_path / CATALOG_FILENAME).exists()
+    catalog = WorkspaceCatalog(tmp_path)
+    assert catalog.is_fresh("entities")
+    entry = catalog.get("entities", "ent_0001")
+    assert entry is not None
+    data = paths[1].read_bytes()
+    assert tmp_path / entry.path == paths[1]
+    assert entry.size == len(data)
+    assert entry.sha256 == hashlib.sha256(data).hexdigest()
+
+
+def test_fresh_catalog_avoids_directory_walks(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    FilesBackend(tmp_path).write("entities", _entities(5))
+
+    def _no_walk(self, pattern):
+        raise AssertionError("rglob called with a fresh catalog")
+
+    monkeypatch.setattr(Path, "rglob", _no_walk)
+    backend = FilesBackend(tmp_path)
+    assert backend.iter_ids("entities") == [f"ent_{index:04d}" for index in range(5)]
+    assert [item["name"] for item in backend.iter_records("entities", prefix="ent_000")] == [
+        f"N{index}" for index in range(5)
+    ]
+
+
+def test_out_of_band_files_make_kind_stale(tmp_path: Path) -> None:
+    backend = FilesBackend(tmp_path)
+    backend.write("entities", _entities(2))
+    write_json(tmp_path / "entities" / "zz" / "ent_zz99.json", {"id": "ent_zz99", "name": "Z"})
+
+    assert not backend.catalog.is_fresh("entities")
+    assert "ent_zz99" in backend.iter_ids("entities")
+
+    backend.write("entities", [{"id": "ent_0100", "name": "New"}])
+    assert backend.catalog.is_fresh("entities")
+    assert backend.iter_ids("entities") == ["ent_0000", "ent_0001", "ent_0100", "ent_zz99"]
+
+
+def test_chunk_at_token_shard_resolves_through_catalog(tmp_path: Path) -> None:
+    write_json(tmp_path / "chunks" / "ab" / "chk_ab01.json", {"chunk_id": "chk_ab01", "text": "hi"})
+    backend = FilesBackend(tmp_path)
+    backend.write("chunks", [{"chunk_id": "chk_cd02", "text": "there"}])
+
+    assert backend.catalog.is_fresh("chunks")
+    assert backend.load("chunks", "chk_ab01")["text"] == "hi"
+
+
+def test_delete_and_compaction(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(catalog_module, "_COMPACT_MIN_RECORDS", 8)
+    backend = FilesBackend(tmp_path)
+    for _ in range(6):
+        backend.write("entities", _entities(4))
+    assert backend.delete("entities", ["ent_0000", "ent_missing"]) == 1
+
+    reloaded = WorkspaceCatalog(tmp_path)
+    assert reloaded.ids("entities") == ["ent_0001", "ent_0002", "ent_0003"]
+    assert reloaded.is_fresh("entities")
+    # Overwrites were compacted away: far fewer records than were appended.
+    records = catalog_module._parse((tmp_path / CATALOG_FILENAME).read_bytes()).records
+    assert records < 6 * 4
@@ -0,0 +1,117 @@
+from __future__ import annotations
+
+import json
+import random
+import shutil
+from pathlib import Path
+
+import pytest
+
+from auditgraph.config import load_config
+from auditgraph.pipeline.runner import PipelineRunner
+from auditgraph.storage.artifacts import json_bytes, profile_pkg_root, read_json, write_json
+from auditgraph.storage.codec import active_codec, dumps, loads, use_codec
+
+
+def _payloads() -> list[object]:
+    rng = random.Random(7)
+    samples: list[object] = [
+        {"b": 1, "a": [1.5, -0.25, 1e-7, 1e16, 123456789.125], "c": None},
+        {"text": "café — naïve ☃ 𝄞", "ctrl": "\x00\x1f\x7f\t\n\"\\", "empty": {}, "list": []},
+        {"big": 2**70, "neg": -(2**63), "bool": [True, False]},
+        [{"nested": {"z": [{"y": "x"}]}}],
+        "plain",
+        0.1,
+    ]
+    for _ in range(50):
+        samples.append(
+            {
+                f"k{rng.randrange(1000)}": rng.choice(
+                    [rng.random() * 10 ** rng.randrange(-8, 20), rng.randrange(-(10**9), 10**9), "v" * rng.randrange(5)]
+                )
+                for _ in range(rng.randrange(1, 6))
+            }
+        )
+    return samples
+
+
+@pytest.mark.parametrize("pretty", [True, False])
+def test_stdlib_matches_historical_layout(pretty: bool) -> None:
+    with use_codec("stdlib"):
+        for payload in _payloads():
+            expected = (
+                json.dumps(payload, indent=2, sort_keys=True)
+                if pretty
+                else json.dumps(payload, sort_keys=True, separators=(",", ":"))
+            )
+            assert dumps(payload, pretty=pretty) == expected.encode("utf-8")
+
+
+@pytest.mark.parametrize("pretty", [True, False])
+def test_orjson_output_is_byte_identical(pretty: bool) -> None:
+    pytest.importorskip("orjson")
+    payloads = _payloads() + [{1: "int key"}]
+    for payload in payloads:
+        with use_codec("stdlib"):
+            expected = dumps(payload, pretty=pretty)
+        with use_codec("orjson"):
+            assert dumps(payload, pretty=pretty) == expected
+            assert loads(expected) == loads(dumps(payload, pretty=pretty))
+
+
+def test_loads_falls_back_for_nan_and_big_ints() -> None:
+    assert loads(b'{"n":' + str(2**70).encode() + b"}") == {"n": 2**70}
+    assert loads("[NaN]")[0] != loads("[NaN]")[0]
+
+
+def test_unknown_codec_is_rejected(monkeypatch: pytest.MonkeyPatch) -> None:
+    with pytest.raises(ValueError):
+        with use_codec("fastest"):
+            pass
+    monkeypatch.setenv("AUDITGRAPH_JSON_CODEC", "stdlib")
+    assert active_codec() == "stdlib"
+
+
+def test_compact_writes_round_trip(tmp_path: Path) -> None:
+    payload = {"b": [1, 2], "a": "é"}
+    write_json(tmp_path / "x.json", payload, compact=True)
+    assert (tmp_path / "x.json").read_bytes() == b'{"a":"\\u00e9","b":[1,2]}'
+    assert read_json(tmp_path / "x.json") == payload
+    assert json_bytes(payload).startswith(b"{\n")
+
+
+def _without_store(path: Path) -> bytes:
+    """File bytes, with the store signature (shard directory mtimes) of a
+    field index or facet file re-encoded away."""
+    data = path.read_bytes()
+    if path.parent.name not in {"fields", "facets"} and path.name != "facets.json":
+        return data
+    payload = loads(data)
+    assert payload.pop("store")
+    return dumps(payload)
+
+
+def test_rebuild_artifacts_identical_across_codecs(tmp_path: Path) -> None:
+    pytest.importorskip("orjson")
+    (tmp_path / "notes").mkdir()
+    (tmp_path / "notes" / "a.md").write_text("# Alpha\n\nUses Python and Rust — café.\n", encoding="utf-8")
+    (tmp_path / "notes" / "b.md").write_text("# Beta\n\nUses Python.\n\n## Part\n\nText.\n", encoding="utf-8")
+    config = load_config(None)
+
+    trees: dict[str, dict[str, bytes]] = {}
+    for codec in ("stdlib", "orjson"):
+        workspace = tmp_path / codec
+        shutil.copytree(tmp_path / "notes", workspace / "notes")
+        with use_codec(codec):
+            result = PipelineRunner().run_rebuild(root=workspace, config=config)
+        assert result.status == "ok"
+        pkg_root = profile_pkg_root(workspace, config)
+        trees[codec] = {
+            str(path.relative_to(pkg_root)): _without_store(path)
+            for directory in ("entities", "links", "indexes")
+            for path in sorted((pkg_root / directory).rglob("*.json"))
+            # Document/chunk IDs, the chunk index and the CSR, cluster,
+            # lexicon and trigram metadata depend on source paths and mtimes.
+            if not {"csr", "clusters", "lexicon", "trigrams", "chunks"} & set(path.parts)
+        }
+    assert trees["stdlib"] and trees["stdlib"] == trees["orjson"]
@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+import json
+from copy import deepcopy
+from pathlib import Path
+
+from auditgraph.config import DEFAULT_CONFIG, Config
+from auditgraph.pipeline.runner import PipelineRunner
+from auditgraph.query._shard_scanner import count_shards
+from auditgraph.query.node_view import node_view
+from auditgraph.storage import compression as compression_module
+from auditgraph.storage.artifacts import profile_pkg_root, read_json, write_json
+from auditgraph.storage.compression import GZIP_MAGIC, compress, logical_size, resolve_compression
+from auditgraph.storage.loaders import load_chunks, load_entities
+from auditgraph.utils.budget import evaluate_pkg_budget
+
+
+def test_gzip_round_trip_is_deterministic(tmp_path: Path) -> None:
+    payload = {"id": "ent_1", "name": "Alpha", "aliases": ["a", "b"]}
+    first = tmp_path / "first.json"
+    second = tmp_path / "second.json"
+
+    write_json(first, payload, compression="gzip")
+    write_json(second, payload, compression="gzip")
+
+    assert first.read_bytes().startswith(GZIP_MAGIC)
+    assert first.read_bytes() == second.read_bytes()
+    assert read_json(first) == payload
+    compact = json.dumps(payload, sort_keys=True, separators=(",", ":")).encode("utf-8")
+    assert logical_size(first) == len(compact)
+
+
+def test_plain_files_still_read(tmp_path: Path) -> None:
+    path = tmp_path / "plain.json"
+    write_json(path, {"a": 1})
+    assert read_json(path) == {"a": 1}
+    assert logical_size(path) == path.stat().st_size
+
+
+def test_zstd_falls_back_to_gzip_without_zstandard(monkeypatch) -> None:
+    monkeypatch.setattr(compression_module, "_zstandard", lambda: None)
+    assert resolve_compression("zstd") == "gzip"
+    assert compress(b"{}", "zstd").startswith(GZIP_MAGIC)
+
+
+def test_rebuild_with_compressed_artifacts(tmp_path: Path) -> None:
+    notes_dir = tmp_path / "notes"
+    notes_dir.mkdir()
+    (notes_dir / "note.md").write_text("# Alpha\n\nSome text about Python.\n\n## Part\n\nMore.\n", encoding="utf-8")
+    raw = deepcopy(DEFAULT_CONFIG)
+    raw["storage"]["compression"] = "gzip"
+    config = Config(raw=raw, source_path=tmp_path / "pkg.yaml")
+
+    assert PipelineRunner().run_rebuild(root=tmp_path, config=config).status == "ok"
+
+    pkg_root = profile_pkg_root(tmp_path, config)
+    entity_files = sorted((pkg_root / "entities").rglob("*.json"))
+    assert entity_files
+    assert all(path.read_bytes().startswith(GZIP_MAGIC) for path in entity_files)
+    assert all(path.read_bytes().startswith(GZIP_MAGIC) for path in (pkg_root / "documents").glob("*.json"))
+
+    entities = load_entities(pkg_root)
+    assert len(entities) == len(entity_files)
+    assert load_chunks(pkg_root)
+    assert node_view(pkg_root, str(entities[0]["id"]))["id"] == entities[0]["id"]
+    assert count_shards(pkg_root) > 0
+
+    status = evaluate_pkg_budget(pkg_root, 0, {"multiplier": 3.0})
+    assert status.artifact_bytes > 0
+    assert status.logical_bytes > status.artifact_bytes
+    assert "logical=" in status.message
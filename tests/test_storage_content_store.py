@@ -0,0 +1,130 @@
+from __future__ import annotations
+
+from collections import Counter
+from pathlib import Path
+
+import pytest
+
+from auditgraph.config import load_config
+from auditgraph.pipeline.runner import PipelineRunner
+from auditgraph.storage.artifacts import profile_pkg_root
+from auditgraph.storage.backends import FilesBackend, activate_backend, get_backend
+from auditgraph.storage.content_store import BODY_KIND, BodyReader, body_id, split_bodies
+from auditgraph.storage.gc import collect_garbage
+from auditgraph.storage.loaders import load_chunk, load_chunks
+
+BOILERPLATE = "# Notice\n\nThis document is confidential. Uses Python.\n"
+
+
+def _rebuild(tmp_path: Path) -> Path:
+    notes = tmp_path / "notes"
+    notes.mkdir()
+    for name in ("a.md", "b.md", "c.md"):
+        (notes / name).write_text(BOILERPLATE, encoding="utf-8")
+    (notes / "d.md").write_text("# Other\n\nDifferent text entirely.\n", encoding="utf-8")
+    config = load_config(None)
+    assert PipelineRunner().run_rebuild(root=tmp_path, config=config).status == "ok"
+    return profile_pkg_root(tmp_path, config)
+
+
+def test_split_bodies_keeps_one_body_per_text() -> None:
+    records = [{"chunk_id": f"chk_{index}", "order": 0, "text": "same"} for index in range(3)]
+    records.append({"chunk_id": "chk_legacy", "order": 0})
+
+    references, bodies = split_bodies(records)
+
+    assert list(bodies) == [body_id("same")]
+    assert all("text" not in reference for reference in references)
+    assert references[0]["text_hash"] == body_id("same")
+    assert references[0]["text_length"] == 4
+    assert references[3] == {"chunk_id": "chk_legacy", "order": 0}
+
+
+def test_duplicate_documents_share_bodies(tmp_path: Path) -> None:
+    pkg_root = _rebuild(tmp_path)
+    backend = get_backend(pkg_root)
+    references = list(backend.iter_records("chunks"))
+    hashes = [str(record["text_hash"]) for record in references]
+
+    assert len(references) == 4
+    assert all("text" not in record for record in references)
+    assert sorted(Counter(hashes).values()) == [1, 3]
+    segment_hashes = {str(record["text_hash"]) for record in backend.iter_records("segments")}
+    assert backend.iter_ids(BODY_KIND) == sorted(set(hashes) | segment_hashes)
+
+    chunks = load_chunks(pkg_root)
+    hash_by_chunk = {record["chunk_id"]: record["text_hash"] for record in references}
+    assert all(chunk["text"] and body_id(str(chunk["text"])) == hash_by_chunk[chunk["chunk_id"]] for chunk in chunks)
+    # Loaders hand back the pre-split record shape.
+    assert not any({"text_hash", "text_length"} & set(chunk) for chunk in chunks)
+    assert load_chunk(pkg_root, str(references[0]["chunk_id"]))["text"]
+
+
+def test_reader_loads_each_body_once_and_passes_legacy_records(tmp_path: Path) -> None:
+    backend = FilesBackend(tmp_path)
+    references, bodies = split_bodies([{"chunk_id": f"chk_{index:02d}", "text": "same"} for index in range(5)])
+    backend.write(BODY_KIND, bodies.values())
+    reader = BodyReader(backend)
+
+    hydrated = list(reader.hydrate_all(references + [{"chunk_id": "chk_legacy", "text": "inline"}]))
+
+    assert [record["text"] for record in hydrated] == ["same"] * 5 + ["inline"]
+    assert reader.loads == 1
+
+
+def test_ner_analyses_each_distinct_body_once(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    from auditgraph.extract import ner_backend
+    from auditgraph.extract.ner import extract_ner_entities
+
+    pkg_root = _rebuild(tmp_path)
+    calls: list[str] = []
+
+    def fake_extract(text: str, nlp: object, entity_types: object = None) -> list[dict[str, object]]:
+        calls.append(text)
+        return [{"label": "ORG", "text": "Python", "start": 0, "end": 6, "score": 0.9}]
+
+    monkeypatch.setattr(ner_backend, "load_ner_model", lambda name: object())
+    monkeypatch.setattr(ner_backend, "extract_entities_from_text", fake_extract)
+
+    entities, _ = extract_ner_entities(pkg_root, {"enabled": True, "quality_threshold": 0.0})
+
+    assert len(calls) == 2
+    [entity] = [entity for entity in entities if entity["name"] == "Python"]
+    assert entity["mention_count"] == 4
+
+    # A full analysis cache evicts the oldest body; results do not change.
+    calls.clear()
+    monkeypatch.setattr("auditgraph.extract.ner.BODY_CACHE_SIZE", 1)
+    bounded, _ = extract_ner_entities(pkg_root, {"enabled": True, "quality_threshold": 0.0})
+    assert 2 <= len(calls) <= 4
+    assert bounded == entities
+
+
+def test_gc_removes_unreferenced_bodies(tmp_path: Path) -> None:
+    pkg_root = _rebuild(tmp_path)
+    backend = get_backend(pkg_root)
+    live = set(backend.iter_ids(BODY_KIND))
+    orphan = {"body_id": body_id("orphan"), "text": "orphan"}
+    backend.write(BODY_KIND, [orphan])
+
+    report = collect_garbage(pkg_root)
+
+    assert report.removed[BODY_KIND].count == 1
+    assert set(get_backend(pkg_root).iter_ids(BODY_KIND)) == live
+
+
+def test_sqlite_search_chunks_matches_bodies(tmp_path: Path) -> None:
+    pkg_root = _rebuild(tmp_path)
+    sqlite_root = tmp_path / "sqlite"
+    sqlite_backend = activate_backend(sqlite_root, "sqlite")
+    files_backend = get_backend(pkg_root)
+    sqlite_backend.write("chunks", files_backend.iter_records("chunks"))
+    sqlite_backend.write(BODY_KIND, files_backend.iter_records(BODY_KIND))
+    inline = {"chunk_id": "chk_inline", "document_id": "doc_z", "order": 0, "text": "confidential"}
+    sqlite_backend.write("chunks", [inline])
+
+    hits = sqlite_backend.search_chunks("confidential")
+
+    assert len(hits) == 4
+    assert all("confidential" in str(hit["text"]).lower() for hit in hits)
+    assert hits[-1]["chunk_id"] == "chk_inline"
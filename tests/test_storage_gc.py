@@ -0,0 +1,141 @@
+from __future__ import annotations
+
+import json
+from copy import deepcopy
+from pathlib import Path
+
+import pytest
+
+from auditgraph.config import DEFAULT_CONFIG, Config
+from auditgraph.errors import GarbageCollectionError
+from auditgraph.pipeline.runner import PipelineRunner
+from auditgraph.storage.artifacts import profile_pkg_root
+from auditgraph.storage.backends import get_backend
+from auditgraph.storage.gc import collect_garbage
+from auditgraph.storage.loaders import load_chunks, load_entities
+
+
+def _config(tmp_path: Path, backend: str = "files") -> Config:
+    raw = deepcopy(DEFAULT_CONFIG)
+    raw["storage"]["backend"] = backend
+    return Config(raw=raw, source_path=tmp_path / "pkg.yaml")
+
+
+def _rebuild_twice(tmp_path: Path, config: Config) -> Path:
+    notes = tmp_path / "notes"
+    notes.mkdir()
+    (notes / "keep.md").write_text("# Keep\n\nUses Python.\n\n## Details\n\nMore.\n", encoding="utf-8")
+    (notes / "drop.md").write_text("# Drop\n\nUses Rust.\n\n## Gone\n\nSoon.\n", encoding="utf-8")
+    runner = PipelineRunner()
+    assert runner.run_rebuild(root=tmp_path, config=config).status == "ok"
+    (notes / "drop.md").unlink()
+    assert runner.run_rebuild(root=tmp_path, config=config).status == "ok"
+    return profile_pkg_root(tmp_path, config)
+
+
+def _source_paths(pkg_root: Path) -> set[str]:
+    return {
+        str(ref.get("source_path"))
+        for entity in load_entities(pkg_root)
+        for ref in entity.get("refs", [])
+        if isinstance(ref, dict)
+    }
+
+
+def test_dry_run_reports_without_deleting(tmp_path: Path) -> None:
+    config = _config(tmp_path)
+    pkg_root = _rebuild_twice(tmp_path, config)
+    before = sorted(path for path in pkg_root.rglob("*") if path.is_file())
+
+    result = PipelineRunner().run_gc(root=tmp_path, config=config, dry_run=True)
+
+    assert result.status == "ok"
+    removed = result.detail["removed"]
+    assert removed["entities"]["count"] > 0
+    assert removed["sources"]["count"] == 1
+    assert removed["runs"]["count"] == 1
+    assert result.detail["total"]["bytes"] > 0
+    assert sorted(path for path in pkg_root.rglob("*") if path.is_file()) == before
+
+
+def test_gc_removes_artifacts_of_deleted_sources(tmp_path: Path) -> None:
+    config = _config(tmp_path)
+    pkg_root = _rebuild_twice(tmp_path, config)
+    assert "notes/drop.md" in _source_paths(pkg_root)
+
+    result = PipelineRunner().run_gc(root=tmp_path, config=config)
+
+    assert result.detail["indexes_rebuilt"] is True
+    assert _source_paths(pkg_root) == {"notes/keep.md"}
+    assert len(list((pkg_root / "runs").iterdir())) == 1
+    assert all("drop" not in json.dumps(chunk) for chunk in get_backend(pkg_root).iter_records("chunks"))
+    adjacency = json.loads((pkg_root / "indexes" / "graph" / "adjacency.json").read_text(encoding="utf-8"))
+    live_ids = {str(entity["id"]) for entity in load_entities(pkg_root)}
+    assert set(adjacency) <= live_ids
+
+    again = collect_garbage(pkg_root, dry_run=True)
+    assert again.total_count == 0
+    assert PipelineRunner().run_rebuild(root=tmp_path, config=config).status == "ok"
+
+
+def test_gc_removes_chunks_of_an_edited_source(tmp_path: Path) -> None:
+    config = _config(tmp_path)
+    notes = tmp_path / "notes"
+    notes.mkdir()
+    note = notes / "notes.md"
+    note.write_text("# Notes\n\nUses Python.\n", encoding="utf-8")
+    runner = PipelineRunner()
+    assert runner.run_rebuild(root=tmp_path, config=config).status == "ok"
+    pkg_root = profile_pkg_root(tmp_path, config)
+    backend = get_backend(pkg_root)
+    old_chunks = {str(chunk["chunk_id"]): chunk for chunk in backend.iter_records("chunks")}
+    old_segments = set(backend.iter_ids("segments"))
+    old_bodies = set(backend.iter_ids("bodies"))
+    note.write_text("# Notes\n\nUses Rust now.\n", encoding="utf-8")
+    assert runner.run_rebuild(root=tmp_path, config=config).status == "ok"
+    new_chunks = {str(chunk["chunk_id"]) for chunk in backend.iter_records("chunks")} - set(old_chunks)
+    assert new_chunks and len({chunk["document_id"] for chunk in backend.iter_records("chunks")}) == 1
+
+    report = collect_garbage(pkg_root, dry_run=True)
+    assert report.removed["chunks"].count == len(old_chunks)
+    collect_garbage(pkg_root)
+
+    assert set(backend.iter_ids("chunks")) == new_chunks
+    assert not old_segments & set(backend.iter_ids("segments"))
+    assert not old_bodies & set(backend.iter_ids("bodies"))
+    assert all("Rust" in str(chunk["text"]) for chunk in load_chunks(pkg_root))
+
+
+def test_gc_compacts_packed_segments(tmp_path: Path) -> None:
+    config = _config(tmp_path, backend="packed")
+    pkg_root = _rebuild_twice(tmp_path, config)
+    segments = pkg_root / "packed" / "entities"
+    before = sum(path.stat().st_size for path in segments.glob("*.pack"))
+
+    report = collect_garbage(pkg_root)
+
+    assert report.compaction_bytes > 0
+    assert sum(path.stat().st_size for path in segments.glob("*.pack")) < before
+    assert _source_paths(pkg_root) == {"notes/keep.md"}
+
+
+def test_gc_archives_removed_records(tmp_path: Path) -> None:
+    config = _config(tmp_path)
+    pkg_root = _rebuild_twice(tmp_path, config)
+    archive = tmp_path / "archive"
+
+    report = collect_garbage(pkg_root, archive_dir=archive)
+
+    archived = [json.loads(line) for line in (archive / "entities.jsonl").read_text(encoding="utf-8").splitlines()]
+    assert len(archived) == report.removed["entities"].count
+    assert [path.name for path in (archive / "runs").iterdir()] == report.runs_removed
+
+
+def test_gc_refuses_incomplete_run(tmp_path: Path) -> None:
+    config = _config(tmp_path)
+    (tmp_path / "notes").mkdir()
+    (tmp_path / "notes" / "a.md").write_text("# A\n", encoding="utf-8")
+    PipelineRunner().run_ingest(root=tmp_path, config=config)
+
+    with pytest.raises(GarbageCollectionError):
+        collect_garbage(profile_pkg_root(tmp_path, config))
@@ -0,0 +1,56 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+from auditgraph.storage.artifacts import write_json
+from auditgraph.storage.provenance import (
+    ProvenanceRecord,
+    load_provenance,
+    lookup_provenance,
+    provenance_log_path,
+    provenance_runs,
+    write_provenance_index,
+)
+
+
+def _record(artifact_id: str, rule_id: str, run_id: str = "run_1") -> ProvenanceRecord:
+    return ProvenanceRecord(
+        artifact_id=artifact_id,
+        source_path=f"notes/{artifact_id}.md",
+        source_hash=f"hash_{artifact_id}",
+        rule_id=rule_id,
+        input_hash=f"input_{artifact_id}",
+        run_id=run_id,
+    )
+
+
+def test_appends_and_looks_up_by_artifact(tmp_path: Path) -> None:
+    write_provenance_index(tmp_path, "run_1", [_record("a", "ingest.source.v1"), _record("b", "ingest.source.v1")])
+    log_size = provenance_log_path(tmp_path, "run_1").stat().st_size
+    write_provenance_index(tmp_path, "run_1", [_record("ent_a", "extract.note.v1")])
+
+    # The second stage appended; the first stage's bytes are untouched.
+    assert provenance_log_path(tmp_path, "run_1").stat().st_size > log_size
+    assert [record["artifact_id"] for record in load_provenance(tmp_path, "run_1")] == ["a", "b", "ent_a"]
+
+    hits = lookup_provenance(tmp_path, "ent_a")
+    assert hits == [_record("ent_a", "extract.note.v1").to_dict()]
+    assert lookup_provenance(tmp_path, "missing") == []
+
+
+def test_lookup_recovers_unindexed_tail(tmp_path: Path) -> None:
+    log_path = write_provenance_index(tmp_path, "run_1", [_record("a", "r1"), _record("b", "r2")])
+    index_path = log_path.with_suffix(".idx")
+    # Simulate a write interrupted after the log append.
+    index_path.write_text(index_path.read_text(encoding="utf-8").splitlines(keepends=True)[0], encoding="utf-8")
+
+    assert lookup_provenance(tmp_path, "b", run_id="run_1")[0]["rule_id"] == "r2"
+
+
+def test_reads_legacy_json_runs(tmp_path: Path) -> None:
+    write_json(tmp_path / "provenance" / "run_0.json", [_record("old", "legacy", run_id="run_0").to_dict()])
+    write_provenance_index(tmp_path, "run_1", [_record("new", "r1")])
+
+    assert provenance_runs(tmp_path) == ["run_0", "run_1"]
+    assert load_provenance(tmp_path, "run_0")[0]["artifact_id"] == "old"
+    assert lookup_provenance(tmp_path, "old")[0]["rule_id"] == "legacy"
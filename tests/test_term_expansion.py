@@ -0,0 +1,132 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+
+from auditgraph.config import Config, fuzzy_settings, load_config
+from auditgraph.errors import QuerySyntaxError
+from auditgraph.index.bm25 import Bm25Reader, bm25_trigram_dir, build_bm25_index
+from auditgraph.index.lexicon import Lexicon
+from auditgraph.index.term_expansion import (
+    auto_max_edits,
+    edit_distance,
+    expand_fuzzy,
+    expand_wildcard,
+    trigrams,
+)
+from auditgraph.query.keyword import keyword_search
+from auditgraph.query.query_language import Fuzzy, Wildcard, parse_query
+from auditgraph.storage.artifacts import read_json
+
+ENTITIES = [
+    {"id": "ent_a", "name": "authentication service", "aliases": ["authn"]},
+    {"id": "ent_b", "name": "author registry", "aliases": []},
+    {"id": "ent_c", "name": "postgres", "aliases": ["postgresql"]},
+    {"id": "ent_d", "name": "redis cache", "aliases": []},
+]
+
+
+def _reader(tmp_path: Path, *, json_only: bool = False) -> Bm25Reader:
+    index_path = build_bm25_index(tmp_path, ENTITIES)
+    if json_only:
+        return Bm25Reader.from_index(read_json(index_path))
+    reader = Bm25Reader.open(tmp_path)
+    assert reader is not None and reader.has_trigrams
+    return reader
+
+
+def test_edit_distance_is_bounded_osa() -> None:
+    assert edit_distance("redis", "redis", 2) == 0
+    assert edit_distance("redsi", "redis", 2) == 1
+    assert edit_distance("postgers", "postgres", 1) == 1
+    assert edit_distance("postgrs", "postgres", 1) == 1
+    assert edit_distance("cache", "catch", 1) is None
+    assert edit_distance("cache", "catch", 2) == 2
+    assert edit_distance("a", "abcd", 2) is None
+    assert [auto_max_edits(term) for term in ("ab", "redis", "postgres")] == [0, 1, 2]
+    assert auto_max_edits("postgres", cap=1) == 1
+
+
+def test_trigram_index_maps_grams_to_terms(tmp_path: Path) -> None:
+    build_bm25_index(tmp_path, ENTITIES)
+    index_path = tmp_path / "indexes" / "bm25" / "index.json"
+    grams = Lexicon.open(bm25_trigram_dir(tmp_path), index_path)
+
+    assert trigrams("redis") == ["$re", "dis", "edi", "is$", "red"]
+    assert grams is not None
+    assert grams.get("$re") == ["redis", "redis cache", "registry"]
+
+
+@pytest.mark.parametrize("json_only", [False, True])
+def test_wildcard_and_prefix_expansion(tmp_path: Path, json_only: bool) -> None:
+    reader = _reader(tmp_path, json_only=json_only)
+
+    # Whole names are indexed as terms too.
+    assert expand_wildcard(reader, "auth*") == [
+        "authentication",
+        "authentication service",
+        "authn",
+        "author",
+        "author registry",
+    ]
+    assert expand_wildcard(reader, "auth?") == ["authn"]
+    assert expand_wildcard(reader, "post*ql") == ["postgresql"]
+    assert expand_wildcard(reader, "auth*", max_expansions=2) == ["authentication", "authentication service"]
+    assert expand_wildcard(reader, "*sql") == []
+
+
+@pytest.mark.parametrize("json_only", [False, True])
+def test_fuzzy_expansion_verifies_distance(tmp_path: Path, json_only: bool) -> None:
+    reader = _reader(tmp_path, json_only=json_only)
+
+    assert expand_fuzzy(reader, "postgers", 2) == [("postgres", 1)]
+    assert expand_fuzzy(reader, "redsi", 1) == [("redis", 1)]
+    assert expand_fuzzy(reader, "redsi", 0) == []
+    assert expand_fuzzy(reader, "autho", 1) == [("authn", 1), ("author", 1)]
+
+
+def test_parse_wildcard_and_fuzzy_terms() -> None:
+    assert parse_query("auth*") == Wildcard("auth*")
+    assert parse_query("name:redsi~1") == Fuzzy("redsi", "name", 1)
+    assert parse_query("postgers~") == Fuzzy("postgers")
+    with pytest.raises(QuerySyntaxError):
+        parse_query("*sql")
+    with pytest.raises(QuerySyntaxError):
+        parse_query("auth_to*")
+
+
+def test_keyword_search_prefix_and_fuzzy_explanations(tmp_path: Path) -> None:
+    build_bm25_index(tmp_path, ENTITIES)
+
+    prefix = keyword_search(tmp_path, "auth*")
+    assert sorted(hit["id"] for hit in prefix) == ["ent_a", "ent_b"]
+    assert all(hit["explanation"]["edit_distance"] == 0 for hit in prefix)
+
+    [hit] = keyword_search(tmp_path, "postgers~")
+    assert hit["id"] == "ent_c"
+    assert hit["explanation"]["edit_distance"] == 1
+    assert hit["explanation"]["matched_terms"] == ["postgres"]
+    [exact] = keyword_search(tmp_path, "postgres")
+    assert 0 < hit["score"] < exact["score"]
+
+
+def test_plain_miss_falls_back_to_fuzzy(tmp_path: Path) -> None:
+    build_bm25_index(tmp_path, ENTITIES)
+
+    [hit] = keyword_search(tmp_path, "redsi")
+    assert hit["id"] == "ent_d"
+    assert hit["explanation"]["edit_distance"] == 1
+    assert keyword_search(tmp_path, "redsi", fuzzy=False) == []
+    # Exact hits never carry an edit distance.
+    assert "edit_distance" not in keyword_search(tmp_path, "redis")[0]["explanation"]
+
+
+def test_fuzzy_settings_read_profile(tmp_path: Path) -> None:
+    assert fuzzy_settings(load_config(None)) == {"enabled": True, "max_edits": 2, "max_expansions": 50}
+    raw = {"profiles": {"default": {"search": {"keyword": {"fuzzy": {"enabled": False, "max_edits": 1}}}}}}
+    assert fuzzy_settings(Config(raw=raw, source_path=tmp_path)) == {
+        "enabled": False,
+        "max_edits": 1,
+        "max_expansions": 50,
+    }
@@ -44,7 +44,7 @@ def test_us4_neighbors_returns_edges(tmp_path: Path) -> None:
     payload = neighbors(pkg, "ent_a", depth=2)
 
     assert payload["center_id"] == "ent_a"
-    assert payload["neighbors"] == adjacency["ent_a"]
+    assert payload["neighbors"] == [{"from_id": "ent_a", "to_id": "ent_b", "type": "related"}]
 
 
 def test_us12_semantic_ranking_is_deterministic(tmp_path: Path) -> None:
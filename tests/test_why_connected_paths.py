@@ -0,0 +1,172 @@
+from __future__ import annotations
+
+import random
+import shutil
+from pathlib import Path
+
+import pytest
+
+from auditgraph.index.adjacency_builder import build_adjacency_index
+from auditgraph.index.csr_adjacency import CsrAdjacency, csr_dir
+from auditgraph.link.adjacency import load_adjacency
+from auditgraph.link.links import write_links
+from auditgraph.query.why_connected import CompactGraph, k_shortest_paths, why_connected
+from auditgraph.storage.hashing import sha256_text
+
+
+def _link(from_id: str, to_id: str, rule_id: str = "rule.v1", link_type: str = "relates_to", **extra: object) -> dict:
+    return {
+        "id": f"lnk_{sha256_text(rule_id + ':' + from_id + ':' + to_id)}",
+        "from_id": from_id,
+        "to_id": to_id,
+        "type": link_type,
+        "rule_id": rule_id,
+        **extra,
+    }
+
+
+def _build(tmp_path: Path, links: list[dict[str, object]]) -> Path:
+    write_links(tmp_path, links)
+    build_adjacency_index(tmp_path)
+    return tmp_path
+
+
+def _hops(payload: dict[str, object]) -> list[list[str]]:
+    return [
+        [edge["from_id"] for edge in path["edges"]] + [path["edges"][-1]["to_id"]]  # type: ignore[index]
+        for path in payload["paths"]  # type: ignore[union-attr]
+    ]
+
+
+def test_multi_hop_path_carries_rule_and_evidence(tmp_path: Path) -> None:
+    evidence = [{"source_path": "notes/a.md", "span": [3, 9]}]
+    pkg_root = _build(
+        tmp_path,
+        [
+            _link("ent_a", "ent_b", evidence=evidence, confidence=0.5),
+            _link("ent_b", "ent_c", rule_id="rule.v2"),
+            _link("ent_c", "ent_d"),
+        ],
+    )
+
+    payload = why_connected(pkg_root, "ent_a", "ent_d", direction="out")
+
+    assert _hops(payload) == [["ent_a", "ent_b", "ent_c", "ent_d"]]
+    assert payload["path"] == payload["paths"][0]["edges"]  # type: ignore[index]
+    first, second, _ = payload["path"]  # type: ignore[misc]
+    assert first["evidence"] == evidence and first["rule_id"] == "rule.v1"
+    assert second["rule_id"] == "rule.v2" and second["evidence"] == []
+    assert payload["paths"][0]["cost"] == 0.5  # type: ignore[index]
+    assert payload["truncated"] is False
+    assert why_connected(pkg_root, "ent_a", "ent_d", max_depth=2)["paths"] == []
+
+
+def test_paths_come_shortest_first(tmp_path: Path) -> None:
+    pkg_root = _build(
+        tmp_path,
+        [
+            _link("ent_a", "ent_b"),
+            _link("ent_b", "ent_e"),
+            _link("ent_a", "ent_c", confidence=0.2),
+            _link("ent_c", "ent_e"),
+            _link("ent_a", "ent_d"),
+            _link("ent_d", "ent_f"),
+            _link("ent_f", "ent_e"),
+            _link("ent_a", "ent_e", rule_id="rule.direct"),
+        ],
+    )
+
+    payload = why_connected(pkg_root, "ent_a", "ent_e", k=5, direction="out")
+
+    assert _hops(payload) == [
+        ["ent_a", "ent_e"],
+        ["ent_a", "ent_b", "ent_e"],
+        ["ent_a", "ent_c", "ent_e"],
+        ["ent_a", "ent_d", "ent_f", "ent_e"],
+    ]
+    assert [path["hops"] for path in payload["paths"]] == [1, 2, 2, 3]  # type: ignore[union-attr]
+
+
+def test_direction_controls_edge_orientation(tmp_path: Path) -> None:
+    pkg_root = _build(tmp_path, [_link("ent_a", "ent_x"), _link("ent_b", "ent_x")])
+
+    assert why_connected(pkg_root, "ent_a", "ent_b", direction="out")["paths"] == []
+    assert why_connected(pkg_root, "ent_x", "ent_a", direction="in")["paths"]
+    payload = why_connected(pkg_root, "ent_a", "ent_b")
+    assert [(edge["from_id"], edge["to_id"]) for edge in payload["path"]] == [  # type: ignore[union-attr]
+        ("ent_a", "ent_x"),
+        ("ent_b", "ent_x"),
+    ]
+    with pytest.raises(ValueError):
+        why_connected(pkg_root, "ent_a", "ent_b", direction="sideways")
+
+
+def test_budget_truncates(tmp_path: Path) -> None:
+    links = [_link(f"ent_{index:03d}", f"ent_{index + 1:03d}") for index in range(50)]
+    pkg_root = _build(tmp_path, links)
+
+    payload = why_connected(pkg_root, "ent_000", "ent_040", max_depth=60, max_expansions=10)
+
+    assert payload["truncated"] is True and payload["paths"] == []
+    assert payload["expanded"] == 10
+    assert len(why_connected(pkg_root, "ent_000", "ent_040", max_depth=60)["path"]) == 40  # type: ignore[arg-type]
+
+
+def _simple_paths(adjacency: dict[str, list[dict[str, object]]], source: str, target: str, max_depth: int) -> list[int]:
+    """Hop counts of every loopless path over edges in either direction."""
+    steps: dict[str, list[tuple[str, int]]] = {}
+    edge = 0
+    for from_id, edges in sorted(adjacency.items()):
+        for item in edges:
+            to_id = str(item["to_id"])
+            steps.setdefault(from_id, []).append((to_id, edge))
+            steps.setdefault(to_id, []).append((from_id, edge))
+            edge += 1
+    lengths: list[int] = []
+
+    def walk(node: str, visited: set[str], hops: int) -> None:
+        if node == target:
+            lengths.append(hops)
+            return
+        if hops == max_depth:
+            return
+        for neighbor, _ in steps.get(node, []):
+            if neighbor not in visited:
+                walk(neighbor, visited | {neighbor}, hops + 1)
+
+    walk(source, {source}, 0)
+    return sorted(lengths)
+
+
+@pytest.mark.parametrize("seed", range(6))
+def test_csr_and_compact_graph_agree_with_enumeration(tmp_path: Path, seed: int) -> None:
+    rng = random.Random(seed)
+    nodes = [f"ent_{index:02d}" for index in range(14)]
+    links = {
+        (a, b): _link(a, b, confidence=rng.choice([0.3, 0.8, 1.0]))
+        for a, b in (rng.sample(nodes, 2) for _ in range(26))
+    }
+    pkg_root = _build(tmp_path, list(links.values()))
+    csr = CsrAdjacency.open(pkg_root)
+    assert csr is not None
+    compact = CompactGraph(load_adjacency(pkg_root))
+
+    for source, target in [(nodes[0], nodes[1]), (nodes[2], nodes[9]), (nodes[5], nodes[13])]:
+        expected = _simple_paths(load_adjacency(pkg_root), source, target, 4)[:5]
+        found, truncated, _ = k_shortest_paths(csr, source, target, k=5, max_depth=4)
+        assert not truncated
+        assert [len(path) for path in found] == expected
+        assert k_shortest_paths(compact, source, target, k=5, max_depth=4)[0] == found
+        for path in found:
+            assert len({step[0] for step in path} | {path[-1][1]}) == len(path) + 1
+
+    mapped = why_connected(pkg_root, nodes[2], nodes[9], k=5)
+    shutil.rmtree(csr_dir(pkg_root))
+    assert why_connected(pkg_root, nodes[2], nodes[9], k=5) == mapped
+
+
+def test_unknown_or_identical_endpoints(tmp_path: Path) -> None:
+    pkg_root = _build(tmp_path, [_link("ent_a", "ent_b")])
+
+    assert why_connected(pkg_root, "ent_a", "ent_missing")["paths"] == []
+    assert why_connected(pkg_root, "ent_a", "ent_a")["path"] == []